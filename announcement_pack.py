@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Announcement Pack
+Every announcement phrase we might need, synthesized ahead of time into one memory-mapped file
+
+Goal and final-score announcements are built from phrases (see
+AppleMusicController.goal_announcement_fragments): "Patriots GOAL!!", "Scored by
+number 9, Brant Friedholm!", "Assisted by ...", "Final score: Patriots 3", ... The
+bake command synthesizes each phrase for every roster player and opponent with Hume,
+once, at home on good Wi-Fi. At the rink an announcement whose phrases are all in
+the pack is stitched straight from the mapped PCM - no network, no decoding - and
+anything else (an unknown number, a team added since) still goes to live TTS, which
+only synthesizes the phrases missing from the pack (see phrase_cache.py).
+
+    python3 announcement_pack.py bake                          # rosters/ -> ~/hockey_announcements.pack
+    python3 announcement_pack.py bake --teams "Blue Devils,Hawks" --max-score 12
+    python3 announcement_pack.py info
+    python3 announcement_pack.py check goal home 9 10 11    # would this play from the pack?
+    python3 announcement_pack.py check final 3 "Blue Devils" 2
+
+Re-baking reuses the audio of every phrase already in the pack, so a roster change
+only synthesizes the new lines. Every phrase is stored at the same loudness
+(--loudness-target, see audio_dsp.py), so names, numbers and scores stitch together evenly. Pack layout: MAGIC, raw PCM of every phrase, a JSON
+index ({phrase: [offset, length]} plus the shared WAV format), then the index offset
+and length and MAGIC again.
+"""
+
+import argparse
+import base64
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from app_log import get_logger
+from audio_dsp import TARGET_LUFS, normalize, read_wav, segue_wav
+from hockey_music_controller import DEFAULT_ROSTER_FILE, AppleMusicController
+from hume_tts import hume_client, hume_config, load_hume_sdk
+from roster_index import RosterIndex, read_roster_csv, team_name_for_file
+
+DEFAULT_PACK_FILE = '~/hockey_announcements.pack'
+MAGIC = b'HOCKPAK1'
+TRAILER = struct.Struct('<QQ')  # index offset, index length
+GAP_MS = 120  # silence between stitched phrases
+MAX_SCORE = 15
+
+log = get_logger('tts')
+
+
+def spoken_text(fragment):
+    """The phrase as synthesized - fragments carry the joining spaces and commas"""
+    return fragment.strip(' ,')
+
+
+def pack_phrases(home_players, opponents, teams=(), max_score=MAX_SCORE):
+    """Every phrase the announcements can use for these rosters
+
+    home_players is {number: name}, opponents {team: {number: name}}; teams are
+    extra opponent names for final scores (no roster needed).
+    """
+    fragments = AppleMusicController.goal_announcement_fragments
+    phrases = set()
+    for team, players in [('home', home_players)] + [('away', p) for p in opponents.values()]:
+        for number in players:
+            phrases.update(fragments(team, number, None, None, players))        # scorer, unassisted
+            phrases.update(fragments(team, number, number, number, players))    # both assist phrases
+            phrases.update(fragments(team, number, number, None, players))      # single assist
+    for score in range(max_score + 1):
+        for team in sorted(set(opponents) | set(teams)):
+            phrases.update(AppleMusicController.final_score_fragments(score, team, score))
+    return sorted({spoken_text(p) for p in phrases} - {''})
+
+
+def synthesize_hume(text, voice_id, api_key, client=None, base_url=None):
+    """WAV bytes for one phrase from Hume, or the TTS server at base_url (raises on any failure)"""
+    _, PostedUtterance, PostedUtteranceVoiceWithName = load_hume_sdk()
+    client = client or hume_client(api_key, base_url)
+    utterance = PostedUtterance(text=text, voice=PostedUtteranceVoiceWithName(name=voice_id, provider='CUSTOM_VOICE'))
+    kwargs = {}
+    try:
+        from hume.tts import FormatWav
+        kwargs['format'] = FormatWav()
+    except ImportError:
+        pass
+    result = client.tts.synthesize_json(utterances=[utterance], **kwargs)
+    if not (result and result.generations):
+        raise RuntimeError('No audio generated')
+    return base64.b64decode(result.generations[0].audio)
+
+
+class AnnouncementPack:
+    """A baked pack, memory-mapped read-only"""
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC or self._map[-len(MAGIC):] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{self.path} is not an announcement pack")
+        end = len(self._map) - len(MAGIC)
+        offset, length = TRAILER.unpack(self._map[end - TRAILER.size:end])
+        index = json.loads(self._map[offset:offset + length])
+        self.voice = index['voice']
+        self.format = tuple(index['format'])  # channels, sample width, rate
+        self.loudness_target = index.get('loudness_target')  # None: phrases as synthesized
+        self.phrases = {text: tuple(span) for text, span in index['phrases'].items()}
+
+    @classmethod
+    def load(cls, path=DEFAULT_PACK_FILE):
+        """The pack at path, or None if there is none (or it is unreadable)"""
+        if not os.path.exists(os.path.expanduser(path)):
+            return None
+        try:
+            pack = cls(path)
+        except (OSError, ValueError, KeyError) as e:
+            log.warning(f"⚠️  Announcement pack not loaded: {e}")
+            return None
+        log.info(f"📦 Announcement pack: {len(pack.phrases)} phrases", path=pack.path)
+        return pack
+
+    def close(self):
+        self._map.close()
+
+    def audio(self, text):
+        """PCM of one phrase as a view into the mapped file, or None"""
+        span = self.phrases.get(spoken_text(text))
+        if span is None:
+            return None
+        return memoryview(self._map)[span[0]:span[0] + span[1]]
+
+    def covers(self, fragments):
+        """True if every fragment of an announcement is in the pack"""
+        return all(spoken_text(f) in self.phrases for f in fragments if spoken_text(f))
+
+    def missing(self, fragments):
+        """Phrases of an announcement that are not baked"""
+        return [spoken_text(f) for f in fragments if spoken_text(f) and spoken_text(f) not in self.phrases]
+
+    def write_wav(self, fragments, out, gap_ms=GAP_MS):
+        """Stitch the fragments' PCM (with short gaps) into a WAV file object"""
+        channels, width, rate = self.format
+        gap = bytes(int(rate * gap_ms / 1000) * channels * width)
+        with wave.open(out, 'wb') as w:
+            w.setnchannels(channels)
+            w.setsampwidth(width)
+            w.setframerate(rate)
+            for i, fragment in enumerate(f for f in fragments if spoken_text(f)):
+                if i:
+                    w.writeframesraw(gap)
+                w.writeframesraw(self.audio(fragment))
+
+    def wav_bytes(self, fragments):
+        """The stitched announcement as WAV bytes"""
+        out = io.BytesIO()
+        self.write_wav(fragments, out)
+        return out.getvalue()
+
+    def speak(self, fragments, player, segue=None, audio=None):
+        """Play a covered announcement with player(path), returns a speak()-style result dict
+
+        A segue (audio_dsp.Segue) is mixed onto the end and played in the same
+        stream; audio is the WAV bytes if they were assembled ahead, segue included.
+        The result's stages are the ms spent on each step, as in AppleMusicController.speak
+        (assemble_ms, segue_ms, write_ms, play_ms - assembling and mixing only when
+        audio wasn't passed in).
+        """
+        started = mark = time.perf_counter()
+        result = {'engine': 'pack', 'ok': False, 'error': None, 'segued': False, 'synth_ms': None, 'total_ms': None,
+                  'stages': {}}
+
+        def stage(name):
+            nonlocal mark
+            now = time.perf_counter()
+            result['stages'][name] = (now - mark) * 1000
+            mark = now
+
+        temp_path = None
+        try:
+            if audio is None:
+                wav = self.wav_bytes(fragments)
+                stage('assemble_ms')
+                audio, result['segued'] = segue_wav(wav, segue)
+                if segue is not None:
+                    stage('segue_ms')
+            else:
+                result['segued'] = segue is not None
+            fd, temp_path = tempfile.mkstemp(suffix='.wav')
+            with os.fdopen(fd, 'wb') as temp_audio:
+                temp_audio.write(audio)
+            stage('write_ms')
+            result['synth_ms'] = (time.perf_counter() - started) * 1000
+            player(temp_path)
+            stage('play_ms')
+            result['ok'] = True
+        except Exception as e:
+            log.error(f"❌ Announcement pack playback failed: {e}")
+            result['error'] = str(e)
+            result['segued'] = False
+        finally:
+            try:
+                if temp_path:
+                    os.unlink(temp_path)
+            except OSError:
+                pass
+        result['total_ms'] = (time.perf_counter() - started) * 1000
+        log.debug("Announcement finished", **result)
+        return result
+
+
+def bake(phrases, path=DEFAULT_PACK_FILE, voice=None, synthesize=None, workers=4, loudness_target=None):
+    """Write a pack with every phrase, reusing the audio of an existing pack
+
+    synthesize(text) returns WAV bytes (default: Hume with the configured voice).
+    With a loudness_target (LUFS) every phrase is normalized to it once, here, so
+    playing from the pack costs nothing extra. Returns {'reused', 'synthesized',
+    'failed': [phrases], 'dropped'}.
+    """
+    path = os.path.expanduser(path)
+    if synthesize is None:
+        hume = hume_config()
+        if not (hume.available and hume.api_key):
+            raise RuntimeError("Hume is not configured (needs the hume SDK and HUME_API_KEY in .env)")
+        voice = voice or hume.voice_id
+        client = hume_client(hume.api_key, hume.base_url)
+        synthesize = lambda text: synthesize_hume(text, voice, hume.api_key, client)  # noqa: E731
+
+    old = None
+    try:
+        old = AnnouncementPack(path) if os.path.exists(path) else None
+    except (OSError, ValueError, KeyError) as e:
+        log.warning(f"⚠️  Existing pack unreadable, re-baking everything: {e}")
+    if old and old.voice != voice:
+        log.info(f"🎙️  Voice changed ({old.voice} -> {voice}) - re-baking everything")
+        old.close()
+        old = None
+
+    audio_format = old.format if old else None
+    renormalize = bool(old) and loudness_target is not None and old.loudness_target != loudness_target
+    pcm = {}
+    for text in phrases:
+        if old and text in old.phrases:
+            pcm[text] = bytes(old.audio(text))
+            if renormalize:
+                pcm[text] = normalize(old.format, pcm[text], loudness_target)[0]
+    todo = [text for text in phrases if text not in pcm]
+    failed = []
+    if todo:
+        log.info(f"🎤 Synthesizing {len(todo)} phrases ({len(pcm)} reused)")
+
+    def synth(text):
+        try:
+            wav_format, wav_pcm = read_wav(synthesize(text))
+            if loudness_target is not None:
+                wav_pcm = normalize(wav_format, wav_pcm, loudness_target)[0]
+            return text, (wav_format, wav_pcm), None
+        except Exception as e:
+            return text, None, e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for done, (text, wav, error) in enumerate(pool.map(synth, todo), 1):
+            if error is None and audio_format not in (None, wav[0]):
+                error = f"format {wav[0]} differs from the pack's {audio_format}"
+            if error is not None:
+                log.error(f"❌ {text!r}: {error}", phrase=text)
+                failed.append(text)
+                continue
+            audio_format = wav[0]
+            pcm[text] = wav[1]
+            if done % 25 == 0:
+                log.info(f"   {done}/{len(todo)}")
+    dropped = len(old.phrases.keys() - set(phrases)) if old else 0
+    if old:
+        old.close()
+    if audio_format is None:
+        raise RuntimeError("No phrase could be synthesized - pack not written")
+
+    index = {'voice': voice, 'format': list(audio_format), 'phrases': {}, 'loudness_target': loudness_target}
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            for text in sorted(pcm):
+                index['phrases'][text] = [f.tell(), len(pcm[text])]
+                f.write(pcm[text])
+            data = json.dumps(index, ensure_ascii=False).encode('utf-8')
+            offset = f.tell()
+            f.write(data + TRAILER.pack(offset, len(data)) + MAGIC)
+        os.replace(temp_path, path)  # a running controller keeps its mapping of the old file
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return {'reused': len(pcm) - (len(todo) - len(failed)), 'synthesized': len(todo) - len(failed),
+            'failed': failed, 'dropped': dropped}
+
+
+def roster_phrases(roster_dir='rosters', home_roster=DEFAULT_ROSTER_FILE, teams=(), max_score=MAX_SCORE):
+    """pack_phrases for the home roster file and every other roster in roster_dir"""
+    home_players = read_roster_csv(home_roster) if os.path.exists(home_roster) else {}
+    home_team = team_name_for_file(home_roster)
+    rosters = RosterIndex(roster_dir)
+    opponents = {team: rosters.players(team) for team in rosters.teams() if team != home_team}
+    return pack_phrases(home_players, opponents, teams, max_score)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-synthesized announcement pack")
+    parser.add_argument('command', choices=['bake', 'info', 'check'])
+    parser.add_argument('args', nargs='*', help="check: goal TEAM SCORER [ASSIST [ASSIST]] or final HOME TEAM VISITING")
+    parser.add_argument('--pack', default=DEFAULT_PACK_FILE, help="pack file")
+    parser.add_argument('--rosters', default='rosters', help="roster directory (home and opponents)")
+    parser.add_argument('--home', default=DEFAULT_ROSTER_FILE, help="home roster CSV")
+    parser.add_argument('--teams', default='', help="extra opponent names for final scores, comma separated")
+    parser.add_argument('--max-score', type=int, default=MAX_SCORE, help="highest score to bake")
+    parser.add_argument('--loudness-target', type=float, default=TARGET_LUFS,
+                        help=f"loudness of every phrase in LUFS (default {TARGET_LUFS:g})")
+    args = parser.parse_args()
+
+    if args.command == 'bake':
+        teams = [t.strip() for t in args.teams.split(',') if t.strip()]
+        phrases = roster_phrases(args.rosters, args.home, teams, args.max_score)
+        print(f"📋 {len(phrases)} phrases")
+        try:
+            stats = bake(phrases, args.pack, loudness_target=args.loudness_target)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        size = os.path.getsize(os.path.expanduser(args.pack)) / 1e6
+        print(f"✅ {args.pack}: {stats['synthesized']} synthesized, {stats['reused']} reused, "
+              f"{stats['dropped']} dropped, {size:.1f} MB")
+        if stats['failed']:
+            print(f"⚠️  {len(stats['failed'])} phrases failed - run bake again to retry them")
+        return 1 if stats['failed'] else 0
+
+    pack = AnnouncementPack.load(args.pack)
+    if pack is None:
+        print(f"❌ No announcement pack at {args.pack}")
+        return 1
+    channels, width, rate = pack.format
+    if args.command == 'info':
+        seconds = sum(length for _, length in pack.phrases.values()) / (channels * width * rate)
+        print(f"📦 {pack.path}")
+        print(f"   voice {pack.voice}, {len(pack.phrases)} phrases, {seconds / 60:.1f} min of audio")
+        print(f"   {rate} Hz, {8 * width}-bit, {channels} channel(s)")
+        if pack.loudness_target is not None:
+            print(f"   normalized to {pack.loudness_target:g} LUFS")
+        return 0
+    # check goal TEAM SCORER [ASSIST [ASSIST]] / check final HOME_SCORE TEAM VISITING_SCORE
+    words = args.args
+    if words[:1] == ['goal'] and 3 <= len(words) <= 5:
+        team, scorer, assists = words[1], words[2], (words[3:] + [None, None])[:2]
+        rosters = RosterIndex(args.rosters)
+        side = 'home' if team.lower() in ('home', team_name_for_file(args.home).lower()) else 'away'
+        roster_team = team_name_for_file(args.home) if side == 'home' else team
+        fragments = AppleMusicController.goal_announcement_fragments(side, scorer, *assists,
+                                                                     rosters.players(roster_team))
+    elif words[:1] == ['final'] and len(words) == 4:
+        fragments = AppleMusicController.final_score_fragments(*words[1:])
+    else:
+        parser.error("check needs: goal TEAM SCORER [ASSIST [ASSIST]]  or  final HOME_SCORE TEAM VISITING_SCORE")
+    print(''.join(fragments))
+    missing = pack.missing(fragments)
+    for phrase in missing:
+        print(f"   ❌ not baked: {phrase}")
+    print("✅ Plays from the pack" if not missing else "⚠️  Falls back to live TTS")
+    return 0 if not missing else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Controller Logging
+Structured, non-blocking logging - callers only enqueue a record, one thread formats and writes it
+
+    from app_log import get_logger
+    log = get_logger('music')
+    log.info(f"✓ Playing track {index} from '{name}'", playlist=name, index=index)
+    log.debug("No track playing (-1728)", throttle='applescript-1728')
+
+Keyword arguments become fields of the record. setup_logging() (called by main) routes
+every "hockey.*" logger through a bounded queue; a listener thread prints the usual
+console line and appends one JSON object per record to a per-game file in ~/hockey_logs
+(a new file on new_game(), the newest LOG_FILES_KEPT are kept). If the terminal or log
+pipe stalls, only the listener waits - and if the queue fills up, records are dropped
+and counted instead of blocking a hotkey.
+
+Records with a throttle key are rate-limited: at most one per THROTTLE_SECONDS, and the
+next one that gets through carries how many were suppressed. Before setup_logging() -
+in tests and the command-line tools - records print to the console directly, as before.
+
+    python3 app_log.py [LOG_FILE] [--level WARNING]   # print a game log (default: latest)
+"""
+
+import argparse
+import atexit
+import glob
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_LOG_DIR = '~/hockey_logs'
+LOG_FILES_KEPT = 20
+THROTTLE_SECONDS = 60
+QUEUE_SIZE = 10000
+ROOT_LOGGER = 'hockey'
+
+_STANDARD_KWARGS = ('exc_info', 'stack_info', 'stacklevel', 'extra')
+_listener = None
+_queue_handler = None
+
+
+class EventLogger(logging.LoggerAdapter):
+    """Logger taking event fields as keyword arguments: log.info(msg, track=..., ok=...)"""
+
+    def __init__(self, logger):
+        super().__init__(logger, {})
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in _STANDARD_KWARGS}
+        kwargs['extra'] = {'fields': fields}
+        return msg, kwargs
+
+
+def get_logger(name):
+    """Logger for one part of the controller ("music", "tts", "engine", ...)"""
+    return EventLogger(logging.getLogger(f'{ROOT_LOGGER}.{name}'))
+
+
+class ThrottleFilter(logging.Filter):
+    """Lets one record per throttle key through every `seconds` of clock(), counting the rest"""
+
+    def __init__(self, seconds=THROTTLE_SECONDS, clock=time.monotonic):
+        super().__init__()
+        self.seconds = seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._keys = {}  # throttle key -> [last emitted (monotonic), suppressed since]
+
+    def filter(self, record):
+        fields = getattr(record, 'fields', None)
+        key = fields.get('throttle') if fields else None
+        if key is None:
+            return True
+        now = self.clock()
+        with self._lock:
+            state = self._keys.get(key)
+            if state and now - state[0] < self.seconds:
+                state[1] += 1
+                return False
+            suppressed = state[1] if state else 0
+            self._keys[key] = [now, 0]
+        if suppressed:
+            record.fields = dict(fields, suppressed=suppressed)
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks or formats on the calling thread"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record  # same process - the listener formats it
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() waits for room in a full queue instead of raising queue.Full"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """The plain emoji line the controller always printed"""
+
+    def format(self, record):
+        line = super().format(record)
+        suppressed = getattr(record, 'fields', {}).get('suppressed')
+        return f"{line} (+{suppressed} similar)" if suppressed else line
+
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per record, like the game journal"""
+
+    def format(self, record):
+        entry = {'ts': round(record.created, 3), 'level': record.levelname,
+                 'logger': record.name[len(ROOT_LOGGER) + 1:], 'msg': record.getMessage()}
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class GameLogHandler(logging.Handler):
+    """Appends JSON lines to one file per game, keeping the newest `keep` files
+
+    Runs on the listener thread only. A record with a "new_game" field (see
+    new_game()) closes the current file and starts the next one.
+    """
+
+    def __init__(self, directory=DEFAULT_LOG_DIR, prefix='controller', keep=LOG_FILES_KEPT):
+        super().__init__()
+        self.directory = os.path.expanduser(directory)
+        self.prefix = prefix
+        self.keep = keep
+        self.path = None
+        self._file = None
+        self.setFormatter(JsonFormatter())
+
+    def _open(self, label=''):
+        if self._file:
+            self._file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        name = datetime.now().strftime(f'{self.prefix}_%Y%m%d_%H%M%S')
+        if label:
+            name += '_' + ''.join(c if c.isalnum() else '_' for c in label)
+        self.path = os.path.join(self.directory, name + '.jsonl')
+        self._file = open(self.path, 'a', encoding='utf-8')
+        for old in sorted(glob.glob(os.path.join(self.directory, f'{self.prefix}_*.jsonl')))[:-self.keep]:
+            try:
+                os.unlink(old)
+            except OSError:
+                pass
+
+    def emit(self, record):
+        try:
+            label = getattr(record, 'fields', {}).get('new_game')
+            if self._file is None or label is not None:
+                self._open(label or '')
+            self._file.write(self.format(record) + '\n')
+            self._file.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        super().close()
+
+
+def _default_console():
+    """Synchronous console output until setup_logging() is called"""
+    logger = logging.getLogger(ROOT_LOGGER)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(ConsoleFormatter())
+        handler.addFilter(ThrottleFilter())
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+_default_console()
+
+
+def setup_logging(prefix='controller', level='INFO', directory=DEFAULT_LOG_DIR, keep=LOG_FILES_KEPT,
+                  console=True, queue_size=QUEUE_SIZE):
+    """Route all controller logging through the queue and the listener thread, returns the log directory
+
+    prefix names this process's log files ("gui", "engine", "headless").
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+    handlers = [GameLogHandler(directory, prefix, keep)]
+    if console:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(ConsoleFormatter())
+        handlers.append(stream)
+    log_queue = queue.Queue(queue_size)
+    _queue_handler = _QueueHandler(log_queue)
+    _queue_handler.addFilter(ThrottleFilter())
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(_queue_handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    _listener = _QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return handlers[0].directory
+
+
+def shutdown_logging():
+    """Write out everything queued and stop the listener thread"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logging.getLogger(ROOT_LOGGER).removeHandler(_queue_handler)
+    if _queue_handler.dropped:
+        print(f"⚠️  {_queue_handler.dropped} log records dropped (log output could not keep up)")
+    _listener = _queue_handler = None
+    _default_console()
+
+
+def new_game(label=''):
+    """Start the next per-game log file (at the point in the queue this is called)"""
+    get_logger('game').info(f"📒 New game{f': {label}' if label else ''}", new_game=label)
+
+
+def latest_log(directory=DEFAULT_LOG_DIR):
+    files = sorted(glob.glob(os.path.join(os.path.expanduser(directory), '*.jsonl')), key=os.path.getmtime)
+    return files[-1] if files else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a controller log file")
+    parser.add_argument('log', nargs='?', help="log file (default: latest in ~/hockey_logs)")
+    parser.add_argument('--level', default='DEBUG', help="lowest level to show")
+    args = parser.parse_args()
+
+    path = args.log or latest_log()
+    if not path:
+        print(f"❌ No logs in {DEFAULT_LOG_DIR}")
+        return 1
+    threshold = logging.getLevelName(args.level.upper())
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if logging.getLevelName(entry['level']) < threshold:
+                continue
+            stamp = datetime.fromtimestamp(entry.pop('ts')).strftime('%H:%M:%S.%f')[:-3]
+            level, name, msg = entry.pop('level'), entry.pop('logger'), entry.pop('msg')
+            fields = ' '.join(f"{k}={v}" for k, v in entry.items())
+            print(f"{stamp} {level:<7} {name:<8} {msg}{'  ' + fields if fields else ''}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+AppleScript
+The Music app's AppleScript commands, shared by the blocking and the asyncio controller
+
+Every script AppleMusicController (hockey_music_controller.py) and
+AsyncMusicController (async_music.py) send to Music is built here, along with the
+parsing of what osascript prints back, so the two stay in step. run_applescript and
+spawn_applescript run a script with osascript.
+"""
+
+import hashlib
+import subprocess
+import time
+
+from app_log import get_logger
+
+log = get_logger('music')
+
+PLAYLISTS = '''
+        tell application "Music"
+            get name of every playlist
+        end tell
+        '''
+
+LIBRARY_TRACKS = '''
+        tell application "Music"
+            set trackNames to name of every track of library playlist 1
+            set trackArtists to artist of every track of library playlist 1
+        end tell
+        set AppleScript's text item delimiters to "|||"
+        return (trackNames as text) & linefeed & (trackArtists as text)
+        '''
+
+WARM_UP = '''
+        tell application "Music"
+            if it is not running then launch
+            get player state
+        end tell
+        '''
+
+PLAY_PAUSE = 'tell application "Music" to playpause'
+NEXT_TRACK = 'tell application "Music" to next track'
+PREVIOUS_TRACK = 'tell application "Music" to previous track'
+STOP = 'tell application "Music" to stop'
+PAUSE = 'tell application "Music" to pause'
+GET_VOLUME = 'tell application "Music" to get sound volume'
+
+CURRENT_TRACK = '''
+        tell application "Music"
+            if player state is not stopped then
+                return name of current track & " - " & artist of current track
+            else
+                return "No track playing"
+            end if
+        end tell
+        '''
+
+CURRENT_TRACK_NAME = '''
+        tell application "Music"
+            if player state is not stopped then
+                return name of current track
+            else
+                return ""
+            end if
+        end tell
+        '''
+
+IS_PLAYING = '''
+        tell application "Music"
+            if player state is playing then
+                return "playing"
+            else
+                return "not playing"
+            end if
+        end tell
+        '''
+
+
+def playlist_tracks(playlist_name):
+    """Script printing a playlist's tracks as "Name | Artist|||Name | Artist..." (see split_tracks)"""
+    return f'''
+        tell application "Music"
+            set trackList to {{}}
+            repeat with t in (every track of playlist "{playlist_name}")
+                set end of trackList to (name of t & " | " & artist of t)
+            end repeat
+            set AppleScript's text item delimiters to "|||"
+            return trackList as text
+        end tell
+        '''
+
+
+def playlist_fingerprint(playlist_name):
+    """Script printing the database IDs of a playlist's tracks (see fingerprint)"""
+    return f'tell application "Music" to get database ID of every track of playlist "{playlist_name}"'
+
+
+def missing_tracks(track_names):
+    """Script printing the names Music has no track for, "|||"-separated"""
+    names = ', '.join('"' + n.replace('\\', '\\\\').replace('"', '\\"') + '"' for n in track_names)
+    return f'''
+        tell application "Music"
+            set missingNames to {{}}
+            repeat with trackName in {{{names}}}
+                if not (exists track (trackName as text)) then set end of missingNames to (trackName as text)
+            end repeat
+            set AppleScript's text item delimiters to "|||"
+            return missingNames as text
+        end tell
+        '''
+
+
+def play_track(playlist_name, track_index, start_time=None):
+    """Script playing a track of a playlist (1-indexed), from start_time seconds if given"""
+    if start_time is None:
+        return f'''
+        tell application "Music"
+            play track {track_index} of playlist "{playlist_name}"
+        end tell
+        '''
+    return f'''
+        tell application "Music"
+            play track {track_index} of playlist "{playlist_name}"
+            delay 0.5
+            set player position to {start_time}
+        end tell
+        '''
+
+
+def play_track_by_name(track_name):
+    return f'''
+        tell application "Music"
+            play track "{track_name}"
+        end tell
+        '''
+
+
+def track_id(playlist_name, track_index):
+    return f'''
+        tell application "Music"
+            return database ID of track {track_index} of playlist "{playlist_name}"
+        end tell
+        '''
+
+
+def set_current_track(track_id):
+    return f'''
+        tell application "Music"
+            set player position to 0
+            set current track to (some track whose database ID is {track_id})
+        end tell
+        '''
+
+
+def show_playlist(playlist_name):
+    return f'''
+        tell application "Music"
+            set view of front window to playlist "{playlist_name}"
+        end tell
+        '''
+
+
+def set_volume(volume):
+    return f'tell application "Music" to set sound volume to {int(volume)}'
+
+
+def fade_out(duration, start_volume, steps=20):
+    """Script ramping the volume down and stopping in one call, then restoring the volume"""
+    step_delay = max(duration / steps, 0.01)
+    return f'''
+        tell application "Music"
+            repeat with i from 1 to {steps}
+                set sound volume to ({start_volume} * ({steps} - i) / {steps}) as integer
+                delay {step_delay:.3f}
+            end repeat
+            stop
+            set sound volume to {int(start_volume)}
+        end tell
+        '''
+
+
+def split_list(output):
+    """A comma-separated AppleScript list as strings"""
+    return [p.strip() for p in output.split(',')]
+
+
+def split_tracks(output):
+    """Tracks from playlist_tracks' output"""
+    return [t.strip() for t in output.split('|||') if t.strip()]
+
+
+def split_library(output):
+    """"Name | Artist" for every track from LIBRARY_TRACKS' output"""
+    names, _, artists = output.partition('\n')
+    return [f"{name.strip()} | {artist.strip()}"
+            for name, artist in zip(names.split('|||'), artists.split('|||')) if name.strip()]
+
+
+def fingerprint(output):
+    """"<track count>:<hash of track IDs>" from playlist_fingerprint's output"""
+    ids = [i.strip() for i in output.split(',') if i.strip()]
+    return f"{len(ids)}:{hashlib.sha1(','.join(ids).encode('utf-8')).hexdigest()[:16]}"
+
+
+def parse_volume(output):
+    """The volume GET_VOLUME printed, or None"""
+    try:
+        return int(output)
+    except ValueError:
+        return None
+
+
+def run_applescript(script, max_retries=3, retry_delay=0.5, silent_on_error=False):
+    """Execute AppleScript with retry logic, returns (output, success)"""
+    for attempt in range(max_retries):
+        try:
+            result = subprocess.run(
+                ['osascript', '-e', script],
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+            if result.returncode == 0:
+                return result.stdout.strip(), True
+            else:
+                error_msg = result.stderr.strip()
+
+                # Check if this is the "no track playing" error (-1728)
+                # This is a NORMAL state, not an actual error!
+                if '(-1728)' in error_msg:
+                    # Return on first attempt for -1728 errors (debug log only, rate-limited)
+                    log.debug("No track playing (-1728)", throttle='applescript-1728')
+                    return "", False
+
+                # For other errors, log unless silent mode
+                if not silent_on_error:
+                    log.warning(f"⚠️  AppleScript error (attempt {attempt + 1}/{max_retries}): {error_msg}",
+                                attempt=attempt + 1, error=error_msg)
+
+                if attempt < max_retries - 1:
+                    time.sleep(retry_delay)
+        except subprocess.TimeoutExpired:
+            if not silent_on_error:
+                log.warning(f"⏱️  AppleScript timeout (attempt {attempt + 1}/{max_retries})",
+                            attempt=attempt + 1, error='timeout')
+            if attempt < max_retries - 1:
+                time.sleep(retry_delay)
+        except Exception as e:
+            if not silent_on_error:
+                log.error(f"❌ AppleScript error (attempt {attempt + 1}/{max_retries}): {e}",
+                          attempt=attempt + 1, error=str(e))
+            if attempt < max_retries - 1:
+                time.sleep(retry_delay)
+
+    if not silent_on_error:
+        log.error("💥 All retry attempts failed!", attempts=max_retries)
+    return "", False
+
+
+def spawn_applescript(script):
+    """Start an AppleScript without waiting for it, returns the process"""
+    return subprocess.Popen(
+        ['osascript', '-e', script],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Async Music Controller
+asyncio counterpart of AppleMusicController - every operation is a coroutine
+
+    controller = AsyncMusicController(max_concurrent=4)
+    tracks = await controller.get_playlist_tracks("Stoppage")
+    await asyncio.wait_for(controller.speak("Patriots GOAL!!"), 8)
+
+osascript, afplay and Hume synthesis run on asyncio subprocess/stream primitives:
+a semaphore bounds how many osascript processes run at once, every call has a
+timeout, and cancelling a coroutine kills the process it started. The scripts and
+the parsing of their output are the ones AppleMusicController uses (applescript.py).
+
+For code that isn't async:
+    AsyncLoopThread      - an event loop on a background thread
+    TkAsyncBridge        - run coroutines from Tk, results delivered on the Tk thread
+    SyncMusicController  - blocking AppleMusicController facade over the async one,
+                           a drop-in for HockeyController (--backend async)
+"""
+
+import asyncio
+import base64
+import os
+import queue
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+import applescript
+from app_log import get_logger
+from audio_dsp import TARGET_LUFS, announcement_cache, prepare_wav, segue_wav
+from hockey_music_controller import AppleMusicController
+from hume_tts import hume_config, load_hume_async_sdk
+
+log = get_logger('music')
+tts_log = get_logger('tts')
+
+
+class AsyncMusicController:
+    """Interface to control Apple Music via AppleScript, as coroutines
+
+    osascript and player are the commands scripts and sound files are run with
+    (the script or file is appended), so tests can stand in for them.
+    """
+
+    # Operations shared with AppleMusicController (same names, arguments and results)
+    OPERATIONS = (
+        'get_playlists', 'get_playlist_tracks', 'get_playlist_fingerprint', 'get_library_tracks', 'warm_up',
+        'missing_tracks', 'play_track_from_playlist', 'play_track_from_playlist_with_start_time',
+        'play_track_by_name', 'play_pause', 'next_track', 'previous_track', 'stop', 'get_current_track',
+        'get_current_track_name_only', 'is_playing', 'pause', 'get_track_id_from_playlist',
+        'set_current_track_by_id', 'set_playlist_as_source', 'get_volume', 'set_volume', 'play_sound_file', 'speak',
+    )
+
+    def __init__(self, max_concurrent=4, timeout=30, osascript=('osascript', '-e'), player=('afplay',)):
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.osascript = tuple(osascript)
+        self.player = tuple(player)
+        self._semaphore = None  # created lazily, inside the loop that uses it
+
+    def _limit(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    @staticmethod
+    async def _run_process(args, timeout):
+        """Run a subprocess to completion, returns (returncode, stdout, stderr)
+
+        The process is killed on timeout (asyncio.TimeoutError) or cancellation.
+        """
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        return process.returncode, stdout.decode('utf-8', 'replace'), stderr.decode('utf-8', 'replace')
+
+    async def run_applescript(self, script, max_retries=3, retry_delay=0.5, silent_on_error=False, timeout=None):
+        """Execute AppleScript with retry logic, returns (output, success)"""
+        timeout = timeout or self.timeout
+        for attempt in range(max_retries):
+            try:
+                async with self._limit():
+                    returncode, stdout, stderr = await self._run_process([*self.osascript, script], timeout)
+                if returncode == 0:
+                    return stdout.strip(), True
+                error_msg = stderr.strip()
+
+                # "No track playing" (-1728) is a normal state, not an error
+                if '(-1728)' in error_msg:
+                    log.debug("No track playing (-1728)", throttle='applescript-1728')
+                    return "", False
+
+                if not silent_on_error:
+                    log.warning(f"⚠️  AppleScript error (attempt {attempt + 1}/{max_retries}): {error_msg}",
+                                attempt=attempt + 1, error=error_msg)
+            except asyncio.TimeoutError:
+                if not silent_on_error:
+                    log.warning(f"⏱️  AppleScript timeout (attempt {attempt + 1}/{max_retries})",
+                                attempt=attempt + 1, error='timeout')
+            except OSError as e:
+                if not silent_on_error:
+                    log.error(f"❌ AppleScript error (attempt {attempt + 1}/{max_retries}): {e}",
+                              attempt=attempt + 1, error=str(e))
+            if attempt < max_retries - 1:
+                await asyncio.sleep(retry_delay)
+
+        if not silent_on_error:
+            log.error("💥 All retry attempts failed!", attempts=max_retries)
+        return "", False
+
+    async def get_playlists(self):
+        """Get list of all playlists"""
+        output, success = await self.run_applescript(applescript.PLAYLISTS)
+        if success and output:
+            return applescript.split_list(output)
+        return []
+
+    async def get_playlist_tracks(self, playlist_name):
+        """Get tracks from a specific playlist"""
+        output, success = await self.run_applescript(applescript.playlist_tracks(playlist_name))
+        if success and output:
+            return applescript.split_tracks(output)
+        return []
+
+    async def get_playlist_fingerprint(self, playlist_name):
+        """Cheap change check for a playlist: "<track count>:<hash of track IDs>" (None on failure)"""
+        output, success = await self.run_applescript(applescript.playlist_fingerprint(playlist_name),
+                                                     silent_on_error=True)
+        if not success:
+            return None
+        return applescript.fingerprint(output)
+
+    async def get_library_tracks(self):
+        """Every track in the library as "Name | Artist" - two bulk property reads, not one per track"""
+        output, success = await self.run_applescript(applescript.LIBRARY_TRACKS, max_retries=2)
+        if not success or not output:
+            return []
+        return applescript.split_library(output)
+
+    async def warm_up(self):
+        """Start Music if needed and wake its scripting bridge, returns True once it answers"""
+        return (await self.run_applescript(applescript.WARM_UP, max_retries=2, retry_delay=1.0))[1]
+
+    async def missing_tracks(self, track_names):
+        """The names play_track_by_name would not find"""
+        if not track_names:
+            return []
+        output, success = await self.run_applescript(applescript.missing_tracks(track_names))
+        if not success:
+            return []
+        return [n for n in output.split('|||') if n]
+
+    async def play_track_from_playlist(self, playlist_name, track_index):
+        """Play a specific track by index from playlist (1-indexed)"""
+        output, success = await self.run_applescript(applescript.play_track(playlist_name, track_index))
+        if not success:
+            log.error(f"❌ FAILED: Could not play track {track_index} from '{playlist_name}'",
+                      playlist=playlist_name, track=track_index)
+        else:
+            log.info(f"✓ Playing track {track_index} from '{playlist_name}'", playlist=playlist_name, track=track_index)
+        return success
+
+    async def play_track_from_playlist_with_start_time(self, playlist_name, track_index, start_time):
+        """Play a specific track by index from playlist with custom start time (1-indexed)"""
+        output, success = await self.run_applescript(applescript.play_track(playlist_name, track_index, start_time))
+        if not success:
+            log.error(f"❌ FAILED: Could not play track {track_index} from '{playlist_name}'",
+                      playlist=playlist_name, track=track_index, start_time=start_time)
+        else:
+            log.info(f"✓ Playing track {track_index} from '{playlist_name}' at {start_time}s",
+                     playlist=playlist_name, track=track_index, start_time=start_time)
+        return success
+
+    async def play_track_by_name(self, track_name):
+        """Play a specific track by name"""
+        return (await self.run_applescript(applescript.play_track_by_name(track_name)))[1]
+
+    async def play_pause(self):
+        """Toggle play/pause"""
+        return (await self.run_applescript(applescript.PLAY_PAUSE))[1]
+
+    async def next_track(self):
+        """Skip to next track"""
+        return (await self.run_applescript(applescript.NEXT_TRACK))[1]
+
+    async def previous_track(self):
+        """Go to previous track"""
+        return (await self.run_applescript(applescript.PREVIOUS_TRACK))[1]
+
+    async def stop(self):
+        """Stop playback"""
+        output, success = await self.run_applescript(applescript.STOP)
+        if not success:
+            log.error("❌ FAILED: Could not stop music")
+        return success
+
+    async def get_current_track(self):
+        """Get currently playing track info"""
+        output, success = await self.run_applescript(applescript.CURRENT_TRACK)
+        return output if success else "Unknown"
+
+    async def get_current_track_name_only(self):
+        """Get just the name of the currently playing track"""
+        output, success = await self.run_applescript(applescript.CURRENT_TRACK_NAME)
+        return output if success else ""
+
+    async def is_playing(self):
+        """Check if music is currently playing"""
+        output, success = await self.run_applescript(applescript.IS_PLAYING)
+        return output == "playing" if success else False
+
+    async def pause(self):
+        """Pause playback"""
+        return (await self.run_applescript(applescript.PAUSE))[1]
+
+    async def get_track_id_from_playlist(self, playlist_name, track_index):
+        """Get the database ID of a track in a playlist"""
+        output, success = await self.run_applescript(applescript.track_id(playlist_name, track_index))
+        return output if success else None
+
+    async def set_current_track_by_id(self, track_id):
+        """Set current track by database ID without playing"""
+        return (await self.run_applescript(applescript.set_current_track(track_id)))[1]
+
+    async def set_playlist_as_source(self, playlist_name):
+        """Set a playlist as the current playback source"""
+        return (await self.run_applescript(applescript.show_playlist(playlist_name)))[1]
+
+    async def get_volume(self):
+        """Get the Music app's sound volume (0-100)"""
+        output, success = await self.run_applescript(applescript.GET_VOLUME)
+        return applescript.parse_volume(output) if success else None
+
+    async def set_volume(self, volume):
+        """Set the Music app's sound volume (0-100)"""
+        return (await self.run_applescript(applescript.set_volume(volume)))[1]
+
+    async def fade_out(self, duration, start_volume, steps=20):
+        """Fade out and stop as one AppleScript call, returns True when the fade finished
+
+        Cancelling kills the ramp mid-way and leaves the volume where it was -
+        restoring it is up to the caller, as with AppleMusicController.start_fade_out.
+        """
+        script = applescript.fade_out(duration, start_volume, steps)
+        return (await self.run_applescript(script, max_retries=1, timeout=duration + self.timeout))[1]
+
+    async def play_sound_file(self, path, timeout=120):
+        """Play a local audio file to completion (afplay) - cancelling stops playback"""
+        try:
+            returncode, _, stderr = await self._run_process([*self.player, path], timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            tts_log.warning(f"⚠️  Could not play {os.path.basename(path)}: {e}", path=path)
+            return False
+        if returncode != 0:
+            tts_log.warning(f"⚠️  Could not play {os.path.basename(path)}: {stderr.strip()}", path=path)
+        return returncode == 0
+
+    async def _hume_synthesize(self, announcement, hume, stages):
+        """Base64 audio for an announcement from Hume's async client
+
+        Times the DNS check, client construction and synthesize_json into stages.
+        """
+        loop = asyncio.get_running_loop()
+        mark = time.perf_counter()
+
+        def stage(name):
+            nonlocal mark
+            now = time.perf_counter()
+            stages[name] = (now - mark) * 1000
+            mark = now
+
+        try:
+            # Quick network check - fail fast if DNS is down
+            host = urlparse(hume.base_url).hostname if hume.base_url else 'api.hume.ai'
+            await asyncio.wait_for(loop.getaddrinfo(host, 443), 2)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RuntimeError(f'Network unreachable: {e}')
+        stage('dns_ms')
+
+        tts_log.info(f"🎤 Starting Hume TTS with custom voice: {hume.voice_id}", voice=hume.voice_id)
+        AsyncHumeClient, PostedUtterance, PostedUtteranceVoiceWithName = load_hume_async_sdk()
+        client = (AsyncHumeClient(api_key=hume.api_key, base_url=hume.base_url) if hume.base_url
+                  else AsyncHumeClient(api_key=hume.api_key))
+        stage('client_ms')
+        utterance = PostedUtterance(
+            text=announcement,
+            voice=PostedUtteranceVoiceWithName(name=hume.voice_id, provider='CUSTOM_VOICE')
+        )
+        result = await client.tts.synthesize_json(utterances=[utterance])
+        stage('synthesize_ms')
+        if not (result and result.generations):
+            raise RuntimeError('No audio generated')
+        return result.generations[0].audio
+
+    async def speak(self, announcement, use_hume=True, player=None, loudness_target=TARGET_LUFS, trim=True,
+                    segue=None, synth_timeout=5.0):
+        """Synthesize an announcement with Hume.ai and play it, or skip if unavailable
+
+        Returns the same result dict as AppleMusicController.speak, stages included,
+        and shares its cache. player(path) is a blocking player run on a worker
+        thread (default: this controller's player command).
+        """
+        started = time.perf_counter()
+        result = {'engine': 'none', 'ok': False, 'error': None, 'cached': False, 'segued': False, 'synth_ms': None,
+                  'gain_db': None, 'lead_trimmed_ms': None, 'trail_trimmed_ms': None, 'total_ms': None,
+                  'stages': {}}
+        stages = result['stages']
+
+        hume = hume_config()
+        cache_key = (hume.voice_id, announcement, loudness_target, trim)
+        cached = announcement_cache.get(cache_key) if use_hume else None
+        if cached:
+            result.update(cached[1], engine='hume', cached=True)
+            result['ok'], result['segued'] = await self._play_announcement(cached[0], player, segue, stages)
+            tts_log.info("✓ Hume TTS (cached)")
+        elif use_hume and hume.available and hume.api_key and hume.voice_id:
+            result['engine'] = 'hume'
+            try:
+                audio = await asyncio.wait_for(self._hume_synthesize(announcement, hume, stages), synth_timeout)
+            except asyncio.TimeoutError:
+                tts_log.error(f"❌ Hume TTS timed out after {synth_timeout:g} seconds - skipping announcement",
+                              error='timeout')
+                result['error'] = 'timeout'
+            except Exception as e:
+                tts_log.error(f"❌ Hume TTS error: {e} - skipping announcement", error=str(e))
+                result['error'] = str(e)
+            else:
+                result['synth_ms'] = (time.perf_counter() - started) * 1000
+                mark = time.perf_counter()
+                audio_bytes = base64.b64decode(audio)
+                stages['decode_ms'] = (time.perf_counter() - mark) * 1000
+                mark = time.perf_counter()
+                audio_bytes, info = prepare_wav(audio_bytes, loudness_target, trim)
+                stages['prepare_ms'] = (time.perf_counter() - mark) * 1000
+                result.update(info)
+                announcement_cache.put(cache_key, audio_bytes, info)
+                result['ok'], result['segued'] = await self._play_announcement(audio_bytes, player, segue, stages)
+                if result['ok']:
+                    tts_log.info("✓ Hume TTS successful!", lead_trimmed_ms=info.get('lead_trimmed_ms'),
+                                 trail_trimmed_ms=info.get('trail_trimmed_ms'))
+            if result['synth_ms'] is None:
+                result['synth_ms'] = (time.perf_counter() - started) * 1000
+        elif not hume.available:
+            tts_log.info("ℹ️  Hume SDK not available - skipping announcement")
+        elif not hume.api_key:
+            tts_log.info("ℹ️  Hume API key not configured - skipping announcement")
+        elif not hume.voice_id:
+            tts_log.info("ℹ️  Hume voice ID not configured - skipping announcement")
+        else:
+            tts_log.info("ℹ️  Hume TTS disabled - skipping announcement")
+
+        result['total_ms'] = (time.perf_counter() - started) * 1000
+        tts_log.debug("Announcement finished", **result)
+        return result
+
+    async def _play_announcement(self, audio_bytes, player=None, segue=None, stages=None):
+        """(played, segue mixed in) - see AppleMusicController._play_announcement"""
+        stages = {} if stages is None else stages
+        mark = time.perf_counter()
+        audio_bytes, segued = segue_wav(audio_bytes, segue)
+        if segue is not None:
+            stages['segue_ms'] = (time.perf_counter() - mark) * 1000
+        mark = time.perf_counter()
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
+            temp_audio.write(audio_bytes)
+            temp_audio_path = temp_audio.name
+        stages['write_ms'] = (time.perf_counter() - mark) * 1000
+        mark = time.perf_counter()
+        try:
+            if player:
+                await asyncio.to_thread(player, temp_audio_path)
+                played = True
+            else:
+                played = await self.play_sound_file(temp_audio_path)
+            stages['play_ms'] = (time.perf_counter() - mark) * 1000
+            return played, segued
+        finally:
+            try:
+                os.unlink(temp_audio_path)
+            except OSError:
+                pass
+
+
+class AsyncLoopThread:
+    """An asyncio event loop running on its own daemon thread"""
+
+    def __init__(self, name='asyncio'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine, returns a concurrent.futures.Future
+
+        future.cancel() cancels the coroutine on the loop.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine and block for its result (never call from the loop thread)"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self):
+        """Stop the loop and wait for the thread"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+class TkAsyncBridge:
+    """Runs coroutines for a Tk app and delivers their results on the Tk thread
+
+        bridge = TkAsyncBridge(root)
+        bridge.call(controller.get_playlists(), on_result=show_playlists)
+
+    Tk is not thread-safe, so callbacks are queued and drained by root.after.
+    """
+
+    def __init__(self, root, loop_thread=None, poll_ms=20):
+        self.root = root
+        self.loop_thread = loop_thread or AsyncLoopThread('tk-asyncio')
+        self.poll_ms = poll_ms
+        self._callbacks = queue.Queue()
+        self._poll()
+
+    def call(self, coro, on_result=None, on_error=None):
+        """Start a coroutine, returns its Future (cancel() to abort it)"""
+        future = self.loop_thread.submit(coro)
+
+        def done(future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                if on_error:
+                    self._callbacks.put(lambda: on_error(error))
+                else:
+                    log.error(f"❌ Background task failed: {error}", error=str(error))
+            elif on_result:
+                self._callbacks.put(lambda: on_result(future.result()))
+
+        future.add_done_callback(done)
+        return future
+
+    def _poll(self):
+        while True:
+            try:
+                callback = self._callbacks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback()
+            except Exception as e:
+                log.error(f"❌ UI update failed: {e}", error=str(e))
+        self.root.after(self.poll_ms, self._poll)
+
+
+class _FadeHandle:
+    """poll/kill/wait over an async fade, so PlaybackScheduler can treat it like a process"""
+
+    def __init__(self, future):
+        self._future = future
+
+    def poll(self):
+        return 0 if self._future.done() else None
+
+    def kill(self):
+        self._future.cancel()
+
+    def wait(self):
+        try:
+            self._future.result()
+        except BaseException:
+            pass
+        return 0
+
+
+class SyncMusicController(AppleMusicController):
+    """Blocking AppleMusicController API backed by AsyncMusicController
+
+    Existing callers (HockeyController, the GUI, the command server) keep their
+    synchronous calls; underneath, the work runs on one event loop with the
+    async controller's concurrency limit and timeouts.
+    """
+
+    def __init__(self, async_controller=None, loop_thread=None):
+        self.async_controller = async_controller or AsyncMusicController()
+        self.loop_thread = loop_thread or AsyncLoopThread('music-asyncio')
+
+    @classmethod
+    def from_config(cls, config):
+        """Backend from the "async_*" keys of a config dict"""
+        return cls(AsyncMusicController(config.get('async_max_concurrent', 4), config.get('async_timeout', 30)))
+
+    def run_applescript(self, script, max_retries=3, retry_delay=0.5, silent_on_error=False):
+        return self.loop_thread.run(
+            self.async_controller.run_applescript(script, max_retries, retry_delay, silent_on_error)
+        )
+
+    def start_fade_out(self, duration, start_volume, steps=20):
+        return _FadeHandle(self.loop_thread.submit(self.async_controller.fade_out(duration, start_volume, steps)))
+
+
+def _blocking(name):
+    def method(self, *args, **kwargs):
+        return self.loop_thread.run(getattr(self.async_controller, name)(*args, **kwargs))
+    method.__name__ = name
+    method.__doc__ = getattr(AsyncMusicController, name).__doc__
+    return method
+
+
+for _name in AsyncMusicController.OPERATIONS:
+    setattr(SyncMusicController, _name, _blocking(_name))
@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+Audio DSP
+Loudness, gain, silence trimming and mixing for the PCM we play ourselves - announcements and sound clips
+
+Hume announcements, baked phrases and sound clips come in at very different levels,
+and the operator ends up riding the volume. Every buffer is analysed once, when it is
+synthesized, baked or decoded, and brought to one target loudness (TARGET_LUFS,
+roughly where Apple Music's Sound Check puts songs). The gain is applied to the PCM
+that is then cached, or handed to afplay/mpv as a volume, so playing it costs nothing extra.
+
+Loudness is the gated block loudness of ITU-R BS.1770: the power of 400 ms blocks
+(75% overlap) with blocks below -70 LUFS, then below the mean minus 10 dB, ignored -
+so pauses between words don't make an announcement look quiet. The K-weighting filter
+is left out (it needs an IIR filter, i.e. scipy), which reads a few dB high on
+bass-heavy clips. The gain is capped so the peak stays under PEAK_CEILING_DB.
+
+Synthesized speech also comes with hundreds of milliseconds of silence around it, which
+adds straight to the time before the first word (and delays the celebration clip after
+the last). trim_silence() cuts it back to a short pad, found from the energy of 10 ms
+frames: anything SILENCE_BELOW_PEAK_DB under the loudest frame, or under
+SILENCE_FLOOR_DBFS, is silence.
+
+A clip that follows an announcement (the goal celebration) is mixed onto its end as a
+Segue - converted to the announcement's format, optionally overlapping its last
+milliseconds with a crossfade - so both play as one stream with no player start between.
+
+With NumPy installed (pip install numpy) all of this runs vectorized over the whole
+buffer; without it a pure-Python loop does the same, about 50x slower.
+
+    python3 audio_dsp.py levels sound_clips/*.m4a     # loudness, peak, gain and silence per file
+    python3 audio_dsp.py bench --clips 200            # a batch of clips, NumPy vs pure Python
+"""
+
+import argparse
+import importlib.util
+import io
+import itertools
+import math
+import random
+import statistics
+import struct
+import sys
+import threading
+import time
+import wave
+from array import array
+from collections import OrderedDict, namedtuple
+
+from app_log import get_logger
+
+TARGET_LUFS = -16.0
+PEAK_CEILING_DB = -1.0
+MAX_GAIN_DB = 12.0    # a near-silent clip isn't turned into a wall of noise
+MIN_GAIN_DB = -24.0
+BLOCK_MS = 400
+STEP_MS = 100
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_DB = -10.0
+SILENCE_FRAME_MS = 10
+SILENCE_BELOW_PEAK_DB = 45.0
+SILENCE_FLOOR_DBFS = -60.0
+LEAD_PAD_MS = 20    # kept before the first word so its attack isn't clipped
+TRAIL_PAD_MS = 80   # ...and after the last for its decay
+
+log = get_logger('audio')
+
+# (loudness in LUFS or None for silence, sample peak in dBFS or None for silence)
+Levels = namedtuple('Levels', 'loudness peak')
+# A clip to play right after another buffer, overlap_ms under its end (faded across if crossfade)
+Segue = namedtuple('Segue', 'format pcm overlap_ms crossfade')
+
+_numpy = None
+
+
+def numpy_available():
+    return importlib.util.find_spec('numpy') is not None
+
+
+def _np(backend=None):
+    """NumPy, imported on first use - or None (the pure-Python path is used then)
+
+    backend picks the path: 'python' never uses NumPy, 'numpy' requires it (ValueError
+    if it isn't installed), None uses NumPy when it is installed. The DSP functions
+    take it as a keyword argument; only the benchmark and tests need anything but None.
+    """
+    global _numpy
+    if backend not in (None, 'numpy', 'python'):
+        raise ValueError(f"Unknown DSP backend: {backend}")
+    if backend == 'python':
+        return None
+    if _numpy is None:
+        if numpy_available():
+            import numpy
+            _numpy = numpy
+        else:
+            _numpy = False
+    if backend == 'numpy' and not _numpy:
+        raise ValueError("NumPy is not installed")
+    return _numpy or None
+
+
+def _db(power):
+    return 10 * math.log10(power) if power > 0 else None
+
+
+# Sample conversion
+_DTYPES = {1: 'u1', 2: '<i2', 4: '<i4'}
+_FULL_SCALE = {1: 128.0, 2: 32768.0, 3: 8388608.0, 4: 2147483648.0}
+
+
+def _frames_np(np, audio_format, pcm):
+    """(frames, channels) float64 array scaled to [-1, 1)"""
+    channels, width, _ = audio_format
+    if width == 3:
+        raw = np.frombuffer(pcm, np.uint8)[:len(pcm) // 3 * 3].reshape(-1, 3).astype(np.int32)
+        samples = (raw[:, 0] | raw[:, 1] << 8 | raw[:, 2] << 16) << 8 >> 8  # sign-extend 24 bits
+    else:
+        samples = np.frombuffer(pcm, _DTYPES[width])[:len(pcm) // width].astype(np.float64)
+        if width == 1:
+            samples = samples - 128
+    samples = samples[:len(samples) // channels * channels]
+    return samples.reshape(-1, channels) / _FULL_SCALE[width]
+
+
+def _samples_py(audio_format, pcm):
+    """Flat list of samples scaled to [-1, 1) - pure Python"""
+    _, width, _ = audio_format
+    scale = _FULL_SCALE[width]
+    if width == 3:
+        return [int.from_bytes(pcm[i:i + 3], 'little', signed=True) / scale for i in range(0, len(pcm) - 2, 3)]
+    samples = array({1: 'B', 2: 'h', 4: 'i'}[width])
+    if samples.itemsize != width:
+        raise ValueError(f"no {width}-byte array type on this platform")
+    samples.frombytes(bytes(pcm[:len(pcm) // width * width]))
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    offset = 128 if width == 1 else 0
+    return [(s - offset) / scale for s in samples]
+
+
+def _check(audio_format):
+    if audio_format[1] not in _FULL_SCALE:
+        raise ValueError(f"unsupported sample width: {audio_format[1]} bytes")
+
+
+# Loudness
+def _gated_loudness(block_powers):
+    """BS.1770 gating over the block powers, loudness in LUFS or None"""
+    absolute = 10 ** ((ABSOLUTE_GATE_LUFS + 0.691) / 10)
+    gated = [p for p in block_powers if p > absolute]
+    if not gated:
+        return None
+    relative = sum(gated) / len(gated) * 10 ** (RELATIVE_GATE_DB / 10)
+    gated = [p for p in gated if p > relative]
+    return -0.691 + _db(sum(gated) / len(gated))
+
+
+def _block_bounds(frames, rate):
+    block, step = int(rate * BLOCK_MS / 1000), int(rate * STEP_MS / 1000)
+    if frames <= block:
+        return [0], frames  # shorter than a block: one block over the whole clip
+    return range(0, frames - block + 1, step), block
+
+
+def analyze(audio_format, pcm, backend=None):
+    """Levels (integrated loudness, sample peak) of a PCM buffer"""
+    _check(audio_format)
+    channels, _, rate = audio_format
+    np = _np(backend)
+    if np is not None:
+        frames = _frames_np(np, audio_format, pcm)
+        if not len(frames):
+            return Levels(None, None)
+        power = np.concatenate(([0.0], np.cumsum(np.square(frames).sum(axis=1))))
+        starts, block = _block_bounds(len(frames), rate)
+        starts = np.asarray(starts)
+        block_powers = (power[starts + block] - power[starts]) / block
+        peak = float(np.abs(frames).max())
+        loudness = _gated_loudness(block_powers.tolist())
+    else:
+        samples = _samples_py(audio_format, pcm)
+        frame_count = len(samples) // channels
+        if not frame_count:
+            return Levels(None, None)
+        squares = [s * s for s in samples[:frame_count * channels]]
+        frame_power = squares if channels == 1 else [sum(squares[i:i + channels])
+                                                     for i in range(0, len(squares), channels)]
+        power = [0.0] + list(itertools.accumulate(frame_power))
+        starts, block = _block_bounds(frame_count, rate)
+        loudness = _gated_loudness([(power[s + block] - power[s]) / block for s in starts])
+        peak = max(max(samples), -min(samples))
+    return Levels(loudness, 20 * math.log10(peak) if peak > 0 else None)
+
+
+def normalization_gain(levels, target=TARGET_LUFS):
+    """Gain in dB that brings a buffer with these levels to the target loudness"""
+    if levels.loudness is None or target is None:
+        return 0.0
+    gain = min(MAX_GAIN_DB, max(MIN_GAIN_DB, target - levels.loudness))
+    if levels.peak is not None:
+        gain = min(gain, PEAK_CEILING_DB - levels.peak)
+    return round(gain, 2)
+
+
+def db_to_volume(gain_db):
+    """Linear volume factor for a gain in dB (afplay -v, mpv --volume / 100)"""
+    return 10 ** (gain_db / 20)
+
+
+def apply_gain(audio_format, pcm, gain_db, backend=None):
+    """PCM with the gain applied (clipped to full scale), the same bytes for 0 dB"""
+    if not gain_db:
+        return pcm
+    _check(audio_format)
+    _, width, _ = audio_format
+    factor = db_to_volume(gain_db)
+    scale = _FULL_SCALE[width]
+    np = _np(backend)
+    if np is not None and width != 3:
+        samples = np.frombuffer(pcm, _DTYPES[width])[:len(pcm) // width].astype(np.float64)
+        if width == 1:
+            samples -= 128
+        samples = np.clip(np.rint(samples * factor), -scale, scale - 1)
+        if width == 1:
+            samples += 128
+        return samples.astype(_DTYPES[width]).tobytes()
+    low, high = -scale, scale - 1
+    gained = [min(high, max(low, round(s * scale * factor))) for s in _samples_py(audio_format, pcm)]
+    if width == 3:
+        return b''.join(int(s).to_bytes(3, 'little', signed=True) for s in gained)
+    out = array({1: 'B', 2: 'h', 4: 'i'}[width], (int(s) + 128 for s in gained) if width == 1 else map(int, gained))
+    if sys.byteorder == 'big':
+        out.byteswap()
+    return out.tobytes()
+
+
+def normalize(audio_format, pcm, target=TARGET_LUFS, backend=None):
+    """(PCM at the target loudness, gain in dB applied)"""
+    gain = normalization_gain(analyze(audio_format, pcm, backend), target)
+    return apply_gain(audio_format, pcm, gain, backend), gain
+
+
+# Silence
+def silence_bounds(audio_format, pcm, backend=None):
+    """(first, end) frame of the audible part of a buffer, None if it is all silence"""
+    _check(audio_format)
+    channels, width, rate = audio_format
+    window = max(1, int(rate * SILENCE_FRAME_MS / 1000))
+    np = _np(backend)
+    if np is not None:
+        frames = _frames_np(np, audio_format, pcm)
+        count = len(frames)
+        if not count:
+            return None
+        power = np.square(frames).sum(axis=1)
+        power = np.pad(power, (0, -count % window)).reshape(-1, window).mean(axis=1)
+        threshold = max(power.max() * 10 ** (-SILENCE_BELOW_PEAK_DB / 10), 10 ** (SILENCE_FLOOR_DBFS / 10))
+        loud = np.flatnonzero(power > threshold)
+        if not len(loud):
+            return None
+        first, last = int(loud[0]), int(loud[-1])
+    else:
+        samples = _samples_py(audio_format, pcm)
+        count = len(samples) // channels
+        if not count:
+            return None
+        squares = [s * s for s in samples[:count * channels]]
+        step = window * channels
+        power = [sum(squares[i:i + step]) / window for i in range(0, len(squares), step)]
+        threshold = max(max(power) * 10 ** (-SILENCE_BELOW_PEAK_DB / 10), 10 ** (SILENCE_FLOOR_DBFS / 10))
+        loud = [i for i, p in enumerate(power) if p > threshold]
+        if not loud:
+            return None
+        first, last = loud[0], loud[-1]
+    return first * window, min(count, (last + 1) * window)
+
+
+def trim_silence(audio_format, pcm, lead_pad_ms=LEAD_PAD_MS, trail_pad_ms=TRAIL_PAD_MS):
+    """(PCM without its leading and trailing silence, ms cut at the start, ms cut at the end)
+
+    A buffer that is all silence is returned as it is.
+    """
+    bounds = silence_bounds(audio_format, pcm)
+    if bounds is None:
+        return pcm, 0.0, 0.0
+    channels, width, rate = audio_format
+    frame_bytes = channels * width
+    count = len(pcm) // frame_bytes
+    start = max(0, bounds[0] - int(rate * lead_pad_ms / 1000))
+    end = min(count, bounds[1] + int(rate * trail_pad_ms / 1000))
+    return pcm[start * frame_bytes:end * frame_bytes], start * 1000 / rate, (count - end) * 1000 / rate
+
+
+# Mixing
+def _pack_np(np, frames, width):
+    """PCM bytes from a float array scaled to [-1, 1), clipped to full scale"""
+    scale = _FULL_SCALE[width]
+    samples = np.clip(np.rint(frames.ravel() * scale), -scale, scale - 1)
+    if width == 3:
+        return samples.astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    if width == 1:
+        samples += 128
+    return samples.astype(_DTYPES[width]).tobytes()
+
+
+def _pack_py(samples, width):
+    """PCM bytes from a flat list of samples scaled to [-1, 1), clipped to full scale - pure Python"""
+    scale = _FULL_SCALE[width]
+    clipped = [min(scale - 1, max(-scale, round(s * scale))) for s in samples]
+    if width == 3:
+        return b''.join(int(s).to_bytes(3, 'little', signed=True) for s in clipped)
+    out = array({1: 'B', 2: 'h', 4: 'i'}[width], (int(s) + 128 for s in clipped) if width == 1 else map(int, clipped))
+    if sys.byteorder == 'big':
+        out.byteswap()
+    return out.tobytes()
+
+
+def convert(audio_format, pcm, to_format, backend=None):
+    """PCM in another (channels, sample width, rate) - channels mixed down or copied, rate linearly resampled"""
+    if tuple(audio_format) == tuple(to_format):
+        return pcm
+    _check(audio_format)
+    _check(to_format)
+    channels, _, rate = audio_format
+    to_channels, to_width, to_rate = to_format
+    np = _np(backend)
+    if np is not None:
+        frames = _frames_np(np, audio_format, pcm)
+        if channels != to_channels:
+            mono = frames if channels == 1 else frames.mean(axis=1, keepdims=True)
+            frames = np.repeat(mono, to_channels, axis=1)
+        count = len(frames)
+        if rate != to_rate and count:
+            positions = np.arange(round(count * to_rate / rate)) * (rate / to_rate)
+            frames = np.stack([np.interp(positions, np.arange(count), frames[:, c]) for c in range(to_channels)],
+                              axis=1)
+        return _pack_np(np, frames, to_width)
+    samples = _samples_py(audio_format, pcm)
+    frames = [samples[i:i + channels] for i in range(0, len(samples) - channels + 1, channels)]
+    if channels != to_channels:
+        frames = [[frame[0] if channels == 1 else sum(frame) / channels] * to_channels for frame in frames]
+    count = len(frames)
+    if rate != to_rate and count:
+        resampled = []
+        for i in range(round(count * to_rate / rate)):
+            position = i * (rate / to_rate)
+            left = min(int(position), count - 1)
+            right = min(left + 1, count - 1)
+            t = position - left
+            resampled.append([a + (b - a) * t for a, b in zip(frames[left], frames[right])])
+        frames = resampled
+    return _pack_py([s for frame in frames for s in frame], to_width)
+
+
+def mix(audio_format, first, second, overlap_ms=0, crossfade=False, backend=None):
+    """PCM of second starting overlap_ms before the end of first, summed where they overlap
+
+    With crossfade, first fades out and second fades in across the overlap.
+    """
+    _check(audio_format)
+    channels, width, rate = audio_format
+    frame_bytes = channels * width
+    first = bytes(first[:len(first) // frame_bytes * frame_bytes])
+    second = bytes(second[:len(second) // frame_bytes * frame_bytes])
+    overlap = min(int(rate * max(0, overlap_ms) / 1000), len(first) // frame_bytes, len(second) // frame_bytes)
+    if not overlap:
+        return first + second
+    np = _np(backend)
+    if np is not None:
+        a, b = _frames_np(np, audio_format, first), _frames_np(np, audio_format, second)
+        if crossfade:
+            ramp = (np.arange(overlap) / overlap)[:, None]
+            a[-overlap:] *= 1 - ramp
+            b[:overlap] *= ramp
+        out = np.zeros((len(a) + len(b) - overlap, channels))
+        out[:len(a)] += a
+        out[len(a) - overlap:] += b
+        return _pack_np(np, out, width)
+    a, b = _samples_py(audio_format, first), _samples_py(audio_format, second)
+    start = len(a) - overlap * channels
+    out = a + b[overlap * channels:]
+    for i in range(overlap * channels):
+        x, y = a[start + i], b[i]
+        if crossfade:
+            ramp = (i // channels) / overlap
+            x, y = x * (1 - ramp), y * ramp
+        out[start + i] = x + y
+    return _pack_py(out, width)
+
+
+def read_wav(data):
+    """((channels, sample width, rate), PCM bytes) from WAV bytes"""
+    with wave.open(io.BytesIO(data), 'rb') as w:
+        return (w.getnchannels(), w.getsampwidth(), w.getframerate()), w.readframes(w.getnframes())
+
+
+def wav_bytes(audio_format, pcm):
+    """WAV file bytes for PCM"""
+    channels, width, rate = audio_format
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(width)
+        w.setframerate(rate)
+        w.writeframes(pcm)
+    return out.getvalue()
+
+
+def prepare_wav(data, target=TARGET_LUFS, trim=True):
+    """Synthesized WAV bytes ready to play: silence trimmed, brought to the target loudness
+
+    Returns (WAV bytes, {'gain_db', 'lead_trimmed_ms', 'trail_trimmed_ms'}) - the
+    input unchanged (and an empty dict) if it can't be analysed.
+    """
+    try:
+        audio_format, pcm = read_wav(data)
+        lead_ms = trail_ms = 0.0
+        if trim:
+            pcm, lead_ms, trail_ms = trim_silence(audio_format, pcm)
+        gain = 0.0
+        if target is not None:
+            pcm, gain = normalize(audio_format, pcm, target)
+    except (EOFError, wave.Error, ValueError) as e:
+        log.warning(f"⚠️  Announcement audio not processed: {e}", throttle='prepare-wav')
+        return data, {}
+    info = {'gain_db': gain, 'lead_trimmed_ms': round(lead_ms, 1), 'trail_trimmed_ms': round(trail_ms, 1)}
+    if not (gain or lead_ms or trail_ms):
+        return data, info
+    return wav_bytes(audio_format, pcm), info
+
+
+def normalize_wav(data, target=TARGET_LUFS):
+    """(WAV bytes at the target loudness, gain in dB) - the input unchanged if it can't be analysed"""
+    data, info = prepare_wav(data, target, trim=False)
+    return data, info.get('gain_db', 0.0)
+
+
+def segue_wav(data, segue):
+    """(WAV bytes with the segue's clip mixed onto the end, True) - the input and False without one
+
+    The result has the WAV's rate and the wider channel count of the two. If the
+    audio can't be mixed the input is returned too, so the caller plays the clip itself.
+    """
+    if segue is None:
+        return data, False
+    try:
+        audio_format, pcm = read_wav(data)
+        channels, width, rate = audio_format
+        out_format = (max(channels, segue.format[0]), width, rate)
+        pcm = convert(audio_format, pcm, out_format)
+        clip = convert(segue.format, segue.pcm, out_format)
+        return wav_bytes(out_format, mix(out_format, pcm, clip, segue.overlap_ms, segue.crossfade)), True
+    except (EOFError, wave.Error, ValueError) as e:
+        log.warning(f"⚠️  Clip not mixed into the announcement: {e}", throttle='segue-wav')
+        return data, False
+
+
+class WavCache:
+    """The last few prepared announcements by key - a repeat skips synthesis and processing"""
+
+    def __init__(self, size=16):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(WAV bytes, prepare_wav info) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, data, info):
+        with self._lock:
+            self._entries[key] = (data, info)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+announcement_cache = WavCache()
+
+
+# Benchmark
+def synthetic_clip(rng, seconds, audio_format=(2, 2, 44100)):
+    """A tone-plus-noise clip at a random level, with a silent gap"""
+    channels, _, rate = audio_format
+    level = 10 ** (rng.uniform(-30, -3) / 20)
+    frequency = rng.uniform(200, 2000)
+    frames = int(seconds * rate)
+    gap = range(frames // 3, frames // 3 + rate // 4)
+    values = []
+    for i in range(frames):
+        value = 0 if i in gap else level * (0.7 * math.sin(2 * math.pi * frequency * i / rate) + 0.3 * rng.uniform(-1, 1))
+        values.extend([int(value * 32767)] * channels)
+    return audio_format, struct.pack(f'<{len(values)}h', *values)
+
+
+def bench(clips, seconds, target=TARGET_LUFS, seed=3):
+    """Normalize a batch of clips with each available backend
+
+    Returns (loudness of each clip before, {backend: (ms per clip, loudness after)}).
+    """
+    rng = random.Random(seed)
+    batch = [synthetic_clip(rng, seconds * rng.uniform(0.5, 1.5)) for _ in range(clips)]
+    before = [analyze(audio_format, pcm).loudness for audio_format, pcm in batch]
+    results = {}
+    for backend in ['numpy', 'python'] if numpy_available() else ['python']:
+        timings, levels = [], []
+        for audio_format, pcm in batch:
+            started = time.perf_counter()
+            out, _ = normalize(audio_format, pcm, target, backend)
+            timings.append((time.perf_counter() - started) * 1000)
+            levels.append(analyze(audio_format, out, backend).loudness)
+        results[backend] = (timings, levels)
+    return before, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loudness of audio files, and a normalization benchmark")
+    sub = parser.add_subparsers(dest='command', required=True)
+    levels_cmd = sub.add_parser('levels', help="loudness, peak and normalization gain per file")
+    levels_cmd.add_argument('files', nargs='+')
+    levels_cmd.add_argument('--target', type=float, default=TARGET_LUFS)
+    bench_cmd = sub.add_parser('bench', help="normalize a batch of synthetic clips")
+    bench_cmd.add_argument('--clips', type=int, default=100)
+    bench_cmd.add_argument('--seconds', type=float, default=3.0, help="average clip length")
+    bench_cmd.add_argument('--target', type=float, default=TARGET_LUFS)
+    args = parser.parse_args()
+
+    if args.command == 'levels':
+        from soundboard import ClipDecodeError, decode_clip  # soundboard imports this module
+        for path in args.files:
+            try:
+                audio_format, pcm = decode_clip(path)
+                levels = analyze(audio_format, pcm)
+                _, lead_ms, trail_ms = trim_silence(audio_format, pcm)
+            except (ClipDecodeError, ValueError) as e:
+                print(f"  {path}: {e}")
+                continue
+            loudness = f"{levels.loudness:6.1f} LUFS" if levels.loudness is not None else "silent"
+            peak = f"{levels.peak:5.1f} dBFS" if levels.peak is not None else "-"
+            print(f"  {path:<40} {loudness}   peak {peak}   gain {normalization_gain(levels, args.target):+.1f} dB"
+                  f"   silence {lead_ms:.0f}/{trail_ms:.0f} ms")
+        return 0
+
+    print(f"🔊 Normalizing {args.clips} clips of ~{args.seconds:.1f}s (44.1 kHz stereo) to {args.target} LUFS")
+    if not numpy_available():
+        print("   NumPy is not installed - pure Python only (pip install numpy for the vectorized path)")
+    before, results = bench(args.clips, args.seconds, args.target)
+    print(f"   before: {min(before):.1f} to {max(before):.1f} LUFS")
+    for backend, (timings, levels) in results.items():
+        timings.sort()
+        print(f"   {backend:<7} median {statistics.median(timings):7.2f} ms/clip, p95 {timings[int(len(timings) * 0.95)]:7.2f} ms, "
+              f"total {sum(timings) / 1000:.2f}s - after: {min(levels):.1f} to {max(levels):.1f} LUFS")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
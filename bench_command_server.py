@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Command Server Load Test
+Measures goal-hotkey latency through the headless API, idle and with many busy clients
+
+Runs against a stub Music backend (no AppleScript), so it works on any OS:
+    python3 bench_command_server.py --clients 50 --rate 20 --samples 200
+
+Use --rate 0 to have every client send flat out; on a machine with few cores that
+measures CPU saturation rather than the server.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import multiprocessing
+import time
+import http.client
+import json
+
+from command_server import CommandServer
+from hockey_music_controller import AppleMusicController, HockeyController
+
+
+class StubMusicController(AppleMusicController):
+    """AppleMusicController whose AppleScript calls just take backend_ms"""
+
+    def __init__(self, backend_ms=2.0):
+        self.backend_ms = backend_ms
+
+    def run_applescript(self, script, max_retries=3, retry_delay=0.5, silent_on_error=False):
+        time.sleep(self.backend_ms / 1000)
+        return "", True
+
+    def get_playlist_tracks(self, playlist_name):
+        time.sleep(self.backend_ms / 1000)
+        return [f"Track {i} | Artist {i}" for i in range(40)]
+
+
+def post(conn, action, params=None):
+    """One keep-alive request, returns (latency_ms, response)"""
+    body = json.dumps(params or {}).encode('utf-8')
+    started = time.perf_counter()
+    conn.request('POST', f'/{action}', body, {'Content-Type': 'application/json'})
+    response = json.loads(conn.getresponse().read())
+    return (time.perf_counter() - started) * 1000, response
+
+
+def measure_goal_latency(host, port, samples):
+    """Latency of the goal command from a dedicated client"""
+    conn = http.client.HTTPConnection(host, port)
+    latencies = []
+    for _ in range(samples):
+        latency, response = post(conn, 'goal')
+        assert response['ok'], response
+        latencies.append(latency)
+        time.sleep(0.005)
+    conn.close()
+    return latencies
+
+
+def background_client(host, port, index, rate, stop_event, request_counts):
+    """Poll status (and fire announcements) at `rate` requests/s until told to stop"""
+    conn = http.client.HTTPConnection(host, port)
+    count = 0
+    actions = ['status', 'status', 'status', 'announce_goal']
+    interval = 1.0 / rate if rate else 0
+    next_send = time.perf_counter()
+    while not stop_event.is_set():
+        action = actions[count % len(actions)]
+        params = {'team': 'away', 'scorer': str(index)} if action == 'announce_goal' else None
+        post(conn, action, params)
+        count += 1
+        if interval:
+            next_send += interval
+            time.sleep(max(0, next_send - time.perf_counter()))
+    request_counts.put(count)
+    conn.close()
+
+
+def summarize(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"   {label:<22} p50 {statistics.median(latencies):6.2f} ms   "
+          f"p95 {p95:6.2f} ms   max {latencies[-1]:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=50, help="concurrent background clients")
+    parser.add_argument('--rate', type=float, default=20, help="requests/s per background client (0 = flat out)")
+    parser.add_argument('--samples', type=int, default=200, help="goal commands to time")
+    parser.add_argument('--backend-ms', type=float, default=2.0, help="simulated AppleScript latency")
+    args = parser.parse_args()
+
+    config_file = os.path.join(tempfile.mkdtemp(), 'config.json')
+    with open(config_file, 'w') as f:
+        json.dump({'goal_song': 'Goal Horn'}, f)
+
+    server = CommandServer(
+        lambda call_later: HockeyController(StubMusicController(args.backend_ms), config_file, call_later),
+        port=0
+    )
+    server.start()
+    host, port = server.address
+    server.dispatch('load_playlist', {'name': 'Stoppage'})
+
+    print("=" * 70)
+    print(f"COMMAND SERVER LOAD TEST ({args.clients} clients, backend {args.backend_ms} ms)")
+    print("=" * 70)
+
+    idle = measure_goal_latency(host, port, args.samples)
+
+    # Announcements would try Hume - keep the load test offline
+    server.core.controller.generate_goal_announcement = lambda *a, **k: "stub announcement"
+
+    # Background clients live in their own processes, like real Stream Decks and scripts
+    stop_event = multiprocessing.Event()
+    request_counts = multiprocessing.Queue()
+    clients = [
+        multiprocessing.Process(target=background_client, args=(host, port, i, args.rate, stop_event, request_counts), daemon=True)
+        for i in range(args.clients)
+    ]
+    for client in clients:
+        client.start()
+    time.sleep(1.0)
+    loaded_started = time.perf_counter()
+    loaded = measure_goal_latency(host, port, args.samples)
+    loaded_elapsed = time.perf_counter() - loaded_started
+    stop_event.set()
+    total_requests = sum(request_counts.get() for _ in clients)
+    for client in clients:
+        client.join()
+
+    print()
+    summarize("goal (idle)", idle)
+    summarize(f"goal ({args.clients} clients)", loaded)
+    print(f"   background throughput  {total_requests / loaded_elapsed:,.0f} req/s")
+    print("=" * 70)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+JXA vs AppleScript Benchmark
+Times the playlist queries on both backends against the real Music app (macOS only)
+
+    python3 bench_jxa_backend.py "Stoppage Music" --runs 5
+
+The AppleScript track query sends two Apple Events per track (name, artist);
+the JXA query sends two for the whole playlist, so the gap grows with playlist size.
+"""
+
+import argparse
+import shutil
+import statistics
+import sys
+import time
+
+from hockey_music_controller import AppleMusicController
+from jxa_backend import JXAMusicController
+
+
+def time_call(fn, runs):
+    """(median ms, result of the last run)"""
+    times = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JXA backend against AppleScript")
+    parser.add_argument('playlist', help="playlist to query (bigger shows the difference best)")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    if not shutil.which('osascript'):
+        print("❌ osascript not found - this benchmark needs macOS with the Music app")
+        return 1
+
+    backends = [('AppleScript', AppleMusicController()), ('JXA', JXAMusicController())]
+    queries = [
+        ('get_playlists', lambda b: b.get_playlists()),
+        ('get_playlist_tracks', lambda b: b.get_playlist_tracks(args.playlist)),
+        ('get_playlist_fingerprint', lambda b: b.get_playlist_fingerprint(args.playlist)),
+    ]
+
+    print("=" * 70)
+    print(f"JXA vs AppleScript - '{args.playlist}', median of {args.runs} runs")
+    print("=" * 70)
+    print(f"   {'query':<26}{'AppleScript ms':>16}{'JXA ms':>10}{'speedup':>10}  results")
+    for name, query in queries:
+        timings = {}
+        results = {}
+        for label, backend in backends:
+            timings[label], results[label] = time_call(lambda: query(backend), args.runs)
+        same = "same" if results['AppleScript'] == results['JXA'] else "DIFFER"
+        if isinstance(results['JXA'], list):
+            same += f" ({len(results['AppleScript'])} vs {len(results['JXA'])} items)"
+        speedup = timings['AppleScript'] / timings['JXA'] if timings['JXA'] else 0
+        print(f"   {name:<26}{timings['AppleScript']:>16.0f}{timings['JXA']:>10.0f}{speedup:>9.1f}x  {same}")
+    print("=" * 70)
+    print("Results differ when names contain ',' or '|' - the JXA results are the correct ones.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Multi-Rink Concurrency Test
+Runs several rinks side by side in one RinkManager, each on its own simulated Music backend
+
+    python3 bench_multi_rink.py --rinks 3 --speed 60
+
+1. Isolation: a goal on every rink at the same instant, while rink 1 is busy with a
+   slow backend and a long announcement - the other rinks must not wait for it.
+2. A full simulated game per rink, all at once, then the per-rink latency report.
+3. The same manager behind the HTTP command server (/<rink>/<action>, /latency).
+
+Needs no macOS; exits non-zero if rinks block each other.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from command_server import CommandServer
+from game_simulator import LatencyModel, SimClock, SimulatedMusicBackend, synthetic_game
+from hockey_music_controller import HockeyController
+from multi_rink import RinkManager, print_latency_report
+
+
+def build_manager(rink_count, clock, fast_latency, slow_latency, seed):
+    """RinkManager with simulated backends - rink1 slow, the others fast"""
+    rng = random.Random(seed)
+    workdir = tempfile.mkdtemp(prefix='hockey_rinks_')
+    rinks = []
+    for i in range(1, rink_count + 1):
+        config_file = os.path.join(workdir, f"rink{i}.json")
+        with open(config_file, 'w') as f:
+            json.dump({cue: f"Rink {i} {cue.replace('_', ' ').title()}" for cue in HockeyController.CUES}, f)
+        rinks.append({'id': f"rink{i}", 'name': f"Rink {i}", 'config_file': config_file,
+                      'latency': slow_latency if i == 1 else fast_latency})
+
+    def backend_factory(rink):
+        return SimulatedMusicBackend(LatencyModel.parse(rink['latency'], rng), clock,
+                                     tts_latency=LatencyModel.parse('1500:0.3', rng))
+
+    return RinkManager(rinks, backend_factory, journal_dir=os.path.join(workdir, 'journal'))
+
+
+def check_isolation(manager, speed):
+    """Goals on the fast rinks while rink1 is tied up - returns True if they never waited"""
+    busy = [manager.submit('rink1', 'announce_goal', {'team': 'home', 'scorer': '7'}),
+            manager.submit('rink1', 'goal', {})]
+    time.sleep(0.01)
+    started = time.perf_counter()
+    goals = {rink_id: manager.submit(rink_id, 'goal', {}) for rink_id in manager.rinks if rink_id != 'rink1'}
+    finished = {}
+    for rink_id, future in goals.items():
+        future.result(timeout=60)
+        finished[rink_id] = (time.perf_counter() - started) * 1000 * speed
+    for future in busy:
+        future.result(timeout=600)
+    rink1_ms = (time.perf_counter() - started) * 1000 * speed
+
+    print(f"   rink1 busy for {rink1_ms:.0f} ms (slow backend + announcement)")
+    for rink_id, ms in finished.items():
+        print(f"   {rink_id} goal done after {ms:.0f} ms")
+    worst = max(finished.values()) if finished else 0
+    return worst < rink1_ms / 2
+
+
+def replay_all(manager, speed, seed):
+    """A different synthetic game on every rink, concurrently"""
+    schedule = []
+    for n, rink_id in enumerate(manager.rinks):
+        manager.dispatch(rink_id, 'load_playlist', {'name': 'Stoppage'})
+        schedule.extend((t, rink_id, action, params) for t, action, params in synthetic_game(seed + n))
+    schedule.sort(key=lambda item: item[0])
+
+    futures = []
+    started = time.perf_counter()
+    for t, rink_id, action, params in schedule:
+        delay = started + t / speed - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        futures.append(manager.submit(rink_id, action, params))
+    for future in futures:
+        try:
+            future.result(timeout=600)
+        except Exception:
+            pass
+    return len(schedule), time.perf_counter() - started
+
+
+def check_http(manager):
+    """Route a couple of requests through the HTTP server"""
+    server = CommandServer(host='127.0.0.1', port=0, dispatcher=manager)
+    server.start()
+    host, port = server.address
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    results = {}
+    for path in ('/rinks', '/rink2/status', '/nowhere/goal', '/latency'):
+        conn.request('GET', path)
+        response = conn.getresponse()
+        results[path] = (response.status, json.loads(response.read()))
+    conn.close()
+    server.httpd.shutdown()
+    server.httpd.server_close()
+    for path, (status, body) in results.items():
+        print(f"   GET {path:<14} -> {status}")
+    return (results['/rinks'][0] == 200 and results['/rink2/status'][0] == 200
+            and results['/nowhere/goal'][0] == 404 and results['/latency'][0] == 200)
+
+
+def scaled(report, speed):
+    """Latency report converted from wall ms to simulated (game) ms"""
+    out = {}
+    for rink_id, stats in report.items():
+        out[rink_id] = dict(stats)
+        for key in ('p50_ms', 'p95_ms', 'max_ms'):
+            if stats[key] is not None:
+                out[rink_id][key] = stats[key] * speed
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several simulated rinks concurrently")
+    parser.add_argument('--rinks', type=int, default=3, help="number of rinks")
+    parser.add_argument('--speed', type=float, default=60, help="game seconds per wall second")
+    parser.add_argument('--fast-latency', default='60:0.3', help="Music latency spec for rinks 2+ (ms)")
+    parser.add_argument('--slow-latency', default='600:0.3', help="Music latency spec for rink 1 (ms)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.rinks < 2:
+        parser.error("need at least 2 rinks")
+
+    clock = SimClock(args.speed)
+    manager = build_manager(args.rinks, clock, args.fast_latency, args.slow_latency, args.seed)
+    passed = True
+    try:
+        print("=" * 70)
+        print("1. Isolation - simultaneous goals while rink1 is busy")
+        isolated = check_isolation(manager, args.speed)
+        print(f"   {'✓ PASS' if isolated else '✗ FAIL'}: other rinks did not wait for rink1")
+        passed &= isolated
+
+        print("=" * 70)
+        print(f"2. One synthetic game per rink, concurrently (x{args.speed})")
+        count, wall = replay_all(manager, args.speed, args.seed)
+        print(f"   {count} actions across {args.rinks} rinks in {wall:.1f}s wall")
+        print("   Latency in simulated ms:")
+        print_latency_report(scaled(manager.latency_report(), args.speed), manager.rink_list())
+
+        print("=" * 70)
+        print("3. HTTP routing")
+        routed = check_http(manager)
+        print(f"   {'✓ PASS' if routed else '✗ FAIL'}: /<rink>/<action> routing")
+        passed &= routed
+        print("=" * 70)
+    finally:
+        manager.shutdown()
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
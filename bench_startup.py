@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Measures module import time and GUI time-to-interactive
+
+Time-to-interactive is measured against a stub Music backend whose calls take
+--backend-ms, so a slow Music app shows up as slow startup if anything on the
+startup path still waits for it. Needs a display (skipped otherwise).
+
+    python3 bench_startup.py --runs 5 --backend-ms 800
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_import(module, runs):
+    """Fresh-interpreter import times for a module, in ms"""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; print((time.perf_counter() - started) * 1000)"
+    )
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', code], cwd=HERE, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def measure_time_to_interactive(runs, backend_ms):
+    """Time from HockeyMusicGUI() to the first event-loop turn, in ms"""
+    import tkinter as tk
+    from bench_command_server import StubMusicController
+    from hockey_music_controller import HockeyController, HockeyMusicGUI
+
+    config_file = os.path.join(tempfile.mkdtemp(), 'config.json')
+    with open(config_file, 'w') as f:
+        json.dump({'playlist': 'Stoppage'}, f)
+
+    times = []
+    for _ in range(runs):
+        try:
+            root = tk.Tk()
+        except tk.TclError as e:
+            print(f"   ⚠️  No display - skipping time-to-interactive ({e})")
+            return None
+        started = time.perf_counter()
+        core = HockeyController(StubMusicController(backend_ms), config_file)
+        HockeyMusicGUI(root, core)
+
+        def interactive():
+            times.append((time.perf_counter() - started) * 1000)
+            root.destroy()
+
+        root.after(0, interactive)
+        root.mainloop()
+    return times
+
+
+def report(label, times):
+    if times is None:
+        print(f"   {label:<40} n/a")
+        return
+    print(f"   {label:<40} median {statistics.median(times):7.1f} ms   min {min(times):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time and time-to-interactive benchmark")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--backend-ms', type=float, default=800, help="simulated Music app latency per call")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STARTUP BENCHMARK")
+    print("=" * 70)
+    report("import hockey_music_controller", measure_import('hockey_music_controller', args.runs))
+    report("import hume (deferred to first use)", measure_import('hume', args.runs))
+    report(f"time to interactive ({args.backend_ms:.0f} ms backend)",
+           measure_time_to_interactive(args.runs, args.backend_ms))
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
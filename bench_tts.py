@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+TTS Pipeline Benchmark
+Per-stage timing of goal and final score announcements, against a stub TTS server
+
+Every live announcement goes DNS check -> client construction -> synthesize_json ->
+base64 decode -> trim/level -> temp file write -> player spawn -> playback start.
+AppleMusicController.speak times each step (result['stages'], logged with
+"Announcement finished" at DEBUG); this runs generate_goal_announcement and
+generate_final_score_announcement many times and reports the distribution of each.
+
+The TTS server is a local stub answering like Hume's /v0/tts after --latency ms with
+--audio-ms of speech-like WAV, so it works offline on any OS. Without the Hume
+SDK installed a small urllib client stands in for it. The default player is a stub
+process that reports when it starts playing; --player afplay uses the real one (macOS).
+
+    python3 bench_tts.py --samples 50 --latency 900:0.4 --audio-ms uniform:2000:5000
+"""
+
+import argparse
+import base64
+import importlib.util
+import json
+import logging
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import hume_tts
+from audio_dsp import announcement_cache, synthetic_clip, wav_bytes
+from game_simulator import LatencyModel
+from hockey_music_controller import AppleMusicController
+from hume_tts import HumeConfig
+
+AUDIO_FORMAT = (1, 2, 48000)   # what Hume returns: mono 16-bit 48 kHz WAV
+LEAD_SILENCE_S = 0.35          # around the speech, like real synthesized announcements
+TRAIL_SILENCE_S = 0.25
+STAGES = ['dns_ms', 'client_ms', 'synthesize_ms', 'decode_ms', 'prepare_ms', 'write_ms',
+          'spawn_ms', 'start_ms', 'play_ms', 'total_ms']
+
+# Stub player: reads the WAV, says when it starts "playing", then lasts the audio's duration / speed
+STUB_PLAYER = (
+    "import sys, time, wave\n"
+    "w = wave.open(sys.argv[1]); seconds = w.getnframes() / w.getframerate(); w.readframes(w.getnframes())\n"
+    "print('started', flush=True)\n"
+    "time.sleep(seconds / float(sys.argv[2]))\n"
+)
+
+
+class StubTTSHandler(BaseHTTPRequestHandler):
+    """Answers any POST like Hume's synthesize_json, after a sampled delay"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        server = self.server
+        started = time.perf_counter()
+        delay = server.latency.sample() / 1000
+        seconds, audio = server.payload(server.audio_ms.sample() / 1000)
+        time.sleep(max(0.0, delay - (time.perf_counter() - started)))  # building new audio counts toward it
+        body = json.dumps({
+            'request_id': str(uuid.uuid4()),
+            'generations': [{
+                'generation_id': str(uuid.uuid4()), 'audio': audio, 'duration': seconds,
+                'encoding': {'format': 'wav', 'sample_rate': AUDIO_FORMAT[2]}, 'file_size': len(audio) * 3 // 4,
+                'snippets': [[{'id': str(uuid.uuid4()), 'text': u.get('text', ''), 'audio': '',
+                               'generation_id': '', 'utterance_index': 0}
+                              for u in request.get('utterances', [])]],
+            }],
+        }).encode('utf-8')
+        with server.lock:
+            server.payload_bytes.append(len(body))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubTTSServer(ThreadingHTTPServer):
+    """Local TTS server whose replies take `latency` ms and carry `audio_ms` of speech (LatencyModels)"""
+
+    daemon_threads = True
+
+    def __init__(self, host, latency, audio_ms, seed=7):
+        super().__init__((host, 0), StubTTSHandler)
+        self.latency = latency
+        self.audio_ms = audio_ms
+        self.payload_bytes = []
+        self.lock = threading.Lock()
+        self._speech = synthetic_clip(random.Random(seed), 0.25, AUDIO_FORMAT)[1]  # tiled to any length
+        self._payloads = {}  # length rounded to 0.25s -> base64 WAV, built once
+
+    def payload(self, seconds):
+        """(seconds, base64 WAV) - speech-like audio with silence around it"""
+        seconds = max(0.25, round(seconds * 4) / 4)
+        with self.lock:
+            audio = self._payloads.get(seconds)
+            if audio is None:
+                lead = bytes(2 * int(LEAD_SILENCE_S * AUDIO_FORMAT[2]))
+                trail = bytes(2 * int(TRAIL_SILENCE_S * AUDIO_FORMAT[2]))
+                pcm = lead + self._speech * int(seconds * 4) + trail
+                audio = self._payloads[seconds] = base64.b64encode(wav_bytes(AUDIO_FORMAT, pcm)).decode('ascii')
+        return seconds + LEAD_SILENCE_S + TRAIL_SILENCE_S, audio
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+Utterance = namedtuple('Utterance', 'text voice')
+Voice = namedtuple('Voice', 'name provider')
+
+
+class StubHumeClient:
+    """Stands in for hume.HumeClient when the SDK isn't installed - synthesize_json over urllib"""
+
+    def __init__(self, api_key, base_url=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.tts = self
+
+    def synthesize_json(self, utterances):
+        body = json.dumps({'utterances': [{'text': u.text, 'voice': u.voice._asdict()} for u in utterances]})
+        request = urllib.request.Request(f"{self.base_url}/v0/tts", body.encode('utf-8'),
+                                         {'Content-Type': 'application/json', 'X-Hume-Api-Key': self.api_key})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            reply = json.loads(response.read())
+        return SimpleNamespace(generations=[SimpleNamespace(**g) for g in reply['generations']])
+
+
+class StageRecorder(logging.Handler):
+    """Collects the result of every announcement from the "Announcement finished" DEBUG record"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.results = []
+
+    def emit(self, record):
+        if record.getMessage() == "Announcement finished":
+            self.results.append(getattr(record, 'fields', {}))
+
+
+def make_player(kind, speed, timings):
+    """player(path) for speak() that appends {spawn_ms, start_ms} of each playback to timings"""
+    def player(path):
+        started = time.perf_counter()
+        if kind == 'afplay':
+            process = subprocess.Popen(['afplay', path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            spawned = time.perf_counter()
+            timings.append({'spawn_ms': (spawned - started) * 1000})  # afplay doesn't say when it starts
+        else:
+            process = subprocess.Popen([sys.executable, '-c', STUB_PLAYER, path, str(speed)],
+                                       stdout=subprocess.PIPE, text=True)
+            spawned = time.perf_counter()
+            process.stdout.readline()
+            timings.append({'spawn_ms': (spawned - started) * 1000,
+                            'start_ms': (time.perf_counter() - started) * 1000})
+        process.wait()
+        if process.stdout:
+            process.stdout.close()
+    return player
+
+
+def announce(kind, rng, player):
+    """One goal or final score announcement with a random scorer/score"""
+    if kind == 'goal':
+        numbers = [str(n) for n in rng.sample(range(2, 99), 3)]
+        assists = numbers[1:rng.randint(1, 3)]
+        AppleMusicController.generate_goal_announcement(rng.choice(['home', 'away']), numbers[0], *assists,
+                                                        player=player)
+    else:
+        AppleMusicController.generate_final_score_announcement(rng.randint(0, 9), 'Visitors', rng.randint(0, 9),
+                                                               player=player)
+
+
+def summarize(label, results):
+    print(f"\n   {label} ({len(results)} announcements)")
+    totals = [r['total_ms'] for r in results]
+    mean_total = statistics.mean(totals) if totals else 0
+    for stage in STAGES:
+        values = sorted(r[stage] for r in results if r.get(stage) is not None)
+        if not values:
+            continue
+        p95 = values[max(0, int(len(values) * 0.95) - 1)]
+        share = f"{statistics.mean(values) / mean_total:5.1%}" if mean_total and stage != 'total_ms' else "     "
+        print(f"   {stage:<14} p50 {statistics.median(values):8.2f} ms   p95 {p95:8.2f} ms   "
+              f"max {values[-1]:8.2f} ms   {share}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=40, help="announcements of each kind")
+    parser.add_argument('--kind', choices=['goal', 'final', 'both'], default='both')
+    parser.add_argument('--latency', default='900:0.4', help="stub server latency in ms ('900', '900:0.4', 'uniform:a:b')")
+    parser.add_argument('--audio-ms', default='uniform:2000:5000', help="speech per announcement in ms, same forms")
+    parser.add_argument('--host', default='127.0.0.1', help="stub server host (a name also times the DNS lookup)")
+    parser.add_argument('--player', choices=['stub', 'afplay'], default='stub')
+    parser.add_argument('--play-speed', type=float, default=20, help="stub player plays this many times faster")
+    parser.add_argument('--cached', action='store_true', help="keep the announcement cache between runs")
+    parser.add_argument('--stub-sdk', action='store_true', help="use the urllib client even with the Hume SDK installed")
+    parser.add_argument('--verbose', action='store_true', help="print the controller's log lines")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    server = StubTTSServer(args.host, LatencyModel.parse(args.latency, rng), LatencyModel.parse(args.audio_ms, rng),
+                           args.seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    sdk = 'hume SDK'
+    if args.stub_sdk or not importlib.util.find_spec('hume'):
+        hume_tts._hume_sdk = (StubHumeClient, Utterance, Voice)
+        sdk = 'stub client (no hume SDK)' if not args.stub_sdk else 'stub client'
+    hume_tts._hume_config = HumeConfig(True, 'bench-key', 'Hockey Goal Announcer', server.url)
+
+    recorder = StageRecorder()
+    tts_logger = logging.getLogger('hockey.tts')
+    tts_logger.addHandler(recorder)
+    tts_logger.setLevel(logging.DEBUG)
+    if not args.verbose:
+        tts_logger.propagate = False
+        logging.getLogger('hockey').setLevel(logging.WARNING)
+
+    print("=" * 70)
+    print(f"TTS PIPELINE BENCHMARK ({sdk}, latency {args.latency} ms, audio {args.audio_ms} ms, "
+          f"{args.player} player)")
+    print("=" * 70)
+
+    kinds = ['goal', 'final'] if args.kind == 'both' else [args.kind]
+    by_kind = {kind: [] for kind in kinds}
+    failures = []
+    for _ in range(args.samples):
+        for kind in kinds:
+            if not args.cached:
+                announcement_cache.clear()
+            timings = []
+            before = len(recorder.results)
+            announce(kind, rng, make_player(args.player, args.play_speed, timings))
+            result = recorder.results[-1] if len(recorder.results) > before else {'ok': False, 'error': 'no result'}
+            if not result.get('ok'):
+                failures.append(result.get('error'))
+                continue
+            row = dict(result.get('stages', {}), total_ms=result['total_ms'])
+            for timing in timings:
+                row.update(timing)
+            by_kind[kind].append(row)
+
+    for kind in kinds:
+        summarize("goal announcements" if kind == 'goal' else "final score announcements", by_kind[kind])
+    sizes = sorted(server.payload_bytes)
+    if sizes:
+        print(f"\n   response size  p50 {statistics.median(sizes) / 1024:8.1f} KB   max {sizes[-1] / 1024:8.1f} KB")
+    if failures:
+        print(f"   ❌ {len(failures)} failed: {', '.join(sorted(set(str(e) for e in failures)))}")
+    print("   (% = share of the mean total; play_ms includes the whole playback)")
+    print("=" * 70)
+    server.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
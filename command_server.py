@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Headless Command Server
+Runs the HockeyController core without Tk and exposes every action over a local HTTP API
+
+    python3 hockey_music_controller.py --headless      # start the daemon
+    python3 hockeyctl.py goal                          # trigger it (see hockeyctl.py)
+    curl http://127.0.0.1:8765/goal                    # ...or from a Stream Deck "Website" action
+
+Requests are GET or POST to /<action>; parameters come from the query string or a
+JSON body. Music commands and everything that changes the playlist or settings
+run one at a time on a playback worker thread, announcements on their own worker
+(a 5 second TTS call never delays a goal song) and clips on a third, so a horn never
+waits behind Music. Only read-only queries answer straight from the request thread.
+Operator commands are coalesced on the way in (see input_coalescer.py): five quick
+/next requests become one "advance 5" and a queued command a newer one makes obsolete
+is dropped - its request answers 409 "superseded".
+"""
+
+import json
+import threading
+import queue
+import time
+from concurrent.futures import CancelledError, Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from input_coalescer import CoalescingWorker
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Action name -> event cue config key
+CUE_ACTIONS = {
+    'goal': 'goal_song',
+    'zamboni': 'zamboni',
+    'zamboni_2nd': 'zamboni_2nd',
+    'game_start': 'game_start',
+    'intermission_1st': 'intermission_1st',
+    'intermission_2nd': 'intermission_2nd',
+    'end_of_game': 'end_of_game',
+    'power_play': 'power_play',
+    'penalty_kill': 'penalty_kill',
+}
+
+# Operator commands that go through CoalescingWorker.press() (merged / superseded)
+COALESCED_ACTIONS = {'play_pause', 'stop', 'next', 'play_from_top', 'play_track', *CUE_ACTIONS}
+
+# Request parameters checked (and whole numbers converted) before an action is queued - a bad one answers 400
+WHOLE_NUMBER_PARAMS = ('count', 'index', 'limit', 'from', 'to')
+TEXT_PARAMS = ('name', 'team', 'voice', 'away_team', 'label', 'q', 'kind', 'visiting_team')
+NUMBER_PARAMS = ('scorer', 'assist1', 'assist2', 'home_score', 'visiting_score')
+
+
+def _checked_params(params):
+    """A copy of params with the whole numbers converted, ValueError naming a bad value"""
+    if not isinstance(params, dict):
+        raise ValueError(f"Parameters must be an object, not {params!r}")
+    checked = dict(params)
+    for key in WHOLE_NUMBER_PARAMS:
+        if key not in checked:
+            continue
+        value = checked[key]
+        try:
+            if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                raise ValueError
+            checked[key] = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be a whole number, not {value!r}") from None
+    for key in TEXT_PARAMS:
+        if checked.get(key) is not None and not isinstance(checked[key], str):
+            raise ValueError(f"{key} must be text, not {checked[key]!r}")
+    for key in NUMBER_PARAMS:
+        value = checked.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (str, int))):
+            raise ValueError(f"{key} must be a number, not {value!r}")
+    return checked
+
+
+def _number(params, key, required=False):
+    """A jersey number parameter as text - JSON numbers are accepted, blank means none"""
+    value = params[key] if required else params.get(key)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ValueError(f"{key} is required")
+    return value or None
+
+
+class CommandWorker:
+    """Runs submitted callables one at a time, in order, on a dedicated thread"""
+
+    def __init__(self, name):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs), returns a Future with its result"""
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def call_later(self, delay_ms, callback):
+        """Run callback on this worker after delay_ms (same signature as Tk's after)"""
+        timer = threading.Timer(delay_ms / 1000, lambda: self.submit(callback))
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def stop(self):
+        """Finish queued work and end the thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class CommandDispatcher:
+    """Maps action names onto a HockeyController, running them on the right worker
+
+    Shared by the HTTP server and the replay harness (game_simulator.py), so both
+    exercise exactly the same command path.
+    """
+
+    def __init__(self, core_factory=None):
+        if core_factory is None:
+            from hockey_music_controller import HockeyController
+            core_factory = HockeyController
+
+        self.playback = CoalescingWorker('playback')
+        self.announcer = CommandWorker('announcer')
+        self.clips = CommandWorker('clips')
+        self.core = core_factory(call_later=self.playback.call_later)
+
+        # action -> (worker or None for inline, handler(params)) - inline only for read-only queries
+        core = self.core
+        self.actions = {
+            'status': (None, lambda p: core.status()),
+            'warm_up': (self.playback, lambda p: core.warm_up()),
+            'play_pause': (self.playback, lambda p: core.play_pause()),
+            'stop': (self.playback, lambda p: core.stop()),
+            'next': (self.playback, lambda p: core.next_track(p.get('count', 1))),
+            'play_from_top': (self.playback, lambda p: core.play_from_top()),
+            'play_track': (self.playback, lambda p: core.play_track_at(p['index'])),
+            'load_playlist': (self.playback, lambda p: core.load_playlist(p['name'])),
+            'playlists': (self.playback, lambda p: core.controller.get_playlists()),
+            'now_playing': (self.playback, lambda p: core.controller.get_current_track()),
+            'is_playing': (self.playback, lambda p: core.controller.is_playing()),
+            # Order and settings edits change what the playback worker is using, so they run on it too
+            'switch_playlist': (self.playback, lambda p: core.switch_playlist(p['name'])),
+            'shuffle': (self.playback, lambda p: core.shuffle()),
+            'reset_order': (self.playback, lambda p: core.reset_order()),
+            'move_track': (self.playback, lambda p: core.move_track(p['from'], p['to'])),
+            'set_position': (self.playback, lambda p: core.set_position(p['index'])),
+            'settings': (self.playback, lambda p: core.apply_settings(p)),
+            'snapshot': (None, lambda p: core.snapshot()),
+            'new_game': (self.playback, lambda p: core.new_game(p.get('label', ''))),
+            'announce_goal': (self.announcer, lambda p: core.announce_goal(
+                p.get('team', 'home'), _number(p, 'scorer', required=True), _number(p, 'assist1'),
+                _number(p, 'assist2'), p.get('voice', 'Alex'), away_team=p.get('away_team') or None
+            )),
+            'prepare_goal': (self.announcer, lambda p: core.prepare_goal(
+                p.get('team', 'home'), _number(p, 'scorer', required=True), _number(p, 'assist1'),
+                _number(p, 'assist2'), away_team=p.get('away_team') or None
+            )),
+            # Clips start their own playback and return at once - their own worker, never behind Music
+            'clip': (self.clips, lambda p: core.play_clip(p['name'])),
+            'set_away_team': (self.playback, lambda p: core.set_away_team(p['team'])),
+            'rosters': (None, lambda p: core.rosters.teams()),
+            'search': (None, lambda p: core.search(
+                p.get('q', ''), p.get('kind', 'track'), p.get('limit', 20)
+            )),
+            'final_score': (self.announcer, lambda p: core.announce_final_score(
+                p['home_score'], p['visiting_team'], p['visiting_score'], p.get('voice', 'Alex')
+            )),
+        }
+        for action, cue in CUE_ACTIONS.items():
+            self.actions[action] = (self.playback, lambda p, cue=cue: core.play_cue(cue))
+
+    def submit(self, action, params):
+        """Start one action without waiting, returns a Future with the handler's result
+
+        Raises KeyError for an unknown action; bad parameters fail the Future
+        with ValueError instead of reaching a worker.
+        """
+        worker, handler = self.actions[action]
+        future = Future()
+        try:
+            params = _checked_params(params)
+        except ValueError as e:
+            future.set_exception(e)
+            return future
+        if worker is None:
+            try:
+                future.set_result(handler(params))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        if action == 'next':
+            # Presses add up - the burst runs as one next_track(total)
+            return worker.press('next', self.core.next_track, count=params.get('count', 1))
+        if action in COALESCED_ACTIONS:
+            return worker.press(action, handler, params)
+        return worker.submit(handler, params)
+
+    def warm_up(self):
+        """Queue the backend warm-up ahead of any command, returns its Future"""
+        return self.submit('warm_up', {})
+    
+    def dispatch(self, action, params):
+        """Run one action, returns (http_status, response dict)"""
+        started = time.perf_counter()
+        if action not in self.actions:
+            return 404, {'ok': False, 'action': action, 'error': f"Unknown action: {action}"}
+        return self.response(action, self.submit(action, params), started)
+
+    def response(self, action, future, started):
+        """Wait for a submitted action, returns (http_status, response dict)"""
+        try:
+            result = future.result(timeout=60)
+        except (ValueError, KeyError) as e:
+            message = f"Missing parameter: {e}" if isinstance(e, KeyError) else str(e)
+            return 400, {'ok': False, 'action': action, 'error': message}
+        except CancelledError:
+            return 409, {'ok': False, 'action': action, 'error': "superseded by a newer command"}
+        except Exception as e:
+            return 500, {'ok': False, 'action': action, 'error': str(e)}
+
+        response = {
+            'ok': result is not False,
+            'action': action,
+            'result': result,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+        return (200 if response['ok'] else 502), response
+
+    def dispatch_path(self, path, params):
+        """Run the action named by a request path ("/goal"), returns (http_status, response dict)"""
+        return self.dispatch(path.strip('/') or 'status', params)
+
+    def shutdown(self):
+        """Drain the workers and close the journal"""
+        self.playback.stop()
+        self.announcer.stop()
+        self.clips.stop()
+        if self.core.journal:
+            self.core.journal.close()
+
+
+class CommandServer:
+    """Local HTTP front end for a HockeyController
+
+    Pass dispatcher to serve something else with dispatch_path()/shutdown(),
+    e.g. a multi_rink.RinkManager.
+    """
+
+    def __init__(self, core_factory=None, host=DEFAULT_HOST, port=DEFAULT_PORT, dispatcher=None):
+        self.dispatcher = dispatcher or CommandDispatcher(core_factory)
+        self.core = getattr(self.dispatcher, 'core', None)
+        self.httpd = _CommandHTTPServer((host, port), _make_handler(self.dispatcher))
+
+    @property
+    def address(self):
+        """(host, port) actually bound - useful with port 0"""
+        return self.httpd.server_address[:2]
+
+    def dispatch(self, action, params):
+        """Run one action, returns (http_status, response dict)"""
+        return self.dispatcher.dispatch(action, params)
+
+    def start(self):
+        """Serve in a background thread"""
+        thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def serve_forever(self):
+        """Serve until interrupted"""
+        host, port = self.address
+        print(f"🏒 Headless controller listening on http://{host}:{port}")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Shutting down")
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Stop serving and drain the workers"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.dispatcher.shutdown()
+
+
+class _CommandHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # many Stream Decks / scripts connecting at once
+
+
+def _make_handler(dispatcher):
+    """Request handler class bound to a CommandDispatcher (or anything with dispatch_path)"""
+
+    class CommandHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive for low-latency repeat commands
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            self._respond(url.path, params)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                try:
+                    body = json.loads(self.rfile.read(length))
+                except ValueError:
+                    self._send(400, {'ok': False, 'error': 'Body must be JSON'})
+                    return
+                if not isinstance(body, dict):
+                    self._send(400, {'ok': False, 'error': 'Body must be a JSON object'})
+                    return
+                params.update(body)
+            self._respond(url.path, params)
+
+        def _respond(self, path, params):
+            status, body = dispatcher.dispatch_path(path, params)
+            self._send(status, body)
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass  # keep stdout for controller output
+
+    return CommandHandler
+
+
+def run_headless(core_factory=None, host=DEFAULT_HOST, port=DEFAULT_PORT, dispatcher=None):
+    """Entry point for `hockey_music_controller.py --headless`"""
+    server = CommandServer(core_factory, host, port, dispatcher)
+    server.dispatcher.warm_up()
+    server.serve_forever()
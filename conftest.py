@@ -0,0 +1,134 @@
+"""
+Shared test fixtures - a controller on the simulated Music backend, clip folders, a fake TTS voice
+Nothing here reaches Music, a sound card or Hume; Hume reads as not configured in every test
+
+    python3 -m pytest -q
+"""
+
+import json
+import logging
+import math
+import struct
+import threading
+import time
+import wave
+
+import pytest
+
+import hume_tts
+from audio_dsp import wav_bytes
+from game_simulator import LatencyModel, SimClock, SimulatedMusicBackend
+from hockey_music_controller import HockeyController
+from hume_tts import HumeConfig
+
+# A manual script that speaks announcements through Hume, not a test
+collect_ignore = ['test_announcement.py']
+
+SYNTH_RATE = 8000
+SPEECH_MS = 300
+
+
+class FakeSynth:
+    """synthesize(text) -> WAV bytes like a TTS voice, counting calls (thread-safe)
+
+    By default 0.2s silence, a 0.3s tone, 0.2s silence - like synthesized speech.
+    constant=True gives a flat level that depends on the phrase instead: it has no
+    loudness to measure, so baking and leveling leave it exactly as synthesized.
+    """
+
+    rate = SYNTH_RATE
+    speech_ms = SPEECH_MS
+
+    def __init__(self, delay=0.0, constant=False):
+        self.delay = delay
+        self.constant = constant
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, text):
+        with self._lock:
+            self.calls.append(text)
+        time.sleep(self.delay)
+        if self.constant:
+            return wav_bytes((1, 2, SYNTH_RATE), struct.pack('<h', len(text)) * (len(text) * 10))
+        frames = SYNTH_RATE * SPEECH_MS // 1000
+        silence = bytes(2 * SYNTH_RATE // 5)
+        tone = struct.pack(f'<{frames}h', *[int(8000 * math.sin(2 * math.pi * 440 * i / SYNTH_RATE))
+                                            for i in range(frames)])
+        return wav_bytes((1, 2, SYNTH_RATE), silence + tone + silence)
+
+
+def _write_clip(folder, filename, seconds=0.5, rate=8000):
+    """A quiet mono WAV clip in folder, returns its path"""
+    path = folder / filename
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b'\x01\x00' * int(seconds * rate))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def offline_tts(monkeypatch):
+    """Hume off whatever .env says, so no test synthesizes over the network"""
+    monkeypatch.setattr(hume_tts, '_hume_config', HumeConfig(False, None, None))
+
+
+@pytest.fixture
+def log_records():
+    """Records logged under "hockey" during the test - it doesn't propagate, so caplog never sees them"""
+    records = []
+    handler = logging.Handler(logging.DEBUG)
+    handler.emit = records.append
+    logger = logging.getLogger('hockey')
+    logger.addHandler(handler)
+    yield records
+    logger.removeHandler(handler)
+
+
+@pytest.fixture
+def make_synth():
+    """FakeSynth(delay=0.0, constant=False)"""
+    return FakeSynth
+
+
+@pytest.fixture
+def sim_backend():
+    """Simulated Music app answering at once"""
+    return SimulatedMusicBackend(LatencyModel('fixed', 0), SimClock(1000))
+
+
+@pytest.fixture
+def write_config(tmp_path_factory):
+    """write_config(config) -> path of a config.json holding it, in a fresh folder"""
+    def write(config):
+        path = tmp_path_factory.mktemp('core') / 'config.json'
+        path.write_text(json.dumps(config))
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def make_core(sim_backend, write_config):
+    """make_core(config=None, backend=sim_backend, **HockeyController kwargs) -> controller"""
+    def make(config=None, backend=None, **kwargs):
+        return HockeyController(backend or sim_backend, write_config(config or {}), **kwargs)
+    return make
+
+
+@pytest.fixture
+def write_clip():
+    """write_clip(folder, filename, seconds=0.5, rate=8000) -> path"""
+    return _write_clip
+
+
+@pytest.fixture
+def clip_folder(tmp_path_factory):
+    """clip_folder(*filenames, seconds=0.5) -> a fresh folder of clips (a pathlib.Path)"""
+    def make(*filenames, seconds=0.5):
+        folder = tmp_path_factory.mktemp('clips')
+        for filename in filenames:
+            _write_clip(folder, filename, seconds)
+        return folder
+    return make
@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+Playback Engine Process
+Runs the HockeyController core in its own process; the Tk GUI is a client over a Unix socket
+
+    python3 hockey_music_controller.py             # GUI - starts the engine first if it isn't running
+    python3 hockey_music_controller.py --engine    # just the engine (also serves the HTTP API)
+    python3 engine_process.py stop                 # end the engine
+
+Music commands, announcements, fades and auto-stops all run in the engine, so a
+stuck Hume call or a slow base64 decode never starves Tk. Closing or crashing the
+GUI mid-game leaves the music, the auto-stop timers and a running announcement
+alone - start the GUI again and it picks up the engine's current state.
+
+Protocol - one JSON object per line:
+    GUI -> engine    {"id": 1, "action": "goal", "params": {}}
+    engine -> GUI    {"id": 1, "status": 200, "response": {...}}     reply, as CommandDispatcher.dispatch
+    engine -> GUI    {"event": "state", "state": {...}}              published state snapshot
+The engine publishes on connect and whenever the state changes - always before the
+reply to the command that changed it, so a client holding a reply has the new state.
+"""
+
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+
+import app_log
+from app_log import get_logger
+from command_server import CUE_ACTIONS, CommandDispatcher, CommandServer
+from hockey_music_controller import AppleMusicController, HockeyController
+from roster_index import RosterIndex
+
+DEFAULT_ENGINE_SOCKET = '~/.hockey_engine.sock'
+DEFAULT_ENGINE_LOG = '~/hockey_engine.log'
+ANNOUNCE_ACTIONS = {'announce_goal', 'final_score'}
+
+log = get_logger('engine')
+
+
+def _encode(message):
+    return (json.dumps(message) + '\n').encode('utf-8')
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class EngineServer:
+    """Serves a CommandDispatcher to GUI clients and publishes its state to them"""
+
+    def __init__(self, dispatcher, path=DEFAULT_ENGINE_SOCKET, poll_seconds=1.0):
+        self.dispatcher = dispatcher
+        self.core = dispatcher.core
+        self.path = os.path.expanduser(path)
+        self.poll_seconds = poll_seconds  # now-playing query, also catches timer-driven changes
+        self.now_playing = None
+        self.announcement = {'state': 'idle'}
+        self._clients = {}  # socket -> send lock
+        self._publish_lock = threading.Lock()
+        self._last_state = None
+        self._stopped = threading.Event()
+        self.sock = self._listen()
+        # The controller only changes on the playback worker, so its snapshot is taken there too
+        self._snapshot = dispatcher.playback.submit(self.core.snapshot).result()
+        dispatcher.playback.add_listener(self._playback_ran)
+
+    def _listen(self):
+        if os.path.exists(self.path):
+            try:
+                _connect(self.path).close()
+                raise RuntimeError(f"An engine is already running on {self.path}")
+            except OSError:
+                os.unlink(self.path)  # left behind by an engine that died
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        sock.listen(8)
+        return sock
+
+    def start(self):
+        """Accept clients and watch the player in background threads"""
+        threading.Thread(target=self._accept_loop, name='engine-accept', daemon=True).start()
+        threading.Thread(target=self._watch_loop, name='engine-watch', daemon=True).start()
+        log.info(f"🎛️  Engine listening on {self.path}", socket=self.path)
+
+    def wait(self):
+        """Block until stop() (or Ctrl-C)"""
+        try:
+            while not self._stopped.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            print("\n👋 Shutting down engine")
+            self.stop()
+
+    def stop(self):
+        """Stop serving clients (the dispatcher is left to its owner)"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        try:
+            self.sock.close()
+        finally:
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        for conn in list(self._clients):
+            conn.close()
+
+    def state(self):
+        """Everything a GUI shows: controller state, now playing and announcement status"""
+        return {
+            'core': self._snapshot,
+            'now_playing': self.now_playing,
+            'announcement': dict(self.announcement),
+        }
+
+    def _playback_ran(self):
+        """Snapshot the controller after each playback-lane command (on that worker) and publish it"""
+        if self._stopped.is_set():
+            return
+        self._snapshot = self.core.snapshot()
+        self.publish()
+
+    def publish(self, new_client=None):
+        """Send the state to every client if it changed (and always to new_client)"""
+        with self._publish_lock:
+            state = self.state()
+            if state != self._last_state:
+                self._last_state = state
+                message = _encode({'event': 'state', 'state': state})
+                for conn in list(self._clients):
+                    self._send_raw(conn, message)
+            if new_client is not None:
+                self._clients[new_client] = threading.Lock()
+                self._send_raw(new_client, _encode({'event': 'state', 'state': self._last_state}))
+
+    def _send_raw(self, conn, payload):
+        lock = self._clients.get(conn)
+        if lock is None:
+            return
+        try:
+            with lock:
+                conn.sendall(payload)
+        except OSError:
+            self._clients.pop(conn, None)
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_client, args=(conn,), name='engine-client', daemon=True).start()
+
+    def _serve_client(self, conn):
+        log.info("🖥️  GUI connected")
+        self.publish(new_client=conn)
+        try:
+            for line in conn.makefile('r', encoding='utf-8'):
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(message, dict):
+                    self._handle(conn, message)
+        except OSError:
+            pass
+        finally:
+            self._clients.pop(conn, None)
+            conn.close()
+            log.info("🖥️  GUI disconnected - engine keeps running")
+
+    def _handle(self, conn, message):
+        request_id = message.get('id')
+        action = message.get('action', 'status')
+        params = message.get('params') or {}
+        started = time.perf_counter()
+
+        def reply(status, response):
+            self._send_raw(conn, _encode({'id': request_id, 'status': status, 'response': response}))
+
+        if action == 'stop_engine':
+            reply(200, {'ok': True, 'action': action, 'result': True})
+            self.stop()
+            return
+        if action not in self.dispatcher.actions:
+            reply(404, {'ok': False, 'action': action, 'error': f"Unknown action: {action}"})
+            return
+
+        if action in ANNOUNCE_ACTIONS:
+            self.announcement = {'state': 'speaking', 'action': action}
+            self.publish()
+
+        def done(future):
+            if action in ANNOUNCE_ACTIONS:
+                ok = not future.cancelled() and future.exception() is None
+                self.announcement = {'state': 'done' if ok else 'failed', 'action': action,
+                                     'text': future.result() if ok else None}
+            self.publish()
+            reply(*self.dispatcher.response(action, future, started))
+
+        try:
+            future = self.dispatcher.submit(action, params)
+        except Exception as e:
+            # A request the dispatcher can't even queue still gets its error reply
+            future = Future()
+            future.set_exception(e)
+        future.add_done_callback(done)
+
+    def _watch_loop(self):
+        while not self._stopped.wait(self.poll_seconds):
+            try:
+                self.now_playing = self.core.controller.get_current_track()
+            except Exception as e:
+                log.warning(f"⚠️  Now-playing query failed: {e}", throttle='now-playing')
+            self.publish()
+
+
+class EngineClient:
+    """Connection to a running engine - requests return Futures, state arrives via listeners"""
+
+    def __init__(self, path=DEFAULT_ENGINE_SOCKET, timeout=5):
+        self.path = os.path.expanduser(path)
+        self.sock = _connect(self.path)
+        self.state = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = []
+        self._send_lock = threading.Lock()
+        self._ready = threading.Event()
+        threading.Thread(target=self._read_loop, name='engine-reader', daemon=True).start()
+        if not self._ready.wait(timeout):
+            self.sock.close()
+            raise RuntimeError(f"Engine on {self.path} did not send its state")
+
+    def add_listener(self, callback):
+        """callback(state) on every published state, callback(None) if the engine goes away
+
+        Called from the reader thread.
+        """
+        self._listeners.append(callback)
+
+    def request(self, action, **params):
+        """Send an action, returns a Future with (status, response dict)"""
+        future = Future()
+        request_id = next(self._ids)
+        self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                self.sock.sendall(_encode({'id': request_id, 'action': action, 'params': params}))
+        except OSError as e:
+            self._pending.pop(request_id, None)
+            future.set_exception(ConnectionError(f"Engine connection lost: {e}"))
+        return future
+
+    def call(self, action, timeout=60, **params):
+        """Run an action and return its result, raising like the local HockeyController would
+
+        ValueError for a rejected command, CancelledError if it was superseded.
+        """
+        status, response = self.request(action, **params).result(timeout)
+        if status in (200, 502):
+            return response.get('result')
+        if status == 409:
+            raise CancelledError()
+        if status in (400, 404):
+            raise ValueError(response.get('error'))
+        raise RuntimeError(response.get('error'))
+
+    def close(self):
+        self.sock.close()
+
+    def _read_loop(self):
+        try:
+            for line in self.sock.makefile('r', encoding='utf-8'):
+                message = json.loads(line)
+                if 'id' in message:
+                    future = self._pending.pop(message['id'], None)
+                    if future is not None:
+                        future.set_result((message['status'], message['response']))
+                elif message.get('event') == 'state':
+                    self.state = message['state']
+                    self._ready.set()
+                    self._notify(self.state)
+        except (OSError, ValueError):
+            pass
+        for future in list(self._pending.values()):
+            future.set_exception(ConnectionError("Engine connection lost"))
+        self._pending.clear()
+        self._notify(None)
+
+    def _notify(self, state):
+        for callback in list(self._listeners):
+            try:
+                callback(state)
+            except Exception as e:
+                log.exception(f"❌ Engine state listener failed: {e}")
+
+
+class RemoteMusicQueries:
+    """The few Music queries the GUI makes, answered by the engine's backend"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_playlists(self):
+        return self.client.call('playlists') or []
+
+    def get_current_track(self):
+        return self.client.call('now_playing')
+
+    def is_playing(self):
+        return self.client.call('is_playing')
+
+
+class RemoteCore:
+    """HockeyController stand-in for the GUI: state from the engine's snapshots, actions sent to it
+
+    apply_snapshot() and the settings dicts belong to the Tk thread; the playback
+    methods and playlist edits block on the engine and are meant for the GUI's
+    input lane. An edit's changes reach the Tk thread in the state the engine
+    publishes before its reply.
+    """
+
+    CUES = HockeyController.CUES
+    CUE_ACTIONS = {cue: action for action, cue in CUE_ACTIONS.items()}
+
+    def __init__(self, client):
+        self.client = client
+        self.controller = RemoteMusicQueries(client)
+        self.journal = None          # the engine keeps the journal
+        self.playlist_cache = None   # ...and the playlist cache
+        self.call_later = None
+        self.roster_file = None
+        self.rosters = None
+        self.apply_snapshot(client.state['core'])
+
+    def apply_snapshot(self, state):
+        """Take over the engine's state (Tk thread)"""
+        self.playlist_name = state['playlist']
+        self.playlist_tracks = state['playlist_tracks']
+        self.shuffled_order = state['shuffled_order']
+        self._current_track_index = state['current_index']
+        self.start_times = state['start_times']
+        self.end_times = state['end_times']
+        self.max_durations = state['max_durations']
+        self.fade_seconds = state['fade_seconds']
+        self.away_team = state['away_team']
+        self.home_team = state['home_team']
+        self.config = dict(state['cues'], playlist=self.playlist_name, away_team=self.away_team)
+        self.loaded_playlists = state.get('loaded_playlists', [])
+        self.clips = state.get('clips', [])
+        if state['roster_file'] != self.roster_file:
+            self.roster_file = state['roster_file']
+            self.rosters = RosterIndex(os.path.dirname(self.roster_file) or '.')
+
+    def sync(self):
+        """Apply the latest published state (Tk thread) - after a reply it includes that command's changes"""
+        if self.client.state:
+            self.apply_snapshot(self.client.state['core'])
+
+    @property
+    def current_track_index(self):
+        return self._current_track_index
+
+    @current_track_index.setter
+    def current_track_index(self, index):
+        self._current_track_index = index
+        self.client.request('set_position', index=index)
+
+    def cue_song(self, cue):
+        return self.config.get(cue, '')
+
+    def track_at(self, list_idx):
+        return self.playlist_tracks[self.shuffled_order[list_idx]]
+
+    def save_config(self):
+        """Send settings and cue songs to the engine, which saves the config file"""
+        settings = {key: getattr(self, key) for key in HockeyController.SETTINGS}
+        settings['cues'] = {cue: self.config.get(cue, '') for cue in self.CUES}
+        self.client.request('settings', **settings)
+
+    # Playback - blocking, run these on the input lane
+    def play_cue(self, cue):
+        if cue not in self.CUE_ACTIONS:
+            raise ValueError(f"Unknown cue: {cue}")
+        return self.client.call(self.CUE_ACTIONS[cue])
+
+    def play_pause(self):
+        return self.client.call('play_pause')
+
+    def stop(self):
+        return self.client.call('stop')
+
+    def next_track(self, count=1):
+        return self.client.call('next', count=count)
+
+    def play_track_at(self, list_idx):
+        return self.client.call('play_track', index=list_idx)
+
+    def play_from_top(self):
+        return self.client.call('play_from_top')
+
+    def announce_goal(self, team, scorer, assist1=None, assist2=None, voice="Alex", away_team=None):
+        return self.client.call('announce_goal', timeout=120, team=team, scorer=scorer, assist1=assist1,
+                                assist2=assist2, voice=voice, away_team=away_team)
+
+    def prepare_goal(self, team, scorer, assist1=None, assist2=None, away_team=None):
+        self.client.request('prepare_goal', team=team, scorer=scorer, assist1=assist1, assist2=assist2,
+                            away_team=away_team)
+        return True
+
+    def announce_final_score(self, home_score, visiting_team, visiting_score, voice="Alex"):
+        return self.client.call('final_score', timeout=120, home_score=home_score, visiting_team=visiting_team,
+                                visiting_score=visiting_score, voice=voice)
+
+    # Playlist edits - queued behind Music on the engine, so also for the input lane
+    def load_playlist(self, playlist_name, on_update=None):
+        return self.client.call('load_playlist', name=playlist_name)
+
+    def loaded_playlist_names(self):
+        return list(self.loaded_playlists)
+
+    def switch_playlist(self, playlist_name):
+        return self.client.call('switch_playlist', name=playlist_name)
+
+    def soundboard_clips(self):
+        return list(self.clips)
+
+    def play_clip(self, name):
+        self.client.request('clip', name=name)
+        return True
+
+    def shuffle(self):
+        self.client.call('shuffle')
+
+    def reset_order(self):
+        self.client.call('reset_order')
+
+    def move_track(self, from_idx, to_idx):
+        item = self.shuffled_order.pop(from_idx)
+        self.shuffled_order.insert(to_idx, item)
+        self.client.request('move_track', **{'from': from_idx, 'to': to_idx})
+
+    def set_away_team(self, team):
+        self.away_team = team or ''
+        self.config['away_team'] = self.away_team
+        self.client.request('set_away_team', team=self.away_team)
+
+    def new_game(self, label=''):
+        app_log.new_game(label)  # the GUI's own log; the engine rotates its log itself
+        return self.client.call('new_game', label=label)
+
+    def search(self, query, kind='track', limit=20):
+        """Type-ahead search in the engine's library index"""
+        return self.client.call('search', q=query, kind=kind, limit=limit) or []
+
+    def goal_announcement_text(self, team, scorer, assist1=None, assist2=None, away_team=None):
+        """Same text the engine will speak, built from the local roster files (no round trip)"""
+        roster_team = self.home_team if team.lower() == "home" else (away_team or self.away_team)
+        return AppleMusicController.build_goal_announcement(
+            team, scorer, assist1, assist2, self.roster_file, self.rosters.players(roster_team)
+        )
+
+    def status(self):
+        return self.client.call('status')
+
+
+def connect_or_spawn(path=DEFAULT_ENGINE_SOCKET, engine_args=(), wait_seconds=15, log_file=DEFAULT_ENGINE_LOG):
+    """EngineClient for the running engine, starting one in the background first if needed
+
+    The engine gets its own session, so it outlives the GUI (and a GUI crash).
+    """
+    try:
+        return EngineClient(path)
+    except OSError:
+        pass
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hockey_music_controller.py')
+    log_path = os.path.expanduser(log_file)
+    print(f"🎛️  Starting playback engine (log: {log_path})")
+    with open(log_path, 'a') as engine_log:
+        subprocess.Popen(
+            [sys.executable, '-u', script, '--engine', '--socket', path, *engine_args],
+            stdin=subprocess.DEVNULL, stdout=engine_log, stderr=subprocess.STDOUT, start_new_session=True
+        )
+
+    deadline = time.monotonic() + wait_seconds
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        try:
+            return EngineClient(path)
+        except OSError:
+            continue
+    raise RuntimeError(f"Playback engine did not start - see {log_path}")
+
+
+def run_engine(core_factory, path=DEFAULT_ENGINE_SOCKET, host='127.0.0.1', port=8765):
+    """Entry point for `hockey_music_controller.py --engine`"""
+    dispatcher = CommandDispatcher(core_factory)
+    engine = EngineServer(dispatcher, path)
+    http = None
+    if port:
+        try:
+            http = CommandServer(host=host, port=port, dispatcher=dispatcher)
+            http.start()
+            log.info(f"🏒 Command API on http://{host}:{port}")
+        except OSError as e:
+            log.warning(f"⚠️  Command API not started ({host}:{port}): {e}")
+    engine.start()
+
+    # Warm-up first on the playback worker, so the GUI's first press finds Music awake
+    dispatcher.warm_up()
+    if dispatcher.core.playlist_name:
+        dispatcher.submit('load_playlist', {'name': dispatcher.core.playlist_name})
+    engine.wait()
+    if http:
+        http.shutdown()
+    else:
+        dispatcher.shutdown()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Control the playback engine process")
+    parser.add_argument('command', choices=['status', 'stop'])
+    parser.add_argument('--socket', default=DEFAULT_ENGINE_SOCKET)
+    args = parser.parse_args()
+
+    try:
+        client = EngineClient(args.socket)
+    except OSError:
+        print(f"❌ No engine running on {args.socket}")
+        return 1
+    if args.command == 'stop':
+        client.call('stop_engine')
+        print("✓ Engine stopped")
+    else:
+        print(json.dumps(client.call('status'), indent=2))
+    client.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
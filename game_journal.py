@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Game Journal
+Append-only, one-file-per-game log of controller events (cues, tracks, announcements, errors)
+
+Each line is one compact JSON object: {"ts": <unix time>, "event": "<type>", ...fields}.
+record() only appends to an in-memory buffer; a background thread writes and fsyncs
+the buffer in batches, so journaling never adds I/O to a hotkey.
+
+Query tool:
+    python3 game_journal.py list                 # games in the journal directory
+    python3 game_journal.py goals [GAME_FILE]    # every goal announced (default: latest game)
+    python3 game_journal.py events [GAME_FILE] [--type cue]
+    python3 game_journal.py summary [GAME_FILE]
+"""
+
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from app_log import get_logger
+
+DEFAULT_JOURNAL_DIR = '~/hockey_journal'
+
+log = get_logger('journal')
+
+# Journal files this process has started - a new game can't append to one of them
+_started = set()
+_started_lock = threading.Lock()
+
+
+class GameJournal:
+    """Buffered append-only event journal, rotated per game"""
+
+    def __init__(self, directory=DEFAULT_JOURNAL_DIR, flush_interval=0.5, batch_size=64):
+        self.directory = os.path.expanduser(directory)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.path = None
+        self._file = None
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.new_game()
+        self._thread = threading.Thread(target=self._run, name='journal', daemon=True)
+        self._thread.start()
+
+    def record(self, event, **fields):
+        """Queue one event - no I/O on the calling thread"""
+        entry = {'ts': round(time.time(), 3), 'event': event}
+        entry.update(fields)
+        with self._buffer_lock:
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def new_game(self, label=''):
+        """Flush the current game and start a new journal file"""
+        with self._write_lock:
+            self._flush_locked()
+            if self._file:
+                self._file.close()
+            os.makedirs(self.directory, exist_ok=True)
+            name = datetime.now().strftime('game_%Y%m%d_%H%M%S')
+            if label:
+                name += '_' + ''.join(c if c.isalnum() else '_' for c in label)
+            self.path = _unstarted_path(os.path.join(self.directory, name))
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if self._file.tell() and not _ends_with_newline(self.path):
+                self._file.write('\n')  # a crash tore the last line - keep the next event off it
+        self.record('game_started', label=label)
+        return self.path
+
+    def flush(self):
+        """Write everything buffered so far"""
+        with self._write_lock:
+            self._flush_locked()
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        with self._write_lock:
+            self._flush_locked()
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _flush_locked(self):
+        with self._buffer_lock:
+            batch, self._buffer = self._buffer, []
+        if not batch or not self._file:
+            return
+        self._file.write(''.join(json.dumps(e, separators=(',', ':'), default=str) + '\n' for e in batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                log.warning(f"⚠️  Journal write failed: {e}", path=self.path, throttle='journal-write')
+
+
+def _unstarted_path(base):
+    """base + '.jsonl', or base_2.jsonl, base_3.jsonl... if this process already started a game there
+
+    Two New Game presses in the same second are two games. A file some earlier
+    run left (the controller restarted within the second) is appended to.
+    """
+    with _started_lock:
+        path, number = base + '.jsonl', 1
+        while path in _started:
+            number += 1
+            path = f"{base}_{number}.jsonl"
+        _started.add(path)
+    return path
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def read_events(path):
+    """All events in a journal file (skips a torn last line)"""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def list_games(directory=DEFAULT_JOURNAL_DIR):
+    """Journal files, oldest first"""
+    return sorted(glob.glob(os.path.join(os.path.expanduser(directory), 'game_*.jsonl')))
+
+
+def _resolve_game(path, directory):
+    if path:
+        return path
+    games = list_games(directory)
+    if not games:
+        raise SystemExit(f"❌ No games in {os.path.expanduser(directory)}")
+    return games[-1]
+
+
+def _clock(ts):
+    return datetime.fromtimestamp(ts).strftime('%H:%M:%S')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the game journal")
+    parser.add_argument('command', choices=['list', 'goals', 'events', 'summary'])
+    parser.add_argument('game', nargs='?', help="journal file (default: latest game)")
+    parser.add_argument('--type', help="only events of this type (events command)")
+    parser.add_argument('--dir', default=DEFAULT_JOURNAL_DIR, help="journal directory")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for path in list_games(args.dir):
+            events = read_events(path)
+            goals = sum(1 for e in events if e['event'] == 'announcement' and e.get('kind') == 'goal')
+            print(f"{os.path.basename(path)}  {len(events):5d} events  {goals:2d} goals")
+        return
+
+    path = _resolve_game(args.game, args.dir)
+    events = read_events(path)
+
+    if args.command == 'goals':
+        for e in events:
+            if e['event'] == 'announcement' and e.get('kind') == 'goal':
+                latency = f"{e['total_ms']:.0f} ms" if e.get('total_ms') is not None else "-"
+                print(f"{_clock(e['ts'])}  {e.get('team', ''):<5} #{e.get('scorer', '?'):<3} "
+                      f"{e.get('engine', '')}/{latency:<8} {e.get('text', '')}")
+    elif args.command == 'events':
+        for e in events:
+            if args.type and e['event'] != args.type:
+                continue
+            fields = {k: v for k, v in e.items() if k not in ('ts', 'event')}
+            print(f"{_clock(e['ts'])}  {e['event']:<16} {json.dumps(fields, ensure_ascii=False)}")
+    else:
+        counts = Counter(e['event'] for e in events)
+        print(f"📒 {os.path.basename(path)}")
+        for event, count in counts.most_common():
+            print(f"   {event:<16} {count}")
+        tts = [e['total_ms'] for e in events if e['event'] == 'announcement' and e.get('total_ms') is not None]
+        if tts:
+            print(f"   announcement latency: avg {sum(tts) / len(tts):.0f} ms, max {max(tts):.0f} ms")
+        trimmed = [(e['lead_trimmed_ms'], e.get('trail_trimmed_ms', 0)) for e in events
+                   if e['event'] == 'announcement' and e.get('lead_trimmed_ms') is not None]
+        if trimmed:
+            lead = sum(t[0] for t in trimmed) / len(trimmed)
+            total = sum(t[0] + t[1] for t in trimmed) / len(trimmed)
+            print(f"   silence trimmed: avg {total:.0f} ms per announcement, {lead:.0f} ms of it before the first word")
+        stalls = [e for e in events if e['event'] == 'ui_stall']
+        if stalls:
+            from stall_watchdog import print_summary, summarize
+            print_summary(summarize(stalls), "UI stalls")
+
+
+if __name__ == '__main__':
+    main()
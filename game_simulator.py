@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Game Simulator
+Replays a whole game of operator actions against simulated Music and TTS backends
+
+Actions go through the same CommandDispatcher as the headless server, so the real
+HockeyController, PlaybackScheduler and worker lanes are exercised - only the
+AppleScript and Hume calls are simulated. Runs anywhere (no macOS needed).
+
+    python3 game_simulator.py --synthetic --speed 50                 # generated game
+    python3 game_simulator.py --synthetic --periods 1 --period-minutes 5 --speed 200   # a quick one
+    python3 game_simulator.py ~/hockey_journal/game_....jsonl        # replay a recorded game
+    python3 game_simulator.py script.jsonl --music-latency 120:0.6 --tts-latency 1800:0.3
+
+Latency specs (milliseconds): "80" fixed, "80:0.5" lognormal with median 80 and
+sigma 0.5, "uniform:50:150". Reported latencies are in simulated (game) time.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+from command_server import CommandDispatcher, CUE_ACTIONS
+import hume_tts
+from game_journal import read_events
+from hockey_music_controller import AppleMusicController, HockeyController
+from hume_tts import HumeConfig
+
+SYNTH_SILENCE_MS = (350, 250)  # silence before and after synthesized speech, until trimmed
+
+
+class LatencyModel:
+    """Random latency distribution, sampled in milliseconds"""
+
+    def __init__(self, kind='fixed', a=0.0, b=0.0, rng=None):
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def parse(cls, spec, rng=None):
+        """'80' fixed, '80:0.5' lognormal(median, sigma), 'uniform:50:150'"""
+        parts = str(spec).split(':')
+        if parts[0] == 'uniform':
+            return cls('uniform', float(parts[1]), float(parts[2]), rng)
+        if len(parts) == 2:
+            return cls('lognormal', float(parts[0]), float(parts[1]), rng)
+        return cls('fixed', float(parts[0]), 0.0, rng)
+
+    def sample(self):
+        if self.kind == 'uniform':
+            return self.rng.uniform(self.a, self.b)
+        if self.kind == 'lognormal':
+            return self.rng.lognormvariate(math.log(self.a), self.b)
+        return self.a
+
+
+class SimClock:
+    """Game time running `speed` times faster than the wall clock"""
+
+    def __init__(self, speed=1.0):
+        self.speed = speed
+
+    def sleep_ms(self, game_ms):
+        if game_ms > 0:
+            time.sleep(game_ms / 1000 / self.speed)
+
+
+class _FakeClipProcess:
+    """Stands in for an afplay process playing a 1.5s clip (poll/kill/wait)"""
+
+    def __init__(self, clock, clip_ms=1500):
+        self._done = threading.Event()
+        threading.Thread(target=lambda: (clock.sleep_ms(clip_ms), self._done.set()), daemon=True).start()
+
+    def poll(self):
+        return 0 if self._done.is_set() else None
+
+    def kill(self):
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        return 0
+
+
+class _FakeFadeProcess:
+    """Stands in for the osascript fade process (poll/kill/wait)"""
+
+    def __init__(self, backend, duration, start_volume, clock):
+        self._done = threading.Event()
+        self._killed = False
+        self._thread = threading.Thread(target=self._run, args=(backend, duration, start_volume, clock), daemon=True)
+        self._thread.start()
+
+    def _run(self, backend, duration, start_volume, clock):
+        clock.sleep_ms(duration * 1000)
+        if not self._killed:
+            backend.state = 'stopped'
+            backend.volume = start_volume
+        self._done.set()
+
+    def poll(self):
+        return 0 if self._done.is_set() else None
+
+    def kill(self):
+        self._killed = True
+
+    def wait(self):
+        self._done.wait()
+        return 0
+
+
+class SimulatedMusicBackend(AppleMusicController):
+    """In-memory Music app: playlists, player state and volume, with call latency"""
+
+    def __init__(self, latency, clock, playlists=None, tts_latency=None):
+        self.latency = latency
+        self.tts_latency = tts_latency or LatencyModel('fixed', 0)
+        self.clock = clock
+        self.playlists = playlists or {'Stoppage': [f"Song {i} | Artist {i % 7}" for i in range(1, 61)]}
+        self.state = 'stopped'
+        self.current = None
+        self.volume = 100
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _call(self, name, extra_ms=0):
+        with self._lock:
+            self.calls[name] += 1
+        self.clock.sleep_ms(self.latency.sample() + extra_ms)
+
+    def run_applescript(self, script, max_retries=3, retry_delay=0.5, silent_on_error=False):
+        self._call('run_applescript')
+        return "", True
+
+    def get_playlists(self):
+        self._call('get_playlists')
+        return list(self.playlists)
+
+    def get_playlist_tracks(self, playlist_name):
+        # One Apple Event per track in the AppleScript version
+        self._call('get_playlist_tracks', extra_ms=2 * len(self.playlists.get(playlist_name, [])))
+        return list(self.playlists.get(playlist_name, []))
+
+    def get_library_tracks(self):
+        self._call('get_library_tracks')
+        return list(dict.fromkeys(t for tracks in self.playlists.values() for t in tracks))
+
+    def get_playlist_fingerprint(self, playlist_name):
+        self._call('get_playlist_fingerprint')
+        tracks = self.playlists.get(playlist_name)
+        return None if tracks is None else f"{len(tracks)}:{hash(tuple(tracks)) & 0xffffffff:08x}"
+
+    def _play(self, track):
+        self.state = 'playing'
+        self.current = track
+        return True
+
+    def play_track_from_playlist(self, playlist_name, track_index):
+        self._call('play_track_from_playlist')
+        tracks = self.playlists.get(playlist_name, [])
+        if not 1 <= track_index <= len(tracks):
+            return False
+        return self._play(tracks[track_index - 1])
+
+    def play_track_from_playlist_with_start_time(self, playlist_name, track_index, start_time):
+        # The AppleScript waits 0.5s before seeking
+        self._call('play_track_from_playlist_with_start_time', extra_ms=500)
+        tracks = self.playlists.get(playlist_name, [])
+        if not 1 <= track_index <= len(tracks):
+            return False
+        return self._play(tracks[track_index - 1])
+
+    def play_track_by_name(self, track_name):
+        self._call('play_track_by_name')
+        return self._play(track_name) if track_name else False
+
+    def play_pause(self):
+        self._call('play_pause')
+        if self.current:
+            self.state = 'paused' if self.state == 'playing' else 'playing'
+        return True
+
+    def pause(self):
+        self._call('pause')
+        if self.state == 'playing':
+            self.state = 'paused'
+        return True
+
+    def stop(self):
+        self._call('stop')
+        self.state = 'stopped'
+        return True
+
+    def get_current_track(self):
+        self._call('get_current_track')
+        return self.current if self.state != 'stopped' else "No track playing"
+
+    def get_current_track_name_only(self):
+        self._call('get_current_track_name_only')
+        return self.current.split(' | ')[0] if self.state != 'stopped' and self.current else ""
+
+    def is_playing(self):
+        self._call('is_playing')
+        return self.state == 'playing'
+
+    def get_volume(self):
+        self._call('get_volume')
+        return self.volume
+
+    def set_volume(self, volume):
+        self._call('set_volume')
+        self.volume = int(volume)
+        return True
+
+    def start_fade_out(self, duration, start_volume, steps=20):
+        self._call('start_fade_out')
+        return _FakeFadeProcess(self, duration, start_volume, self.clock)
+
+    def play_sound_file(self, path):
+        self._call('play_sound_file', extra_ms=1500)
+
+    def spawn_sound_file(self, path, volume=1.0):
+        self._call('spawn_sound_file')
+        return _FakeClipProcess(self.clock)
+
+    def speak(self, announcement, use_hume=True, loudness_target=None, trim=True, segue=None):
+        """Simulated TTS: synthesis latency, then ~0.3s of speech per word
+
+        Untrimmed, the speech comes with the silence real synthesis puts around it; a
+        segue plays on in the same stream.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self.calls['speak'] += 1
+        synth_ms = self.tts_latency.sample()
+        self.clock.sleep_ms(synth_ms)
+        lead_ms, trail_ms = SYNTH_SILENCE_MS
+        self.clock.sleep_ms(300 * len(announcement.split()) + (0 if trim else lead_ms + trail_ms))
+        if segue:
+            channels, width, rate = segue.format
+            self.clock.sleep_ms(len(segue.pcm) / (channels * width * rate) * 1000 - segue.overlap_ms)
+        return {
+            'engine': 'simulated', 'ok': True, 'error': None, 'segued': segue is not None, 'synth_ms': synth_ms,
+            'lead_trimmed_ms': lead_ms if trim else 0.0, 'trail_trimmed_ms': trail_ms if trim else 0.0,
+            'total_ms': (time.perf_counter() - started) * 1000 * self.clock.speed
+        }
+
+
+def actions_from_journal(path):
+    """Operator actions (t, action, params) reconstructed from a game journal"""
+    events = read_events(path)
+    if not events:
+        return []
+    cue_actions = {cue: action for action, cue in CUE_ACTIONS.items()}
+    t0 = events[0]['ts']
+    actions = []
+    for e in events:
+        t = e['ts'] - t0
+        kind = e['event']
+        if kind == 'cue' and e.get('cue') in cue_actions:
+            actions.append((t, cue_actions[e['cue']], {}))
+        elif kind == 'next':
+            actions.append((t, 'next', {}))
+        elif kind == 'track_started':
+            actions.append((t, 'play_track', {'index': e.get('index', 0)}))
+        elif kind == 'track_stopped' and e.get('reason') == 'manual':
+            actions.append((t, 'stop', {}))
+        elif kind in ('paused', 'resumed'):
+            actions.append((t, 'play_pause', {}))
+        elif kind == 'announcement' and e.get('kind') == 'goal':
+            assists = e.get('assists') or []
+            actions.append((t, 'announce_goal', {
+                'team': e.get('team', 'home'), 'scorer': e.get('scorer', '0'),
+                'assist1': assists[0] if len(assists) > 0 else None,
+                'assist2': assists[1] if len(assists) > 1 else None
+            }))
+        elif kind == 'announcement' and e.get('kind') == 'final_score':
+            actions.append((t, 'final_score', {
+                'home_score': e.get('home_score'), 'visiting_team': e.get('visiting_team'),
+                'visiting_score': e.get('visiting_score')
+            }))
+    return actions
+
+
+def actions_from_script(path):
+    """Actions from a JSON-lines script: {"t": 12.5, "action": "goal", "params": {...}}"""
+    actions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                actions.append((float(entry['t']), entry['action'], entry.get('params', {})))
+    return actions
+
+
+def load_actions(path):
+    """Script or journal file, detected from its first line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = json.loads(f.readline() or '{}')
+    return actions_from_journal(path) if 'event' in first else actions_from_script(path)
+
+
+def synthetic_game(seed=0, periods=3, period_seconds=1200):
+    """A plausible game: stoppages, rapid Next bursts, goals with announcements, specials"""
+    rng = random.Random(seed)
+    actions = [(0.0, 'game_start', {})]
+    t = 30.0
+    home = away = 0
+    for period in range(periods):
+        period_end = t + period_seconds
+        while t < period_end:
+            t += rng.uniform(30, 110)        # play on until the whistle
+            roll = rng.random()
+            if roll < 0.12:
+                team = 'home' if rng.random() < 0.55 else 'away'
+                home, away = (home + 1, away) if team == 'home' else (home, away + 1)
+                actions.append((t, 'goal', {}))
+                assists = rng.sample(range(2, 30), rng.randint(0, 2))
+                actions.append((t + 8, 'announce_goal', {
+                    'team': team, 'scorer': str(rng.randint(2, 30)),
+                    'assist1': str(assists[0]) if assists else None,
+                    'assist2': str(assists[1]) if len(assists) > 1 else None
+                }))
+                actions.append((t + 25, 'stop', {}))
+                t += 30
+            elif roll < 0.22:
+                actions.append((t, rng.choice(['power_play', 'penalty_kill']), {}))
+                actions.append((t + 20, 'stop', {}))
+                t += 20
+            else:
+                actions.append((t, 'play_pause', {}))
+                if rng.random() < 0.25:      # operator hammers N looking for a song
+                    for i in range(rng.randint(2, 5)):
+                        actions.append((t + 2 + i * 0.15, 'next', {}))
+                    actions.append((t + 3.5, 'play_pause', {}))
+                t += rng.uniform(20, 35)
+                actions.append((t, 'next', {}))
+        if period < periods - 1:
+            actions.append((t + 5, 'intermission_1st' if period == 0 else 'intermission_2nd', {}))
+            actions.append((t + 240, 'zamboni' if period == 0 else 'zamboni_2nd', {}))
+            actions.append((t + 600, 'stop', {}))
+            t += 660
+    actions.append((t + 2, 'end_of_game', {}))
+    actions.append((t + 10, 'final_score', {
+        'home_score': str(home), 'visiting_team': 'Rivals', 'visiting_score': str(away)
+    }))
+    return sorted(actions, key=lambda a: a[0])
+
+
+def run_replay(actions, speed=1.0, music_latency='80:0.4', tts_latency='1500:0.3', seed=0):
+    """Replay actions against simulated backends, returns a timing report dict"""
+    rng = random.Random(seed)
+    clock = SimClock(speed)
+    backend = SimulatedMusicBackend(
+        LatencyModel.parse(music_latency, rng), clock,
+        tts_latency=LatencyModel.parse(tts_latency, rng)
+    )
+
+    workdir = tempfile.mkdtemp(prefix='hockey_sim_')
+    config_file = os.path.join(workdir, 'config.json')
+    with open(config_file, 'w') as f:
+        config = {cue: f"{cue.replace('_', ' ').title()} Song" for cue in HockeyController.CUES}
+        config['soundboard_output'] = 'process'  # clips through the simulated player, never the sound card
+        # No baked pack or phrase cache from the operator's home folder
+        config['announcement_pack'] = os.path.join(workdir, 'announcements.pack')
+        config['phrase_cache_dir'] = os.path.join(workdir, 'phrases')
+        json.dump(config, f)
+
+    # Announcements go through the simulated speak(), never Hume - whatever .env says
+    hume = hume_tts._hume_config
+    hume_tts._hume_config = HumeConfig(False, None, None)
+    try:
+        return _replay(actions, speed, backend, config_file)
+    finally:
+        hume_tts._hume_config = hume
+
+
+def _replay(actions, speed, backend, config_file):
+    dispatcher = CommandDispatcher(
+        lambda call_later: HockeyController(backend, config_file, call_later)
+    )
+    # The input lane's settle/debounce windows are wall time - compress them like the clock
+    dispatcher.playback.settle /= speed
+    dispatcher.playback.debounce /= speed
+    dispatcher.dispatch('load_playlist', {'name': 'Stoppage'})
+    backend.calls.clear()
+
+    results = []
+    results_lock = threading.Lock()
+    futures = []
+    started = time.perf_counter()
+
+    for t, action, params in actions:
+        delay = started + t / speed - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        issued = time.perf_counter()
+        try:
+            future = dispatcher.submit(action, params)
+        except KeyError:
+            results.append({'action': action, 't': t, 'latency_ms': 0, 'error': 'unknown action'})
+            continue
+
+        def done(future, action=action, t=t, issued=issued):
+            error = None
+            if future.cancelled():
+                error = 'superseded'
+            else:
+                try:
+                    if future.result() is False:
+                        error = 'backend failure'
+                except Exception as e:
+                    error = str(e)
+            with results_lock:
+                results.append({
+                    'action': action, 't': t, 'error': error,
+                    'latency_ms': (time.perf_counter() - issued) * 1000 * speed
+                })
+
+        future.add_done_callback(done)
+        futures.append(future)
+
+    for future in futures:
+        try:
+            future.result(timeout=600)
+        except Exception:
+            pass
+    wall_seconds = time.perf_counter() - started
+    dispatcher.shutdown()
+    return build_report(results, backend.calls, wall_seconds, speed)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def build_report(results, backend_calls, wall_seconds, speed):
+    """Per-action latency distribution (simulated ms), error and superseded counts"""
+    by_action = defaultdict(list)
+    errors = Counter()
+    superseded = Counter()
+    for r in results:
+        by_action[r['action']].append(r['latency_ms'])
+        if r['error'] == 'superseded':
+            superseded[r['action']] += 1
+        elif r['error']:
+            errors[r['action']] += 1
+    actions = {}
+    for action, latencies in sorted(by_action.items()):
+        actions[action] = {
+            'count': len(latencies),
+            'p50_ms': round(statistics.median(latencies), 1),
+            'p95_ms': round(_percentile(latencies, 0.95), 1),
+            'max_ms': round(max(latencies), 1),
+            'errors': errors[action],
+            'superseded': superseded[action]
+        }
+    return {
+        'speed': speed,
+        'wall_seconds': round(wall_seconds, 2),
+        'actions': actions,
+        'backend_calls': dict(backend_calls.most_common())
+    }
+
+
+def print_report(report):
+    print("=" * 70)
+    print(f"GAME SIMULATION REPORT (speed x{report['speed']}, {report['wall_seconds']}s wall)")
+    print("=" * 70)
+    print(f"   {'action':<18}{'count':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'errors':>8}{'dropped':>9}")
+    for action, stats in report['actions'].items():
+        print(f"   {action:<18}{stats['count']:>6}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['max_ms']:>10.1f}{stats['errors']:>8}{stats['superseded']:>9}")
+    print()
+    print("   Backend calls: " + ", ".join(f"{k}={v}" for k, v in report['backend_calls'].items()))
+    print("=" * 70)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a game against simulated Music/TTS backends")
+    parser.add_argument('source', nargs='?', help="game journal or JSON-lines action script")
+    parser.add_argument('--synthetic', action='store_true', help="generate a game instead of replaying one")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the generated game and latencies")
+    parser.add_argument('--periods', type=int, default=3, help="periods in the generated game")
+    parser.add_argument('--period-minutes', type=float, default=20, help="length of each generated period")
+    parser.add_argument('--speed', type=float, default=1.0, help="game seconds per wall second")
+    parser.add_argument('--music-latency', default='80:0.4', help="Music call latency spec (ms)")
+    parser.add_argument('--tts-latency', default='1500:0.3', help="TTS synthesis latency spec (ms)")
+    parser.add_argument('--write-script', help="save the action list as a JSON-lines script")
+    parser.add_argument('--json', help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        actions = synthetic_game(args.seed, args.periods, args.period_minutes * 60)
+    elif args.source:
+        actions = load_actions(args.source)
+    else:
+        parser.error("give a journal/script file or --synthetic")
+
+    if args.write_script:
+        with open(args.write_script, 'w', encoding='utf-8') as f:
+            for t, action, params in actions:
+                f.write(json.dumps({'t': round(t, 3), 'action': action, 'params': params}) + '\n')
+
+    game_seconds = actions[-1][0] if actions else 0
+    print(f"🏒 Replaying {len(actions)} actions ({game_seconds / 60:.0f} game minutes) at x{args.speed}")
+    report = run_replay(actions, args.speed, args.music_latency, args.tts_latency, args.seed)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
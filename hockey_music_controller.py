@@ -18,21 +18,32 @@ import threading
 import queue
 import socket
 import csv
+import argparse
+import copy
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+from game_journal import GameJournal
+from roster_index import RosterIndex, shared_roster_index, team_name_for_file
+from playlist_cache import PlaylistCache
+from search_index import SearchIndex
+from soundboard import DEFAULT_CLIP_DIR, DEFAULT_CACHE_MB, Soundboard, simpleaudio_output
+from audio_dsp import TARGET_LUFS, Segue, announcement_cache, prepare_wav, segue_wav
+from input_coalescer import CoalescingWorker
+from stall_watchdog import StallWatchdog, print_summary
+import app_log
+import applescript
+from app_log import get_logger
+from hume_tts import HumeConfig, hume_client, hume_config, hume_enabled, load_hume_sdk  # noqa: F401 - HumeConfig re-exported
+
+log = get_logger('music')
+tts_log = get_logger('tts')
+gui_log = get_logger('gui')
+
+
+DEFAULT_ROSTER_FILE = 'rosters/patriots_roster_2025.csv'
+PRELOAD_WORKERS = 4  # playlists fetched at once by preload_playlists
 
-# Try to import Hume AI SDK
-try:
-    from hume import HumeClient
-    from hume.tts import PostedUtterance, PostedUtteranceVoiceWithName
-    from dotenv import load_dotenv
-    load_dotenv()
-    HUME_AVAILABLE = True
-    HUME_API_KEY = os.getenv('HUME_API_KEY')
-    # Hardcoded custom voice ID
-    HUME_VOICE_ID = "Hockey Goal Announcer"
-except ImportError:
-    HUME_AVAILABLE = False
-    HUME_API_KEY = None
-    HUME_VOICE_ID = None
 
 class AppleMusicController:
     """Interface to control Apple Music via AppleScript"""
@@ -40,224 +51,170 @@ class AppleMusicController:
     @staticmethod
     def run_applescript(script, max_retries=3, retry_delay=0.5, silent_on_error=False):
         """Execute AppleScript with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                result = subprocess.run(
-                    ['osascript', '-e', script],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip(), True
-                else:
-                    error_msg = result.stderr.strip()
-                    
-                    # Check if this is the "no track playing" error (-1728)
-                    # This is a NORMAL state, not an actual error!
-                    if '(-1728)' in error_msg:
-                        # Silently return on first attempt for -1728 errors
-                        return "", False
-                    
-                    # For other errors, print messages unless silent mode
-                    if not silent_on_error:
-                        print(f"⚠️  AppleScript error (attempt {attempt + 1}/{max_retries}): {error_msg}")
-                    
-                    if attempt < max_retries - 1:
-                        time.sleep(retry_delay)
-            except subprocess.TimeoutExpired:
-                if not silent_on_error:
-                    print(f"⏱️  AppleScript timeout (attempt {attempt + 1}/{max_retries})")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-            except Exception as e:
-                if not silent_on_error:
-                    print(f"❌ AppleScript error (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-        
-        if not silent_on_error:
-            print("💥 All retry attempts failed!")
-        return "", False
+        return applescript.run_applescript(script, max_retries, retry_delay, silent_on_error)
     
     def get_playlists(self):
         """Get list of all playlists"""
-        script = '''
-        tell application "Music"
-            get name of every playlist
-        end tell
-        '''
-        output, success = self.run_applescript(script)
+        output, success = self.run_applescript(applescript.PLAYLISTS)
         if success and output:
-            return [p.strip() for p in output.split(',')]
+            return applescript.split_list(output)
         return []
     
     def get_playlist_tracks(self, playlist_name):
         """Get tracks from a specific playlist"""
-        script = f'''
-        tell application "Music"
-            set trackList to {{}}
-            repeat with t in (every track of playlist "{playlist_name}")
-                set end of trackList to (name of t & " | " & artist of t)
-            end repeat
-            set AppleScript's text item delimiters to "|||"
-            return trackList as text
-        end tell
-        '''
-        output, success = self.run_applescript(script)
+        output, success = self.run_applescript(applescript.playlist_tracks(playlist_name))
         if success and output:
-            tracks = output.split('|||')
-            return [t.strip() for t in tracks if t.strip()]
+            return applescript.split_tracks(output)
         return []
     
+    def get_playlist_fingerprint(self, playlist_name):
+        """Cheap change check for a playlist: "<track count>:<hash of track IDs>" (None on failure)
+
+        One Apple Event for the whole ID list, instead of one per track like
+        get_playlist_tracks.
+        """
+        output, success = self.run_applescript(applescript.playlist_fingerprint(playlist_name), silent_on_error=True)
+        if not success:
+            return None
+        return applescript.fingerprint(output)
+
+    def get_library_tracks(self):
+        """Every track in the library as "Name | Artist" - two bulk property reads, not one per track"""
+        output, success = self.run_applescript(applescript.LIBRARY_TRACKS, max_retries=2)
+        if not success or not output:
+            return []
+        return applescript.split_library(output)
+    
+    def warm_up(self):
+        """Start Music if needed and wake its scripting bridge, returns True once it answers"""
+        return self.run_applescript(applescript.WARM_UP, max_retries=2, retry_delay=1.0)[1]
+    
+    def missing_tracks(self, track_names):
+        """The names play_track_by_name would not find (one Apple Event per name, one script)"""
+        if not track_names:
+            return []
+        output, success = self.run_applescript(applescript.missing_tracks(track_names))
+        if not success:
+            return []
+        return [n for n in output.split('|||') if n]
+    
     def play_track_from_playlist(self, playlist_name, track_index):
         """Play a specific track by index from playlist (1-indexed)"""
-        script = f'''
-        tell application "Music"
-            play track {track_index} of playlist "{playlist_name}"
-        end tell
-        '''
-        output, success = self.run_applescript(script)
+        output, success = self.run_applescript(applescript.play_track(playlist_name, track_index))
         if not success:
-            print(f"❌ FAILED: Could not play track {track_index} from '{playlist_name}'")
+            log.error(f"❌ FAILED: Could not play track {track_index} from '{playlist_name}'",
+                      playlist=playlist_name, track=track_index)
         else:
-            print(f"✓ Playing track {track_index} from '{playlist_name}'")
+            log.info(f"✓ Playing track {track_index} from '{playlist_name}'", playlist=playlist_name, track=track_index)
         return success
     
     def play_track_from_playlist_with_start_time(self, playlist_name, track_index, start_time):
         """Play a specific track by index from playlist with custom start time (1-indexed)"""
-        script = f'''
-        tell application "Music"
-            play track {track_index} of playlist "{playlist_name}"
-            delay 0.5
-            set player position to {start_time}
-        end tell
-        '''
-        output, success = self.run_applescript(script)
+        output, success = self.run_applescript(applescript.play_track(playlist_name, track_index, start_time))
         if not success:
-            print(f"❌ FAILED: Could not play track {track_index} from '{playlist_name}'")
+            log.error(f"❌ FAILED: Could not play track {track_index} from '{playlist_name}'",
+                      playlist=playlist_name, track=track_index, start_time=start_time)
         else:
-            print(f"✓ Playing track {track_index} from '{playlist_name}' at {start_time}s")
+            log.info(f"✓ Playing track {track_index} from '{playlist_name}' at {start_time}s",
+                     playlist=playlist_name, track=track_index, start_time=start_time)
         return success
     
     def play_track_by_name(self, track_name):
         """Play a specific track by name"""
-        script = f'''
-        tell application "Music"
-            play track "{track_name}"
-        end tell
-        '''
-        return self.run_applescript(script)[1]
+        return self.run_applescript(applescript.play_track_by_name(track_name))[1]
     
     def play_pause(self):
         """Toggle play/pause"""
-        script = 'tell application "Music" to playpause'
-        return self.run_applescript(script)[1]
+        return self.run_applescript(applescript.PLAY_PAUSE)[1]
     
     def next_track(self):
         """Skip to next track"""
-        script = 'tell application "Music" to next track'
-        return self.run_applescript(script)[1]
+        return self.run_applescript(applescript.NEXT_TRACK)[1]
     
     def previous_track(self):
         """Go to previous track"""
-        script = 'tell application "Music" to previous track'
-        return self.run_applescript(script)[1]
+        return self.run_applescript(applescript.PREVIOUS_TRACK)[1]
     
     def stop(self):
         """Stop playback"""
-        script = 'tell application "Music" to stop'
-        output, success = self.run_applescript(script)
+        output, success = self.run_applescript(applescript.STOP)
         if not success:
-            print("❌ FAILED: Could not stop music")
+            log.error("❌ FAILED: Could not stop music")
         return success
     
     def get_current_track(self):
         """Get currently playing track info"""
-        script = '''
-        tell application "Music"
-            if player state is not stopped then
-                return name of current track & " - " & artist of current track
-            else
-                return "No track playing"
-            end if
-        end tell
-        '''
-        output, success = self.run_applescript(script)
+        output, success = self.run_applescript(applescript.CURRENT_TRACK)
         return output if success else "Unknown"
     
     def get_current_track_name_only(self):
         """Get just the name of the currently playing track"""
-        script = '''
-        tell application "Music"
-            if player state is not stopped then
-                return name of current track
-            else
-                return ""
-            end if
-        end tell
-        '''
-        output, success = self.run_applescript(script)
+        output, success = self.run_applescript(applescript.CURRENT_TRACK_NAME)
         return output if success else ""
     
     def is_playing(self):
         """Check if music is currently playing"""
-        script = '''
-        tell application "Music"
-            if player state is playing then
-                return "playing"
-            else
-                return "not playing"
-            end if
-        end tell
-        '''
-        output, success = self.run_applescript(script)
+        output, success = self.run_applescript(applescript.IS_PLAYING)
         return output == "playing" if success else False
     
     def pause(self):
         """Pause playback"""
-        script = 'tell application "Music" to pause'
-        return self.run_applescript(script)[1]
+        return self.run_applescript(applescript.PAUSE)[1]
     
     def get_track_id_from_playlist(self, playlist_name, track_index):
         """Get the database ID of a track in a playlist"""
-        script = f'''
-        tell application "Music"
-            return database ID of track {track_index} of playlist "{playlist_name}"
-        end tell
-        '''
-        output, success = self.run_applescript(script)
+        output, success = self.run_applescript(applescript.track_id(playlist_name, track_index))
         return output if success else None
     
     def set_current_track_by_id(self, track_id):
         """Set current track by database ID without playing"""
-        script = f'''
-        tell application "Music"
-            set player position to 0
-            set current track to (some track whose database ID is {track_id})
-        end tell
-        '''
-        return self.run_applescript(script)[1]
+        return self.run_applescript(applescript.set_current_track(track_id))[1]
     
     def set_playlist_as_source(self, playlist_name):
         """Set a playlist as the current playback source"""
-        script = f'''
-        tell application "Music"
-            set view of front window to playlist "{playlist_name}"
-        end tell
-        '''
-        return self.run_applescript(script)[1]
+        return self.run_applescript(applescript.show_playlist(playlist_name))[1]
+
+    def get_volume(self):
+        """Get the Music app's sound volume (0-100)"""
+        output, success = self.run_applescript(applescript.GET_VOLUME)
+        return applescript.parse_volume(output) if success else None
+
+    def set_volume(self, volume):
+        """Set the Music app's sound volume (0-100)"""
+        return self.run_applescript(applescript.set_volume(volume))[1]
+
+    def start_fade_out(self, duration, start_volume, steps=20):
+        """Start a fade-out-and-stop as ONE AppleScript call, returns the running process
+
+        The whole ramp runs inside Music so it costs a single osascript launch.
+        The original volume is restored after the stop so the next song plays normally.
+        """
+        return self.spawn_applescript(applescript.fade_out(duration, start_volume, steps))
+
+    @staticmethod
+    def spawn_applescript(script):
+        """Start an AppleScript without waiting for it, returns the process"""
+        return applescript.spawn_applescript(script)
+
+    @staticmethod
+    def play_sound_file(path):
+        """Play a local audio file to completion (afplay, blocking)"""
+        subprocess.run(['afplay', path], check=False)
     
     @staticmethod
+    def spawn_sound_file(path, volume=1.0):
+        """Start playing a local audio file without waiting (afplay), returns the process"""
+        return subprocess.Popen(['afplay', '-v', f"{volume:.3f}", path], stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
     
     @staticmethod
-    def load_roster(roster_file='rosters/patriots_roster_2025.csv'):
+    def load_roster(roster_file=DEFAULT_ROSTER_FILE):
         """Load player roster from CSV file"""
         roster = {}
         roster_path = os.path.expanduser(roster_file)
         
         if not os.path.exists(roster_path):
-            print(f"⚠️  Roster file not found: {roster_path}")
+            log.warning(f"⚠️  Roster file not found: {roster_path}", path=roster_path)
             return roster
         
         try:
@@ -268,25 +225,41 @@ class AppleMusicController:
                         number = row[0].strip()
                         name = row[1].strip()
                         roster[number] = name
-            print(f"✅ Loaded {len(roster)} players from roster")
+            log.info(f"✅ Loaded {len(roster)} players from roster", path=roster_path, players=len(roster))
         except Exception as e:
-            print(f"❌ Error loading roster: {e}")
+            log.error(f"❌ Error loading roster: {e}", path=roster_path)
         
         return roster
 
-    def _hume_tts_worker(announcement, voice_id, api_key, result_queue):
-        """Worker function to run Hume TTS in a separate thread"""
+    def _hume_tts_worker(announcement, voice_id, api_key, result_queue, base_url=None):
+        """Worker function to run Hume TTS in a separate thread
+
+        Puts (status, audio or error, stages) - stages are the ms spent on the
+        DNS check, client construction and synthesize_json.
+        """
+        stages = {}
+        mark = time.perf_counter()
+        
+        def stage(name):
+            nonlocal mark
+            now = time.perf_counter()
+            stages[name] = (now - mark) * 1000
+            mark = now
+        
         try:
             # Quick network check - fail fast if DNS is down
             socket.setdefaulttimeout(2)
             try:
-                socket.getaddrinfo('api.hume.ai', 443)
+                socket.getaddrinfo(urlparse(base_url).hostname if base_url else 'api.hume.ai', 443)
             except socket.error as e:
-                result_queue.put(('error', f'Network unreachable: {e}'))
+                result_queue.put(('error', f'Network unreachable: {e}', stages))
                 return
+            stage('dns_ms')
             
-            print(f"🎤 Starting Hume TTS with custom voice: {voice_id}")
-            client = HumeClient(api_key=api_key)
+            tts_log.info(f"🎤 Starting Hume TTS with custom voice: {voice_id}", voice=voice_id)
+            _, PostedUtterance, PostedUtteranceVoiceWithName = load_hume_sdk()
+            client = hume_client(api_key, base_url)
+            stage('client_ms')
             
             # Use custom voice
             utterance = PostedUtterance(
@@ -299,265 +272,1331 @@ class AppleMusicController:
             
             # Synthesize speech
             result = client.tts.synthesize_json(utterances=[utterance])
+            stage('synthesize_ms')
             
             # Return result to queue
             if result and result.generations and len(result.generations) > 0:
-                result_queue.put(('success', result.generations[0].audio))
+                result_queue.put(('success', result.generations[0].audio, stages))
             else:
-                result_queue.put(('error', 'No audio generated'))
+                result_queue.put(('error', 'No audio generated', stages))
                 
         except Exception as e:
-            result_queue.put(('error', str(e)))
+            result_queue.put(('error', str(e), stages))
 
-    # IMPROVED VERSION WITH BETTER EMOTION
-    # Just copy this entire method and replace your existing one
+    @staticmethod
+    def build_goal_announcement(team, scorer, assist1=None, assist2=None, roster_file=DEFAULT_ROSTER_FILE, players=None):
+        """Announcement text for a goal - excited for home goals, neutral for away
 
+        players is the scoring team's {number: name}; without it home players come from
+        roster_file through the shared roster index (read once, not per goal) and away
+        players are announced by number only.
+        """
+        if players is None:
+            home = team_name_for_file(roster_file)
+            players = shared_roster_index(roster_file).players(home) if team.lower() == "home" else {}
+        return ''.join(AppleMusicController.goal_announcement_fragments(team, scorer, assist1, assist2, players))
+    
     @staticmethod
-    def generate_goal_announcement(team, scorer, assist1=None, assist2=None, voice="Alex", use_hume=True):
-        """Generate and play goal announcement with improved emotion and energy"""
+    def goal_announcement_fragments(team, scorer, assist1=None, assist2=None, players=None):
+        """Goal announcement as phrases - joined they are the text, each can be pre-synthesized on its own"""
+        players = players or {}
+        
+        def assist_text(number):
+            name = players.get(str(number).strip())
+            return f"number {number}, {name}" if name else number
+        
+        player_name = players.get(str(scorer), None)
+        assists = [assist_text(a) for a in [assist1, assist2] if a and a.strip()]
         
-        # Build announcement text with BETTER EMOTION
         if team.lower() == "home":
             # HOME GOALS: Excited and energetic!
-            roster = AppleMusicController.load_roster()
-            player_name = roster.get(str(scorer), None)
-            
+            fragments = ["Patriots GOAL!!"]
             if player_name:
                 # MORE EXCITING: Double exclamation, uppercase GOAL
-                announcement = f"Patriots GOAL!! Scored by number {scorer}, {player_name}!"
+                fragments.append(f" Scored by number {scorer}, {player_name}!")
             else:
-                announcement = f"Patriots GOAL!! Scored by number {scorer}!"
+                fragments.append(f" Scored by number {scorer}!")
             
             # Add assists with energy
-            assists = [a for a in [assist1, assist2] if a and a.strip()]
             if len(assists) == 2:
-                announcement += f" Assisted by {assists[0]} and {assists[1]}!"
+                fragments += [f" Assisted by {assists[0]}", f" and {assists[1]}!"]
             elif len(assists) == 1:
-                announcement += f" Assisted by {assists[0]}!"
+                fragments.append(f" Assisted by {assists[0]}!")
             else:
-                announcement += " Unassisted!"
+                fragments.append(" Unassisted!")
         else:
             # AWAY GOALS: Professional and neutral
-            announcement = f"Goal scored by number {scorer}"
+            if player_name:
+                fragments = [f"Goal scored by number {scorer}, {player_name}"]
+            else:
+                fragments = [f"Goal scored by number {scorer}"]
             
-            assists = [a for a in [assist1, assist2] if a and a.strip()]
             if len(assists) == 2:
-                announcement += f", assisted by {assists[0]} and {assists[1]}."
+                fragments += [f", assisted by {assists[0]}", f" and {assists[1]}."]
             elif len(assists) == 1:
-                announcement += f", assisted by {assists[0]}."
+                fragments.append(f", assisted by {assists[0]}.")
             else:
-                announcement += ", unassisted."
+                fragments.append(", unassisted.")
+        
+        return fragments
+    
+    @staticmethod
+    def build_final_score_announcement(home_score, visiting_team, visiting_score):
+        """Announcement text for the final score"""
+        return ''.join(AppleMusicController.final_score_fragments(home_score, visiting_team, visiting_score))
+    
+    @staticmethod
+    def final_score_fragments(home_score, visiting_team, visiting_score):
+        """Final score announcement as phrases (see goal_announcement_fragments)"""
+        return [f"Final score: Patriots {home_score}", f", {visiting_team}", f" {visiting_score}"]
+    
+    @staticmethod
+    def speak(announcement, use_hume=True, player=None, loudness_target=TARGET_LUFS, trim=True, segue=None):
+        """Synthesize an announcement with Hume.ai and play it, or skip if unavailable
+
+        player(path) plays the audio file (default: afplay). The audio has its leading
+        and trailing silence trimmed (unless trim is False) and is brought to
+        loudness_target (LUFS, None to play it as synthesized); the result is cached,
+        so the same announcement again plays without synthesis. A segue (audio_dsp.Segue,
+        the celebration clip) is mixed onto the end and plays in the same stream. Returns a
+        result dict: engine ('hume' or 'none'), ok, error, cached, segued, synth_ms,
+        gain_db, lead_trimmed_ms, trail_trimmed_ms, total_ms, and stages: ms per step of the
+        pipeline (dns_ms, client_ms, synthesize_ms, decode_ms, prepare_ms, write_ms, play_ms),
+        logged with "Announcement finished" at DEBUG - bench_tts.py reports them.
+        """
+        started = time.perf_counter()
+        result = {'engine': 'none', 'ok': False, 'error': None, 'cached': False, 'segued': False, 'synth_ms': None,
+                  'gain_db': None, 'lead_trimmed_ms': None, 'trail_trimmed_ms': None, 'total_ms': None,
+                  'stages': {}}
+        stages = result['stages']
         
         # Try Hume.ai if available and enabled
-        if use_hume and HUME_AVAILABLE and HUME_API_KEY and HUME_VOICE_ID:
+        hume = hume_config()
+        cache_key = (hume.voice_id, announcement, loudness_target, trim)
+        cached = announcement_cache.get(cache_key) if use_hume else None
+        if cached:
+            result.update(cached[1], engine='hume', cached=True)
+            result['segued'] = AppleMusicController._play_announcement(cached[0], player, segue, stages)
+            tts_log.info("✓ Hume TTS (cached)")
+            result['ok'] = True
+        elif use_hume and hume.available and hume.api_key and hume.voice_id:
+            result['engine'] = 'hume'
             result_queue = queue.Queue()
             
             # Start worker thread
             thread = threading.Thread(
                 target=AppleMusicController._hume_tts_worker,
-                args=(announcement, HUME_VOICE_ID, HUME_API_KEY, result_queue),
+                args=(announcement, hume.voice_id, hume.api_key, result_queue, hume.base_url),
                 daemon=True
             )
             thread.start()
             
             # Wait for result with timeout
             thread.join(timeout=5.0)
+            result['synth_ms'] = (time.perf_counter() - started) * 1000
             
             # Check if thread finished
             if thread.is_alive():
-                print("❌ Hume TTS timed out after 5 seconds - skipping announcement")
-                return announcement
-            
-            # Get result from queue
-            try:
-                status, data = result_queue.get_nowait()
-                
-                if status == 'success':
-                    # Decode base64 audio and play it
-                    audio_bytes = base64.b64decode(data)
-                    
-                    # Write to temporary file and play
-                    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-                        temp_audio.write(audio_bytes)
-                        temp_audio_path = temp_audio.name
-                    
-                    # Play audio using afplay (macOS)
-                    subprocess.run(['afplay', temp_audio_path])
-                    
-                    # Clean up temp file
-                    try:
-                        os.unlink(temp_audio_path)
-                    except:
-                        pass
-                    
-                    print("✓ Hume TTS successful!")
-                    return announcement
-                else:
-                    print(f"❌ Hume TTS error: {data}")
-                    print("⏭️  Skipping announcement")
-                    return announcement
+                tts_log.error("❌ Hume TTS timed out after 5 seconds - skipping announcement", error='timeout')
+                result['error'] = 'timeout'
+            else:
+                # Get result from queue
+                try:
+                    status, data, worker_stages = result_queue.get_nowait()
+                    stages.update(worker_stages)
                     
-            except queue.Empty:
-                print("❌ Hume TTS failed - no result returned")
-                print("⏭️  Skipping announcement")
-                return announcement
+                    if status == 'success':
+                        # Decode base64 audio, cut the silence around it, level it with the music and clips
+                        mark = time.perf_counter()
+                        audio_bytes = base64.b64decode(data)
+                        stages['decode_ms'] = (time.perf_counter() - mark) * 1000
+                        mark = time.perf_counter()
+                        audio_bytes, info = prepare_wav(audio_bytes, loudness_target, trim)
+                        stages['prepare_ms'] = (time.perf_counter() - mark) * 1000
+                        result.update(info)
+                        announcement_cache.put(cache_key, audio_bytes, info)
+                        result['segued'] = AppleMusicController._play_announcement(audio_bytes, player, segue, stages)
+                        tts_log.info("✓ Hume TTS successful!", lead_trimmed_ms=info.get('lead_trimmed_ms'),
+                                     trail_trimmed_ms=info.get('trail_trimmed_ms'))
+                        result['ok'] = True
+                    else:
+                        tts_log.error(f"❌ Hume TTS error: {data} - skipping announcement", error=str(data))
+                        result['error'] = str(data)
+                        
+                except queue.Empty:
+                    tts_log.error("❌ Hume TTS failed - no result returned - skipping announcement",
+                                  error='no result returned')
+                    result['error'] = 'no result returned'
         else:
-            if not HUME_AVAILABLE:
-                print("ℹ️  Hume SDK not available - skipping announcement")
-            elif not HUME_API_KEY:
-                print("ℹ️  Hume API key not configured - skipping announcement")
-            elif not HUME_VOICE_ID:
-                print("ℹ️  Hume voice ID not configured - skipping announcement")
+            if not hume.available:
+                tts_log.info("ℹ️  Hume SDK not available - skipping announcement")
+            elif not hume.api_key:
+                tts_log.info("ℹ️  Hume API key not configured - skipping announcement")
+            elif not hume.voice_id:
+                tts_log.info("ℹ️  Hume voice ID not configured - skipping announcement")
             else:
-                print("ℹ️  Hume TTS disabled - skipping announcement")
+                tts_log.info("ℹ️  Hume TTS disabled - skipping announcement")
         
-        return announcement
+        result['total_ms'] = (time.perf_counter() - started) * 1000
+        tts_log.debug("Announcement finished", **result)
+        return result
+    
+    @staticmethod
+    def _play_announcement(audio_bytes, player=None, segue=None, stages=None):
+        """Write WAV bytes (plus a segue) to a temporary file and play it, True if the segue went in
 
+        Plays with afplay (macOS) unless the backend has its own player. The ms spent
+        mixing, writing and playing go into stages (segue_ms, write_ms, play_ms).
+        """
+        stages = {} if stages is None else stages
+        mark = time.perf_counter()
+        audio_bytes, segued = segue_wav(audio_bytes, segue)
+        if segue is not None:
+            stages['segue_ms'] = (time.perf_counter() - mark) * 1000
+        mark = time.perf_counter()
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
+            temp_audio.write(audio_bytes)
+            temp_audio_path = temp_audio.name
+        stages['write_ms'] = (time.perf_counter() - mark) * 1000
+        mark = time.perf_counter()
+        try:
+            (player or AppleMusicController.play_sound_file)(temp_audio_path)
+            stages['play_ms'] = (time.perf_counter() - mark) * 1000
+        finally:
+            try:
+                os.unlink(temp_audio_path)
+            except OSError:
+                pass
+        return segued
+    
+    @staticmethod
+    def generate_goal_announcement(team, scorer, assist1=None, assist2=None, voice="Alex", use_hume=True,
+                                   player=None):
+        """Generate and play goal announcement with improved emotion and energy"""
+        announcement = AppleMusicController.build_goal_announcement(team, scorer, assist1, assist2)
+        AppleMusicController.speak(announcement, use_hume, player)
+        return announcement
+    
     @staticmethod
-    def generate_final_score_announcement(home_score, visiting_team, visiting_score, voice="Alex", use_hume=True):
+    def generate_final_score_announcement(home_score, visiting_team, visiting_score, voice="Alex", use_hume=True,
+                                          player=None):
         """Generate and play final score announcement using Hume.ai or skip if unavailable"""
-        # Build announcement text
-        announcement = f"Final score: Patriots {home_score}, {visiting_team} {visiting_score}"
+        announcement = AppleMusicController.build_final_score_announcement(home_score, visiting_team, visiting_score)
+        AppleMusicController.speak(announcement, use_hume, player)
+        return announcement
+
+
+class RemoteMusicController(AppleMusicController):
+    """Music on another Mac, driven over remote Apple Events
+
+    machine is an eppc URL such as "eppc://rink2.local" - enable Remote Apple Events
+    on that Mac (System Settings > General > Sharing). Announcements and sound
+    clips still play on this machine's audio output.
+    """
+
+    def __init__(self, machine):
+        self.machine = machine
+        self._target = f'application "Music" of machine "{machine}"'
+
+    def _remote(self, script):
+        return script.replace('application "Music"', self._target)
+
+    def run_applescript(self, script, max_retries=3, retry_delay=0.5, silent_on_error=False):
+        return AppleMusicController.run_applescript(self._remote(script), max_retries, retry_delay, silent_on_error)
+
+    def spawn_applescript(self, script):
+        return AppleMusicController.spawn_applescript(self._remote(script))
+
+
+class PlaybackScheduler:
+    """Timed auto-stop / fade-out for the current song
+
+    Runs one timer thread that sleeps on a monotonic deadline, so end points fire
+    within a few milliseconds without any extra polling of the Music app. Only one
+    stop is ever pending: scheduling a new one (or cancelling) replaces the old one.
+    clock is the monotonic time source (tests pass a fake one).
+    """
+
+    def __init__(self, controller, on_stop=None, clock=time.monotonic):
+        self.controller = controller
+        self.on_stop = on_stop      # on_stop(label, fade_seconds) after an auto-stop
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._deadline = None       # monotonic time the action should fire
+        self._remaining = None      # seconds left while paused
+        self._fade = 0
+        self._label = ''
+        self._fade_process = None
+        self._fade_volume = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def schedule(self, play_seconds, fade_seconds=0, label=''):
+        """Stop playback play_seconds from now, fading over the last fade_seconds"""
+        self.cancel()
+        fade_seconds = max(0, min(fade_seconds, play_seconds))
+        with self._cond:
+            self._generation += 1
+            self._deadline = self._clock() + play_seconds - fade_seconds
+            self._fade = fade_seconds
+            self._label = label
+            self._cond.notify()
+        log.info(f"⏲️  Auto-stop in {play_seconds:.1f}s{f' (fade {fade_seconds}s)' if fade_seconds else ''}: {label}",
+                 seconds=play_seconds, fade=fade_seconds, track=label)
+
+    def cancel(self):
+        """Drop any pending stop and abort a fade that is already running"""
+        with self._cond:
+            self._generation += 1
+            self._deadline = None
+            self._remaining = None
+            process, volume = self._fade_process, self._fade_volume
+            self._fade_process = None
+            self._fade_volume = None
+            self._cond.notify()
+        if process and process.poll() is None:
+            # Operator took over mid-fade - kill the ramp and put the volume back
+            process.kill()
+            process.wait()
+            if volume is not None:
+                self.controller.set_volume(volume)
+
+    def pause(self):
+        """Freeze the countdown (music was paused)"""
+        with self._cond:
+            if self._deadline is not None:
+                self._remaining = max(0, self._deadline - self._clock())
+                self._deadline = None
+                self._cond.notify()
+
+    def resume(self):
+        """Continue a countdown frozen by pause()"""
+        with self._cond:
+            if self._remaining is not None:
+                self._deadline = self._clock() + self._remaining
+                self._remaining = None
+                self._cond.notify()
+
+    def is_pending(self):
+        """True if a stop is scheduled or paused"""
+        with self._cond:
+            return self._deadline is not None or self._remaining is not None
+
+    def _run(self):
+        """Timer thread - waits for the deadline, then fires the stop"""
+        while True:
+            with self._cond:
+                while self._deadline is None:
+                    self._cond.wait()
+                delay = self._deadline - self._clock()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                generation = self._generation
+                fade = self._fade
+                label = self._label
+                self._deadline = None
+            try:
+                self._fire(generation, fade, label)
+            except Exception as e:
+                log.exception(f"❌ Auto-stop failed: {e}")
+
+    def _fire(self, generation, fade, label):
+        """Stop or fade out, unless cancelled in the meantime"""
+        if not fade:
+            with self._cond:
+                if generation != self._generation:
+                    return
+            log.info(f"⏹️  Auto-stop: {label}", track=label)
+            self.controller.stop()
+            if self.on_stop:
+                self.on_stop(label, 0)
+            return
+
+        volume = self.controller.get_volume()
+        if volume is None:
+            volume = 100
+        with self._cond:
+            if generation != self._generation:
+                return
+            process = self.controller.start_fade_out(fade, volume)
+            self._fade_process = process
+            self._fade_volume = volume
+        log.info(f"🔉 Fading out over {fade}s: {label}", fade=fade, track=label)
+        process.wait()
+        with self._cond:
+            completed = self._fade_process is process
+            if completed:
+                self._fade_process = None
+                self._fade_volume = None
+        if completed and self.on_stop:
+            self.on_stop(label, fade)
+
+
+class HockeyController:
+    """Game controller core - config, stoppage playlist state and every operator action
+
+    Has no Tk dependency so it can run headless (see command_server.py). Delayed
+    backend calls go through call_later(delay_ms, callback); the GUI passes root.after.
+    """
+    
+    # Event song config key -> (display name, status line prefix)
+    CUES = {
+        'goal_song': ('Goal', '🎉 GOAL! Playing:'),
+        'zamboni': ('Zamboni', '🧊 Zamboni:'),
+        'zamboni_2nd': ('2nd Zamboni', '🧊 2nd Zamboni:'),
+        'game_start': ('Game Start', '🏒 Game Start:'),
+        'intermission_1st': ('1st Intermission', '⏸️ 1st Intermission:'),
+        'intermission_2nd': ('2nd Intermission', '⏸️ 2nd Intermission:'),
+        'end_of_game': ('End of Game', '🏁 End of Game:'),
+        'power_play': ('Power Play', '⚡ Power Play:'),
+        'penalty_kill': ('Penalty Kill', '🛡️ Penalty Kill:'),
+    }
+    
+    def __init__(self, controller=None, config_file="~/hockey_music_config.json", call_later=None, journal=None,
+                 playlist_cache=None):
+        self.controller = controller or AppleMusicController()
+        self.journal = journal  # GameJournal, or None to not record events
+        self.playlist_cache = playlist_cache  # PlaylistCache, or None to always fetch
+        self.config_file = os.path.expanduser(config_file)
+        self.config = self.load_config()
+        self.call_later = call_later or self._timer_call_later
+        self.command_generation = 0  # bumped by every playback command, see _new_command
         
-        # Try Hume.ai if available and enabled
-        if use_hume and HUME_AVAILABLE and HUME_API_KEY and HUME_VOICE_ID:
-            result_queue = queue.Queue()
-            
-            # Start worker thread
-            thread = threading.Thread(
-                target=AppleMusicController._hume_tts_worker,
-                args=(announcement, HUME_VOICE_ID, HUME_API_KEY, result_queue),
-                daemon=True
-            )
-            thread.start()
-            
-            # Wait for result with timeout
-            thread.join(timeout=5.0)
-            
-            # Check if thread finished
-            if thread.is_alive():
-                print("❌ Hume TTS timed out after 5 seconds - skipping announcement")
-                return announcement
-            
-            # Get result from queue
+        self.playlist_name = self.config.get('playlist', '')
+        self.playlist_tracks = []
+        self.shuffled_order = []
+        self.current_track_index = 0
+        # Every other loaded playlist, ready for switch_playlist:
+        # name -> {'tracks': [...], 'order': [...], 'index': position}
+        self.loaded_playlists = {}
+        self.library_loaded = threading.Event()  # set once warm_up's background loads are done
+        self.start_times = self.config.get('start_times', {})  # Load saved start times
+        self.end_times = self.config.get('end_times', {})  # Per-track auto-stop points
+        self.max_durations = self.config.get('max_durations', {})  # Per-cue max play time (seconds)
+        self.fade_seconds = self.config.get('fade_seconds', 3)
+        self.roster_file = self.config.get('roster_file', DEFAULT_ROSTER_FILE)
+        self.rosters = RosterIndex(os.path.dirname(self.roster_file) or '.')  # loaded on first use
+        self.home_team = team_name_for_file(self.roster_file)
+        self.away_team = self.config.get('away_team', '')
+        self.announcement_pack = self.load_announcement_pack()
+        self._phrase_cache = None  # see phrase_cache()
+        self.readiness = {'state': 'cold', 'detail': 'Music not contacted yet'}  # see warm_up
+        # Type-ahead search over the library, filled by index_library() (see search_index.py)
+        self.search_indexes = {'track': SearchIndex(), 'playlist': SearchIndex()}
+        # Sound clips on hotkeys, decoded by load_library (see soundboard.py). 'soundboard_output'
+        # "process" starts a player per clip even when simpleaudio could play them from memory
+        in_memory = self.config.get('soundboard_output', 'memory') == 'memory'
+        self.loudness_target = self.config.get('loudness_target', TARGET_LUFS)  # None: no normalization
+        self.soundboard = Soundboard(
+            self.config.get('soundboard_dir', DEFAULT_CLIP_DIR),
+            keys=self.config.get('soundboard_keys'),
+            cache_mb=self.config.get('soundboard_cache_mb', DEFAULT_CACHE_MB),
+            output=simpleaudio_output() if in_memory else None,
+            spawn=self.controller.spawn_sound_file,
+            loudness_target=self.loudness_target
+        )
+        # The celebration mixed onto the end of home goal announcements (celebration_segue), and
+        # the last announcement assembled ahead by prepare_goal: ((fragments, celebrate), (wav, segued))
+        self._celebration = None
+        self._prepared = None
+        self._prepare_lock = threading.Lock()
+        self.soundboard.add_listener(self._forget_celebration)
+        self.scheduler = PlaybackScheduler(
+            self.controller,
+            on_stop=lambda label, fade: self.record('track_stopped', reason='auto', track=label, fade=fade)
+        )
+    
+    @staticmethod
+    def _timer_call_later(delay_ms, callback):
+        """Default call_later when there is no Tk loop"""
+        timer = threading.Timer(delay_ms / 1000, callback)
+        timer.daemon = True
+        timer.start()
+        return timer
+    
+    def _new_command(self):
+        """Start a playback command - delayed backend calls of earlier commands become no-ops"""
+        self.command_generation += 1
+        return self.command_generation
+    
+    def _call_later_if_current(self, generation, delay_ms, callback):
+        """call_later that is skipped if another playback command ran in the meantime"""
+        def run():
+            if generation == self.command_generation:
+                callback()
+        self.call_later(delay_ms, run)
+    
+    def load_config(self):
+        """Load configuration from file"""
+        if os.path.exists(self.config_file):
             try:
-                status, data = result_queue.get_nowait()
-                
-                if status == 'success':
-                    # Decode base64 audio and play it
-                    audio_bytes = base64.b64decode(data)
-                    
-                    # Write to temporary file and play
-                    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-                        temp_audio.write(audio_bytes)
-                        temp_audio_path = temp_audio.name
-                    
-                    # Play audio using afplay (macOS)
-                    subprocess.run(['afplay', temp_audio_path])
-                    
-                    # Clean up temp file
-                    try:
-                        os.unlink(temp_audio_path)
-                    except:
-                        pass
-                    
-                    print("✓ Hume TTS successful!")
-                    return announcement
-                else:
-                    print(f"❌ Hume TTS error: {data}")
-                    print("⏭️  Skipping announcement")
-                    return announcement
-                    
-            except queue.Empty:
-                print("❌ Hume TTS failed - no result returned")
-                print("⏭️  Skipping announcement")
-                return announcement
+                with open(self.config_file, 'r') as f:
+                    return json.load(f)
+            except:
+                pass
+        return {cue: '' for cue in self.CUES}
+    
+    def save_config(self):
+        """Save configuration to file"""
+        self.config['playlist'] = self.playlist_name
+        self.config['start_times'] = self.start_times  # Save custom start times
+        self.config['end_times'] = self.end_times
+        self.config['max_durations'] = self.max_durations
+        self.config['fade_seconds'] = self.fade_seconds
+        self.config['away_team'] = self.away_team
+        try:
+            with open(self.config_file, 'w') as f:
+                json.dump(self.config, f, indent=2)
+        except Exception as e:
+            log.error(f"Error saving config: {e}", path=self.config_file)
+    
+    def record(self, event, **fields):
+        """Add an event to the game journal (buffered - never blocks)"""
+        if self.journal:
+            self.journal.record(event, **fields)
+    
+    def new_game(self, label=''):
+        """Start a new game journal file (and game log), returns its path"""
+        app_log.new_game(label)
+        if self.journal:
+            return self.journal.new_game(label)
+        return None
+    
+    def warm_up(self):
+        """Wake the music backend before the first operator action, returns the readiness dict
+
+        Launches Music if needed, runs a trivial query, touches the configured playlist,
+        checks every cue song can be found, and loads the rosters and the Hume SDK. Run
+        it on the playback worker at startup so a press made meanwhile waits for a warm
+        backend rather than racing a cold one. readiness['state'] is 'ready', 'degraded'
+        (Music answers but a playlist or song is missing) or 'offline'. Once Music
+        answers, the segment playlists are preloaded and the library search index is
+        built on a background thread (see load_library).
+        """
+        started = time.perf_counter()
+        self.readiness = {'state': 'warming', 'detail': 'Waking Music…'}
+        try:
+            answered, error = self.controller.warm_up(), None
+        except Exception as e:
+            # e.g. osascript missing or the mpv process failing to start - offline, not stuck 'warming'
+            answered, error = False, e
+        if not answered:
+            detail = f"Music is not responding ({error})" if error else 'Music is not responding'
+            self.readiness = {'state': 'offline', 'detail': detail,
+                              'warm_ms': round((time.perf_counter() - started) * 1000)}
+            self.record('warm_up', **self.readiness)
+            log.error(f"❌ Music did not answer during warm-up{f': {error}' if error else ''}")
+            return self.readiness
+        threading.Thread(target=self.load_library, name='load-library', daemon=True).start()
+        
+        problems = []
+        if self.playlist_name and self.controller.get_playlist_fingerprint(self.playlist_name) is None:
+            problems.append(f"playlist '{self.playlist_name}' not found")
+        songs = {cue: self.cue_song(cue) for cue in self.CUES if self.cue_song(cue)}
+        missing = set(self.controller.missing_tracks(sorted(set(songs.values()))))
+        problems += [f"{self.CUES[cue][0]} song '{song}' not found" for cue, song in songs.items() if song in missing]
+        
+        # Build the roster index and import the Hume SDK so the first announcement pays for neither
+        self.rosters.refresh()
+        if hume_enabled():
+            try:
+                load_hume_sdk()
+            except Exception as e:
+                tts_log.warning(f"⚠️  Could not preload Hume SDK: {e}")
+        
+        warm_ms = round((time.perf_counter() - started) * 1000)
+        if problems:
+            self.readiness = {'state': 'degraded', 'detail': '; '.join(problems), 'warm_ms': warm_ms}
+            log.warning(f"⚠️  Music ready in {warm_ms} ms, but: {self.readiness['detail']}", warm_ms=warm_ms)
         else:
-            if not HUME_AVAILABLE:
-                print("ℹ️  Hume SDK not available - skipping announcement")
-            elif not HUME_API_KEY:
-                print("ℹ️  Hume API key not configured - skipping announcement")
-            elif not HUME_VOICE_ID:
-                print("ℹ️  Hume voice ID not configured - skipping announcement")
+            self.readiness = {'state': 'ready', 'detail': f"Music ready ({warm_ms / 1000:.1f}s)", 'warm_ms': warm_ms}
+            log.info(f"✅ Music ready in {warm_ms} ms", warm_ms=warm_ms)
+        self.record('warm_up', **self.readiness)
+        return self.readiness
+    
+    def load_library(self):
+        """Preload the segment playlists, index the library and decode the sound clips (background thread)"""
+        try:
+            self.preload_playlists()
+            self.index_library()
+            self.soundboard.preload()
+            self.soundboard.watch()
+        except Exception as e:
+            log.exception(f"❌ Background library load failed: {e}")
+        finally:
+            self.library_loaded.set()
+    
+    def index_library(self):
+        """Bulk-export the library into the search indexes, returns (tracks, playlists) indexed
+
+        Slow for a big library (one long query), so never run it on the playback worker.
+        Run again to pick up library changes - only new and deleted entries are touched.
+        """
+        started = time.perf_counter()
+        tracks = self.controller.get_library_tracks()
+        playlists = self.controller.get_playlists()
+        if tracks:
+            self.search_indexes['track'].sync(tracks)
+        if playlists:
+            self.search_indexes['playlist'].sync(playlists)
+        index_ms = round((time.perf_counter() - started) * 1000)
+        log.info(f"🔎 Indexed {len(tracks)} tracks and {len(playlists)} playlists in {index_ms} ms",
+                 tracks=len(tracks), playlists=len(playlists), index_ms=index_ms)
+        return len(tracks), len(playlists)
+    
+    def search(self, query, kind='track', limit=20):
+        """Fuzzy type-ahead: best matching "Name | Artist" tracks (or playlist names) for a query"""
+        if kind not in self.search_indexes:
+            raise ValueError(f"Unknown search kind: {kind}")
+        return self.search_indexes[kind].search(query, limit)
+    
+    def cue_song(self, cue):
+        """Configured song name for an event cue ('' if unset)"""
+        return self.config.get(cue, '')
+    
+    def play_cue(self, cue):
+        """Play an event song and arm its max-duration auto-stop
+
+        Raises ValueError if the cue is unknown or not configured, returns False
+        if Music could not play it.
+        """
+        if cue not in self.CUES:
+            raise ValueError(f"Unknown cue: {cue}")
+        song = self.cue_song(cue)
+        if not song:
+            raise ValueError(f"Please configure {self.CUES[cue][0]} song first!")
+        
+        self._new_command()
+        self.scheduler.cancel()
+        success = self.controller.play_track_by_name(song)
+        self.record('cue', cue=cue, song=song, ok=success)
+        if not success:
+            return False
+        max_seconds = self.max_durations.get(cue)
+        if max_seconds:
+            self.scheduler.schedule(max_seconds, self.fade_seconds, song)
+        return True
+    
+    def track_at(self, list_idx):
+        """Track info ("name | artist") at a position of the shuffled order"""
+        return self.playlist_tracks[self.shuffled_order[list_idx]]
+    
+    def _check_position(self, index, name='index'):
+        """index as an int - ValueError unless it is a position in the shuffled order"""
+        index = int(index)
+        if not 0 <= index < len(self.shuffled_order):
+            raise ValueError(f"{name} {index} is out of range (the playlist has {len(self.shuffled_order)} tracks)")
+        return index
+    
+    def set_position(self, index):
+        """Make the track at index of the shuffled order the next one to play"""
+        self.current_track_index = self._check_position(index)
+    
+    def play_track_at(self, list_idx):
+        """Play the track at list_idx of the shuffled order, applying its start/end times"""
+        if not self.shuffled_order or not self.playlist_name:
+            raise ValueError("Please load a playlist first!")
+        list_idx = self._check_position(list_idx)
+        self._new_command()
+        self.current_track_index = list_idx
+        actual_track_idx = self.shuffled_order[list_idx] + 1  # 1-indexed
+        track_info = self.track_at(list_idx)
+        
+        self.scheduler.cancel()
+        if track_info in self.start_times:
+            start_time = self.start_times[track_info]
+            success = self.controller.play_track_from_playlist_with_start_time(self.playlist_name, actual_track_idx, start_time)
+        else:
+            success = self.controller.play_track_from_playlist(self.playlist_name, actual_track_idx)
+        self.record('track_started', playlist=self.playlist_name, index=list_idx, track=track_info,
+                    start_time=self.start_times.get(track_info, 0), ok=success)
+        
+        if success:
+            self._schedule_track_stop(track_info)
+        return success
+    
+    def _schedule_track_stop(self, track_info):
+        """Arm the auto-stop for a stoppage track from its end time and the stoppage max"""
+        start_time = self.start_times.get(track_info, 0)
+        limits = []
+        end_time = self.end_times.get(track_info)
+        if end_time and end_time > start_time:
+            limits.append(end_time - start_time)
+        if self.max_durations.get('stoppage'):
+            limits.append(self.max_durations['stoppage'])
+        if limits:
+            self.scheduler.schedule(min(limits), self.fade_seconds, track_info)
+    
+    def play_pause(self):
+        """Toggle play/pause - if stopped, play current playlist track"""
+        self._new_command()
+        # Check current state
+        is_currently_playing = self.controller.is_playing()
+        
+        if is_currently_playing:
+            # Just pause - and hold any auto-stop countdown
+            self.controller.play_pause()
+            self.scheduler.pause()
+            self.record('paused')
+        else:
+            # Check if we're stopped vs paused
+            current_track = self.controller.get_current_track()
+            
+            if current_track == "No track playing" and self.shuffled_order and self.playlist_name:
+                # Completely stopped - restart from current playlist position
+                self.play_track_at(self.current_track_index)
             else:
-                print("ℹ️  Hume TTS disabled - skipping announcement")
+                # Just paused or has a track - resume
+                self.controller.play_pause()
+                self.scheduler.resume()
+                self.record('resumed')
+    
+    def stop(self):
+        """Stop playback"""
+        self._new_command()
+        self.scheduler.cancel()
+        success = self.controller.stop()
+        self.record('track_stopped', reason='manual', ok=success)
+        return success
+    
+    def next_track(self, count=1):
+        """Move count tracks ahead in the playlist - stops music and queues that song"""
+        if not self.shuffled_order or not self.playlist_name:
+            raise ValueError("Please load a playlist first to use Next!")
+        
+        generation = self._new_command()
+        # Stop playback immediately
+        self.scheduler.cancel()
+        self.controller.stop()
         
+        # Move to next track in our shuffled order
+        self.current_track_index = (self.current_track_index + count) % len(self.shuffled_order)
+        
+        # Get the next track info
+        playlist_name = self.playlist_name
+        actual_track_idx = self.shuffled_order[self.current_track_index] + 1  # 1-indexed
+        
+        # Get track info for start time lookup
+        track_info = self.track_at(self.current_track_index)
+        self.record('next', index=self.current_track_index, track=track_info, count=count)
+        
+        # Queue the track by playing and immediately stopping
+        # Use a delayed call to ensure stop comes after play starts. Every delayed call is
+        # dropped if a newer command (play, cue, stop, next) ran first - a late stop would
+        # otherwise silence the song that command started.
+        def queue_next_track():
+            # Check if this track has a custom start time
+            if track_info in self.start_times:
+                start_time = self.start_times[track_info]
+                self.controller.play_track_from_playlist_with_start_time(playlist_name, actual_track_idx, start_time)
+            else:
+                self.controller.play_track_from_playlist(playlist_name, actual_track_idx)
+            # Stop it immediately - multiple times to be sure
+            for delay_ms in (5, 20, 50):
+                self._call_later_if_current(generation, delay_ms, self.controller.stop)
+        
+        # Small delay before queuing to ensure stop command completed
+        self._call_later_if_current(generation, 100, queue_next_track)
+        return track_info
+    
+    def play_from_top(self):
+        """Play the first track in the current order"""
+        return self.play_track_at(0)
+    
+    def load_playlist(self, playlist_name, on_update=None):
+        """Load tracks from a playlist, returns the number of tracks (0 on failure)
+
+        With a playlist cache, a cached snapshot loads instantly and is revalidated
+        on a background thread. If the playlist changed, on_update(name, tracks) is
+        called from that thread; by default the new tracks are applied via call_later.
+        """
+        cached = self.playlist_cache.get(playlist_name) if self.playlist_cache else None
+        if not cached:
+            return self.set_playlist_tracks(playlist_name, self.fetch_playlist_tracks(playlist_name))
+        
+        track_count = self.set_playlist_tracks(playlist_name, cached['tracks'])
+        if on_update is None:
+            on_update = lambda name, tracks: self.call_later(0, lambda: self.apply_revalidated_playlist(name, tracks))
+        
+        def revalidate():
+            tracks = self.revalidate_playlist(playlist_name, cached['fingerprint'])
+            if tracks:
+                on_update(playlist_name, tracks)
+        
+        threading.Thread(target=revalidate, daemon=True).start()
+        return track_count
+    
+    def fetch_playlist_tracks(self, playlist_name):
+        """Fetch a playlist's tracks from Music (and refresh its cached snapshot)"""
+        fingerprint = self.controller.get_playlist_fingerprint(playlist_name) if self.playlist_cache else None
+        tracks = self.controller.get_playlist_tracks(playlist_name)
+        if self.playlist_cache and tracks and fingerprint:
+            self.playlist_cache.put(playlist_name, fingerprint, tracks)
+        return tracks
+    
+    def revalidate_playlist(self, playlist_name, fingerprint):
+        """Re-fetch a cached playlist only if its fingerprint changed, returns the new tracks or None"""
+        current = self.controller.get_playlist_fingerprint(playlist_name)
+        if current is None or current == fingerprint:
+            if current:
+                log.info(f"✓ Cached playlist '{playlist_name}' is up to date", playlist=playlist_name)
+            return None
+        log.info(f"🔄 Playlist '{playlist_name}' changed - refreshing", playlist=playlist_name)
+        tracks = self.controller.get_playlist_tracks(playlist_name)
+        if not tracks:
+            return None
+        self.playlist_cache.put(playlist_name, current, tracks)
+        return tracks
+    
+    def apply_revalidated_playlist(self, playlist_name, tracks):
+        """Swap in a changed playlist, keeping the operator's order and position
+
+        Returns False if a different playlist has been loaded meanwhile.
+        """
+        if playlist_name != self.playlist_name or tracks == self.playlist_tracks:
+            return False
+        old_order = [self.playlist_tracks[i] for i in self.shuffled_order]
+        current = old_order[self.current_track_index] if self.current_track_index < len(old_order) else None
+        positions = {}
+        for i, track in enumerate(tracks):
+            positions.setdefault(track, i)
+        
+        # Surviving tracks keep their place, new ones go at the end
+        order = list(dict.fromkeys(positions[t] for t in old_order if t in positions))
+        kept = set(order)
+        order += [i for i in range(len(tracks)) if i not in kept]
+        
+        self.playlist_tracks = tracks
+        self.shuffled_order = order
+        self.search_indexes['track'].update(tracks)
+        if current in positions:
+            self.current_track_index = order.index(positions[current])
+        else:
+            self.current_track_index = min(self.current_track_index, len(order) - 1)
+        self.record('playlist_loaded', playlist=playlist_name, tracks=len(tracks), revalidated=True)
+        return True
+    
+    def set_playlist_tracks(self, playlist_name, tracks):
+        """Make already-fetched tracks the stoppage playlist, returns the number of tracks
+
+        The playlist it replaces stays loaded, so switch_playlist can go back to it.
+        """
+        if tracks:
+            if playlist_name != self.playlist_name:
+                self._stash_active_playlist()
+            self.loaded_playlists.pop(playlist_name, None)
+            self.playlist_name = playlist_name
+            self.playlist_tracks = tracks
+            self.shuffled_order = list(range(len(tracks)))
+            self.current_track_index = 0
+            self.search_indexes['track'].update(tracks)  # searchable even before the library export
+            self.save_config()
+        self.record('playlist_loaded', playlist=playlist_name, tracks=len(tracks))
+        return len(tracks)
+    
+    def _stash_active_playlist(self):
+        """Keep the active playlist, its order and position among the loaded playlists"""
+        if self.playlist_name and self.playlist_tracks:
+            self.loaded_playlists[self.playlist_name] = {
+                'tracks': self.playlist_tracks, 'order': self.shuffled_order, 'index': self.current_track_index
+            }
+    
+    def _fetch_for_preload(self, playlist_name):
+        """A playlist's tracks - a cached snapshot only costs its fingerprint check"""
+        cached = self.playlist_cache.get(playlist_name) if self.playlist_cache else None
+        if cached:
+            return self.revalidate_playlist(playlist_name, cached['fingerprint']) or cached['tracks']
+        return self.fetch_playlist_tracks(playlist_name)
+    
+    def preload_playlists(self, playlist_names=None, workers=PRELOAD_WORKERS):
+        """Fetch several playlists at once and keep them in memory for switch_playlist
+
+        Defaults to the config's "segment_playlists" (warm-ups, periods, intermissions...).
+        At most `workers` fetches run at a time. Playlists already loaded keep their
+        order and position. Returns {playlist name: track count} for the ones fetched.
+        """
+        if playlist_names is None:
+            playlist_names = self.config.get('segment_playlists', [])
+        names = [name for name in dict.fromkeys(playlist_names)
+                 if name and name != self.playlist_name and name not in self.loaded_playlists]
+        if not names:
+            return {}
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='preload') as pool:
+            fetched = dict(zip(names, pool.map(self._fetch_for_preload, names)))
+        for name, tracks in fetched.items():
+            if tracks and name != self.playlist_name:
+                self.loaded_playlists.setdefault(name, {'tracks': tracks, 'order': list(range(len(tracks))), 'index': 0})
+                self.search_indexes['track'].update(tracks)
+        counts = {name: len(tracks) for name, tracks in fetched.items()}
+        missing = [name for name, count in counts.items() if not count]
+        preload_ms = round((time.perf_counter() - started) * 1000)
+        log.info(f"📚 Preloaded {len(names) - len(missing)}/{len(names)} playlists in {preload_ms} ms",
+                 playlists=counts, preload_ms=preload_ms)
+        if missing:
+            log.warning(f"⚠️  Could not load playlists: {', '.join(missing)}")
+        return counts
+    
+    def loaded_playlist_names(self):
+        """Playlists switch_playlist can change to (including the active one), segments first"""
+        names = list(self.loaded_playlists)
+        if self.playlist_tracks and self.playlist_name not in names:
+            names.append(self.playlist_name)
+        segments = {name: i for i, name in enumerate(self.config.get('segment_playlists', []))}
+        return sorted(names, key=lambda name: (segments.get(name, len(segments)), name.lower()))
+    
+    def switch_playlist(self, playlist_name):
+        """Make a loaded playlist the stoppage playlist - no Music call, its order and position kept
+
+        Returns the number of tracks. Raises ValueError if the playlist isn't loaded.
+        """
+        if playlist_name == self.playlist_name and self.playlist_tracks:
+            return len(self.playlist_tracks)
+        state = self.loaded_playlists.get(playlist_name)
+        if state is None:
+            raise ValueError(f"Playlist not loaded: {playlist_name}")
+        self._stash_active_playlist()
+        del self.loaded_playlists[playlist_name]
+        self.playlist_name = playlist_name
+        self.playlist_tracks = state['tracks']
+        self.shuffled_order = state['order']
+        self.current_track_index = state['index']
+        self.save_config()
+        self.record('playlist_switched', playlist=playlist_name, index=self.current_track_index)
+        return len(self.playlist_tracks)
+    
+    def shuffle(self):
+        """Shuffle the playlist order and go back to the first song"""
+        random.shuffle(self.shuffled_order)
+        self.current_track_index = 0
+    
+    def reset_order(self):
+        """Reset playlist to original order"""
+        self.shuffled_order = list(range(len(self.playlist_tracks)))
+    
+    def move_track(self, from_idx, to_idx):
+        """Move a track within the shuffled order"""
+        from_idx, to_idx = self._check_position(from_idx, 'from'), self._check_position(to_idx, 'to')
+        item = self.shuffled_order.pop(from_idx)
+        self.shuffled_order.insert(to_idx, item)
+    
+    def set_away_team(self, team):
+        """Choose the visiting team whose roster names away goals"""
+        self.away_team = team or ''
+        self.config['away_team'] = self.away_team
+    
+    def goal_announcement_fragments(self, team, scorer, assist1=None, assist2=None, away_team=None):
+        """Goal announcement phrases with scorer and assists named from the roster index"""
+        roster_team = self.home_team if team.lower() == "home" else (away_team or self.away_team)
+        return self.controller.goal_announcement_fragments(
+            team, scorer, assist1, assist2, self.rosters.players(roster_team)
+        )
+    
+    def goal_announcement_text(self, team, scorer, assist1=None, assist2=None, away_team=None):
+        """Goal announcement with scorer and assists named from the roster index"""
+        return ''.join(self.goal_announcement_fragments(team, scorer, assist1, assist2, away_team))
+    
+    def load_announcement_pack(self):
+        """Map the baked announcement pack (see announcement_pack.py), None if there is none"""
+        from announcement_pack import DEFAULT_PACK_FILE, AnnouncementPack
+        return AnnouncementPack.load(self.config.get('announcement_pack', DEFAULT_PACK_FILE))
+    
+    def phrase_cache(self):
+        """The PhraseCache live announcements are synthesized into, phrase by phrase (see phrase_cache.py)"""
+        if self._phrase_cache is None:
+            from phrase_cache import DEFAULT_PHRASE_DIR, PhraseCache
+            self._phrase_cache = PhraseCache(self.config.get('phrase_cache_dir', DEFAULT_PHRASE_DIR),
+                                             loudness_target=self.loudness_target)
+        return self._phrase_cache
+    
+    def speak_fragments(self, fragments, celebrate=False):
+        """Play an announcement from the pack if every phrase is baked, else synthesize it live
+
+        Live, only the phrases neither the pack nor the phrase cache has are
+        synthesized ('announcement_phrases': false synthesizes the whole sentence).
+        With celebrate the celebration clip is mixed onto the end when it can be
+        (the result's 'segued' says whether it was).
+        """
+        segue = self.celebration_segue() if celebrate else None
+        pack = self.announcement_pack
+        if pack and pack.covers(fragments):
+            with self._prepare_lock:
+                prepared = self._prepared
+            if prepared and prepared[0] == (tuple(fragments), celebrate):
+                audio, segued = prepared[1]
+                return pack.speak(fragments, self.controller.play_sound_file, segue if segued else None, audio)
+            return pack.speak(fragments, self.controller.play_sound_file, segue)
+        if self.config.get('announcement_phrases', True) and hume_enabled():
+            return self.phrase_cache().speak(fragments, self.controller.play_sound_file, pack, segue)
+        return self.controller.speak(''.join(fragments), hume_enabled(), loudness_target=self.loudness_target,
+                                     trim=self.config.get('trim_silence', True), segue=segue)
+    
+    def celebration_segue(self):
+        """The celebration clip as an audio_dsp.Segue, None if it isn't pre-mixed
+
+        'celebration_premix' (default true) mixes it onto the end of home goal
+        announcements so both play as one stream; 'celebration_overlap_ms' starts it
+        under the last words, 'celebration_crossfade' fades across that overlap.
+        """
+        clip = self.config.get('celebration_clip', 'woo')
+        if not self.config.get('celebration_premix', True) or clip not in self.soundboard.clips:
+            return None
+        if self._celebration is None or self._celebration[0] != clip:
+            decoded = self.soundboard.audio(clip)
+            if decoded is None:
+                return None
+            self._celebration = (clip, Segue(decoded[0], decoded[1], self.config.get('celebration_overlap_ms', 0),
+                                             self.config.get('celebration_crossfade', False)))
+        return self._celebration[1]
+    
+    def _forget_celebration(self):
+        """Soundboard folder changed - decode the celebration again next time"""
+        self._celebration = None
+        with self._prepare_lock:
+            self._prepared = None
+    
+    def prepare_goal(self, team, scorer, assist1=None, assist2=None, away_team=None):
+        """Assemble a goal announcement (and its celebration) ahead of the Announce click
+
+        Only announcements the pack covers can be assembled ahead; returns True if
+        this one is ready to play.
+        """
+        fragments = self.goal_announcement_fragments(team, scorer, assist1, assist2, away_team)
+        celebrate = team.lower() == "home"
+        pack = self.announcement_pack
+        if not (pack and pack.covers(fragments)):
+            return False
+        key = (tuple(fragments), celebrate)
+        with self._prepare_lock:
+            if self._prepared and self._prepared[0] == key:
+                return True
+        started = time.perf_counter()
+        audio = segue_wav(pack.wav_bytes(fragments), self.celebration_segue() if celebrate else None)
+        with self._prepare_lock:
+            self._prepared = (key, audio)
+        tts_log.debug("Announcement assembled ahead", ms=round((time.perf_counter() - started) * 1000, 1),
+                      segued=audio[1])
+        return True
+    
+    def announce_goal(self, team, scorer, assist1=None, assist2=None, voice="Alex", away_team=None):
+        """Announce a goal (plus the celebration sound for home goals), returns the text"""
+        fragments = self.goal_announcement_fragments(team, scorer, assist1, assist2, away_team)
+        announcement = ''.join(fragments)
+        celebrate = team.lower() == "home"
+        result = self.speak_fragments(fragments, celebrate)
+        self._record_announcement('goal', announcement, result, team=team, scorer=scorer,
+                                  assists=[a for a in (assist1, assist2) if a])
+        
+        # Celebration sound after home goal announcements - already played if it was mixed in
+        if celebrate and not result.get('segued'):
+            self.play_celebration_sound()
         return announcement
+    
+    def announce_final_score(self, home_score, visiting_team, visiting_score, voice="Alex"):
+        """Announce the final score, returns the text"""
+        fragments = self.controller.final_score_fragments(home_score, visiting_team, visiting_score)
+        announcement = ''.join(fragments)
+        result = self.speak_fragments(fragments)
+        self._record_announcement('final_score', announcement, result, home_score=home_score,
+                                  visiting_team=visiting_team, visiting_score=visiting_score)
+        return announcement
+    
+    def _record_announcement(self, kind, announcement, result, **fields):
+        """Journal an announcement with its TTS engine and timings"""
+        timings = {key: round(result[key], 1) for key in ('synth_ms', 'gain_db', 'lead_trimmed_ms', 'trail_trimmed_ms',
+                                                          'total_ms') if result.get(key) is not None}
+        extras = {key: result[key] for key in ('cached', 'segued', 'synthesized') if result.get(key)}
+        self.record('announcement', kind=kind, text=announcement, engine=result['engine'],
+                    ok=result['ok'], **timings, **extras, **fields)
+        if result.get('error'):
+            self.record('error', source='tts', message=result['error'])
+    
+    def play_celebration_sound(self):
+        """Start the celebration clip ('celebration_clip', default "woo") - doesn't wait for it"""
+        clip = self.config.get('celebration_clip', 'woo')
+        if clip not in self.soundboard.clips:
+            tts_log.info(f"ℹ️  Celebration clip '{clip}' not found in {self.soundboard.directory}")
+            return
+        tts_log.info("🎉 Playing celebration sound!")
+        self.play_clip(clip)
+    
+    def play_clip(self, name):
+        """Start a soundboard clip over whatever is playing, returns False if there is no such clip"""
+        ok = self.soundboard.play(name)
+        if ok:
+            self.record('clip', clip=name, latency_ms=round(self.soundboard.latencies[-1], 1))
+        return ok
+    
+    def soundboard_clips(self):
+        """[{'name', 'key'}] for the soundboard buttons - hotkeyed clips first, in key order"""
+        keys = {name: key for key, name in self.soundboard.hotkeys().items()}
+        names = sorted(self.soundboard.clips, key=lambda name: (name not in keys, keys.get(name, ''), name))
+        return [{'name': name, 'key': keys.get(name)} for name in names]
+    
+    def status(self):
+        """Snapshot of controller state (no backend calls)"""
+        next_track = None
+        if self.shuffled_order:
+            next_track = self.track_at(self.current_track_index)
+        return {
+            'playlist': self.playlist_name,
+            'track_count': len(self.playlist_tracks),
+            'current_index': self.current_track_index,
+            'current_track': next_track,
+            'auto_stop_pending': self.scheduler.is_pending(),
+            'away_team': self.away_team,
+            'cues': {cue: self.cue_song(cue) for cue in self.CUES},
+            'readiness': dict(self.readiness),
+            'clip_latency': self.soundboard.latency_stats(),
+        }
+
+    # Settings a remote GUI may change with apply_settings()
+    SETTINGS = ('start_times', 'end_times', 'max_durations', 'fade_seconds', 'away_team')
+
+    def snapshot(self):
+        """Full controller state for a GUI in another process (see engine_process.py)"""
+        state = self.status()
+        state.update({
+            'playlist_tracks': list(self.playlist_tracks),
+            'shuffled_order': list(self.shuffled_order),
+            'roster_file': self.roster_file,
+            'home_team': self.home_team,
+            'loaded_playlists': self.loaded_playlist_names(),
+            'clips': self.soundboard_clips(),
+        })
+        state.update({key: copy.deepcopy(getattr(self, key)) for key in self.SETTINGS})
+        return state
 
+    def apply_settings(self, settings):
+        """Update settings and cue songs sent by a remote GUI, then save the config
+
+        Values are converted to their types first; a bad one raises ValueError
+        and nothing is changed.
+        """
+        checked = self._checked_settings(settings)
+        for key, value in checked.items():
+            if key != 'cues':
+                setattr(self, key, value)
+        for cue, song in checked.get('cues', {}).items():
+            if cue in self.CUES:
+                self.config[cue] = song
+        self.save_config()
+        return True
+
+    @staticmethod
+    def _checked_settings(settings):
+        """The SETTINGS and cues in settings converted to their types, ValueError naming a bad one"""
+        def seconds(name, value):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number of seconds, not {value!r}") from None
+            if not 0 <= value < float('inf'):  # NaN fails this too
+                raise ValueError(f"{name} must be 0 seconds or more, not {value!r}")
+            return int(value) if value.is_integer() else value
+
+        def mapping(name, value, convert):
+            if not isinstance(value, dict):
+                raise ValueError(f"{name} must be an object, not {value!r}")
+            return {str(key): convert(f"{name}[{key!r}]", item) for key, item in value.items()}
+
+        checked = {}
+        for key in ('start_times', 'end_times', 'max_durations'):
+            if key in settings:
+                checked[key] = mapping(key, settings[key], seconds)
+        if 'fade_seconds' in settings:
+            checked['fade_seconds'] = seconds('fade_seconds', settings['fade_seconds'])
+        if 'away_team' in settings:
+            checked['away_team'] = str(settings['away_team'] or '')
+        if settings.get('cues'):
+            checked['cues'] = mapping('cues', settings['cues'], lambda name, song: str(song or ''))
+        return checked
 
 
 class HockeyMusicGUI:
     """Main GUI for hockey music control"""
     
-    def __init__(self, root):
+    def __init__(self, root, core=None):
         self.root = root
         self.root.title("Hockey Stoppage Music Controller")
         self.root.geometry("800x600")
         
-        self.controller = AppleMusicController()
-        self.config_file = os.path.expanduser("~/hockey_music_config.json")
-        self.config = self.load_config()
-        
-        self.current_playlist = tk.StringVar(value=self.config.get('playlist', ''))
-        self.goal_song = tk.StringVar(value=self.config.get('goal_song', ''))
-        self.zamboni_song = tk.StringVar(value=self.config.get('zamboni', ''))
-        self.zamboni_2nd_song = tk.StringVar(value=self.config.get('zamboni_2nd', ''))
-        self.game_start_song = tk.StringVar(value=self.config.get('game_start', ''))
-        self.intermission_1st_song = tk.StringVar(value=self.config.get('intermission_1st', ''))
-        self.intermission_2nd_song = tk.StringVar(value=self.config.get('intermission_2nd', ''))
-        self.end_of_game_song = tk.StringVar(value=self.config.get('end_of_game', ''))
-        self.power_play_song = tk.StringVar(value=self.config.get('power_play', ''))
-        self.penalty_kill_song = tk.StringVar(value=self.config.get('penalty_kill', ''))
-        self.playlist_tracks = []
-        self.shuffled_order = []
-        self.current_track_index = 0
-        self.start_times = self.config.get('start_times', {})  # Load saved start times
+        self.core = core or HockeyController(journal=GameJournal(), playlist_cache=PlaylistCache())
+        # Playback commands run on an input lane that merges bursts (N N N -> advance 3)
+        # and drops queued commands a newer one made obsolete; see input_coalescer.py
+        self.playback = CoalescingWorker('gui-playback')
+        self.announcer = CoalescingWorker('gui-announcer')  # announcements wait here, never on Tk
+        self.core.call_later = self.playback.call_later
+        self.controller = self.core.controller
+        # Set when the core is an engine_process.RemoteCore - the engine publishes its state
+        self.engine = getattr(self.core, 'client', None)
+        self.available_playlists = []
+        self.playlist_search = SearchIndex()  # the loaded playlist, for the search box above it
+        self._ui_calls = queue.Queue()
+        
+        self.current_playlist = tk.StringVar(value=self.core.playlist_name)
+        self.goal_song = tk.StringVar(value=self.core.cue_song('goal_song'))
+        self.zamboni_song = tk.StringVar(value=self.core.cue_song('zamboni'))
+        self.zamboni_2nd_song = tk.StringVar(value=self.core.cue_song('zamboni_2nd'))
+        self.game_start_song = tk.StringVar(value=self.core.cue_song('game_start'))
+        self.intermission_1st_song = tk.StringVar(value=self.core.cue_song('intermission_1st'))
+        self.intermission_2nd_song = tk.StringVar(value=self.core.cue_song('intermission_2nd'))
+        self.end_of_game_song = tk.StringVar(value=self.core.cue_song('end_of_game'))
+        self.power_play_song = tk.StringVar(value=self.core.cue_song('power_play'))
+        self.penalty_kill_song = tk.StringVar(value=self.core.cue_song('penalty_kill'))
+        
+        # Keep the core's song config in step with the entry fields
+        cue_vars = {
+            'goal_song': self.goal_song,
+            'zamboni': self.zamboni_song,
+            'zamboni_2nd': self.zamboni_2nd_song,
+            'game_start': self.game_start_song,
+            'intermission_1st': self.intermission_1st_song,
+            'intermission_2nd': self.intermission_2nd_song,
+            'end_of_game': self.end_of_game_song,
+            'power_play': self.power_play_song,
+            'penalty_kill': self.penalty_kill_song
+        }
+        for cue, var in cue_vars.items():
+            var.trace_add('write', lambda *args, cue=cue, var=var: self.core.config.__setitem__(cue, var.get()))
         
         self.setup_ui()
         self.setup_keyboard_shortcuts()
+        self._poll_ui_calls()
+        
+        # Log every Tk event-loop stall with the call that caused it (see stall_watchdog.py)
+        self.watchdog = None
+        stall_threshold_ms = self.core.config.get('stall_threshold_ms', 100)
+        if stall_threshold_ms:
+            self.watchdog = StallWatchdog(self.root, stall_threshold_ms, journal=self.core.journal)
+            self.watchdog.start()
+        
+        if self.engine:
+            self._now_playing = None
+            self._on_engine_state(self.engine.state)
+            self.engine.add_listener(lambda state: self.run_on_ui(lambda: self._on_engine_state(state)))
+        
+        # Fast start: the window is usable right away - the last-known snapshot of
+        # the configured playlist shows immediately, then it is revalidated and the
+        # playlist list and the Hume SDK load in the background
+        self._cached_playlist = self._show_cached_playlist()
+        threading.Thread(target=self._background_startup, daemon=True).start()
+    
+    def run_on_ui(self, callback):
+        """Queue a callback to run on the Tk thread (safe to call from any thread)"""
+        self._ui_calls.put(callback)
+    
+    def _poll_ui_calls(self):
+        """Run callbacks queued by worker threads"""
+        while True:
+            try:
+                callback = self._ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback()
+            except Exception as e:
+                gui_log.exception(f"❌ UI update failed: {e}")
+        self.root.after(50, self._poll_ui_calls)
+    
+    def _show_cached_playlist(self):
+        """Render the cached snapshot of the configured playlist, returns it (or None)"""
+        playlist_name = self.core.playlist_name
+        cached = self.core.playlist_cache.get(playlist_name) if playlist_name and self.core.playlist_cache else None
+        if cached:
+            track_count = self.core.set_playlist_tracks(playlist_name, cached['tracks'])
+            self.update_playlist_display()
+            self.current_track_label.config(text=f"✓ {track_count} tracks from '{playlist_name}' (checking for changes...)")
+        return cached
+    
+    def _background_startup(self):
+        """Initial loads that used to block the window from appearing"""
+        if self.engine:
+            # The engine loaded the playlist and the Hume SDK itself
+            playlists = self.controller.get_playlists()
+            self.run_on_ui(lambda: setattr(self, 'available_playlists', playlists))
+            self.core.rosters.refresh()
+            return
+        
+        # Warm Music up on the playback worker - an early press queues behind it
+        readiness = self.playback.submit(self.core.warm_up).result()
+        self.run_on_ui(lambda: self._show_readiness(readiness))
+        
+        playlist_name = self.core.playlist_name
+        if playlist_name and self._cached_playlist:
+            tracks = self.core.revalidate_playlist(playlist_name, self._cached_playlist['fingerprint'])
+            if tracks:
+                self.run_on_ui(lambda: self._apply_revalidated_playlist(playlist_name, tracks))
+            else:
+                self.run_on_ui(lambda: self.current_track_label.config(
+                    text=f"✓ Loaded {len(self.core.playlist_tracks)} tracks from '{playlist_name}'"))
+        elif playlist_name:
+            tracks = self.core.fetch_playlist_tracks(playlist_name)
+            self.run_on_ui(lambda: self._apply_initial_playlist(playlist_name, tracks))
         
-        # Load playlist if configured
-        if self.current_playlist.get():
-            self.load_playlist()
+        playlists = self.controller.get_playlists()
+        self.run_on_ui(lambda: setattr(self, 'available_playlists', playlists))
+        
+        # warm_up preloads the segment playlists in the background
+        if readiness['state'] != 'offline':
+            self.core.library_loaded.wait()
+            self.run_on_ui(self._show_loaded_playlists)
+    
+    READINESS_ICONS = {'cold': '⏳', 'warming': '⏳', 'ready': '✅', 'degraded': '⚠️', 'offline': '❌'}
+    
+    def _show_readiness(self, readiness):
+        """Show the backend warm-up state under the now-playing line"""
+        self.readiness_label.config(text=f"{self.READINESS_ICONS.get(readiness['state'], '')} {readiness['detail']}")
     
-    def load_config(self):
-        """Load configuration from file"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return {
-            'goal_song': '',
-            'zamboni': '',
-            'zamboni_2nd': '',
-            'game_start': '',
-            'intermission_1st': '',
-            'intermission_2nd': '',
-            'end_of_game': '',
-            'power_play': '',
-            'penalty_kill': ''
-        }
+    def _apply_initial_playlist(self, playlist_name, tracks):
+        """Show the playlist fetched at startup (status line instead of a modal dialog)"""
+        if self.core.shuffled_order:
+            return  # operator already loaded one by hand
+        track_count = self.core.set_playlist_tracks(playlist_name, tracks)
+        if track_count:
+            self.update_playlist_display()
+            self.current_track_label.config(text=f"✓ Loaded {track_count} tracks from '{playlist_name}'")
+        else:
+            self.current_track_label.config(text=f"⚠️ Could not load tracks from: {playlist_name}")
+    
+    def _apply_revalidated_playlist(self, playlist_name, tracks):
+        """Show a playlist that changed since its cached snapshot"""
+        if self.core.apply_revalidated_playlist(playlist_name, tracks):
+            self.update_playlist_display()
+            self.current_track_label.config(text=f"🔄 '{playlist_name}' changed - now {len(tracks)} tracks")
     
     def save_config(self):
         """Save configuration to file"""
-        self.config['playlist'] = self.current_playlist.get()
-        self.config['goal_song'] = self.goal_song.get()
-        self.config['zamboni'] = self.zamboni_song.get()
-        self.config['zamboni_2nd'] = self.zamboni_2nd_song.get()
-        self.config['game_start'] = self.game_start_song.get()
-        self.config['intermission_1st'] = self.intermission_1st_song.get()
-        self.config['intermission_2nd'] = self.intermission_2nd_song.get()
-        self.config['end_of_game'] = self.end_of_game_song.get()
-        self.config['power_play'] = self.power_play_song.get()
-        self.config['penalty_kill'] = self.penalty_kill_song.get()
-        self.config['start_times'] = self.start_times  # Save custom start times
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
-        except Exception as e:
-            print(f"Error saving config: {e}")
+        self.core.save_config()
+    
+    def _on_engine_state(self, state):
+        """Show a state snapshot published by the engine process"""
+        if state is None:
+            self.current_track_label.config(text="⚠️ Lost the playback engine - restart the app to reconnect")
+            return
+        
+        core = state['core']
+        playlist_changed = (core['playlist_tracks'] != self.core.playlist_tracks
+                            or core['shuffled_order'] != self.core.shuffled_order
+                            or core['start_times'] != self.core.start_times
+                            or core['end_times'] != self.core.end_times)
+        self.core.apply_snapshot(core)
+        if core.get('readiness'):
+            self._show_readiness(core['readiness'])
+        if playlist_changed or self.playlist_listbox.size() != len(self.core.shuffled_order):
+            self.update_playlist_display()
+        self._show_loaded_playlists()
+        self._show_soundboard()
+        self._update_playlist_highlight()
+        
+        announcement = state['announcement']
+        if announcement['state'] == 'speaking':
+            self.current_track_label.config(text="📢 Announcing...")
+        elif state['now_playing'] != self._now_playing and state['now_playing']:
+            self.current_track_label.config(text=f"♪ {state['now_playing']}")
+        self._now_playing = state['now_playing']
     
     def setup_ui(self):
         """Create the user interface"""
@@ -701,6 +1740,15 @@ class HockeyMusicGUI:
         )
         self.final_score_btn.pack(fill=tk.X, padx=5)
         
+        # Soundboard - one button per clip in sound_clips/, rebuilt when the folder changes
+        self.soundboard_frame = ttk.LabelFrame(control_frame, text="Soundboard", padding=5)
+        self.soundboard_frame.pack(fill=tk.X, pady=(0, 5))
+        self._shown_clips = None
+        self._clip_keys = []
+        self._show_soundboard()
+        if not self.engine:
+            self.core.soundboard.add_listener(lambda: self.run_on_ui(self._show_soundboard))
+        
 
         playback_frame = ttk.Frame(control_frame)
         playback_frame.pack(fill=tk.X, pady=5)
@@ -740,6 +1788,10 @@ class HockeyMusicGUI:
         )
         self.current_track_label.pack(pady=5)
         
+        # Music readiness (warm-up at startup)
+        self.readiness_label = ttk.Label(control_frame, text="⏳ Waking Music…", font=('Arial', 10))
+        self.readiness_label.pack()
+        
         # Configuration button
         config_button_frame = ttk.Frame(control_frame)
         config_button_frame.pack(fill=tk.X, pady=5)
@@ -748,7 +1800,13 @@ class HockeyMusicGUI:
             config_button_frame,
             text="⚙️ Configure Songs & Playlist",
             command=self.open_config_window
-        ).pack(pady=5)
+        ).pack(side=tk.LEFT, expand=True, anchor=tk.E, padx=5, pady=5)
+        
+        ttk.Button(
+            config_button_frame,
+            text="📒 New Game",
+            command=self.start_new_game
+        ).pack(side=tk.LEFT, expand=True, anchor=tk.W, padx=5, pady=5)
         
         # Playlist management frame
         playlist_frame = ttk.LabelFrame(self.root, text="Playlist Order (Drag to Reorder)", padding="10")
@@ -762,6 +1820,26 @@ class HockeyMusicGUI:
         ttk.Button(playlist_controls, text="Reset Order", command=self.reset_playlist_order).pack(side=tk.LEFT, padx=5)
         ttk.Button(playlist_controls, text="Play from Top", command=self.play_from_top).pack(side=tk.LEFT, padx=5)
         
+        # Preloaded segment playlists (warm-up, periods, intermissions...) - switching keeps each one's place
+        ttk.Label(playlist_controls, text="Segment:").pack(side=tk.LEFT, padx=(10, 0))
+        self.segment_var = tk.StringVar(value=self.core.playlist_name)
+        self.segment_combo = ttk.Combobox(playlist_controls, textvariable=self.segment_var, width=18, state='readonly')
+        self.segment_combo.pack(side=tk.LEFT, padx=5)
+        self.segment_combo.bind('<<ComboboxSelected>>', self.switch_segment)
+        
+        # Type-ahead search: selects the best match, Enter plays it
+        self.playlist_search_var = tk.StringVar()
+        self.playlist_search_entry = ttk.Entry(playlist_controls, textvariable=self.playlist_search_var, width=20)
+        self.playlist_search_entry.pack(side=tk.RIGHT, padx=5)
+        ttk.Label(playlist_controls, text="🔎").pack(side=tk.RIGHT)
+        # Skip the window's bindings so typing "g" or "n" here doesn't trigger a hotkey
+        entry = self.playlist_search_entry
+        entry.bindtags((str(entry), entry.winfo_class(), 'all'))
+        self.playlist_search_var.trace_add('write', self.search_playlist)
+        entry.bind('<Return>', self.on_search_enter)
+        entry.bind('<Escape>', self.clear_playlist_search)
+        entry.bind('<Down>', lambda e: self.playlist_listbox.focus_set())
+        
         # Listbox with scrollbar
         list_frame = ttk.Frame(playlist_frame)
         list_frame.pack(fill=tk.BOTH, expand=True)
@@ -804,13 +1882,14 @@ class HockeyMusicGUI:
         ttk.Label(info_frame, text=shortcuts_text, font=('Arial', 9, 'italic')).pack()
         
         # Start updating current track display now that all UI elements exist
-        self.update_current_track()
+        self.start_current_track_updates()
     
     def open_pa_announcement_window(self):
         """Open PA announcement configuration window"""
         pa_window = tk.Toplevel(self.root)
         pa_window.title("PA Goal Announcement")
-        pa_window.geometry("450x450")
+        pa_window.geometry("520x450")
+        self.core.rosters.refresh()  # pick up roster files edited since the last announcement
         pa_window.transient(self.root)
         pa_window.grab_set()
         
@@ -819,7 +1898,7 @@ class HockeyMusicGUI:
         main_frame.pack(fill=tk.BOTH, expand=True)
         
         # Title with Hume status
-        if HUME_AVAILABLE and HUME_API_KEY:
+        if hume_enabled():
             title_text = "📢 Goal Announcement (Hume.ai Enabled)"
             title_color = 'green'
         else:
@@ -845,6 +1924,13 @@ class HockeyMusicGUI:
         away_radio = ttk.Radiobutton(team_frame, text="Away", variable=team_var, value="away")
         away_radio.pack(side=tk.LEFT, padx=5)
         
+        # Visiting team roster (names for away scorers and assists)
+        away_team_var = tk.StringVar(value=self.core.away_team)
+        away_combo = ttk.Combobox(team_frame, textvariable=away_team_var, width=16, state='readonly')
+        away_combo['values'] = [t for t in self.core.rosters.teams() if t != self.core.home_team]
+        away_combo.pack(side=tk.LEFT, padx=5)
+        away_combo.bind('<<ComboboxSelected>>', lambda e: team_var.set("away"))
+        
         # Scorer input
         ttk.Label(main_frame, text="Goal Scored By #:", font=('Arial', 11)).grid(row=2, column=0, sticky=tk.W, pady=10)
         scorer_entry = ttk.Entry(main_frame, width=15, font=('Arial', 12))
@@ -864,7 +1950,7 @@ class HockeyMusicGUI:
         ttk.Label(main_frame, text="(optional)", font=('Arial', 9, 'italic')).grid(row=4, column=2, sticky=tk.W, padx=5)
         
         # Voice selection (only show if not using Hume)
-        if not (HUME_AVAILABLE and HUME_API_KEY):
+        if not hume_enabled():
             ttk.Label(main_frame, text="Voice:", font=('Arial', 11)).grid(row=5, column=0, sticky=tk.W, pady=10)
             voice_var = tk.StringVar(value="Alex")
             voice_combo = ttk.Combobox(main_frame, textvariable=voice_var, width=20, state='readonly')
@@ -897,7 +1983,7 @@ class HockeyMusicGUI:
             voice_var = tk.StringVar(value="Hume")
             hume_info = ttk.Label(
                 main_frame,
-                text="✅ Using Hume.ai professional voice" + (f"\n(Voice ID: {HUME_VOICE_ID[:20]}...)" if HUME_VOICE_ID else "\n(Auto-selected voice)"),
+                text="✅ Using Hume.ai professional voice" + (f"\n(Voice ID: {hume_config().voice_id[:20]}...)" if hume_config().voice_id else "\n(Auto-selected voice)"),
                 font=('Arial', 10),
                 foreground='green'
             )
@@ -932,34 +2018,20 @@ class HockeyMusicGUI:
                 preview_label.config(text="Enter scorer number to preview")
                 return
             
-            if team == "home":
-                text = f"Patriots goal scored by number {scorer}!"
-                # Add assists with exclamation marks for Patriots
-                assists = [a for a in [assist1, assist2] if a]
-                if len(assists) == 2:
-                    text += f" assisted by number {assists[0]} and number {assists[1]}!"
-                elif len(assists) == 1:
-                    text += f" assisted by number {assists[0]}!"
-                else:
-                    text += " unassisted!"
-            else:
-                text = f"goal scored by number {scorer}"
-                # Add assists without exclamation marks for visitors
-                assists = [a for a in [assist1, assist2] if a]
-                if len(assists) == 2:
-                    text += f", assisted by number {assists[0]} and number {assists[1]}"
-                elif len(assists) == 1:
-                    text += f", assisted by number {assists[0]}"
-                else:
-                    text += ", unassisted"
-            
+            # Same text the announcer will speak, names included
+            text = self.core.goal_announcement_text(team, scorer, assist1 or None, assist2 or None,
+                                                    away_team_var.get())
             preview_label.config(text=text)
+            # Assemble the audio (with the celebration mixed in) while the operator is still typing
+            self.announcer.press('prepare_goal', self.core.prepare_goal, team, scorer, assist1 or None,
+                                 assist2 or None, away_team_var.get())
         
         # Update preview when inputs change
         scorer_entry.bind('<KeyRelease>', update_preview)
         assist1_entry.bind('<KeyRelease>', update_preview)
         assist2_entry.bind('<KeyRelease>', update_preview)
         team_var.trace_add('write', lambda *args: update_preview())
+        away_team_var.trace_add('write', lambda *args: update_preview())
         
         # Announce button
         def announce():
@@ -972,30 +2044,20 @@ class HockeyMusicGUI:
             assist1 = assist1_entry.get().strip() or None
             assist2 = assist2_entry.get().strip() or None
             voice = voice_var.get()
+            if away_team_var.get() != self.core.away_team:
+                self.core.set_away_team(away_team_var.get())
+                self.core.save_config()
             
             # Use Hume.ai if available, otherwise use macOS voice
-            use_hume = HUME_AVAILABLE and HUME_API_KEY
-            
-            # Generate and play announcement
-            announcement = self.controller.generate_goal_announcement(
-                team, scorer, assist1, assist2, voice, use_hume
-            )
-            
-            # Play celebration sound after home goal announcements
-            if team.lower() == "home":
-                celebration_sound = os.path.expanduser("sound_clips/woo.m4a")
-                if os.path.exists(celebration_sound):
-                    try:
-                        subprocess.run(['afplay', celebration_sound], check=False)
-                        print("🎉 Playing celebration sound!")
-                    except Exception as e:
-                        print(f"⚠️  Could not play celebration sound: {e}")
-                else:
-                    print(f"ℹ️  Celebration sound not found at: {celebration_sound}")
+            use_hume = hume_enabled()
             
-            # Show what was announced
-            tts_method = "Hume.ai" if use_hume else "macOS"
-            self.current_track_label.config(text=f"📢 ({tts_method}) {announcement}")
+            # Generate and play announcement (plus celebration sound for home goals)
+            def speak():
+                announcement = self.core.announce_goal(team, scorer, assist1, assist2, voice)
+                # Show what was announced
+                tts_method = "Hume.ai" if use_hume else "macOS"
+                self.run_on_ui(lambda: self.current_track_label.config(text=f"📢 ({tts_method}) {announcement}"))
+            self.announcer.submit(speak)
             
             # Close window
             pa_window.destroy()
@@ -1034,6 +2096,7 @@ class HockeyMusicGUI:
         fs_window.title("Final Score Announcement")
         fs_window.geometry("450x400")
         fs_window.transient(self.root)
+        self.core.rosters.refresh()
         fs_window.grab_set()
         
         # Main frame
@@ -1041,7 +2104,7 @@ class HockeyMusicGUI:
         main_frame.pack(fill=tk.BOTH, expand=True)
         
         # Title with Hume status
-        if HUME_AVAILABLE and HUME_API_KEY:
+        if hume_enabled():
             title_text = "🏁 Final Score Announcement (Hume.ai Enabled)"
             title_color = 'green'
         else:
@@ -1064,7 +2127,10 @@ class HockeyMusicGUI:
         
         # Visiting Team Name input
         ttk.Label(main_frame, text="Visiting Team:", font=('Arial', 11)).grid(row=2, column=0, sticky=tk.W, pady=10)
-        visiting_team_entry = ttk.Entry(main_frame, width=20, font=('Arial', 12))
+        # Pick a team with a roster (or type any name) - it also names away goals
+        visiting_team_entry = ttk.Combobox(main_frame, width=20, font=('Arial', 12))
+        visiting_team_entry['values'] = [t for t in self.core.rosters.teams() if t != self.core.home_team]
+        visiting_team_entry.set(self.core.away_team)
         visiting_team_entry.grid(row=2, column=1, sticky=tk.W, pady=10)
         
         # Visiting Team Score input
@@ -1073,7 +2139,7 @@ class HockeyMusicGUI:
         visiting_score_entry.grid(row=3, column=1, sticky=tk.W, pady=10)
         
         # Voice selection (only show if not using Hume)
-        if not (HUME_AVAILABLE and HUME_API_KEY):
+        if not hume_enabled():
             ttk.Label(main_frame, text="Voice:", font=('Arial', 11)).grid(row=4, column=0, sticky=tk.W, pady=10)
             voice_var = tk.StringVar(value="Alex")
             voice_combo = ttk.Combobox(main_frame, textvariable=voice_var, width=20, state='readonly')
@@ -1084,8 +2150,8 @@ class HockeyMusicGUI:
             # Show Hume.ai info
             voice_var = tk.StringVar(value="Hume")
             voice_info_text = "✅ Using Hume.ai professional voice"
-            if HUME_VOICE_ID:
-                voice_info_text += f" (Voice: {HUME_VOICE_ID[:20]}...)"
+            if hume_config().voice_id:
+                voice_info_text += f" (Voice: {hume_config().voice_id[:20]}...)"
             hume_info = ttk.Label(
                 main_frame,
                 text=voice_info_text,
@@ -1129,6 +2195,7 @@ class HockeyMusicGUI:
         patriots_score_entry.bind('<KeyRelease>', update_preview)
         visiting_team_entry.bind('<KeyRelease>', update_preview)
         visiting_score_entry.bind('<KeyRelease>', update_preview)
+        visiting_team_entry.bind('<<ComboboxSelected>>', update_preview)
         
         # Announce button
         def announce():
@@ -1141,18 +2208,20 @@ class HockeyMusicGUI:
                 return
             
             voice = voice_var.get()
+            if self.core.rosters.has_team(visiting_team) and visiting_team != self.core.away_team:
+                self.core.set_away_team(visiting_team)
+                self.core.save_config()
             
             # Use Hume.ai if available, otherwise use macOS voice
-            use_hume = HUME_AVAILABLE and HUME_API_KEY
+            use_hume = hume_enabled()
             
             # Generate and play announcement
-            announcement = self.controller.generate_final_score_announcement(
-                home_score, visiting_team, visiting_score, voice, use_hume
-            )
-            
-            # Show what was announced
-            tts_method = "Hume.ai" if use_hume else "macOS"
-            self.current_track_label.config(text=f"🏁 ({tts_method}) {announcement}")
+            def speak():
+                announcement = self.core.announce_final_score(home_score, visiting_team, visiting_score, voice)
+                # Show what was announced
+                tts_method = "Hume.ai" if use_hume else "macOS"
+                self.run_on_ui(lambda: self.current_track_label.config(text=f"🏁 ({tts_method}) {announcement}"))
+            self.announcer.submit(speak)
             
             # Close window
             fs_window.destroy()
@@ -1190,7 +2259,7 @@ class HockeyMusicGUI:
         """Open configuration window as a popup"""
         config_window = tk.Toplevel(self.root)
         config_window.title("Configuration")
-        config_window.geometry("650x550")
+        config_window.geometry("720x620")
         config_window.transient(self.root)  # Set to be on top of main window
         config_window.grab_set()  # Make modal
         
@@ -1204,12 +2273,40 @@ class HockeyMusicGUI:
             text="Configure Special Songs & Playlist",
             font=('Arial', 14, 'bold')
         )
-        title_label.pack(pady=(0, 15))
+        title_label.pack(pady=(0, 5))
+        ttk.Label(
+            main_frame,
+            text="Max sec: fade out automatically after this many seconds (blank = play until stopped)",
+            font=('Arial', 9, 'italic')
+        ).pack(pady=(0, 10))
         
         # Configuration frame
         config_frame = ttk.Frame(main_frame)
         config_frame.pack(fill=tk.BOTH, expand=True)
         
+        def add_max_entry(row, cue):
+            """Max-duration entry for a cue, saved as the user types"""
+            var = tk.StringVar(value=str(self.core.max_durations.get(cue, '')))
+            def on_change(*args):
+                value = var.get().strip()
+                try:
+                    if value:
+                        self.core.max_durations[cue] = self.parse_time_string(value)
+                    else:
+                        self.core.max_durations.pop(cue, None)
+                except ValueError:
+                    return
+                self.save_config()
+            var.trace_add('write', on_change)
+            ttk.Entry(config_frame, textvariable=var, width=6).grid(row=row, column=3, padx=5, pady=5)
+        
+        for row, cue in enumerate(['goal_song', 'zamboni', 'zamboni_2nd', 'game_start',
+                                   'intermission_1st', 'intermission_2nd', 'end_of_game']):
+            add_max_entry(row, cue)
+        add_max_entry(8, 'power_play')
+        add_max_entry(9, 'penalty_kill')
+        add_max_entry(12, 'stoppage')
+        
         # Goal song setup
         ttk.Label(config_frame, text="Goal Song:").grid(row=0, column=0, sticky=tk.W, pady=5)
         ttk.Entry(config_frame, textvariable=self.goal_song, width=35).grid(row=0, column=1, padx=5, pady=5)
@@ -1266,8 +2363,10 @@ class HockeyMusicGUI:
         playlist_label.grid(row=11, column=0, columnspan=3, sticky=tk.W, pady=(0, 5))
         
         ttk.Label(config_frame, text="Select Playlist:").grid(row=12, column=0, sticky=tk.W, pady=5)
-        self.config_playlist_combo = ttk.Combobox(config_frame, textvariable=self.current_playlist, width=32)
+        self.config_playlist_combo = ttk.Combobox(config_frame, textvariable=self.current_playlist, width=32,
+                                                  values=self.available_playlists)
         self.config_playlist_combo.grid(row=12, column=1, padx=5, pady=5)
+        self.config_playlist_combo.bind('<KeyRelease>', self.filter_playlist_choices)
         ttk.Button(config_frame, text="Refresh", command=self.refresh_playlists_popup).grid(row=12, column=2, padx=5, pady=5)
         
         ttk.Button(
@@ -1276,6 +2375,18 @@ class HockeyMusicGUI:
             command=lambda: [self.load_playlist(), config_window.destroy()]
         ).grid(row=13, column=1, pady=10)
         
+        # Fade length used by every auto-stop
+        ttk.Label(config_frame, text="Fade-out (sec):").grid(row=14, column=0, sticky=tk.W, pady=5)
+        fade_var = tk.StringVar(value=str(self.core.fade_seconds))
+        def on_fade_change(*args):
+            try:
+                self.core.fade_seconds = max(0, float(fade_var.get().strip()))
+            except ValueError:
+                return
+            self.save_config()
+        fade_var.trace_add('write', on_fade_change)
+        ttk.Entry(config_frame, textvariable=fade_var, width=6).grid(row=14, column=1, sticky=tk.W, padx=5, pady=5)
+        
         # Close button at bottom
         ttk.Button(
             main_frame,
@@ -1289,10 +2400,33 @@ class HockeyMusicGUI:
         y = (config_window.winfo_screenheight() // 2) - (config_window.winfo_height() // 2)
         config_window.geometry(f"+{x}+{y}")
     
+    def start_new_game(self):
+        """Start a new game journal file"""
+        label = simpledialog.askstring("New Game", "Opponent / game name (optional):", parent=self.root)
+        if label is None:
+            return
+        if self.watchdog:
+            print_summary(self.watchdog.new_game(label.strip()), "UI stalls last game")
+        
+        def done(path):
+            if path:
+                self.current_track_label.config(text=f"📒 New game journal: {os.path.basename(path)}")
+        
+        self._edit('new_game', self.core.new_game, label.strip(), on_done=done)
+    
+    def filter_playlist_choices(self, event):
+        """Narrow the playlist drop-down to what has been typed (type-ahead)"""
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        typed = self.current_playlist.get()
+        matches = self.core.search(typed, 'playlist', limit=30) if typed.strip() else []
+        self.config_playlist_combo['values'] = matches or self.available_playlists
+    
     def refresh_playlists_popup(self):
         """Refresh playlists in the popup window"""
         playlists = self.controller.get_playlists()
         if playlists:
+            self.available_playlists = playlists
             self.config_playlist_combo['values'] = playlists
             messagebox.showinfo("Success", f"Loaded {len(playlists)} playlists")
         else:
@@ -1312,206 +2446,164 @@ class HockeyMusicGUI:
         self.root.bind('<p>', lambda e: self.play_penalty_kill())
         self.root.bind('<P>', lambda e: self.play_penalty_kill())
     
-    def update_current_track(self):
-        """Update the current track display - but DON'T change highlight"""
-        current = self.controller.get_current_track()
-        self.current_track_label.config(text=f"♪ {current}")
+    # Keys the soundboard may not take over (see setup_keyboard_shortcuts)
+    RESERVED_KEYS = {'space', 'g', 'n', 's', 'o', 'p'}
+    
+    def _show_soundboard(self):
+        """(Re)build the clip buttons and their hotkeys if the clips changed"""
+        clips = self.core.soundboard_clips()
+        if clips == self._shown_clips:
+            return
+        self._shown_clips = clips
+        for child in self.soundboard_frame.winfo_children():
+            child.destroy()
+        for sequence in self._clip_keys:
+            self.root.unbind(sequence)
+        self._clip_keys = []
+        
+        if not clips:
+            ttk.Label(self.soundboard_frame, text="No clips - drop audio files into sound_clips/").pack(side=tk.LEFT)
+            return
+        for clip in clips:
+            key = clip['key']
+            if key and key.lower() in self.RESERVED_KEYS:
+                gui_log.warning(f"⚠️  Soundboard key '{key}' is taken by a built-in shortcut", clip=clip['name'])
+                key = None
+            tk.Button(
+                self.soundboard_frame,
+                text=f"{key} · {clip['name'].title()}" if key else clip['name'].title(),
+                command=lambda name=clip['name']: self.play_clip(name),
+                font=('Arial', 11)
+            ).pack(side=tk.LEFT, padx=3)
+            if key:
+                keysyms = {key.lower(), key.upper()} if len(key) == 1 else {key}  # 'h' and 'H', or 'F1'
+                for sequence in (f'<Key-{keysym}>' for keysym in keysyms):
+                    self.root.bind(sequence, lambda e, name=clip['name']: self.play_clip(name))
+                    self._clip_keys.append(sequence)
+    
+    def play_clip(self, name):
+        """Fire a soundboard clip - off the Tk thread, and never queued behind Music"""
+        threading.Thread(target=self.core.play_clip, args=(name,), name='clip', daemon=True).start()
+    
+    def start_current_track_updates(self):
+        """Update the current track display every second - but DON'T change highlight
+
+        The AppleScript query runs on a background thread so the window never
+        waits on Music; only the label update happens on the Tk thread. With an
+        engine process the engine publishes the current track instead.
+        """
+        if self.engine:
+            return
+        
+        def poll():
+            while True:
+                current = self.controller.get_current_track()
+                self.run_on_ui(lambda current=current: self.current_track_label.config(text=f"♪ {current}"))
+                time.sleep(1)
+        
+        threading.Thread(target=poll, daemon=True).start()
+    
+    def _press(self, command, handler, *args, on_done=None, warning_title="No Playlist"):
+        """Send a playback command through the input lane without blocking the UI
+
+        on_done(result) runs on the Tk thread once the command ran; nothing runs if it
+        was superseded. A ValueError from the core is shown as a warning dialog.
+        """
+        future = self.playback.press(command, handler, *args)
+        if getattr(future, 'gui_watched', False):
+            return future  # merged into (or debounced to) a press already being watched
+        return self._watch(command, future, on_done, warning_title)
+    
+    def _edit(self, command, handler, *args, on_done=None, warning_title="No Playlist"):
+        """Run a playlist edit on the input lane, after the commands pressed before it
+
+        Loading, switching and reordering wait on Music (or the engine) like playback
+        does, so they never run on the Tk thread. Edits are never merged or dropped;
+        on_done and errors are handled as in _press.
+        """
+        return self._watch(command, self.playback.submit(handler, *args), on_done, warning_title)
+    
+    def _watch(self, command, future, on_done, warning_title):
+        """Report a lane command's outcome on the Tk thread (see _press)"""
+        future.gui_watched = True
+        
+        def finished(future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if isinstance(error, ValueError):
+                self.run_on_ui(lambda: messagebox.showwarning(warning_title, str(error)))
+            elif error:
+                gui_log.error(f"❌ {command} failed: {error}", command=command, error=str(error))
+            elif on_done:
+                result = future.result()
+                self.run_on_ui(lambda: on_done(result))
+        
+        future.add_done_callback(finished)
+        return future
+    
+    def _play_cue(self, cue):
+        """Play an event song through the core, reporting problems in a dialog"""
+        song = self.core.cue_song(cue)
         
-        # Don't automatically change highlight - user controls it with arrows
-        # Just update the display label
+        def done(success):
+            if success:
+                self.current_track_label.config(text=f"{HockeyController.CUES[cue][1]} {song}")
+            else:
+                messagebox.showerror("Error", f"Could not play: {song}")
         
-        self.root.after(1000, self.update_current_track)
+        self._press(cue, self.core.play_cue, cue, on_done=done, warning_title="No Song")
     
     def play_goal_song(self):
         """Play the configured goal song"""
-        goal_song = self.goal_song.get()
-        if not goal_song:
-            messagebox.showwarning("No Goal Song", "Please configure a goal song first!")
-            return
-        
-        if self.controller.play_track_by_name(goal_song):
-            self.current_track_label.config(text=f"🎉 GOAL! Playing: {goal_song}")
-        else:
-            messagebox.showerror("Error", f"Could not play goal song: {goal_song}")
+        self._play_cue('goal_song')
     
     def play_zamboni(self):
         """Play the zamboni song"""
-        song = self.zamboni_song.get()
-        if not song:
-            messagebox.showwarning("No Song", "Please configure Zamboni song first!")
-            return
-        
-        if self.controller.play_track_by_name(song):
-            self.current_track_label.config(text=f"🧊 Zamboni: {song}")
-        else:
-            messagebox.showerror("Error", f"Could not play: {song}")
+        self._play_cue('zamboni')
     
     def play_zamboni_2nd(self):
         """Play the 2nd zamboni song"""
-        song = self.zamboni_2nd_song.get()
-        if not song:
-            messagebox.showwarning("No Song", "Please configure 2nd Zamboni song first!")
-            return
-        
-        if self.controller.play_track_by_name(song):
-            self.current_track_label.config(text=f"🧊 2nd Zamboni: {song}")
-        else:
-            messagebox.showerror("Error", f"Could not play: {song}")
+        self._play_cue('zamboni_2nd')
     
     def play_game_start(self):
         """Play the game start song"""
-        song = self.game_start_song.get()
-        if not song:
-            messagebox.showwarning("No Song", "Please configure Game Start song first!")
-            return
-        
-        if self.controller.play_track_by_name(song):
-            self.current_track_label.config(text=f"🏒 Game Start: {song}")
-        else:
-            messagebox.showerror("Error", f"Could not play: {song}")
+        self._play_cue('game_start')
     
     def play_intermission_1st(self):
         """Play the 1st intermission song"""
-        song = self.intermission_1st_song.get()
-        if not song:
-            messagebox.showwarning("No Song", "Please configure 1st Intermission song first!")
-            return
-        
-        if self.controller.play_track_by_name(song):
-            self.current_track_label.config(text=f"⏸️ 1st Intermission: {song}")
-        else:
-            messagebox.showerror("Error", f"Could not play: {song}")
+        self._play_cue('intermission_1st')
     
     def play_intermission_2nd(self):
         """Play the 2nd intermission song"""
-        song = self.intermission_2nd_song.get()
-        if not song:
-            messagebox.showwarning("No Song", "Please configure 2nd Intermission song first!")
-            return
-        
-        if self.controller.play_track_by_name(song):
-            self.current_track_label.config(text=f"⏸️ 2nd Intermission: {song}")
-        else:
-            messagebox.showerror("Error", f"Could not play: {song}")
+        self._play_cue('intermission_2nd')
     
     def play_end_of_game(self):
         """Play the end of game song"""
-        song = self.end_of_game_song.get()
-        if not song:
-            messagebox.showwarning("No Song", "Please configure End of Game song first!")
-            return
-        
-        if self.controller.play_track_by_name(song):
-            self.current_track_label.config(text=f"🏁 End of Game: {song}")
-        else:
-            messagebox.showerror("Error", f"Could not play: {song}")
+        self._play_cue('end_of_game')
     
     def play_power_play(self):
         """Play the Power Play song"""
-        song = self.power_play_song.get()
-        if not song:
-            messagebox.showwarning("No Song", "Please configure Power Play song first!")
-            return
-        
-        if self.controller.play_track_by_name(song):
-            self.current_track_label.config(text=f"⚡ Power Play: {song}")
-        else:
-            messagebox.showerror("Error", f"Could not play: {song}")
+        self._play_cue('power_play')
     
     def play_penalty_kill(self):
         """Play the Penalty Kill song"""
-        song = self.penalty_kill_song.get()
-        if not song:
-            messagebox.showwarning("No Song", "Please configure Penalty Kill song first!")
-            return
-        
-        if self.controller.play_track_by_name(song):
-            self.current_track_label.config(text=f"🛡️ Penalty Kill: {song}")
-        else:
-            messagebox.showerror("Error", f"Could not play: {song}")
+        self._play_cue('penalty_kill')
     
     def play_pause(self):
         """Toggle play/pause - if stopped, play current playlist track"""
-        # Check current state
-        is_currently_playing = self.controller.is_playing()
-        
-        if is_currently_playing:
-            # Just pause
-            self.controller.play_pause()
-        else:
-            # Check if we're stopped vs paused
-            current_track = self.controller.get_current_track()
-            
-            if current_track == "No track playing" and self.shuffled_order and self.current_playlist.get():
-                # Completely stopped - restart from current playlist position
-                playlist_name = self.current_playlist.get()
-                actual_track_idx = self.shuffled_order[self.current_track_index] + 1
-                
-                # Get track info for start time lookup
-                track_info = self.playlist_tracks[self.shuffled_order[self.current_track_index]]
-                
-                # Check if this track has a custom start time
-                if track_info in self.start_times:
-                    start_time = self.start_times[track_info]
-                    self.controller.play_track_from_playlist_with_start_time(playlist_name, actual_track_idx, start_time)
-                else:
-                    self.controller.play_track_from_playlist(playlist_name, actual_track_idx)
-            else:
-                # Just paused or has a track - resume
-                self.controller.play_pause()
+        self._press('play_pause', self.core.play_pause)
     
     def stop(self):
         """Stop playback"""
-        self.controller.stop()
+        self._press('stop', self.core.stop)
     
     def next_track(self):
         """Move to next track in playlist - stops music and queues next song"""
-        if not self.shuffled_order or not self.current_playlist.get():
-            messagebox.showwarning("No Playlist", "Please load a playlist first to use Next!")
-            return
-        
-        # Stop playback immediately
-        self.controller.stop()
-        
-        # Move to next track in our shuffled order
-        self.current_track_index = (self.current_track_index + 1) % len(self.shuffled_order)
+        self._press('next', self.core.next_track, on_done=lambda track_info: self._update_playlist_highlight())
         
-        # Manually update the highlight immediately
+        # Manually update the highlight immediately (counting presses not yet sent)
         self._update_playlist_highlight()
-        
-        # Get the next track info
-        playlist_name = self.current_playlist.get()
-        actual_track_idx = self.shuffled_order[self.current_track_index] + 1  # 1-indexed
-        
-        # Get track info for start time lookup
-        track_info = self.playlist_tracks[self.shuffled_order[self.current_track_index]]
-        
-        # Queue the track by playing and immediately stopping
-        # Use a delayed call to ensure stop comes after play starts
-        def queue_next_track():
-            # Check if this track has a custom start time
-            if track_info in self.start_times:
-                start_time = self.start_times[track_info]
-                self.controller.play_track_from_playlist_with_start_time(playlist_name, actual_track_idx, start_time)
-            else:
-                self.controller.play_track_from_playlist(playlist_name, actual_track_idx)
-            # Stop it immediately - multiple times to be sure
-            self.root.after(5, lambda: self.controller.stop())
-            self.root.after(20, lambda: self.controller.stop())
-            self.root.after(50, lambda: self.controller.stop())
-        
-        # Small delay before queuing to ensure stop command completed
-        self.root.after(100, queue_next_track)
-    
-    def _advance_to_next_track(self):
-        """Internal method to advance to next track without playing"""
-        # Move to next track in our shuffled order
-        self.current_track_index = (self.current_track_index + 1) % len(self.shuffled_order)
-        
-        # Set the next track without playing it
-        playlist_name = self.current_playlist.get()
-        actual_track_idx = self.shuffled_order[self.current_track_index] + 1  # 1-indexed
-        self.controller.set_track_without_playing(playlist_name, actual_track_idx)
     
     def refresh_playlists(self):
         """Refresh the list of available playlists"""
@@ -1523,7 +2615,7 @@ class HockeyMusicGUI:
             messagebox.showerror("Error", "Could not load playlists. Is Music app running?")
     
     def set_special_song(self, song_type, song_var):
-        """Open a dialog to select a special song from library"""
+        """Pick a special song from the library with type-ahead search"""
         labels = {
             'goal_song': 'Goal Song',
             'zamboni': 'Zamboni Song',
@@ -1536,15 +2628,73 @@ class HockeyMusicGUI:
             'penalty_kill': 'Penalty Kill Song'
         }
         
-        song_name = simpledialog.askstring(
-            f"Set {labels.get(song_type, 'Song')}",
-            "Enter the exact name of the song from your library:",
-            parent=self.root
-        )
-        if song_name:
+        label = labels.get(song_type, 'Song')
+        
+        picker = tk.Toplevel(self.root)
+        picker.title(f"Set {label}")
+        picker.geometry("480x360")
+        picker.transient(self.root)
+        previous_grab = picker.grab_current()  # the config window, when opened from there
+        picker.grab_set()
+        
+        frame = ttk.Frame(picker, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text="Type part of the title or artist:").pack(anchor=tk.W)
+        query = tk.StringVar(value=song_var.get())
+        entry = ttk.Entry(frame, textvariable=query, width=50)
+        entry.pack(fill=tk.X, pady=5)
+        results = tk.Listbox(frame, font=('Arial', 11), height=12, selectmode=tk.SINGLE)
+        results.pack(fill=tk.BOTH, expand=True)
+        hint = ttk.Label(frame, text="", font=('Arial', 9, 'italic'))
+        hint.pack(anchor=tk.W, pady=(5, 0))
+        
+        def update_results(*args):
+            results.delete(0, tk.END)
+            typed = query.get()
+            for track in self.core.search(typed, 'track', limit=30) if typed.strip() else []:
+                results.insert(tk.END, track)
+            if results.size():
+                results.selection_set(0)
+                hint.config(text="↑/↓ to pick, Enter or double-click to choose")
+            else:
+                hint.config(text="No match in the library - Enter uses the name exactly as typed")
+        
+        def move(step):
+            if not results.size():
+                return "break"
+            selection = results.curselection()
+            index = min(max((selection[0] if selection else -1) + step, 0), results.size() - 1)
+            results.selection_clear(0, tk.END)
+            results.selection_set(index)
+            results.see(index)
+            return "break"
+        
+        def close(event=None):
+            picker.destroy()
+            if previous_grab and previous_grab.winfo_exists():
+                previous_grab.grab_set()
+        
+        def choose(event=None):
+            selection = results.curselection()
+            song_name = results.get(selection[0]).split(' | ')[0] if selection else query.get().strip()
+            if not song_name:
+                return
+            close()
             song_var.set(song_name)
             self.save_config()
-            messagebox.showinfo("Success", f"{labels.get(song_type, 'Song')} set to: {song_name}")
+            messagebox.showinfo("Success", f"{label} set to: {song_name}")
+        
+        query.trace_add('write', update_results)
+        entry.bind('<Down>', lambda e: move(1))
+        entry.bind('<Up>', lambda e: move(-1))
+        entry.bind('<Return>', choose)
+        results.bind('<Double-Button-1>', choose)
+        results.bind('<Return>', choose)
+        picker.bind('<Escape>', close)
+        picker.protocol("WM_DELETE_WINDOW", close)
+        update_results()
+        entry.focus_set()
+        entry.select_range(0, tk.END)
     
     def load_playlist(self):
         """Load tracks from selected playlist"""
@@ -1553,99 +2703,137 @@ class HockeyMusicGUI:
             messagebox.showwarning("No Playlist", "Please select a playlist first!")
             return
         
-        tracks = self.controller.get_playlist_tracks(playlist_name)
-        if tracks:
-            self.playlist_tracks = tracks
-            self.shuffled_order = list(range(len(tracks)))
-            self.update_playlist_display()
-            self.save_config()
-            messagebox.showinfo("Success", f"Loaded {len(tracks)} tracks")
-        else:
-            messagebox.showerror("Error", f"Could not load tracks from: {playlist_name}")
+        def done(track_count):
+            if track_count:
+                self.update_playlist_display()
+                messagebox.showinfo("Success", f"Loaded {track_count} tracks")
+            else:
+                messagebox.showerror("Error", f"Could not load tracks from: {playlist_name}")
+        
+        self._edit('load_playlist', self.core.load_playlist, playlist_name,
+                   lambda name, tracks: self.run_on_ui(lambda: self._apply_revalidated_playlist(name, tracks)),
+                   on_done=done)
     
     def update_playlist_display(self):
         """Update the listbox with current track order"""
+        self.playlist_search.sync(self.core.playlist_tracks)
         self.playlist_listbox.delete(0, tk.END)
-        for i, track_idx in enumerate(self.shuffled_order):
-            track = self.playlist_tracks[track_idx]
+        for i, track_idx in enumerate(self.core.shuffled_order):
+            track = self.core.playlist_tracks[track_idx]
             
-            # Add indicator if track has custom start time
-            if track in self.start_times:
-                start_time = self.start_times[track]
-                display_text = f"{i+1}. ⏱️ [{self.format_seconds(start_time)}] {track}"
-            else:
-                display_text = f"{i+1}. {track}"
+            # Add indicator if track has custom start/end time
+            markers = ""
+            if track in self.core.start_times:
+                markers += f"⏱️ [{self.format_seconds(self.core.start_times[track])}] "
+            if track in self.core.end_times:
+                markers += f"⏹️ [{self.format_seconds(self.core.end_times[track])}] "
+            display_text = f"{i+1}. {markers}{track}"
             
             self.playlist_listbox.insert(tk.END, display_text)
+        self._show_loaded_playlists()
+    
+    def _show_loaded_playlists(self):
+        """Offer every loaded playlist in the segment switcher"""
+        names = tuple(self.core.loaded_playlist_names())
+        if tuple(self.segment_combo['values']) != names:
+            self.segment_combo['values'] = names
+        if self.segment_var.get() != self.core.playlist_name:
+            self.segment_var.set(self.core.playlist_name)
+    
+    def switch_segment(self, event=None):
+        """Switch to another loaded playlist (no Music call), picking up where it was left"""
+        playlist_name = self.segment_var.get()
+        if playlist_name == self.core.playlist_name:
+            return
+        
+        def done(track_count):
+            self.current_playlist.set(playlist_name)
+            self.update_playlist_display()
+            self.playlist_listbox.selection_clear(0, tk.END)
+            self._update_playlist_highlight()
+            self.playlist_listbox.see(self.core.current_track_index)
+            self.current_track_label.config(
+                text=f"🔀 '{playlist_name}' - {track_count} tracks, next up #{self.core.current_track_index + 1}")
+        
+        self._edit('switch_playlist', self.core.switch_playlist, playlist_name, on_done=done)
+        self.root.focus_set()  # hand the keyboard back to the hotkeys
     
     def shuffle_playlist(self):
         """Shuffle the playlist order"""
-        import random
-        random.shuffle(self.shuffled_order)
-        self.update_playlist_display()
+        def done(result):
+            self.update_playlist_display()
+            
+            # Reset to first song and highlight it
+            self.playlist_listbox.selection_clear(0, tk.END)
+            self.playlist_listbox.selection_set(0)
+            self.playlist_listbox.see(0)
+            self.playlist_listbox.activate(0)
         
-        # Reset to first song and highlight it
-        self.current_track_index = 0
-        self.playlist_listbox.selection_clear(0, tk.END)
-        self.playlist_listbox.selection_set(0)
-        self.playlist_listbox.see(0)
-        self.playlist_listbox.activate(0)
+        self._edit('shuffle', self.core.shuffle, on_done=done)
     
     def reset_playlist_order(self):
         """Reset playlist to original order"""
-        self.shuffled_order = list(range(len(self.playlist_tracks)))
-        self.update_playlist_display()
+        self._edit('reset_order', self.core.reset_order, on_done=lambda result: self.update_playlist_display())
     
     def play_from_top(self):
         """Play the first track in the current order"""
-        if not self.shuffled_order or not self.current_playlist.get():
-            messagebox.showwarning("No Playlist", "Please load a playlist first!")
-            return
-        
-        playlist_name = self.current_playlist.get()
-        # Reset to first track
-        self.current_track_index = 0
-        # Play the first track in shuffled order (convert to 1-indexed)
-        first_track_idx = self.shuffled_order[0] + 1
-        self.controller.play_track_from_playlist(playlist_name, first_track_idx)
+        self._press('play_from_top', self.core.play_from_top)
     
     def play_selected_track(self, event):
         """Play the track that was double-clicked"""
         selection = self.playlist_listbox.curselection()
-        if not selection or not self.current_playlist.get():
+        if not selection or not self.core.playlist_name:
             return
         
         list_idx = selection[0]
-        # Update our current position
-        self.current_track_index = list_idx
-        
-        # Get track info for start time lookup
-        track_info = self.playlist_tracks[self.shuffled_order[list_idx]]
-        
-        playlist_name = self.current_playlist.get()
-        # Convert shuffled index to actual playlist index (1-indexed)
-        actual_track_idx = self.shuffled_order[list_idx] + 1
-        
-        # Check if this track has a custom start time
-        if track_info in self.start_times:
-            start_time = self.start_times[track_info]
-            self.controller.play_track_from_playlist_with_start_time(playlist_name, actual_track_idx, start_time)
-        else:
-            self.controller.play_track_from_playlist(playlist_name, actual_track_idx)
+        # Play it and make it our current position
+        self._press('play_track', self.core.play_track_at, list_idx)
         
         # Keep highlight on this song
         self.playlist_listbox.selection_clear(0, tk.END)
         self.playlist_listbox.selection_set(list_idx)
     
+    def search_playlist(self, *args):
+        """Select the loaded playlist's best match for the search box"""
+        matches = self.playlist_search.search(self.playlist_search_var.get(), limit=1)
+        if not matches:
+            return
+        positions = {}
+        for list_idx, track_idx in enumerate(self.core.shuffled_order):
+            positions.setdefault(self.core.playlist_tracks[track_idx], list_idx)
+        list_idx = positions.get(matches[0])
+        if list_idx is None:
+            return
+        self.playlist_listbox.selection_clear(0, tk.END)
+        self.playlist_listbox.selection_set(list_idx)
+        self.playlist_listbox.see(list_idx)
+        self.playlist_listbox.activate(list_idx)
+    
+    def on_search_enter(self, event):
+        """Play the search match and clear the search box"""
+        if self.playlist_search_var.get().strip():
+            self.play_selected_track(event)
+        self.clear_playlist_search()
+        return "break"
+    
+    def clear_playlist_search(self, event=None):
+        """Empty the search box and hand the keyboard back to the hotkeys"""
+        self.playlist_search_var.set('')
+        self.root.focus_set()
+        return "break"
+    
     def _update_playlist_highlight(self):
         """Manually update the playlist highlight to current track index - only if needed"""
         # Only update if there's no current selection (user hasn't manually selected)
         current_selection = self.playlist_listbox.curselection()
-        if not current_selection and self.current_track_index < self.playlist_listbox.size():
+        size = self.playlist_listbox.size()
+        if not current_selection and size:
+            # Where the playlist will be once queued Next presses have run
+            index = (self.core.current_track_index + self.playback.pending_count('next')) % size
             # Clear previous selection
             self.playlist_listbox.selection_clear(0, tk.END)
             # Highlight current track
-            self.playlist_listbox.selection_set(self.current_track_index)
+            self.playlist_listbox.selection_set(index)
     
     def on_arrow_up(self, event):
         """Handle up arrow key in playlist"""
@@ -1656,7 +2844,7 @@ class HockeyMusicGUI:
                 self.playlist_listbox.selection_clear(0, tk.END)
                 self.playlist_listbox.selection_set(idx - 1)
                 self.playlist_listbox.see(idx - 1)
-                self.current_track_index = idx - 1
+                self.core.current_track_index = idx - 1
         return "break"  # Prevent default behavior
     
     def on_arrow_down(self, event):
@@ -1668,7 +2856,7 @@ class HockeyMusicGUI:
                 self.playlist_listbox.selection_clear(0, tk.END)
                 self.playlist_listbox.selection_set(idx + 1)
                 self.playlist_listbox.see(idx + 1)
-                self.current_track_index = idx + 1
+                self.core.current_track_index = idx + 1
         return "break"  # Prevent default behavior
     
     def on_enter_key(self, event):
@@ -1683,30 +2871,17 @@ class HockeyMusicGUI:
         if not selection:
             return "break"
         
-        highlighted_idx = selection[0]
-        
-        # Check if music is playing
-        is_playing = self.controller.is_playing()
-        
-        if is_playing:
-            # Stop the current music
-            self.controller.stop()
-        else:
+        def stop_or_play(highlighted_idx):
+            # Check if music is playing
+            if self.controller.is_playing():
+                # Stop the current music
+                return self.core.stop()
             # Not playing - play the highlighted song
-            self.current_track_index = highlighted_idx
-            playlist_name = self.current_playlist.get()
-            if playlist_name and self.shuffled_order:
-                # Get track info for start time lookup
-                track_info = self.playlist_tracks[self.shuffled_order[highlighted_idx]]
-                
-                actual_track_idx = self.shuffled_order[highlighted_idx] + 1
-                # Check if this track has a custom start time
-                if track_info in self.start_times:
-                    start_time = self.start_times[track_info]
-                    self.controller.play_track_from_playlist_with_start_time(playlist_name, actual_track_idx, start_time)
-                else:
-                    self.controller.play_track_from_playlist(playlist_name, actual_track_idx)
+            self.core.current_track_index = highlighted_idx
+            if self.core.playlist_name and self.core.shuffled_order:
+                return self.core.play_track_at(highlighted_idx)
         
+        self._press('stop_or_play', stop_or_play, selection[0])
         return "break"  # Prevent default listbox behavior
     
     def on_drag_start(self, event):
@@ -1718,8 +2893,7 @@ class HockeyMusicGUI:
         current_index = self.playlist_listbox.nearest(event.y)
         if current_index != self.drag_start_index:
             # Swap items
-            item = self.shuffled_order.pop(self.drag_start_index)
-            self.shuffled_order.insert(current_index, item)
+            self.core.move_track(self.drag_start_index, current_index)
             self.update_playlist_display()
             self.playlist_listbox.selection_set(current_index)
             self.drag_start_index = current_index
@@ -1728,7 +2902,7 @@ class HockeyMusicGUI:
         """Show right-click context menu for track"""
         # Get the track under the cursor
         index = self.playlist_listbox.nearest(event.y)
-        if index < 0 or index >= len(self.shuffled_order):
+        if index < 0 or index >= len(self.core.shuffled_order):
             return
         
         # Select the track
@@ -1736,14 +2910,14 @@ class HockeyMusicGUI:
         self.playlist_listbox.selection_set(index)
         
         # Get track info
-        track_info = self.playlist_tracks[self.shuffled_order[index]]
+        track_info = self.core.playlist_tracks[self.core.shuffled_order[index]]
         
         # Create context menu
         menu = tk.Menu(self.root, tearoff=0)
         
         # Show current start time if set
-        if track_info in self.start_times:
-            current_time = self.start_times[track_info]
+        if track_info in self.core.start_times:
+            current_time = self.core.start_times[track_info]
             menu.add_command(
                 label=f"⏱️ Start Time: {self.format_seconds(current_time)}",
                 state='disabled'
@@ -1763,12 +2937,29 @@ class HockeyMusicGUI:
                 command=lambda: self.set_track_start_time(index, track_info)
             )
         
+        # End time (auto-stop point)
+        menu.add_separator()
+        if track_info in self.core.end_times:
+            menu.add_command(
+                label=f"⏹️ Edit End Time ({self.format_seconds(self.core.end_times[track_info])})",
+                command=lambda: self.set_track_end_time(track_info)
+            )
+            menu.add_command(
+                label="🗑️ Remove End Time",
+                command=lambda: self.remove_track_end_time(track_info)
+            )
+        else:
+            menu.add_command(
+                label="⏹️ Set End Time",
+                command=lambda: self.set_track_end_time(track_info)
+            )
+        
         # Show menu
         menu.tk_popup(event.x_root, event.y_root)
     
     def set_track_start_time(self, index, track_info):
         """Set custom start time for a track"""
-        current_time = self.start_times.get(track_info, 0)
+        current_time = self.core.start_times.get(track_info, 0)
         current_formatted = self.format_seconds(current_time)
         
         # Ask for start time
@@ -1787,7 +2978,7 @@ class HockeyMusicGUI:
                 seconds = self.parse_time_string(time_str)
                 
                 # Store the start time
-                self.start_times[track_info] = seconds
+                self.core.start_times[track_info] = seconds
                 self.save_config()
                 
                 # Update display to show indicator
@@ -1802,12 +2993,50 @@ class HockeyMusicGUI:
     
     def remove_track_start_time(self, track_info):
         """Remove custom start time for a track"""
-        if track_info in self.start_times:
-            del self.start_times[track_info]
+        if track_info in self.core.start_times:
+            del self.core.start_times[track_info]
             self.save_config()
             self.update_playlist_display()
             messagebox.showinfo("Success", "Start time removed")
     
+    def set_track_end_time(self, track_info):
+        """Set the point where a track automatically fades out and stops"""
+        current_formatted = self.format_seconds(self.core.end_times.get(track_info, 0))
+        
+        time_str = simpledialog.askstring(
+            "Set End Time",
+            f"Enter auto-stop time for:\n{track_info}\n\n"
+            f"Current: {current_formatted}\n\n"
+            "Format: seconds (e.g., '45') or MM:SS (e.g., '1:30')",
+            parent=self.root,
+            initialvalue=current_formatted
+        )
+        
+        if time_str:
+            try:
+                seconds = self.parse_time_string(time_str)
+                if seconds <= self.core.start_times.get(track_info, 0):
+                    raise ValueError("End time must be after the start time.")
+                
+                self.core.end_times[track_info] = seconds
+                self.save_config()
+                self.update_playlist_display()
+                
+                messagebox.showinfo(
+                    "Success",
+                    f"End time set to {self.format_seconds(seconds)}"
+                )
+            except ValueError as e:
+                messagebox.showerror("Invalid Time", str(e))
+    
+    def remove_track_end_time(self, track_info):
+        """Remove the auto-stop point for a track"""
+        if track_info in self.core.end_times:
+            del self.core.end_times[track_info]
+            self.save_config()
+            self.update_playlist_display()
+            messagebox.showinfo("Success", "End time removed")
+    
     def parse_time_string(self, time_str):
         """Parse time string to seconds (supports 'MM:SS' or just seconds)"""
         time_str = time_str.strip()
@@ -1838,12 +3067,101 @@ class HockeyMusicGUI:
         return f"{minutes}:{secs:02d}"
 
 
+def make_music_controller(backend='applescript', config=None):
+    """Music backend by name: 'applescript' (default), 'jxa' (bulk JSON playlist queries),
+    'mpv' (local music folder, Linux - settings from the "mpv_*" keys of config) or 'async'
+    (AppleScript on an asyncio loop - a cap on concurrent osascript calls and a timeout on
+    each, from the "async_*" keys of config)"""
+    if backend == 'async':
+        from async_music import SyncMusicController
+        return SyncMusicController.from_config(config or {})
+    if backend == 'jxa':
+        from jxa_backend import JXAMusicController
+        return JXAMusicController()
+    if backend == 'mpv':
+        from mpv_backend import MpvMusicController
+        return MpvMusicController.from_config(config or {})
+    return AppleMusicController()
+
+
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Hockey Stoppage Time Music Controller")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without the GUI, controlled over the local command API (see hockeyctl.py)")
+    parser.add_argument('--host', default='127.0.0.1', help="command API address (headless mode)")
+    parser.add_argument('--port', type=int, default=8765, help="command API port (headless mode)")
+    parser.add_argument('--rinks', metavar='FILE',
+                        help="headless: drive every rink in this rinks file from one process (see multi_rink.py)")
+    parser.add_argument('--backend', choices=['applescript', 'jxa', 'mpv', 'async'],
+                        help="Music via AppleScript, or JavaScript for Automation (faster playlist queries, "
+                             "handles commas and pipes in names), or mpv with a local music folder (Linux), "
+                             "or AppleScript on an asyncio loop (bounded, time-limited osascript calls); "
+                             "default: \"backend\" in the config file, else applescript")
+    parser.add_argument('--engine', action='store_true',
+                        help="run only the playback engine the GUI connects to (see engine_process.py)")
+    parser.add_argument('--socket', default='~/.hockey_engine.sock', help="engine socket path")
+    parser.add_argument('--in-process', action='store_true',
+                        help="run the GUI and the playback engine in one process (music stops with the window)")
+    parser.add_argument('--log-level', help="DEBUG, INFO, WARNING or ERROR (default: \"log_level\" in the config "
+                                            "file, else INFO); game logs go to ~/hockey_logs")
+    args = parser.parse_args()
+    
+    saved_config = {}
+    try:
+        with open(os.path.expanduser("~/hockey_music_config.json"), 'r') as f:
+            saved_config = json.load(f)
+    except (OSError, ValueError):
+        pass
+    backend = args.backend or saved_config.get('backend', 'applescript')
+    role = 'rinks' if args.rinks else 'headless' if args.headless else 'engine' if args.engine else 'gui'
+    app_log.setup_logging(role, args.log_level or saved_config.get('log_level', 'INFO'))
+    
+    def new_backend():
+        return make_music_controller(backend, saved_config)
+    
+    if args.rinks:
+        from command_server import run_headless
+        from multi_rink import RinkManager, load_rinks
+        run_headless(host=args.host, port=args.port, dispatcher=RinkManager(load_rinks(args.rinks)))
+        return
+    
+    if args.headless:
+        from command_server import run_headless
+        run_headless(lambda call_later: HockeyController(new_backend(), call_later=call_later,
+                                                         journal=GameJournal(), playlist_cache=PlaylistCache()),
+                     args.host, args.port)
+        return
+    
+    if args.engine:
+        from engine_process import run_engine
+        run_engine(lambda call_later: HockeyController(new_backend(), call_later=call_later,
+                                                       journal=GameJournal(), playlist_cache=PlaylistCache()),
+                   args.socket, args.host, args.port)
+        return
+    
+    core = None
+    if not args.in_process:
+        from engine_process import RemoteCore, connect_or_spawn
+        try:
+            core = RemoteCore(connect_or_spawn(args.socket, ['--backend', backend]))
+        except (OSError, RuntimeError) as e:
+            print(f"⚠️  No playback engine ({e}) - running in one process")
+    if core is None:
+        core = HockeyController(new_backend(), journal=GameJournal(),
+                                playlist_cache=PlaylistCache())
+    
     root = tk.Tk()
-    app = HockeyMusicGUI(root)
+    app = HockeyMusicGUI(root, core)
     root.mainloop()
+    if app.watchdog:
+        print_summary(app.watchdog.stop())
+    if app.core.journal:
+        app.core.journal.close()
 
 
 if __name__ == "__main__":
-    main()
+    # Run the module the way engine_process and the backends import it, so there is one copy
+    # of the controller classes instead of a __main__ one next to theirs
+    import hockey_music_controller
+    hockey_music_controller.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Hockey Controller CLI
+Thin client for the headless command server (hockey_music_controller.py --headless)
+
+Examples:
+    python3 hockeyctl.py goal
+    python3 hockeyctl.py next
+    python3 hockeyctl.py announce_goal team=home scorer=7 assist1=10 assist2=11
+    python3 hockeyctl.py final_score home_score=5 visiting_team=Rivals visiting_score=3
+    python3 hockeyctl.py status
+    python3 hockeyctl.py --rink rink2 goal      # multi-rink server (--rinks)
+"""
+
+import argparse
+import json
+import sys
+import urllib.request
+import urllib.error
+
+from command_server import DEFAULT_HOST, DEFAULT_PORT
+
+
+def send_command(action, params=None, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=60, rink=None):
+    """POST one action to the server, returns the response dict"""
+    path = f"{rink}/{action}" if rink else action
+    request = urllib.request.Request(
+        f"http://{host}:{port}/{path}",
+        data=json.dumps(params or {}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a command to the headless hockey controller")
+    parser.add_argument('action', help="goal, zamboni, next, stop, play_pause, announce_goal, final_score, status, ...")
+    parser.add_argument('params', nargs='*', help="key=value parameters")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--rink', help="rink id when the server drives several rinks")
+    args = parser.parse_args()
+
+    params = {}
+    for item in args.params:
+        key, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f"Parameters must be key=value, got: {item}")
+        params[key] = value
+
+    try:
+        response = send_command(args.action, params, args.host, args.port, rink=args.rink)
+    except urllib.error.URLError as e:
+        print(f"❌ Could not reach controller at {args.host}:{args.port}: {e.reason}")
+        return 1
+
+    if response.get('ok'):
+        result = response.get('result')
+        if isinstance(result, (dict, list)):
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"✓ {response['action']}" + (f": {result}" if result not in (None, True) else "")
+                  + f" ({response.get('latency_ms')} ms)")
+        return 0
+
+    print(f"❌ {response.get('error', 'Command failed')}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
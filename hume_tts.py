@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Hume TTS settings
+The Hume configuration and SDK, loaded once and shared by everything that synthesizes
+
+Live announcements (hockey_music_controller.py), the phrase cache and the baked
+announcement pack all read the same HumeConfig. It lives here, not in the
+controller script, so that running the controller as a script doesn't leave a
+second copy that settings (or a test's patch) never reach.
+
+The Hume SDK and python-dotenv are imported on first use, not at startup -
+the SDK alone can take longer to import than the whole GUI takes to build.
+"""
+
+import importlib.util
+import os
+from collections import namedtuple
+
+HumeConfig = namedtuple('HumeConfig', ['available', 'api_key', 'voice_id', 'base_url'], defaults=[None])
+_hume_config = None
+_hume_sdk = None
+_hume_async_sdk = None
+
+
+def hume_config():
+    """Hume settings (available, api_key, voice_id, base_url) - loads .env on first call
+
+    base_url (HUME_BASE_URL) points the live announcements at another TTS server,
+    e.g. the stub server of bench_tts.py; unset means the Hume API.
+    """
+    global _hume_config
+    if _hume_config is None:
+        if importlib.util.find_spec('hume') and importlib.util.find_spec('dotenv'):
+            from dotenv import load_dotenv
+            load_dotenv()
+            # Hardcoded custom voice ID
+            _hume_config = HumeConfig(True, os.getenv('HUME_API_KEY'), "Hockey Goal Announcer",
+                                      os.getenv('HUME_BASE_URL') or None)
+        else:
+            _hume_config = HumeConfig(False, None, None)
+    return _hume_config
+
+
+def hume_enabled():
+    """True if announcements will use Hume (SDK installed and API key set)"""
+    config = hume_config()
+    return bool(config.available and config.api_key)
+
+
+def load_hume_sdk():
+    """Import the Hume SDK once, returns (HumeClient, PostedUtterance, PostedUtteranceVoiceWithName)"""
+    global _hume_sdk
+    if _hume_sdk is None:
+        from hume import HumeClient
+        from hume.tts import PostedUtterance, PostedUtteranceVoiceWithName
+        _hume_sdk = (HumeClient, PostedUtterance, PostedUtteranceVoiceWithName)
+    return _hume_sdk
+
+
+def hume_client(api_key, base_url=None):
+    """A HumeClient, pointed at base_url (HUME_BASE_URL) when there is one"""
+    HumeClient = load_hume_sdk()[0]
+    return HumeClient(api_key=api_key, base_url=base_url) if base_url else HumeClient(api_key=api_key)
+
+
+def load_hume_async_sdk():
+    """Import the Hume SDK's asyncio client once, returns (AsyncHumeClient, PostedUtterance,
+    PostedUtteranceVoiceWithName) - for async_music.py"""
+    global _hume_async_sdk
+    if _hume_async_sdk is None:
+        from hume import AsyncHumeClient
+        from hume.tts import PostedUtterance, PostedUtteranceVoiceWithName
+        _hume_async_sdk = (AsyncHumeClient, PostedUtterance, PostedUtteranceVoiceWithName)
+    return _hume_async_sdk
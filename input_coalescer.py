@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Input Coalescer
+Playback command lane that collapses bursts and drops commands a newer one made obsolete
+
+Operator commands go through press() instead of running one after another in full:
+
+    N N N N N        -> one next_track(5) once the burst settles (settle_ms)
+    SPACE SPACE      -> nothing (the second toggle cancels the first, which waits toggle_ms for it)
+    N  then  G       -> the pending Next still advances the playlist, then the goal song plays
+    G  then  S       -> a goal song still waiting in the queue is dropped; only Stop runs
+    G G (bounce)     -> a repeat of the same command within debounce_ms is ignored
+
+A command that is already talking to Music always finishes - only queued ones are
+merged or cancelled (their Futures are cancelled). submit() runs anything else in
+order and is never merged; call_later() matches Tk's after() and CommandWorker.
+add_listener() callbacks run on the worker after each command, before its Future
+resolves - the place to read state only the worker changes.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from app_log import get_logger
+
+log = get_logger('input')
+
+MERGE = 'merge'           # consecutive presses add up (Next)
+TOGGLE = 'toggle'         # two pending presses cancel out (Play/Pause)
+SUPERSEDE = 'supersede'   # replaces queued toggles/supersedes (Stop, cues, play track)
+BARRIER = 'barrier'       # submit(): runs as-is, nothing merges across it
+
+# Command name -> kind; anything else pressed is SUPERSEDE
+COMMAND_KINDS = {
+    'next': MERGE,
+    'play_pause': TOGGLE,
+}
+
+
+class _Entry:
+    __slots__ = ('command', 'kind', 'handler', 'args', 'kwargs', 'count', 'future', 'ready_at')
+
+    def __init__(self, command, kind, handler, args, kwargs, count=1, ready_at=0.0):
+        self.command = command
+        self.kind = kind
+        self.handler = handler
+        self.args = args
+        self.kwargs = kwargs
+        self.count = count
+        self.future = Future()
+        self.ready_at = ready_at
+
+    def run(self):
+        if self.kind == MERGE:
+            return self.handler(self.count, *self.args, **self.kwargs)
+        return self.handler(*self.args, **self.kwargs)
+
+
+class CoalescingWorker:
+    """Runs playback commands one at a time on a dedicated thread, coalescing bursts"""
+
+    def __init__(self, name='playback', settle_ms=150, debounce_ms=120, toggle_ms=120):
+        self.settle = settle_ms / 1000
+        self.debounce = debounce_ms / 1000
+        self.toggle = toggle_ms / 1000  # a toggle waits this long for a second press that cancels it
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._last_press = None     # (command, args, monotonic time, future)
+        self._stopping = False
+        self._listeners = []
+        self.stats = {'pressed': 0, 'executed': 0, 'merged': 0, 'cancelled': 0, 'debounced': 0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def press(self, command, handler, *args, count=1, **kwargs):
+        """Queue an operator command, returns a Future with its result
+
+        MERGE commands call handler(count, *args) once per settled burst; the
+        Future is cancelled if the command was dropped as obsolete.
+        """
+        kind = COMMAND_KINDS.get(command, SUPERSEDE)
+        now = time.monotonic()
+        with self._cond:
+            self.stats['pressed'] += 1
+            tail = self._pending[-1] if self._pending else None
+
+            if kind == MERGE:
+                if tail is not None and tail.command == command and tail.args == args:
+                    tail.count += count
+                    tail.ready_at = now + self.settle
+                    self.stats['merged'] += 1
+                    return tail.future
+                entry = _Entry(command, kind, handler, args, kwargs, count, now + self.settle)
+            else:
+                if kind == TOGGLE and tail is not None and tail.command == command and tail.args == args:
+                    # Second toggle before the first ran - net effect is nothing
+                    self._pending.pop()
+                    self._cancel(tail)
+                    self._last_press = None
+                    future = Future()
+                    future.cancel()
+                    return future
+                last = self._last_press
+                if last and last[0] == command and last[1] == args and now - last[2] < self.debounce:
+                    self.stats['debounced'] += 1
+                    return last[3]
+                if kind == SUPERSEDE:
+                    self._supersede_pending(now)
+                ready_at = now + self.toggle if kind == TOGGLE else now
+                entry = _Entry(command, kind, handler, args, kwargs, ready_at=ready_at)
+                self._last_press = (command, args, now, entry.future)
+
+            self._pending.append(entry)
+            self._cond.notify()
+            return entry.future
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) as-is, returns a Future with its result"""
+        with self._cond:
+            entry = _Entry(None, BARRIER, fn, args, kwargs)
+            self._pending.append(entry)
+            self._cond.notify()
+            return entry.future
+
+    def call_later(self, delay_ms, callback):
+        """Run callback on this worker after delay_ms (same signature as Tk's after)"""
+        timer = threading.Timer(delay_ms / 1000, lambda: self.submit(callback))
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def add_listener(self, callback):
+        """callback() after every command or submitted call, on the worker thread, before its Future resolves"""
+        self._listeners.append(callback)
+
+    def pending_count(self, command):
+        """Total count of a MERGE command waiting to run (e.g. Next presses not yet sent)"""
+        with self._cond:
+            return sum(e.count for e in self._pending if e.command == command)
+
+    def stop(self):
+        """Finish queued work and end the thread"""
+        with self._cond:
+            self._stopping = True
+            for entry in self._pending:
+                entry.ready_at = 0.0
+            self._cond.notify()
+        self._thread.join()
+
+    def _supersede_pending(self, now):
+        """Cancel queued toggles/supersedes after the last barrier; flush queued merges"""
+        survivors = []
+        seen_barrier = False
+        for entry in reversed(self._pending):
+            if entry.kind == BARRIER:
+                seen_barrier = True
+            if seen_barrier or entry.kind == MERGE:
+                if entry.kind == MERGE:
+                    entry.ready_at = now   # still advance the playlist - just don't wait
+                survivors.append(entry)
+            else:
+                self._cancel(entry)
+        self._pending = deque(reversed(survivors))
+
+    def _cancel(self, entry):
+        if entry.future.cancel():
+            self.stats['cancelled'] += 1
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending:
+                        delay = self._pending[0].ready_at - time.monotonic()
+                        if delay <= 0:
+                            entry = self._pending.popleft()
+                            break
+                        self._cond.wait(delay)
+                    elif self._stopping:
+                        return
+                    else:
+                        self._cond.wait()
+            if not entry.future.set_running_or_notify_cancel():
+                continue
+            if entry.kind != BARRIER:
+                self.stats['executed'] += 1
+            try:
+                result = entry.run()
+            except BaseException as e:
+                self._notify()
+                entry.future.set_exception(e)
+            else:
+                self._notify()
+                entry.future.set_result(result)
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                log.exception(f"❌ Input lane listener failed: {e}")
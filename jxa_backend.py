@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+JXA Music Backend
+Playlist queries as JavaScript for Automation, returning JSON
+
+The AppleScript queries loop over tracks one Apple Event at a time and join the
+results into delimited text, so a playlist called "Goals, Celebrations" or a
+title containing "|" comes back mangled. Here each query reads a property of
+every item in one call (playlist.tracks.name()) and the result is JSON - names
+are passed as script arguments, never spliced into the source.
+
+    python3 hockey_music_controller.py --backend jxa
+
+Everything else (play, stop, volume, fades...) is inherited from AppleMusicController.
+"""
+
+import hashlib
+import json
+import subprocess
+import time
+
+from app_log import get_logger
+from hockey_music_controller import AppleMusicController
+
+log = get_logger('music')
+
+# Each script's run(argv) returns a JSON string
+PLAYLISTS_JS = '''
+function run(argv) {
+    return JSON.stringify(Application("Music").playlists.name());
+}
+'''
+
+PLAYLIST_TRACKS_JS = '''
+function run(argv) {
+    var tracks = Application("Music").playlists.byName(argv[0]).tracks;
+    return JSON.stringify({names: tracks.name(), artists: tracks.artist()});
+}
+'''
+
+LIBRARY_TRACKS_JS = '''
+function run(argv) {
+    var tracks = Application("Music").libraryPlaylists[0].tracks;
+    return JSON.stringify({names: tracks.name(), artists: tracks.artist()});
+}
+'''
+
+PLAYLIST_IDS_JS = '''
+function run(argv) {
+    return JSON.stringify(Application("Music").playlists.byName(argv[0]).tracks.databaseID());
+}
+'''
+
+
+class JXAMusicController(AppleMusicController):
+    """AppleMusicController whose playlist queries use bulk JXA property reads"""
+
+    @staticmethod
+    def run_jxa(script, *args, max_retries=2, retry_delay=0.5, silent_on_error=False):
+        """Run a JXA script with arguments, returns (stdout, success)"""
+        for attempt in range(max_retries):
+            try:
+                result = subprocess.run(
+                    ['osascript', '-l', 'JavaScript', '-e', script, *args],
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
+                if result.returncode == 0:
+                    return result.stdout.strip(), True
+                if not silent_on_error:
+                    log.warning(f"⚠️  JXA error (attempt {attempt + 1}/{max_retries}): {result.stderr.strip()}")
+            except subprocess.TimeoutExpired:
+                if not silent_on_error:
+                    log.warning(f"⏱️  JXA timeout (attempt {attempt + 1}/{max_retries})")
+            except Exception as e:
+                if not silent_on_error:
+                    log.error(f"❌ JXA error (attempt {attempt + 1}/{max_retries}): {e}")
+            if attempt < max_retries - 1:
+                time.sleep(retry_delay)
+        return "", False
+
+    @staticmethod
+    def parse_playlists(output):
+        """Playlist names from PLAYLISTS_JS output"""
+        names = json.loads(output) if output else []
+        return [n for n in names if isinstance(n, str) and n]
+
+    @staticmethod
+    def parse_playlist_tracks(output):
+        """"Name | Artist" entries from PLAYLIST_TRACKS_JS output"""
+        data = json.loads(output) if output else {}
+        names = data.get('names') or []
+        artists = data.get('artists') or []
+        return [f"{name} | {artist or ''}" for name, artist in zip(names, artists)]
+
+    @staticmethod
+    def parse_fingerprint(output):
+        """Same "<count>:<hash>" fingerprint as AppleMusicController.get_playlist_fingerprint"""
+        ids = [str(i) for i in json.loads(output)] if output else []
+        return f"{len(ids)}:{hashlib.sha1(','.join(ids).encode('utf-8')).hexdigest()[:16]}"
+
+    def _query(self, script, parse, *args, silent_on_error=False):
+        output, success = self.run_jxa(script, *args, silent_on_error=silent_on_error)
+        if not success:
+            return None
+        try:
+            return parse(output)
+        except (ValueError, AttributeError, TypeError) as e:
+            log.error(f"❌ Unexpected JXA output: {e}")
+            return None
+
+    def get_playlists(self):
+        """Get all playlists from Apple Music"""
+        return self._query(PLAYLISTS_JS, self.parse_playlists) or []
+
+    def get_playlist_tracks(self, playlist_name):
+        """Get tracks from a specific playlist"""
+        return self._query(PLAYLIST_TRACKS_JS, self.parse_playlist_tracks, playlist_name) or []
+
+    def get_library_tracks(self):
+        """Every track in the library as a "Name | Artist" entry"""
+        return self._query(LIBRARY_TRACKS_JS, self.parse_playlist_tracks) or []
+
+    def get_playlist_fingerprint(self, playlist_name):
+        """Cheap change check for a playlist (None on failure)"""
+        return self._query(PLAYLIST_IDS_JS, self.parse_fingerprint, playlist_name, silent_on_error=True)
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+mpv Playback Backend
+Plays a local music folder through a persistent mpv instance driven over its JSON IPC socket
+
+For the Linux backup machine and for CI - no Music app, no osascript, no afplay:
+
+    {"backend": "mpv", "mpv_library": "~/Music/Hockey"}          in ~/hockey_music_config.json
+    python3 hockey_music_controller.py --backend mpv             # or choose it per run
+
+Library layout - every subfolder is a playlist (files in name order) and so is every
+.m3u/.m3u8 file at the top level; cue songs are found by title anywhere in the library:
+
+    ~/Music/Hockey/Stoppage Music/01 Artist - Title.mp3
+    ~/Music/Hockey/Goal Songs/Artist - Title.m4a
+    ~/Music/Hockey/Warmup.m3u
+
+Track names come from the file names ("Artist - Title" -> "Title | Artist").
+mpv is started once (idle, no video) and left running, so it outlives a GUI or engine
+restart. "mpv_audio_output": "null" plays silently - used by test_mpv_backend.py to
+drive the whole controller end to end without a sound card.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import re
+import socket
+import subprocess
+import threading
+import time
+
+from app_log import get_logger
+from audio_dsp import TARGET_LUFS
+from hockey_music_controller import AppleMusicController
+
+DEFAULT_LIBRARY = '~/Music/Hockey'
+DEFAULT_MPV_SOCKET = '~/.hockey_mpv.sock'
+AUDIO_EXTENSIONS = {'.mp3', '.m4a', '.aac', '.flac', '.ogg', '.oga', '.opus', '.wav', '.aif', '.aiff'}
+PLAYLIST_EXTENSIONS = {'.m3u', '.m3u8'}
+
+log = get_logger('music')
+
+
+class MpvError(Exception):
+    """mpv rejected a command or could not be reached"""
+
+
+def track_name_artist(path):
+    """(name, artist) from a file name like "01 Artist - Title.mp3" """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    stem = re.sub(r'^\d+[\s.\-_]+', '', stem).strip()
+    if ' - ' in stem:
+        artist, name = stem.split(' - ', 1)
+        return name.strip(), artist.strip()
+    return stem, ''
+
+
+def track_label(path):
+    """"Name | Artist" - the same format as the Music backends' playlist tracks"""
+    name, artist = track_name_artist(path)
+    return f"{name} | {artist}"
+
+
+class MusicLibrary:
+    """Playlists from a folder: each subfolder and each top-level .m3u/.m3u8 file
+
+    find_track looks titles up in an index built by the last full scan, and rescans
+    only when a scanned folder's modification time changed (a file added, removed or
+    renamed in it) - a stat per folder instead of listing every file on each lookup.
+    """
+
+    def __init__(self, root=DEFAULT_LIBRARY):
+        self.root = os.path.expanduser(root)
+        self._index = None  # (folder mtimes, {title: path}, {file name: path}) from the last scan
+        self._index_lock = threading.Lock()
+
+    def playlists(self):
+        """Playlist names, sorted"""
+        if not os.path.isdir(self.root):
+            log.warning(f"⚠️  Music library not found: {self.root}")
+            return []
+        names = []
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and not entry.name.startswith('.'):
+                names.append(entry.name)
+            elif os.path.splitext(entry.name)[1].lower() in PLAYLIST_EXTENSIONS:
+                names.append(os.path.splitext(entry.name)[0])
+        return sorted(names, key=str.lower)
+
+    def playlist_files(self, playlist_name):
+        """Audio file paths of a playlist in play order ([] if there is no such playlist)"""
+        folder = os.path.join(self.root, playlist_name)
+        if os.path.isdir(folder):
+            return sorted((e.path for e in os.scandir(folder)
+                           if e.is_file() and os.path.splitext(e.name)[1].lower() in AUDIO_EXTENSIONS),
+                          key=lambda p: os.path.basename(p).lower())
+        for extension in PLAYLIST_EXTENSIONS:
+            m3u = folder + extension
+            if os.path.isfile(m3u):
+                return self._read_m3u(m3u)
+        return []
+
+    @staticmethod
+    def _read_m3u(path):
+        files = []
+        base = os.path.dirname(path)
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    files.append(os.path.normpath(os.path.join(base, os.path.expanduser(line))))
+        return files
+
+    def all_files(self):
+        """Every audio file under the library root (and a fresh title index for find_track)"""
+        files, folders = [], {}
+        for folder, dirs, names in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            folders[folder] = _mtime(folder)
+            files.extend(os.path.join(folder, name) for name in sorted(names)
+                         if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS)
+        titles, stems = {}, {}
+        for path in files:
+            titles.setdefault(track_name_artist(path)[0].lower(), path)
+            stems.setdefault(os.path.splitext(os.path.basename(path))[0].lower(), path)
+        with self._index_lock:
+            self._index = (folders, titles, stems)
+        return files
+
+    def find_track(self, track_name):
+        """Path of the first file whose title (or file name) matches track_name, or None"""
+        with self._index_lock:
+            index = self._index
+        if index is None or any(_mtime(folder) != mtime for folder, mtime in index[0].items()):
+            self.all_files()
+            with self._index_lock:
+                index = self._index
+        _, titles, stems = index
+        wanted = track_name.strip().lower()
+        return titles.get(wanted) or stems.get(wanted)
+
+    def fingerprint(self, playlist_name):
+        """"<count>:<hash>" over file names and modification times (None if no such playlist)"""
+        files = self.playlist_files(playlist_name)
+        if not files and playlist_name not in self.playlists():
+            return None
+        parts = []
+        for path in files:
+            try:
+                parts.append(f"{os.path.relpath(path, self.root)}@{os.path.getmtime(path):.0f}")
+            except OSError:
+                parts.append(path)
+        return f"{len(files)}:{hashlib.sha1(','.join(parts).encode('utf-8')).hexdigest()[:16]}"
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None  # removed since the scan
+
+
+class _MpvFade:
+    """Fade-out-and-stop on a thread, with the poll/kill/wait of the osascript fade process"""
+
+    def __init__(self, backend, duration, start_volume, steps):
+        self._done = threading.Event()
+        self._killed = False
+        self._thread = threading.Thread(target=self._run, args=(backend, duration, start_volume, steps), daemon=True)
+        self._thread.start()
+
+    def _run(self, backend, duration, start_volume, steps):
+        step_delay = max(duration / steps, 0.01)
+        try:
+            for i in range(1, steps + 1):
+                if self._killed:
+                    return
+                backend.set_volume(int(start_volume * (steps - i) / steps))
+                time.sleep(step_delay)
+            if not self._killed:
+                backend.stop()
+                backend.set_volume(start_volume)
+        finally:
+            self._done.set()
+
+    def poll(self):
+        return 0 if self._done.is_set() else None
+
+    def kill(self):
+        self._killed = True
+
+    def wait(self):
+        self._done.wait()
+        return 0
+
+
+class MpvMusicController(AppleMusicController):
+    """Music backend playing a local library through mpv's JSON IPC"""
+
+    def __init__(self, library=DEFAULT_LIBRARY, socket_path=DEFAULT_MPV_SOCKET, audio_output=None, mpv='mpv'):
+        self.library = MusicLibrary(library)
+        self.socket_path = os.path.expanduser(socket_path)
+        self.audio_output = audio_output  # mpv --ao, e.g. "null" for silent tests
+        self.mpv = mpv
+        self.current_path = None  # file last loaded, so Play after Stop restarts it
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._sock = None
+        self._reader = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Backend from the "mpv_*" keys of a config dict"""
+        return cls(config.get('mpv_library', DEFAULT_LIBRARY), config.get('mpv_socket', DEFAULT_MPV_SOCKET),
+                   config.get('mpv_audio_output'), config.get('mpv_path', 'mpv'))
+
+    def _audio_args(self):
+        return [f'--ao={self.audio_output}'] if self.audio_output else []
+
+    # IPC
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+
+    def _start_mpv(self):
+        """Connect to the running mpv, starting it (idle, no video) if needed"""
+        try:
+            self._connect()
+            return
+        except OSError:
+            pass
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        log.info(f"🎛️  Starting mpv (IPC {self.socket_path})")
+        try:
+            subprocess.Popen(
+                [self.mpv, '--idle=yes', '--no-video', '--no-terminal', '--keep-open=no',
+                 f'--input-ipc-server={self.socket_path}', *self._audio_args()],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                start_new_session=True  # keeps playing if the controller exits
+            )
+        except OSError as e:
+            raise MpvError(f"Could not start mpv: {e}")
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            try:
+                self._connect()
+                return
+            except OSError:
+                continue
+        raise MpvError(f"mpv did not open {self.socket_path}")
+
+    def _disconnect(self):
+        if self._sock:
+            self._sock.close()
+        self._sock = self._reader = None
+
+    def command(self, *args):
+        """Run one mpv command, returns its data (raises MpvError)"""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._start_mpv()
+                    return self._request(list(args))
+                except OSError as e:
+                    self._disconnect()  # mpv went away - start/reconnect once
+                    if attempt:
+                        raise MpvError(f"mpv connection failed: {e}")
+
+    def _request(self, args):
+        request_id = next(self._ids)
+        self._sock.sendall((json.dumps({'command': args, 'request_id': request_id}) + '\n').encode('utf-8'))
+        while True:
+            line = self._reader.readline()
+            if not line.endswith(b'\n'):
+                raise OSError("mpv closed the connection")  # before or partway through a reply
+            try:
+                message = json.loads(line)
+            except ValueError:
+                self._disconnect()  # no telling where the next reply starts - reconnect on the next command
+                raise MpvError(f"{args[0]}: unreadable reply from mpv: {line[:80]!r}")
+            if message.get('request_id') != request_id:
+                continue  # an event
+            if message.get('error') != 'success':
+                raise MpvError(f"{args[0]}: {message.get('error')}")
+            return message.get('data')
+
+    def get_property(self, name, default=None):
+        try:
+            return self.command('get_property', name)
+        except MpvError:
+            return default  # e.g. no file loaded
+
+    def set_property(self, name, value):
+        try:
+            self.command('set_property', name, value)
+            return True
+        except MpvError as e:
+            log.warning(f"⚠️  mpv: {e}")
+            return False
+
+    def run_applescript(self, script, max_retries=3, retry_delay=0.5, silent_on_error=False):
+        if not silent_on_error:
+            log.warning("⚠️  AppleScript is not available with the mpv backend")
+        return "", False
+
+    # Library queries
+    def get_playlists(self):
+        """Get all playlists (folders and .m3u files in the library)"""
+        return self.library.playlists()
+
+    def get_playlist_tracks(self, playlist_name):
+        """Get tracks from a specific playlist"""
+        return [track_label(path) for path in self.library.playlist_files(playlist_name)]
+
+    def get_library_tracks(self):
+        """Every audio file under the library folder as a "Name | Artist" entry"""
+        return [track_label(path) for path in self.library.all_files()]
+
+    def get_playlist_fingerprint(self, playlist_name):
+        """Cheap change check for a playlist (None if it doesn't exist)"""
+        return self.library.fingerprint(playlist_name)
+
+    def warm_up(self):
+        """Start mpv and scan the library folder, returns True once mpv answers"""
+        self.library.playlists()
+        return self.get_property('idle-active') is not None
+
+    def missing_tracks(self, track_names):
+        """The names play_track_by_name would not find in the library"""
+        return [name for name in track_names if not self.library.find_track(name)]
+
+    # Playback
+    def _load(self, path, start_time=0):
+        try:
+            self.command('set_property', 'start', str(start_time) if start_time else 'none')
+            self.command('loadfile', path, 'replace')
+            self.command('set_property', 'pause', False)
+        except MpvError as e:
+            log.error(f"❌ FAILED: Could not play {os.path.basename(path)}: {e}")
+            return False
+        self.current_path = path
+        return True
+
+    def play_track_from_playlist(self, playlist_name, track_index):
+        """Play a specific track by index from playlist (1-indexed)"""
+        return self.play_track_from_playlist_with_start_time(playlist_name, track_index, 0)
+
+    def play_track_from_playlist_with_start_time(self, playlist_name, track_index, start_time):
+        """Play a specific track by index from playlist with custom start time (1-indexed)"""
+        files = self.library.playlist_files(playlist_name)
+        if not 1 <= track_index <= len(files):
+            log.error(f"❌ FAILED: No track {track_index} in '{playlist_name}'")
+            return False
+        success = self._load(files[track_index - 1], start_time)
+        if success:
+            at = f" at {start_time}s" if start_time else ""
+            log.info(f"✓ Playing track {track_index} from '{playlist_name}'{at}")
+        return success
+
+    def play_track_by_name(self, track_name):
+        """Play a specific track by name"""
+        path = self.library.find_track(track_name)
+        if not path:
+            log.error(f"❌ FAILED: '{track_name}' not found in {self.library.root}")
+            return False
+        return self._load(path)
+
+    def _idle(self):
+        return self.get_property('idle-active', True)
+
+    def play_pause(self):
+        """Toggle play/pause (after a stop, restarts the last track like Music does)"""
+        if self._idle():
+            return self._load(self.current_path) if self.current_path else False
+        try:
+            self.command('cycle', 'pause')
+            return True
+        except MpvError:
+            return False
+
+    def pause(self):
+        """Pause playback"""
+        return self.set_property('pause', True)
+
+    def stop(self):
+        """Stop playback"""
+        try:
+            self.command('stop')
+            return True
+        except MpvError as e:
+            log.error(f"❌ FAILED: Could not stop music: {e}")
+            return False
+
+    def get_current_track(self):
+        """Get currently playing track info"""
+        if self._idle():
+            return "No track playing"
+        path = self.get_property('path')
+        if not path:
+            return "Unknown"
+        name, artist = track_name_artist(path)
+        return f"{name} - {artist}" if artist else name
+
+    def get_current_track_name_only(self):
+        """Get just the name of the currently playing track"""
+        if self._idle():
+            return ""
+        path = self.get_property('path')
+        return track_name_artist(path)[0] if path else ""
+
+    def is_playing(self):
+        """Check if music is currently playing"""
+        return not self._idle() and not self.get_property('pause', True)
+
+    def get_volume(self):
+        """Get mpv's volume (0-100)"""
+        volume = self.get_property('volume')
+        return int(round(volume)) if volume is not None else None
+
+    def set_volume(self, volume):
+        """Set mpv's volume (0-100)"""
+        return self.set_property('volume', int(volume))
+
+    def start_fade_out(self, duration, start_volume, steps=20):
+        """Start a fade-out-and-stop, returns a handle with poll()/kill()/wait()"""
+        return _MpvFade(self, duration, start_volume, steps)
+
+    def play_sound_file(self, path):
+        """Play a local audio file to completion (separate one-shot mpv, blocking)"""
+        subprocess.run([self.mpv, '--no-video', '--no-terminal', '--no-config', *self._audio_args(), path],
+                       stdin=subprocess.DEVNULL, check=False)
+
+    def spawn_sound_file(self, path, volume=1.0):
+        """Start a separate one-shot mpv on a local audio file without waiting, returns the process"""
+        level = [f"--volume={volume * 100:.0f}", '--volume-max=400'] if volume != 1.0 else []
+        return subprocess.Popen([self.mpv, '--no-video', '--no-terminal', '--no-config', *self._audio_args(), *level,
+                                 path], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def speak(self, announcement, use_hume=True, loudness_target=TARGET_LUFS, trim=True, segue=None):
+        """Hume announcement played through mpv instead of afplay"""
+        return AppleMusicController.speak(announcement, use_hume, player=self.play_sound_file,
+                                          loudness_target=loudness_target, trim=trim, segue=segue)
+
+    def quit(self):
+        """End the mpv instance (it otherwise keeps running on purpose)"""
+        with self._lock:
+            if self._sock is None:
+                try:
+                    self._connect()
+                except OSError:
+                    return  # not running
+            try:
+                self._sock.sendall(b'{"command": ["quit"]}\n')
+            except OSError:
+                pass
+            self._disconnect()
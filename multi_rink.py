@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Multi-Rink Controller
+Drives several independent sheets of ice from one process
+
+Each rink gets its own HockeyController (config, playlist state, roster, journal),
+its own Music backend and its own CommandDispatcher - so its own playback and
+announcer worker threads. A slow Music call or a long announcement on one rink
+never queues behind, or in front of, another rink's commands.
+
+    python3 hockey_music_controller.py --headless --rinks ~/hockey_rinks.json
+    python3 hockeyctl.py --rink rink2 goal
+    curl http://127.0.0.1:8765/rink1/goal
+    curl http://127.0.0.1:8765/latency          # per-rink latency report
+
+Rinks file:
+    {"rinks": [
+        {"id": "rink1", "name": "Main Rink", "config_file": "~/hockey_music_config.json"},
+        {"id": "rink2", "name": "Rink 2", "machine": "eppc://rink2.local",
+         "config_file": "~/hockey_music_config_rink2.json"}
+    ]}
+
+"machine" is optional - without it the rink uses Music on this Mac ("backend":
+"jxa" selects the JavaScript for Automation queries, see jxa_backend.py; "mpv" with
+"mpv_library" and its own "mpv_socket" plays a local folder, see mpv_backend.py). A rink's
+roster comes from "roster_file" in its own config file.
+"""
+
+import json
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+
+from app_log import get_logger
+from command_server import CommandDispatcher
+from game_journal import DEFAULT_JOURNAL_DIR, GameJournal
+from hockey_music_controller import HockeyController, RemoteMusicController, make_music_controller
+from playlist_cache import PlaylistCache
+
+log = get_logger('rinks')
+
+DEFAULT_RINKS_FILE = '~/hockey_rinks.json'
+LATENCY_WINDOW = 500  # samples kept per rink and action
+
+
+def load_rinks(path=DEFAULT_RINKS_FILE):
+    """Rink definitions from a rinks file, with ids and config files filled in"""
+    with open(os.path.expanduser(path), 'r') as f:
+        rinks = json.load(f)['rinks']
+    for i, rink in enumerate(rinks, 1):
+        rink.setdefault('id', f"rink{i}")
+        rink.setdefault('name', rink['id'])
+        rink.setdefault('config_file', f"~/hockey_music_config_{rink['id']}.json")
+        rink.setdefault('playlist_cache', f"~/hockey_playlist_cache_{rink['id']}.json")
+        if '/' in rink['id']:
+            raise ValueError(f"Rink id may not contain '/': {rink['id']}")
+    return rinks
+
+
+def make_backend(rink):
+    """Music backend for a rink definition (local, or remote when it names a machine)"""
+    if rink.get('machine'):
+        return RemoteMusicController(rink['machine'])
+    return make_music_controller(rink.get('backend', 'applescript'), rink)
+
+
+class RinkManager:
+    """One CommandDispatcher per rink, with per-rink latency tracking
+
+    Drop-in dispatcher for CommandServer: requests go to /<rink id>/<action>.
+    """
+
+    def __init__(self, rinks, backend_factory=make_backend, journal_dir=DEFAULT_JOURNAL_DIR):
+        self.rinks = {}
+        self.names = {}
+        self._latency = defaultdict(lambda: defaultdict(lambda: deque(maxlen=LATENCY_WINDOW)))
+        self._errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+        for rink in rinks:
+            rink_id = rink['id']
+            if rink_id in self.rinks:
+                raise ValueError(f"Duplicate rink id: {rink_id}")
+            journal = GameJournal(os.path.join(journal_dir, rink_id)) if journal_dir else None
+            backend = backend_factory(rink)
+            cache = PlaylistCache(rink['playlist_cache']) if rink.get('playlist_cache') else None
+            self.rinks[rink_id] = CommandDispatcher(
+                lambda call_later, rink=rink, backend=backend, journal=journal, cache=cache: HockeyController(
+                    backend, rink['config_file'], call_later, journal=journal, playlist_cache=cache
+                )
+            )
+            self.names[rink_id] = rink.get('name', rink_id)
+        log.info(f"🏟️  Managing {len(self.rinks)} rinks: {', '.join(self.rinks)}", rinks=list(self.rinks))
+
+    def warm_up(self):
+        """Warm up every rink's backend in parallel (each on its own playback worker)"""
+        return {rink_id: dispatcher.warm_up() for rink_id, dispatcher in self.rinks.items()}
+
+    def core(self, rink_id):
+        """HockeyController for a rink (KeyError if unknown)"""
+        return self.rinks[rink_id].core
+
+    def submit(self, rink_id, action, params):
+        """Start an action on a rink without waiting, returns a Future
+
+        Raises KeyError for an unknown rink or action.
+        """
+        started = time.perf_counter()
+        future = self.rinks[rink_id].submit(action, params)
+
+        def done(future):
+            if future.cancelled():
+                return  # superseded by a newer command before it reached Music
+            try:
+                ok = future.result() is not False
+            except Exception:
+                ok = False
+            self._record_latency(rink_id, action, (time.perf_counter() - started) * 1000, ok)
+
+        future.add_done_callback(done)
+        return future
+
+    def dispatch(self, rink_id, action, params):
+        """Run one action on a rink, returns (http_status, response dict)"""
+        if rink_id not in self.rinks:
+            return 404, {'ok': False, 'rink': rink_id, 'action': action, 'error': f"Unknown rink: {rink_id}"}
+        started = time.perf_counter()
+        status, response = self.rinks[rink_id].dispatch(action, params)
+        if status != 404:
+            self._record_latency(rink_id, action, (time.perf_counter() - started) * 1000, status in (200, 409))
+        response['rink'] = rink_id
+        return status, response
+
+    def dispatch_path(self, path, params):
+        """Route "/<rink>/<action>", "/rinks" or "/latency", returns (http_status, response dict)"""
+        parts = path.strip('/').split('/', 1)
+        if parts[0] in ('', 'rinks'):
+            return 200, {'ok': True, 'action': 'rinks', 'result': self.rink_list()}
+        if parts[0] == 'latency':
+            return 200, {'ok': True, 'action': 'latency', 'result': self.latency_report()}
+        return self.dispatch(parts[0], parts[1] if len(parts) > 1 and parts[1] else 'status', params)
+
+    def rink_list(self):
+        """{rink id: display name}"""
+        return dict(self.names)
+
+    def _record_latency(self, rink_id, action, latency_ms, ok):
+        with self._lock:
+            self._latency[rink_id][action].append(latency_ms)
+            if not ok:
+                self._errors[rink_id] += 1
+
+    def latency_report(self):
+        """Per-rink command latency (ms): overall and per action, over recent commands"""
+        with self._lock:
+            samples = {rink_id: {action: list(values) for action, values in actions.items()}
+                       for rink_id, actions in self._latency.items()}
+            errors = dict(self._errors)
+        report = {}
+        for rink_id in self.rinks:
+            actions = samples.get(rink_id, {})
+            everything = [ms for values in actions.values() for ms in values]
+            report[rink_id] = dict(_latency_stats(everything), errors=errors.get(rink_id, 0),
+                                   actions={action: _latency_stats(values) for action, values in sorted(actions.items())})
+        return report
+
+    def shutdown(self):
+        """Drain every rink's workers and close their journals"""
+        for dispatcher in self.rinks.values():
+            dispatcher.shutdown()
+
+
+def _latency_stats(values):
+    if not values:
+        return {'count': 0, 'p50_ms': None, 'p95_ms': None, 'max_ms': None}
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'p50_ms': round(statistics.median(ordered), 1),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 1),
+        'max_ms': round(ordered[-1], 1),
+    }
+
+
+def print_latency_report(report, names=None):
+    print(f"   {'rink':<14}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'errors':>8}")
+    for rink_id, stats in report.items():
+        label = (names or {}).get(rink_id, rink_id)
+        if not stats['count']:
+            print(f"   {label:<14}{0:>7}{'-':>10}{'-':>10}{'-':>10}{stats['errors']:>8}")
+            continue
+        print(f"   {label:<14}{stats['count']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['max_ms']:>10.1f}{stats['errors']:>8}")
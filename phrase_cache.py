@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Phrase Cache
+Live announcements synthesized phrase by phrase, each phrase kept on disk for the next one
+
+A whole-sentence announcement is new text for every scorer and assist combination,
+so live TTS never gets to reuse anything. Here an announcement is split into its
+phrases (AppleMusicController.goal_announcement_fragments: lead-in, scorer, assist
+clauses, "Unassisted!", final-score parts). Each phrase is looked up in the baked
+pack (announcement_pack.py), then in this cache, and only the ones found in neither
+are synthesized - all at once, in parallel. A goal by a known scorer with new
+assists then costs one or two short synth calls instead of a full sentence.
+
+Phrases are stored trimmed and leveled (audio_dsp.prepare_wav), one WAV per phrase
+named after a hash of the voice, loudness target and text. Pack phrases are baked
+as synthesized, so only they are trimmed while stitching. Phrases are stitched with
+a short crossfade; the silence pads trim_silence leaves make the pause between them.
+
+    python3 phrase_cache.py info
+    python3 phrase_cache.py clear
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from announcement_pack import spoken_text, synthesize_hume
+from app_log import get_logger
+from audio_dsp import TARGET_LUFS, convert, mix, prepare_wav, read_wav, segue_wav, trim_silence, wav_bytes
+from hume_tts import hume_client, hume_config
+
+DEFAULT_PHRASE_DIR = '~/hockey_phrases'
+CROSSFADE_MS = 15
+SYNTH_TIMEOUT = 5.0   # seconds for all missing phrases of one announcement
+MEMORY_PHRASES = 256  # most recently used phrases kept decoded
+
+log = get_logger('tts')
+
+
+class PhraseCache:
+    """Synthesized phrases as WAV files in a directory, filled as announcements need them"""
+
+    def __init__(self, directory=DEFAULT_PHRASE_DIR, voice=None, synthesize=None, loudness_target=TARGET_LUFS,
+                 workers=4, timeout=SYNTH_TIMEOUT):
+        self.directory = os.path.expanduser(directory)
+        self.voice = voice if voice or synthesize else hume_config().voice_id
+        self.loudness_target = loudness_target
+        self.timeout = timeout
+        self._synthesize = synthesize  # synthesize(text) -> WAV bytes, default Hume (see _synthesizer)
+        self._memory = OrderedDict()   # text -> (format, pcm), least recently used first
+        self._inflight = {}            # text -> Future of a synthesis already running
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='phrase-synth')
+
+    def _path(self, text):
+        key = f"{self.voice}\n{self.loudness_target}\n{text}".encode('utf-8')
+        return os.path.join(self.directory, hashlib.sha1(key).hexdigest()[:20] + '.wav')
+
+    def audio(self, text):
+        """(format, pcm) of a cached phrase, or None"""
+        with self._lock:
+            entry = self._memory.get(text)
+            if entry is not None:
+                self._memory.move_to_end(text)
+                return entry
+        try:
+            with open(self._path(text), 'rb') as f:
+                entry = read_wav(f.read())
+        except (OSError, EOFError, wave.Error) as e:
+            if not isinstance(e, FileNotFoundError):
+                log.warning(f"⚠️  Cached phrase unreadable, synthesizing it again: {e}", phrase=text)
+            return None
+        self._remember(text, entry)
+        return entry
+
+    def _remember(self, text, entry):
+        with self._lock:
+            self._memory[text] = entry
+            self._memory.move_to_end(text)
+            while len(self._memory) > MEMORY_PHRASES:
+                self._memory.popitem(last=False)
+
+    def _synthesizer(self):
+        if self._synthesize is None:
+            hume = hume_config()
+            if not (hume.available and hume.api_key):
+                raise RuntimeError("Hume is not configured (needs the hume SDK and HUME_API_KEY in .env)")
+            client = hume_client(hume.api_key, hume.base_url)
+            self._synthesize = lambda text: synthesize_hume(text, self.voice, hume.api_key, client)  # noqa: E731
+        return self._synthesize
+
+    def _synthesize_phrase(self, text):
+        """Synthesize, trim and level one phrase, then store it"""
+        try:
+            data, _ = prepare_wav(self._synthesizer()(text), self.loudness_target)
+            entry = read_wav(data)
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self._path(text))
+            self._remember(text, entry)
+            return entry
+        finally:
+            with self._lock:
+                self._inflight.pop(text, None)
+
+    def fill(self, texts):
+        """Synthesize every phrase that isn't cached, in parallel - returns (synthesized, [failed phrases])
+
+        Waits at most `timeout` seconds; a phrase still synthesizing then is reported
+        as failed but is stored when it arrives, for the next announcement.
+        """
+        missing = [text for text in dict.fromkeys(texts) if self.audio(text) is None]
+        futures = {}
+        for text in missing:
+            with self._lock:
+                future = self._inflight.get(text)
+                if future is None:
+                    future = self._inflight[text] = self._pool.submit(self._synthesize_phrase, text)
+            futures[future] = text
+        done, _ = wait(futures, timeout=self.timeout)
+        failed = []
+        for future, text in futures.items():
+            error = future.exception() if future in done else f'timed out after {self.timeout:g}s'
+            if error is not None:
+                log.error(f"❌ Phrase not synthesized: {error}", phrase=text, error=str(error))
+                failed.append(text)
+        return len(missing) - len(failed), failed
+
+    def assemble(self, fragments, pack=None):
+        """(format, pcm) of an announcement stitched from the pack and this cache, None if a phrase is missing"""
+        segments = []
+        for text in (spoken_text(f) for f in fragments):
+            if not text:
+                continue
+            if pack is not None and text in pack.phrases:
+                entry = (pack.format, trim_silence(pack.format, bytes(pack.audio(text)))[0])
+            else:
+                entry = self.audio(text)
+            if entry is None:
+                return None
+            segments.append(entry)
+        if not segments:
+            return None
+        audio_format = segments[0][0]
+        pcm = b''
+        for segment_format, segment in segments:
+            segment = convert(segment_format, segment, audio_format)
+            pcm = mix(audio_format, pcm, segment, CROSSFADE_MS, crossfade=True) if pcm else segment
+        return audio_format, pcm
+
+    def speak(self, fragments, player, pack=None, segue=None):
+        """Play an announcement phrase by phrase with player(path), returns a speak()-style result dict
+
+        Phrases in neither the pack nor the cache are synthesized first. A segue
+        (audio_dsp.Segue) is mixed onto the end, as in AppleMusicController.speak.
+        The result's stages are the ms spent on each step (synthesize_ms when a
+        phrase was missing, assemble_ms, segue_ms, write_ms, play_ms).
+        """
+        started = mark = time.perf_counter()
+        result = {'engine': 'phrases', 'ok': False, 'error': None, 'segued': False, 'synthesized': 0,
+                  'synth_ms': None, 'total_ms': None, 'stages': {}}
+
+        def stage(name):
+            nonlocal mark
+            now = time.perf_counter()
+            result['stages'][name] = (now - mark) * 1000
+            mark = now
+
+        texts = [t for t in (spoken_text(f) for f in fragments) if t and not (pack and t in pack.phrases)]
+        result['synthesized'], failed = self.fill(texts)
+        if result['synthesized'] or failed:
+            stage('synthesize_ms')
+        assembled = None if failed else self.assemble(fragments, pack)
+        if assembled is not None:
+            stage('assemble_ms')
+        result['synth_ms'] = (time.perf_counter() - started) * 1000
+        if assembled is None:
+            result['error'] = f"{len(failed)} phrases not synthesized"
+            log.error(f"❌ Announcement not assembled: {result['error']} - skipping announcement")
+        else:
+            audio, result['segued'] = segue_wav(wav_bytes(*assembled), segue)
+            if segue is not None:
+                stage('segue_ms')
+            fd, temp_path = tempfile.mkstemp(suffix='.wav')
+            try:
+                with os.fdopen(fd, 'wb') as temp_audio:
+                    temp_audio.write(audio)
+                stage('write_ms')
+                player(temp_path)
+                stage('play_ms')
+                result['ok'] = True
+                log.info(f"✓ Announcement from phrases ({result['synthesized']} synthesized)",
+                         synthesized=result['synthesized'])
+            except Exception as e:
+                log.error(f"❌ Announcement playback failed: {e}")
+                result['error'] = str(e)
+                result['segued'] = False
+            finally:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+        result['total_ms'] = (time.perf_counter() - started) * 1000
+        log.debug("Announcement finished", **result)
+        return result
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phrases synthesized for live announcements")
+    parser.add_argument('command', choices=['info', 'clear'])
+    parser.add_argument('--dir', default=DEFAULT_PHRASE_DIR, help="phrase directory")
+    args = parser.parse_args()
+
+    directory = os.path.expanduser(args.dir)
+    files = [os.path.join(directory, name) for name in os.listdir(directory)
+             if name.endswith('.wav')] if os.path.isdir(directory) else []
+    if args.command == 'info':
+        size = sum(os.path.getsize(path) for path in files) / 1e6
+        print(f"🗂️  {args.dir}: {len(files)} phrases, {size:.1f} MB")
+    else:
+        for path in files:
+            os.unlink(path)
+        print(f"🗑️  Removed {len(files)} phrases from {args.dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Playlist Cache
+On-disk snapshots of playlist contents, keyed by playlist name
+
+Each entry keeps the track list plus a cheap change fingerprint (track count and
+a hash of the tracks' database IDs - one Apple Event instead of one per track).
+The controller shows a cached snapshot immediately and revalidates it in the
+background, only re-fetching and swapping the view when the fingerprint differs.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from app_log import get_logger
+
+DEFAULT_CACHE_FILE = '~/hockey_playlist_cache.json'
+
+log = get_logger('cache')
+
+
+class PlaylistCache:
+    """{playlist name: {fingerprint, tracks, saved_at}} persisted as one JSON file"""
+
+    def __init__(self, path=DEFAULT_CACHE_FILE):
+        self.path = os.path.expanduser(path)
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load_locked(self):
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, playlist_name):
+        """Cached snapshot dict for a playlist, or None"""
+        with self._lock:
+            entry = self._load_locked().get(playlist_name)
+        if entry and entry.get('tracks'):
+            return entry
+        return None
+
+    def put(self, playlist_name, fingerprint, tracks):
+        """Store a snapshot and write the cache file (atomically)"""
+        with self._lock:
+            entries = self._load_locked()
+            entries[playlist_name] = {'fingerprint': fingerprint, 'tracks': list(tracks), 'saved_at': time.time()}
+            directory = os.path.dirname(self.path) or '.'
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix='.playlist_cache_', dir=directory)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                log.warning(f"⚠️  Could not save playlist cache: {e}")
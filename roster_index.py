@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Roster Index
+Every team roster in rosters/, loaded once into memory and indexed by team and number
+
+One CSV per team (`number,Full Name`, no header). The team name comes from the
+file name: patriots_roster_2025.csv -> "Patriots", opponents_blue_devils.csv ->
+"Blue Devils". Lookups never touch the disk; refresh() re-reads only the files
+that changed since the last load.
+
+    python3 roster_index.py list
+    python3 roster_index.py lookup "Blue Devils" 12
+    python3 roster_index.py import league.csv      # team,number,name rows -> one CSV per team
+"""
+
+import argparse
+import csv
+import glob
+import os
+import re
+import threading
+
+from app_log import get_logger
+
+DEFAULT_ROSTER_DIR = 'rosters'
+
+log = get_logger('roster')
+_shared = {}  # roster folder -> RosterIndex, see shared_roster_index
+
+
+def team_name_for_file(path):
+    """Display team name for a roster file name"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    stem = re.sub(r'^opponents?_', '', stem)
+    stem = re.sub(r'_roster.*$', '', stem)
+    stem = re.sub(r'_\d{4}$', '', stem)
+    return stem.replace('_', ' ').strip().title()
+
+
+def roster_file_for_team(directory, team):
+    """Roster file path the bulk import writes for a team"""
+    slug = re.sub(r'[^a-z0-9]+', '_', team.lower()).strip('_')
+    return os.path.join(directory, f"{slug}_roster.csv")
+
+
+def read_roster_csv(path):
+    """{number: name} from one roster CSV"""
+    players = {}
+    with open(path, 'r', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and row[0].strip():
+                players[row[0].strip().lstrip('#')] = row[1].strip()
+    return players
+
+
+class RosterIndex:
+    """Team -> number -> player name, for every roster CSV in a directory"""
+
+    def __init__(self, directory=DEFAULT_ROSTER_DIR):
+        self.directory = os.path.expanduser(directory)
+        self._teams = {}    # team key (lower case) -> {number: name}
+        self._names = {}    # team key -> display name
+        self._files = {}    # path -> (mtime, team key)
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @staticmethod
+    def _key(team):
+        return (team or '').strip().lower()
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.refresh()
+
+    def refresh(self):
+        """(Re)load new or changed roster files, returns the number of teams"""
+        paths = sorted(glob.glob(os.path.join(self.directory, '*.csv')))
+        with self._lock:
+            for path in list(self._files):
+                if path not in paths:
+                    _, key = self._files.pop(path)
+                    self._teams.pop(key, None)
+                    self._names.pop(key, None)
+            for path in paths:
+                try:
+                    mtime = os.path.getmtime(path)
+                    if path in self._files and self._files[path][0] == mtime:
+                        continue
+                    players = read_roster_csv(path)
+                except (OSError, csv.Error) as e:
+                    log.error(f"❌ Error loading roster {os.path.basename(path)}: {e}")
+                    continue
+                name = team_name_for_file(path)
+                key = self._key(name)
+                self._teams[key] = players
+                self._names[key] = name
+                self._files[path] = (mtime, key)
+            self._loaded = True
+            count = len(self._teams)
+        log.info(f"✅ Roster index: {count} teams, {sum(len(p) for p in self._teams.values())} players")
+        return count
+
+    def teams(self):
+        """Display names of every team, sorted"""
+        self._ensure_loaded()
+        with self._lock:
+            return sorted(self._names.values())
+
+    def players(self, team):
+        """{number: name} for a team ({} if unknown)"""
+        self._ensure_loaded()
+        with self._lock:
+            return dict(self._teams.get(self._key(team), {}))
+
+    def lookup(self, team, number):
+        """Player name for a team and jersey number, or None"""
+        if number is None:
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            return self._teams.get(self._key(team), {}).get(str(number).strip().lstrip('#'))
+
+    def has_team(self, team):
+        """True if a roster is loaded for this team"""
+        self._ensure_loaded()
+        with self._lock:
+            return self._key(team) in self._teams
+
+    def import_league(self, path):
+        """Split a league CSV (team,number,name with a header row) into one roster per team
+
+        Existing rosters for the imported teams are replaced. Returns {team: players}.
+        """
+        self._ensure_loaded()
+        league = {}
+        with open(os.path.expanduser(path), 'r', newline='') as f:
+            reader = csv.DictReader(f)
+            fields = {name.strip().lower(): name for name in reader.fieldnames or []}
+            missing = [col for col in ('team', 'number', 'name') if col not in fields]
+            if missing:
+                raise ValueError(f"League CSV needs columns team, number, name (missing: {', '.join(missing)})")
+            for row in reader:
+                team = (row[fields['team']] or '').strip()
+                number = (row[fields['number']] or '').strip().lstrip('#')
+                if team and number:
+                    league.setdefault(team, []).append((number, (row[fields['name']] or '').strip()))
+
+        os.makedirs(self.directory, exist_ok=True)
+        for team, players in league.items():
+            existing = [p for p, (_, key) in self._files.items() if key == self._key(team)]
+            target = existing[0] if existing else roster_file_for_team(self.directory, team)
+            with open(target, 'w', newline='') as f:
+                csv.writer(f).writerows(players)
+        self.refresh()
+        log.info(f"✅ Imported {len(league)} team rosters into {self.directory}", path=path, teams=len(league))
+        return {team: len(players) for team, players in league.items()}
+
+
+def shared_roster_index(roster_file):
+    """The RosterIndex for roster_file's folder, shared by every caller (read on first lookup)
+
+    For announcements built without a controller, which keeps its own index.
+    """
+    directory = os.path.dirname(roster_file) or '.'
+    index = _shared.get(directory)
+    if index is None:
+        index = _shared.setdefault(directory, RosterIndex(directory))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Team rosters for PA announcements")
+    parser.add_argument('command', choices=['list', 'lookup', 'import'])
+    parser.add_argument('args', nargs='*', help="lookup: TEAM NUMBER, import: LEAGUE_CSV")
+    parser.add_argument('--dir', default=DEFAULT_ROSTER_DIR, help="roster directory")
+    args = parser.parse_args()
+
+    index = RosterIndex(args.dir)
+    if args.command == 'list':
+        for team in index.teams():
+            print(f"   {team:<24} {len(index.players(team)):3d} players")
+    elif args.command == 'lookup':
+        if len(args.args) != 2:
+            parser.error("lookup needs TEAM NUMBER")
+        name = index.lookup(*args.args)
+        print(name if name else f"❌ No #{args.args[1]} on {args.args[0]}")
+    else:
+        if len(args.args) != 1:
+            parser.error("import needs LEAGUE_CSV")
+        for team, count in sorted(index.import_league(args.args[0]).items()):
+            print(f"   {team:<24} {count:3d} players")
+
+
+if __name__ == '__main__':
+    main()
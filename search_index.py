@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Search Index
+Fuzzy type-ahead over track names, artists and playlist names
+
+Each entry is split into the trigrams of its words ("goal" -> "  g", " go", "goa",
+"oal", "al "), and every trigram maps to the set of entries containing it. A query
+only touches the sets of its own trigrams, so it costs about the same for 500 tracks
+as for 50,000. Matches rank by how many of the query's trigrams they share, then by
+whole-word and prefix matches, then by length. The last word of a query counts as
+unfinished ("sweet ca" finds "Sweet Caroline"), and a typo costs a few trigrams rather
+than the match ("carolnie" still finds it).
+
+The index is built once from one bulk library export and kept current incrementally:
+sync() with the next export only adds and removes what changed.
+
+    python3 search_index.py                                # type-ahead timing on 50,000 fake tracks
+    python3 search_index.py --tracks 20000 "sweet car" "zamboni"
+"""
+
+import argparse
+import heapq
+import random
+import statistics
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+MIN_MATCH = 0.5  # share of the query's trigrams an entry needs to match at all
+
+
+def normalize(text):
+    """Lower case words without accents or punctuation: "Beyoncé - Halo!" -> ['beyonce', 'halo']"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c if c.isalnum() else ' ' for c in text if not unicodedata.combining(c))
+    return text.lower().split()
+
+
+def trigrams(words, partial=False):
+    """Set of word trigrams; with partial=True the last word may continue ("sw" matches "sweet")"""
+    grams = set()
+    for i, word in enumerate(words):
+        padded = f"  {word}" if partial and i == len(words) - 1 else f"  {word} "
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """Trigram index over a set of strings, safe to query while another thread updates it"""
+
+    def __init__(self, texts=()):
+        self._ids = {}          # text -> entry id
+        self._entries = {}      # entry id -> (text, words)
+        self._sizes = {}        # entry id -> trigram count (shorter entries rank first on a tie)
+        self._postings = {}     # trigram -> set of entry ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.update(texts)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, text):
+        return text in self._ids
+
+    def add(self, text):
+        """Index one string, returns False if it was already there"""
+        if not text or text in self._ids:
+            return False
+        words = normalize(text)
+        grams = trigrams(words)
+        with self._lock:
+            if text in self._ids:
+                return False
+            entry_id = self._next_id
+            self._next_id += 1
+            self._ids[text] = entry_id
+            self._entries[entry_id] = (text, words)
+            self._sizes[entry_id] = len(grams)
+            for gram in grams:
+                ids = self._postings.get(gram)
+                if ids is None:
+                    self._postings[gram] = {entry_id}
+                else:
+                    ids.add(entry_id)
+        return True
+
+    def remove(self, text):
+        """Drop one string, returns False if it wasn't indexed"""
+        with self._lock:
+            entry_id = self._ids.pop(text, None)
+            if entry_id is None:
+                return False
+            _, words = self._entries.pop(entry_id)
+            del self._sizes[entry_id]
+            for gram in trigrams(words):
+                ids = self._postings.get(gram)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del self._postings[gram]
+        return True
+
+    def update(self, texts):
+        """Add every string not indexed yet, returns how many were new"""
+        return sum(1 for text in texts if self.add(text))
+
+    def sync(self, texts):
+        """Make the index hold exactly `texts`, returns (added, removed)"""
+        wanted = set(texts)
+        with self._lock:
+            removed = [text for text in self._ids if text not in wanted]
+        for text in removed:
+            self.remove(text)
+        return self.update(t for t in texts if t not in self._ids), len(removed)
+
+    def search(self, query, limit=20):
+        """Best matches for what has been typed so far, best first"""
+        words = normalize(query)
+        grams = trigrams(words, partial=not query[-1:].isspace())
+        if not grams:
+            return []
+        needed = max(1, round(len(grams) * MIN_MATCH))
+        shortlist_size = limit * 4
+        with self._lock:
+            postings = sorted((self._postings[g] for g in grams if g in self._postings), key=len)
+            if len(postings) < needed:
+                return []
+            # Usually enough entries have every trigram - set intersection finds those cheaply
+            full = set.intersection(*postings) if len(postings) == len(grams) else ()
+            if len(full) >= shortlist_size:
+                shortlist = heapq.nsmallest(shortlist_size, full, key=self._sizes.__getitem__)
+                hits = dict.fromkeys(shortlist, len(grams))
+            else:
+                # Typos: an entry with `needed` hits is in one of the len - needed + 1 rarest sets
+                candidates = set().union(*postings[:len(postings) - needed + 1])
+                hits = Counter()
+                for ids in postings:
+                    hits.update(candidates.intersection(ids) if len(ids) > len(candidates) else ids)
+                shortlist = heapq.nlargest(
+                    shortlist_size, (i for i, n in hits.items() if n >= needed),
+                    key=lambda i: (hits[i], -self._sizes[i])
+                )
+            scored = [(self._score(words, self._entries[i][1], hits[i] / len(grams), self._sizes[i]),
+                       self._entries[i][0]) for i in shortlist]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [text for _, text in scored[:limit]]
+
+    @staticmethod
+    def _score(query_words, words, coverage, size):
+        score = coverage
+        for i, word in enumerate(query_words):
+            last = i == len(query_words) - 1
+            if word in words:
+                score += 0.3
+            elif last and any(w.startswith(word) for w in words):
+                score += 0.2
+        n = len(query_words)
+        if len(words) >= n and words[:n - 1] == query_words[:-1] and words[n - 1].startswith(query_words[-1]):
+            score += 0.2  # the entry starts with what was typed
+        return score - size / 1000
+
+
+def synthetic_library(count, seed=7):
+    """`count` fake "Name | Artist" tracks"""
+    rng = random.Random(seed)
+    syllables = [c + v for c in 'bcdfghjklmnprstvwz' for v in 'aeiou'] + ['the', 'love', 'night', 'ing']
+
+    def word():
+        return ''.join(rng.choice(syllables) for _ in range(rng.randint(1, 4)))
+
+    tracks = {f"{' '.join(word().title() for _ in range(rng.randint(1, 4)))} | {word().title()} {word().title()}"
+              for _ in range(count)}
+    return sorted(tracks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Type-ahead timing for the search index")
+    parser.add_argument('queries', nargs='*', help="queries to type (default: a few fake titles)")
+    parser.add_argument('--tracks', type=int, default=50000, help="fake library size")
+    args = parser.parse_args()
+
+    tracks = synthetic_library(args.tracks)
+    started = time.perf_counter()
+    index = SearchIndex(tracks)
+    print(f"🔎 Indexed {len(index)} tracks in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    queries = args.queries or [t.split(' | ')[0] for t in random.Random(1).sample(tracks, 20)]
+    timings = []
+    for query in queries:
+        for end in range(1, len(query) + 1):  # every keystroke
+            started = time.perf_counter()
+            results = index.search(query[:end])
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"   {query!r} -> {results[0] if results else '(no match)'}")
+    timings.sort()
+    print(f"⏱️  {len(timings)} keystrokes: median {statistics.median(timings):.2f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms, max {timings[-1]:.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
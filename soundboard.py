@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Soundboard
+Every clip in sound_clips/ on a hotkey - decoded ahead of time, several playing at once
+
+Clips are named after their files ("Lets_Go_Patriots.m4a" -> "lets go patriots") and
+get hotkeys from the config's "soundboard_keys" ({"1": "horn", "2": "lets go patriots"};
+by default 1-9 in name order). Each clip is decoded to PCM once - WAV files directly,
+anything else with afconvert (macOS) or ffmpeg - into an LRU cache capped at
+"soundboard_cache_mb". A clip that no longer fits is decoded again when it's played.
+
+Clips are brought to one loudness (see audio_dsp.py): each clip is measured once and
+its levels are kept next to the clips in .loudness.json. The gain is baked into the
+cached PCM, or passed to the player as its volume.
+
+With the optional simpleaudio package (pip install simpleaudio) a trigger hands the
+cached PCM to the sound device and returns at once, and clips overlap freely. Without
+it, each trigger starts its own player process on the clip file (afplay, or mpv with
+the mpv backend): clips still overlap and nothing waits for them, but they start
+more slowly. Either way, the time from trigger to playback start is logged and
+kept for latency_stats().
+
+A watcher thread rescans the folder every WATCH_SECONDS and decodes new or changed clips.
+
+    python3 soundboard.py list
+    python3 soundboard.py play horn woo          # several names play together
+    python3 soundboard.py bench                  # trigger-to-start latency
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import OrderedDict, deque
+
+from app_log import get_logger
+from audio_dsp import TARGET_LUFS, Levels, analyze, apply_gain, db_to_volume, normalization_gain, read_wav
+
+DEFAULT_CLIP_DIR = 'sound_clips'
+DEFAULT_CACHE_MB = 64
+CLIP_EXTENSIONS = {'.m4a', '.mp3', '.wav', '.aif', '.aiff', '.caf', '.flac', '.ogg'}
+WATCH_SECONDS = 3
+LATENCY_SAMPLES = 200
+LEVELS_FILE = '.loudness.json'  # in the clip folder: {file name: {mtime, size, loudness, peak}}
+DECODE_FORMAT = (2, 2, 44100)  # channels, sample width, rate - what ffmpeg is asked for
+
+log = get_logger('clips')
+
+
+class ClipDecodeError(Exception):
+    """A clip could not be decoded to PCM"""
+
+
+def clip_name(path):
+    """Soundboard name for a clip file: "Lets_Go-Patriots.m4a" -> "lets go patriots" """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return ' '.join(stem.replace('_', ' ').replace('-', ' ').lower().split())
+
+
+def decode_clip(path):
+    """((channels, sample width, rate), PCM bytes) for an audio file"""
+    try:
+        if os.path.splitext(path)[1].lower() == '.wav':
+            with open(path, 'rb') as f:
+                return read_wav(f.read())
+        if shutil.which('afconvert'):
+            fd, temp_path = tempfile.mkstemp(suffix='.wav', prefix='hockey_clip_')
+            os.close(fd)
+            try:
+                subprocess.run(['afconvert', '-f', 'WAVE', '-d', 'LEI16', path, temp_path],
+                               capture_output=True, check=True, timeout=30)
+                with open(temp_path, 'rb') as f:
+                    return read_wav(f.read())
+            finally:
+                os.unlink(temp_path)
+        if shutil.which('ffmpeg'):
+            channels, width, rate = DECODE_FORMAT
+            result = subprocess.run(['ffmpeg', '-v', 'error', '-i', path, '-f', 's16le', '-ac', str(channels),
+                                     '-ar', str(rate), '-'], capture_output=True, check=True, timeout=30)
+            return DECODE_FORMAT, result.stdout
+    except (OSError, EOFError, wave.Error, subprocess.SubprocessError) as e:
+        raise ClipDecodeError(f"{os.path.basename(path)}: {e}") from e
+    raise ClipDecodeError(f"{os.path.basename(path)}: no decoder (afconvert or ffmpeg) for this format")
+
+
+def simpleaudio_output():
+    """output(format, pcm) playing from memory with simpleaudio, or None if it isn't installed"""
+    if not importlib.util.find_spec('simpleaudio'):
+        return None
+    import simpleaudio
+
+    def output(audio_format, pcm):
+        channels, width, rate = audio_format
+        return simpleaudio.play_buffer(pcm, channels, width, rate)
+    return output
+
+
+def spawn_afplay(path, volume=1.0):
+    """Start afplay on a file without waiting, returns the process"""
+    return subprocess.Popen(['afplay', '-v', f"{volume:.3f}", path], stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+
+
+class Soundboard:
+    """The clips in a folder, their hotkeys, a decoded-PCM cache and the clips now playing"""
+
+    def __init__(self, directory=DEFAULT_CLIP_DIR, keys=None, cache_mb=DEFAULT_CACHE_MB, output=None, spawn=None,
+                 loudness_target=TARGET_LUFS):
+        self.directory = os.path.expanduser(directory)
+        self.keys = keys            # {hotkey: clip name} from the config, None for 1-9 in name order
+        self.cache_budget = int(cache_mb * 1024 * 1024)
+        self.output = output        # output(format, pcm) -> playback; None to start a player per trigger
+        self.spawn = spawn or spawn_afplay  # spawn(path, volume) -> process
+        self.loudness_target = loudness_target  # LUFS, None to play clips as they are
+        self.clips = {}             # clip name -> file path
+        self.gains = {}             # clip name -> normalization gain (dB) once measured
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)  # trigger-to-start, milliseconds
+        self._stamps = {}           # file path -> (mtime, size)
+        self._cache = OrderedDict()  # clip name -> (format, pcm), least recently played first
+        self._cached_bytes = 0
+        self._undecodable = set()
+        self._playing = []
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._watcher = None
+        self._levels_path = os.path.join(self.directory, LEVELS_FILE)
+        try:
+            with open(self._levels_path, 'r', encoding='utf-8') as f:
+                self._levels = json.load(f)
+        except (OSError, ValueError):
+            self._levels = {}
+        self.scan()
+
+    # Folder
+    def scan(self):
+        """Re-read the folder, returns True if any clip was added, changed or removed"""
+        found = {}
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in CLIP_EXTENSIONS:
+                    stat = entry.stat()
+                    found[entry.path] = (stat.st_mtime, stat.st_size)
+        except OSError:
+            pass  # no folder - an empty soundboard
+        with self._lock:
+            if found == self._stamps:
+                return False
+            changed = {path for path, stamp in found.items() if self._stamps.get(path) != stamp}
+            self._stamps = found
+            self.clips = {clip_name(path): path for path in sorted(found)}
+            for name in list(self._cache):
+                if self.clips.get(name) is None or self.clips[name] in changed:
+                    self._cached_bytes -= len(self._cache.pop(name)[1])
+            self._undecodable -= {clip_name(path) for path in changed}
+            for name in list(self.gains):
+                if self.clips.get(name) is None or self.clips[name] in changed:
+                    del self.gains[name]
+        return True
+
+    def hotkeys(self):
+        """{hotkey: clip name} for the clips that exist"""
+        if self.keys is None:
+            return {str(i): name for i, name in enumerate(sorted(self.clips)[:9], 1)}
+        return {str(key): name for key, name in self.keys.items() if name in self.clips}
+
+    def add_listener(self, callback):
+        """callback() after the watcher finds new, changed or deleted clips (watcher thread)"""
+        self._listeners.append(callback)
+
+    def watch(self, seconds=WATCH_SECONDS):
+        """Rescan the folder every `seconds` on a background thread, decoding what's new"""
+        if self._watcher:
+            return
+        def run():
+            while not self._stopped.wait(seconds):
+                if self.scan():
+                    log.info(f"🔄 Sound clips changed - {len(self.clips)} clips", clips=len(self.clips))
+                    self.preload()
+                    for callback in list(self._listeners):
+                        try:
+                            callback()
+                        except Exception as e:
+                            log.exception(f"❌ Soundboard listener failed: {e}")
+        self._watcher = threading.Thread(target=run, name='soundboard-watch', daemon=True)
+        self._watcher.start()
+
+    # Loudness
+    def _stored_levels(self, path):
+        """Levels measured earlier for this version of the file, or None"""
+        entry = self._levels.get(os.path.basename(path))
+        mtime, size = self._stamps.get(path, (None, None))
+        if entry and entry.get('mtime') == mtime and entry.get('size') == size:
+            return Levels(entry['loudness'], entry['peak'])
+        return None
+
+    def _gain(self, name, path, decoded=None):
+        """Normalization gain of a clip (dB) - measured once, then remembered in LEVELS_FILE"""
+        if self.loudness_target is None:
+            return 0.0
+        with self._lock:
+            levels = self._stored_levels(path)
+        if levels is None:
+            if decoded is None:
+                try:
+                    decoded = decode_clip(path)
+                except ClipDecodeError as e:
+                    log.warning(f"⚠️  {e} - loudness not measured", clip=name)
+                    return 0.0
+            try:
+                levels = analyze(*decoded)
+            except ValueError as e:
+                log.warning(f"⚠️  {os.path.basename(path)}: {e} - loudness not measured", clip=name)
+                return 0.0
+            with self._lock:
+                mtime, size = self._stamps.get(path, (None, None))
+                self._levels[os.path.basename(path)] = {'mtime': mtime, 'size': size, 'loudness': levels.loudness,
+                                                        'peak': levels.peak}
+                self._save_levels_locked()
+        gain = normalization_gain(levels, self.loudness_target)
+        with self._lock:
+            if self.clips.get(name) == path:
+                self.gains[name] = gain
+        return gain
+
+    def _save_levels_locked(self):
+        try:
+            fd, temp_path = tempfile.mkstemp(prefix='.loudness_', dir=self.directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._levels, f, indent=1)
+            os.replace(temp_path, self._levels_path)
+        except OSError as e:
+            log.warning(f"⚠️  Could not save clip levels: {e}", throttle='clip-levels')
+
+    # Decoded PCM cache
+    def _decoded(self, name, evict=True):
+        """(format, pcm) for a clip - from the cache, or decoded and cached now - or None
+
+        With evict=False the clip is only cached if it fits next to what is cached already.
+        """
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry:
+                self._cache.move_to_end(name)
+                return entry
+            path = self.clips.get(name)
+            if path is None or name in self._undecodable:
+                return None
+        try:
+            audio_format, pcm = decode_clip(path)
+            pcm = apply_gain(audio_format, pcm, self._gain(name, path, (audio_format, pcm)))
+        except (ClipDecodeError, ValueError) as e:
+            log.warning(f"⚠️  {e} - it will play from the file", clip=name)
+            with self._lock:
+                self._undecodable.add(name)
+            return None
+        entry = (audio_format, pcm)
+        size = len(pcm)
+        with self._lock:
+            fits = self._cached_bytes + size <= self.cache_budget or (evict and size <= self.cache_budget)
+            if fits and name not in self._cache and self.clips.get(name) == path:
+                while self._cache and self._cached_bytes + size > self.cache_budget:
+                    self._cached_bytes -= len(self._cache.popitem(last=False)[1][1])
+                self._cache[name] = entry
+                self._cached_bytes += size
+        return entry
+
+    def audio(self, name):
+        """(format, pcm) of a clip at its level, decoded and cached on first use - None if it can't be"""
+        return self._decoded(name)
+
+    def preload(self):
+        """Decode every clip not cached yet (hotkeyed ones first) that fits in the budget, returns how many
+
+        Without an in-memory output the players read the files themselves - only the
+        clips' loudness is measured then.
+        """
+        started = time.perf_counter()
+        if not self.output:
+            for name, path in list(self.clips.items()):
+                if name not in self.gains:
+                    self._gain(name, path)
+            return 0
+        hotkeyed = list(self.hotkeys().values())
+        names = hotkeyed + [name for name in sorted(self.clips) if name not in hotkeyed]
+        decoded = 0
+        for name in names:
+            with self._lock:
+                if name in self._cache or name in self._undecodable:
+                    continue
+                if self._cached_bytes >= self.cache_budget:
+                    break
+            self._decoded(name, evict=False)
+            with self._lock:
+                decoded += name in self._cache
+        if decoded:
+            log.info(f"🔊 Decoded {decoded} sound clips ({self._cached_bytes / 1048576:.1f} MB) in "
+                     f"{(time.perf_counter() - started) * 1000:.0f} ms", cached_bytes=self._cached_bytes)
+        return decoded
+
+    def cached_clips(self):
+        with self._lock:
+            return list(self._cache)
+
+    # Playback
+    def play(self, name):
+        """Start a clip without waiting for it (other clips keep playing), returns False if unknown"""
+        started = time.perf_counter()
+        if name not in self.clips:
+            log.warning(f"⚠️  No sound clip named '{name}'", clip=name)
+            return False
+        entry = self._decoded(name) if self.output else None
+        try:
+            if entry:
+                handle = self.output(*entry)
+                source = 'memory'
+            else:
+                handle = self.spawn(self.clips[name], db_to_volume(self.gains.get(name, 0.0)))
+                source = 'file'
+        except Exception as e:
+            log.error(f"❌ Could not play sound clip '{name}': {e}", clip=name)
+            return False
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._playing = [h for h in self._playing if self._is_active(h)] + [handle]
+            self.latencies.append(latency_ms)
+        log.info(f"🔊 {name}", clip=name, source=source, latency_ms=round(latency_ms, 2))
+        return True
+
+    @staticmethod
+    def _is_active(handle):
+        if hasattr(handle, 'is_playing'):
+            return handle.is_playing()
+        return handle.poll() is None
+
+    def playing_count(self):
+        with self._lock:
+            self._playing = [h for h in self._playing if self._is_active(h)]
+            return len(self._playing)
+
+    def stop_all(self):
+        """Cut off every clip still playing"""
+        with self._lock:
+            playing, self._playing = self._playing, []
+        for handle in playing:
+            try:
+                handle.stop() if hasattr(handle, 'stop') else handle.kill()
+            except Exception:
+                pass
+
+    def latency_stats(self):
+        """Trigger-to-start latency over the last LATENCY_SAMPLES triggers (milliseconds)"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return {'count': 0}
+        return {'count': len(samples), 'median_ms': round(statistics.median(samples), 2),
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+                'max_ms': round(samples[-1], 2)}
+
+    def close(self):
+        self._stopped.set()
+        self.stop_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List, play and time the sound clips")
+    parser.add_argument('command', choices=['list', 'play', 'bench'])
+    parser.add_argument('names', nargs='*', help="clips to play")
+    parser.add_argument('--dir', default=DEFAULT_CLIP_DIR)
+    parser.add_argument('--count', type=int, default=20, help="bench: triggers per clip")
+    args = parser.parse_args()
+
+    board = Soundboard(args.dir, output=simpleaudio_output())
+    board.preload()
+    if args.command == 'list':
+        keys = {name: key for key, name in board.hotkeys().items()}
+        for name, path in sorted(board.clips.items()):
+            cached = '✓ decoded' if name in board.cached_clips() else 'file'
+            gain = f"{board.gains[name]:+.1f} dB" if name in board.gains else ''
+            print(f"  [{keys.get(name, ' ')}] {name:<30} {os.path.basename(path):<30} {cached:<10} {gain}")
+        print(f"{len(board.clips)} clips, playback from {'memory (simpleaudio)' if board.output else 'files'}")
+        return 0
+    names = args.names or sorted(board.clips)
+    if args.command == 'bench':
+        for _ in range(args.count):
+            for name in names:
+                board.play(name)
+                time.sleep(0.05)
+            board.stop_all()
+        print(f"⏱️  Trigger to start: {board.latency_stats()}")
+        return 0
+    if not all(board.play(name) for name in names):
+        return 1
+    while board.playing_count():
+        time.sleep(0.1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Tk Stall Watchdog
+Finds the calls that freeze the window: a heartbeat on the Tk loop, a thread that grabs the stack when it stops
+
+A heartbeat after() callback reschedules itself every interval_ms. When it is more
+than threshold_ms late, a watcher thread captures the main thread's stack while it
+is still stuck, and once the loop comes back the stall is logged with its duration,
+the app call site (e.g. run_applescript) and the innermost call it was blocked in
+(e.g. subprocess wait). Nothing is written on the Tk thread - a writer thread
+appends to ~/hockey_stalls.log and stalls also go to the game journal as "ui_stall".
+
+    python3 stall_watchdog.py                 # summary of the latest game in the stall log
+    python3 stall_watchdog.py --all --stacks  # every game, with the captured stacks
+
+The window starts one automatically (threshold from the "stall_threshold_ms" config
+key, default 100; 0 turns it off). Stalls while Tk was idle - the Mac asleep or App
+Nap delaying timers - are not counted.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict
+
+from app_log import get_logger
+
+DEFAULT_STALL_LOG = '~/hockey_stalls.log'
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STACK_DEPTH = 15  # frames kept per stall
+
+log = get_logger('stalls')
+
+
+def _frame_label(frame):
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
+
+
+def describe_stack(stack):
+    """(app call site, innermost call) for an extracted main-thread stack"""
+    site = None
+    for frame in reversed(stack):
+        path = os.path.abspath(frame.filename)
+        if os.path.dirname(path) == APP_DIR and path != os.path.abspath(__file__):
+            site = _frame_label(frame)
+            break
+    return site or 'unknown', _frame_label(stack[-1])
+
+
+def _is_idle(stack):
+    """True if the Tk thread was just waiting in mainloop (timers delayed, nothing blocking)"""
+    frame = stack[-1]
+    return frame.name == 'mainloop' and os.path.basename(frame.filename) == '__init__.py'
+
+
+class StallWatchdog:
+    """Detects Tk event-loop stalls and records where the main thread was stuck"""
+
+    def __init__(self, root, threshold_ms=100, interval_ms=50, log_path=DEFAULT_STALL_LOG, journal=None):
+        self.root = root
+        self.threshold = threshold_ms / 1000
+        self.interval_ms = interval_ms
+        self.log_path = os.path.expanduser(log_path)
+        self.journal = journal
+        self.game = ''
+        self.stalls = []  # this game's stalls (Tk thread only)
+        self._tk_thread = threading.get_ident()
+        self._lock = threading.Lock()
+        self._due = None        # monotonic time the next heartbeat should run
+        self._captured = None   # (due, stack) grabbed by the watcher during the current stall
+        self._writes = queue.Queue()
+        self._writer = None     # the stall-log thread, started with the heartbeat
+        self._running = False
+
+    def start(self):
+        """Start the heartbeat (call on the Tk thread) and the watcher/writer threads"""
+        self._running = True
+        self._write({'event': 'start', 'threshold_ms': self.threshold * 1000})
+        self._beat()
+        threading.Thread(target=self._watch, name='stall-watchdog', daemon=True).start()
+        self._writer = threading.Thread(target=self._write_loop, name='stall-log', daemon=True)
+        self._writer.start()
+
+    def stop(self):
+        """Stop watching, returns this game's summary"""
+        self._running = False
+        summary = self.summary()
+        self._writes.put(None)
+        return summary
+
+    def new_game(self, label=''):
+        """Close the current game's stall list, returns its summary"""
+        summary = self.summary()
+        self.game = label
+        self.stalls = []
+        self._write({'event': 'game', 'label': label})
+        return summary
+
+    def _beat(self):
+        if not self._running:
+            return
+        now = time.monotonic()
+        with self._lock:
+            late = now - self._due if self._due is not None else 0
+            captured = self._captured if self._captured and self._captured[0] == self._due else None
+            self._captured = None
+            self._due = now + self.interval_ms / 1000
+        if late > self.threshold:
+            self._record(late, captured[1] if captured else None)
+        self.root.after(self.interval_ms, self._beat)
+
+    def _watch(self):
+        poll = self.interval_ms / 2000
+        while self._running:
+            time.sleep(poll)
+            with self._lock:
+                due = self._due
+                if due is None or time.monotonic() - due <= self.threshold:
+                    continue
+                if self._captured and self._captured[0] == due:
+                    continue  # already have this stall's stack
+                frame = sys._current_frames().get(self._tk_thread)
+                if frame is not None:
+                    self._captured = (due, traceback.extract_stack(frame)[-STACK_DEPTH:])
+
+    def _record(self, late, stack):
+        if stack and _is_idle(stack):
+            return
+        duration_ms = round(late * 1000, 1)  # how long the loop was overdue
+        if stack:
+            site, blocking_in = describe_stack(stack)
+        else:
+            site, blocking_in = 'unknown', 'unknown (shorter than a watchdog poll)'
+        stall = {'duration_ms': duration_ms, 'site': site, 'blocking_in': blocking_in}
+        self.stalls.append(stall)
+        if self.journal:
+            self.journal.record('ui_stall', **stall)
+        self._write(dict(stall, event='stall', game=self.game,
+                         stack=[_frame_label(f) for f in stack] if stack else []))
+
+    def _write(self, entry):
+        entry['ts'] = round(time.time(), 3)
+        self._writes.put(entry)
+
+    def _write_loop(self):
+        os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+        while True:
+            entry = self._writes.get()
+            if entry is None:
+                return
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            except OSError as e:
+                log.warning(f"⚠️  Stall log write failed: {e}", path=self.log_path, throttle='stall-log')
+
+    def summary(self):
+        """Count, total and worst stall, and the call sites ranked by time lost"""
+        return summarize(self.stalls)
+
+
+def summarize(stalls):
+    """Summary dict for a list of stall records"""
+    sites = defaultdict(lambda: {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'blocking_in': ''})
+    for stall in stalls:
+        site = sites[stall['site']]
+        site['count'] += 1
+        site['total_ms'] += stall['duration_ms']
+        if stall['duration_ms'] >= site['max_ms']:
+            site['max_ms'] = stall['duration_ms']
+            site['blocking_in'] = stall['blocking_in']
+    return {
+        'count': len(stalls),
+        'total_ms': round(sum(s['duration_ms'] for s in stalls), 1),
+        'max_ms': max((s['duration_ms'] for s in stalls), default=0),
+        'sites': sorted(({'site': name, **info} for name, info in sites.items()),
+                        key=lambda s: s['total_ms'], reverse=True),
+    }
+
+
+def print_summary(summary, title="UI stalls"):
+    if not summary['count']:
+        print(f"✅ {title}: none")
+        return
+    print(f"🐢 {title}: {summary['count']} stalls, {summary['total_ms'] / 1000:.1f}s frozen, "
+          f"worst {summary['max_ms']:.0f} ms")
+    for site in summary['sites'][:10]:
+        print(f"   {site['count']:4d}x {site['total_ms']:8.0f} ms (max {site['max_ms']:6.0f})  "
+              f"{site['site']}  <- {site['blocking_in']}")
+
+
+def read_stall_log(path=DEFAULT_STALL_LOG):
+    """[(game label, [stall records])] from a stall log, oldest game first
+
+    Every game is listed, stalls or not, so the last entry is always the latest
+    game. Stalls logged before the first game marker come first, unlabeled.
+    """
+    games = [('', [])]
+    with open(os.path.expanduser(path), 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry['event'] == 'game':
+                games.append((entry.get('label', ''), []))
+            elif entry['event'] == 'stall':
+                games[-1][1].append(entry)
+    return games if games[0][1] or len(games) == 1 else games[1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize Tk event-loop stalls")
+    parser.add_argument('--log', default=DEFAULT_STALL_LOG, help="stall log file")
+    parser.add_argument('--all', action='store_true', help="every game in the log, not just the latest")
+    parser.add_argument('--stacks', action='store_true', help="print the captured stack of each stall")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.expanduser(args.log)):
+        print(f"❌ No stall log at {args.log}")
+        return 1
+    games = read_stall_log(args.log)
+    for label, stalls in (games if args.all else games[-1:]):
+        print_summary(summarize(stalls), f"UI stalls - {label or 'game'}")
+        if args.stacks:
+            for stall in stalls:
+                print(f"\n   {stall['duration_ms']:.0f} ms at {stall['site']}")
+                for frame in stall.get('stack', []):
+                    print(f"      {frame}")
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Test the announcement pack - phrase planning, baking, incremental re-bake and stitching
+Uses a fake synthesizer (a tone per phrase), so it needs neither Hume nor a network
+
+    python3 -m pytest test_announcement_pack.py
+"""
+
+import io
+import math
+import os
+import struct
+import wave
+
+import pytest
+
+from announcement_pack import AnnouncementPack, bake, pack_phrases, read_wav, spoken_text
+from audio_dsp import analyze, wav_bytes
+from hockey_music_controller import AppleMusicController
+
+HOME = {'9': 'Brant Friedholm', '10': 'Cale Kulig', '11': 'Kyler Harris'}
+OPPONENTS = {'Blue Devils': {'4': 'Sam Ortiz', '12': 'Lee Park'}}
+RATE = 8000
+
+
+@pytest.fixture
+def synth(make_synth):
+    """A flat tone per phrase, its length depending on the phrase"""
+    return make_synth(constant=True)
+
+
+@pytest.fixture
+def pack_path(tmp_path):
+    return str(tmp_path / 'announcements.pack')
+
+
+def test_fragments_join_to_announcement_text():
+    for team, players in (('home', HOME), ('away', OPPONENTS['Blue Devils']), ('away', {})):
+        for assists in ((None, None), ('10', None), ('10', '11'), ('4', '77')):
+            fragments = AppleMusicController.goal_announcement_fragments(team, '9', *assists, players)
+            text = AppleMusicController.build_goal_announcement(team, '9', *assists, players=players)
+            assert ''.join(fragments) == text, (fragments, text)
+    assert AppleMusicController.build_goal_announcement('home', '9', '10', '11', players=HOME) == \
+        "Patriots GOAL!! Scored by number 9, Brant Friedholm! Assisted by number 10, Cale Kulig and number 11, Kyler Harris!"
+    assert AppleMusicController.build_final_score_announcement(3, 'Blue Devils', 2) == "Final score: Patriots 3, Blue Devils 2"
+
+
+def test_phrases_cover_every_roster_announcement():
+    phrases = set(pack_phrases(HOME, OPPONENTS, teams=['Hawks'], max_score=5))
+    for scorer in HOME:
+        for a1 in [None] + list(HOME):
+            for a2 in [None] + list(HOME):
+                if a2 and not a1:
+                    continue
+                fragments = AppleMusicController.goal_announcement_fragments('home', scorer, a1, a2, HOME)
+                assert all(spoken_text(f) in phrases for f in fragments), fragments
+    fragments = AppleMusicController.goal_announcement_fragments('away', '12', '4', None, OPPONENTS['Blue Devils'])
+    assert all(spoken_text(f) in phrases for f in fragments)
+    assert {'Hawks', 'Blue Devils', 'Final score: Patriots 5'} <= phrases
+
+
+def test_bake_and_stitch(pack_path, synth):
+    path = pack_path
+    phrases = pack_phrases(HOME, OPPONENTS, max_score=3)
+    stats = bake(phrases, path, voice='test', synthesize=synth)
+    assert stats == {'reused': 0, 'synthesized': len(phrases), 'failed': [], 'dropped': 0}
+
+    pack = AnnouncementPack(path)
+    fragments = AppleMusicController.goal_announcement_fragments('home', '9', '10', None, HOME)
+    assert pack.covers(fragments)
+    out = io.BytesIO()
+    pack.write_wav(fragments, out, gap_ms=0)
+    _, pcm = read_wav(out.getvalue())
+    assert pcm == b''.join(read_wav(synth(spoken_text(f)))[1] for f in fragments)
+
+    unknown = AppleMusicController.goal_announcement_fragments('home', '42', None, None, HOME)
+    assert not pack.covers(unknown)
+    assert pack.missing(unknown) == ['Scored by number 42!']
+
+    played = []
+    result = pack.speak(fragments, lambda p: played.append(os.path.getsize(p)))
+    assert result['ok'] and result['engine'] == 'pack' and played and played[0] > len(pcm)
+    pack.close()
+
+
+def test_incremental_rebake(pack_path, make_synth):
+    path = pack_path
+    bake(pack_phrases(HOME, OPPONENTS, max_score=2), path, voice='test', synthesize=make_synth(constant=True))
+    old = AnnouncementPack(path)
+    kept_audio = bytes(old.audio('Scored by number 9, Brant Friedholm!'))
+    old.close()
+
+    roster = dict(HOME, **{'11': 'Kyle Harris', '14': 'New Player'})  # one fixed name, one new line
+    synth = make_synth(constant=True)
+    stats = bake(pack_phrases(roster, OPPONENTS, max_score=2), path, voice='test', synthesize=synth)
+    assert synth.calls and all('Kyle Harris' in t or 'New Player' in t for t in synth.calls), synth.calls
+    assert stats['dropped'] == 4  # scorer, single assist, first and second of two assists
+    assert stats['synthesized'] == len(synth.calls) == 8
+
+    pack = AnnouncementPack(path)
+    assert bytes(pack.audio('Scored by number 9, Brant Friedholm!')) == kept_audio
+    pack.close()
+
+    # A different voice re-bakes everything
+    synth = make_synth(constant=True)
+    stats = bake(pack_phrases(roster, OPPONENTS, max_score=2), path, voice='other', synthesize=synth)
+    assert stats['reused'] == 0 and len(synth.calls) == stats['synthesized']
+
+
+def test_bake_normalizes_loudness(pack_path, synth):
+    def tone_synth(text):
+        """A tone whose level depends on the phrase - up to 20 dB apart across phrases"""
+        amplitude = 10 ** (-(len(text) % 20 + 3) / 20) * 32767
+        out = io.BytesIO()
+        with wave.open(out, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(RATE)
+            w.writeframes(b''.join(struct.pack('<h', int(amplitude * math.sin(i / 3))) for i in range(RATE // 2)))
+        return out.getvalue()
+
+    path = pack_path
+    phrases = pack_phrases(HOME, {}, max_score=1)
+    bake(phrases, path, voice='test', synthesize=tone_synth, loudness_target=-18)
+    pack = AnnouncementPack(path)
+    levels = [analyze(pack.format, pack.audio(text)).loudness for text in phrases]
+    assert pack.loudness_target == -18 and max(levels) - min(levels) < 0.5, levels
+    pack.close()
+
+    # A re-bake at another target re-levels the reused phrases without synthesizing them
+    stats = bake(phrases, path, voice='test', synthesize=synth, loudness_target=-14)
+    assert stats['reused'] == len(phrases) and not synth.calls
+    pack = AnnouncementPack(path)
+    assert all(abs(analyze(pack.format, pack.audio(text)).loudness + 14) < 0.5 for text in phrases)
+    pack.close()
+
+
+def test_failed_phrases_are_left_for_next_bake(pack_path, synth):
+    path = pack_path
+
+    def flaky(text):
+        if 'Cale' in text:
+            raise OSError('Network unreachable')
+        return synth(text)
+
+    phrases = pack_phrases(HOME, {}, max_score=0)
+    stats = bake(phrases, path, voice='test', synthesize=flaky)
+    assert len(stats['failed']) == 4 and all('Cale' in t for t in stats['failed'])
+    stats = bake(phrases, path, voice='test', synthesize=synth)
+    assert stats['synthesized'] == 4 and stats['failed'] == []
+    assert AnnouncementPack.load(path).covers(phrases)
+
+
+def test_goal_and_celebration_play_as_one_stream(pack_path, synth, clip_folder, sim_backend, make_core):
+    clips = clip_folder()
+    (clips / 'woo.wav').write_bytes(wav_bytes((2, 2, 2 * RATE), bytes(4 * 2 * RATE)))  # 1s, stereo, another rate
+    backend = sim_backend
+    played = []
+    backend.play_sound_file = lambda path: played.append(read_wav(open(path, 'rb').read()))
+    core = make_core({'soundboard_dir': str(clips), 'soundboard_output': 'process', 'loudness_target': None})
+    fragments = core.goal_announcement_fragments('home', '9')
+    path = pack_path
+    phrases = [spoken_text(f) for f in fragments + core.goal_announcement_fragments('away', '9')]
+    bake(phrases, path, voice='test', synthesize=synth)
+    core.announcement_pack = AnnouncementPack(path)
+    out = io.BytesIO()
+    core.announcement_pack.write_wav(fragments, out)
+    speech_frames = len(read_wav(out.getvalue())[1]) // 2
+
+    assert core.prepare_goal('home', '9') and core._prepared[1][1]
+    core.announce_goal('home', '9')
+    (audio_format, pcm), = played
+    assert audio_format == (2, 2, RATE) and len(pcm) // 4 == speech_frames + RATE, (audio_format, len(pcm))
+    assert backend.calls['spawn_sound_file'] == 0  # no second player for the celebration
+
+    # The clip can start under the last words; away goals get no celebration
+    core.config['celebration_overlap_ms'] = 250
+    core._forget_celebration()
+    core.announce_goal('home', '9')
+    assert len(played[-1][1]) // 4 == speech_frames + RATE - RATE // 4
+    core.announce_goal('away', '9')
+    assert played[-1][0] == (1, 2, RATE)
+
+    # Not pre-mixed: the clip starts on its own after the announcement, as before
+    core.config['celebration_premix'] = False
+    core.announce_goal('home', '9')
+    assert len(played[-1][1]) // 2 == speech_frames and backend.calls['spawn_sound_file'] == 1
+    assert not core.prepare_goal('home', '42')
+
@@ -0,0 +1,119 @@
+"""
+Test controller logging - throttled records and their suppressed counts, records dropped (and
+counted) instead of blocking when the queue is full, per-game JSON log files
+
+    python3 -m pytest test_app_log.py
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+
+import pytest
+
+import app_log
+from app_log import GameLogHandler, ThrottleFilter, _QueueHandler, get_logger, setup_logging, shutdown_logging
+
+
+def _record(msg='Now-playing query failed', **fields):
+    record = logging.LogRecord('hockey.music', logging.WARNING, __file__, 1, msg, None, None)
+    record.fields = fields
+    return record
+
+
+def test_throttle_lets_one_record_per_key_through():
+    now = [0.0]
+    throttle = ThrottleFilter(seconds=60, clock=lambda: now[0])
+    assert throttle.filter(_record(throttle='now-playing'))
+    now[0] = 10
+    assert [throttle.filter(_record(throttle='now-playing')) for _ in range(3)] == [False] * 3
+    # Other keys and unkeyed records are not held back
+    assert throttle.filter(_record(throttle='journal-write'))
+    assert throttle.filter(_record()) and throttle.filter(_record())
+
+    # The next one through after the window says how many were held back
+    now[0] = 60
+    fields = {'throttle': 'now-playing'}
+    record = _record(**fields)
+    assert throttle.filter(record)
+    assert record.fields == {'throttle': 'now-playing', 'suppressed': 3} and fields == {'throttle': 'now-playing'}
+    assert app_log.ConsoleFormatter('%(message)s').format(record) == "Now-playing query failed (+3 similar)"
+
+    # A full window with nothing suppressed adds nothing
+    now[0] = 121
+    record = _record(throttle='now-playing')
+    assert throttle.filter(record) and 'suppressed' not in record.fields
+
+
+def test_full_queue_drops_and_counts():
+    handler = _QueueHandler(queue.Queue(2))
+    for i in range(5):
+        handler.emit(_record(f"record {i}"))
+    assert handler.dropped == 3
+    assert [handler.queue.get_nowait().msg for _ in range(2)] == ["record 0", "record 1"]
+
+
+@pytest.fixture
+def logging_to(tmp_path):
+    """setup_logging(**kwargs) into tmp_path - shut down again after the test"""
+    def setup(**kwargs):
+        return setup_logging('test', directory=str(tmp_path), console=False, **kwargs)
+    yield setup
+    shutdown_logging()
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_stalled_output_drops_records_instead_of_blocking(logging_to, monkeypatch, capsys):
+    # The listener is stuck writing the first record; callers keep going
+    stuck = threading.Event()
+    release = threading.Event()
+    emit = GameLogHandler.emit
+
+    def slow_emit(self, record):
+        stuck.set()
+        release.wait(5)
+        emit(self, record)
+    monkeypatch.setattr(GameLogHandler, 'emit', slow_emit)
+    directory = logging_to(queue_size=3)
+    log = get_logger('music')
+    log.info("first")
+    assert stuck.wait(5)
+    for i in range(10):
+        log.info(f"record {i}")
+    assert app_log._queue_handler.dropped == 7
+
+    # Shutting down with the queue still full waits for the listener rather than failing
+    threading.Timer(0.1, release.set).start()
+    shutdown_logging()
+    assert "7 log records dropped" in capsys.readouterr().out
+
+    entries = _read(os.path.join(directory, os.listdir(directory)[0]))
+    assert [e['msg'] for e in entries] == ["first", "record 0", "record 1", "record 2"]
+    assert entries[0]['logger'] == 'music' and entries[0]['level'] == 'INFO'
+
+
+def test_game_log_files(logging_to, tmp_path):
+    logging_to()
+    log = get_logger('tts')
+    log.info("🎙️  Speaking", text="Goal!", ok=True)
+    log.warning("Hume timed out", throttle='hume-timeout')
+    log.warning("Hume timed out", throttle='hume-timeout')
+    app_log.new_game('Hawks vs. Rivals')
+    log.info("Second game")
+    shutdown_logging()
+
+    first, second = sorted(tmp_path.glob('test_*.jsonl'), key=lambda p: ('Hawks' in p.name, p.name))
+    assert second.name.endswith('_Hawks_vs__Rivals.jsonl')
+    entries = _read(first)
+    assert [e['msg'] for e in entries] == ["🎙️  Speaking", "Hume timed out"]
+    assert entries[0]['text'] == "Goal!" and entries[0]['ok'] is True
+    assert [e['msg'] for e in _read(second)] == ["📒 New game: Hawks vs. Rivals", "Second game"]
+
+    # After shutdown, records print to the console again
+    assert any(isinstance(h, logging.StreamHandler) for h in logging.getLogger('hockey').handlers)
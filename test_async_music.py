@@ -0,0 +1,212 @@
+"""
+Test the asyncio music controller - the shared AppleScript scripts and parsing, a timeout or a
+cancellation killing the osascript it started, the cap on concurrent osascript calls, announcements
+timed stage by stage against a local TTS server, and the blocking facade and Tk bridge over it
+osascript is a stand-in Python process, so this runs anywhere
+
+    python3 -m pytest test_async_music.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+import applescript
+import hume_tts
+from async_music import AsyncLoopThread, AsyncMusicController, SyncMusicController, TkAsyncBridge
+from audio_dsp import announcement_cache
+from bench_tts import StubHumeClient, StubTTSServer, Utterance, Voice
+from game_simulator import LatencyModel
+from hockey_music_controller import make_music_controller
+from hume_tts import HumeConfig
+
+# Stands in for osascript: records the script under its pid, then answers as fake.json says
+FAKE_OSASCRIPT = """
+import json, os, sys, time
+folder, script = sys.argv[1], sys.argv[2]
+with open(os.path.join(folder, 'fake.json')) as f:
+    fake = json.load(f)
+with open(os.path.join(folder, f'{os.getpid()}.running'), 'w') as f:
+    f.write(script)
+time.sleep(fake['delay'])
+os.rename(os.path.join(folder, f'{os.getpid()}.running'), os.path.join(folder, f'{os.getpid()}.done'))
+if fake['error']:
+    sys.stderr.write(fake['error'])
+    sys.exit(1)
+print(fake['reply'])
+"""
+
+
+@pytest.fixture
+def osascript(tmp_path):
+    """osascript(reply='', delay=0, error=None, **AsyncMusicController kwargs) -> controller"""
+    def make(reply='', delay=0, error=None, **kwargs):
+        (tmp_path / 'fake.json').write_text(json.dumps({'reply': reply, 'delay': delay, 'error': error}))
+        return AsyncMusicController(osascript=(sys.executable, '-c', FAKE_OSASCRIPT, str(tmp_path)), **kwargs)
+    return make
+
+
+def _scripts(folder, state):
+    return [(int(path.name.split('.')[0]), path.read_text()) for path in folder.glob(f'*.{state}')]
+
+
+def _gone(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    return False
+
+
+def test_operations_send_the_shared_scripts(osascript, tmp_path, log_records):
+    controller = osascript(reply="Stoppage, Goal Songs")
+    assert asyncio.run(controller.get_playlists()) == ['Stoppage', 'Goal Songs']
+    assert [script for _, script in _scripts(tmp_path, 'done')] == [applescript.PLAYLISTS]
+
+    # A failed play is reported on the music log, like AppleMusicController's
+    controller = osascript(error="Music got an error (-1708)")
+    assert asyncio.run(controller.play_track_from_playlist('Stoppage', 3)) is False
+    failed = [r for r in log_records if 'Could not play track' in r.getMessage()]
+    assert failed and failed[0].name == 'hockey.music' and failed[0].fields['track'] == 3
+
+
+def test_timeout_kills_the_process(osascript, tmp_path, log_records):
+    controller = osascript(delay=30, timeout=0.5)
+    started = time.monotonic()
+    assert asyncio.run(controller.run_applescript(applescript.STOP, max_retries=1)) == ("", False)
+    assert time.monotonic() - started < 10
+    [(pid, _)] = _scripts(tmp_path, 'running')
+    assert _gone(pid), "the timed-out osascript is still running"
+    assert any(r.getMessage().startswith("⏱️  AppleScript timeout") for r in log_records)
+
+
+def test_cancellation_kills_the_process(osascript, tmp_path):
+    controller = osascript(delay=30)
+
+    async def cancel_mid_call():
+        task = asyncio.create_task(controller.run_applescript(applescript.STOP))
+        while not _scripts(tmp_path, 'running'):
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(asyncio.wait_for(cancel_mid_call(), 20))
+    [(pid, _)] = _scripts(tmp_path, 'running')
+    assert _gone(pid), "the cancelled osascript is still running"
+
+
+def test_concurrent_calls_are_capped(osascript, monkeypatch):
+    controller = osascript(reply="42", delay=0.2, max_concurrent=2)
+    running, peak = [0], [0]
+    run_process = controller._run_process
+
+    async def counting(args, timeout):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        try:
+            return await run_process(args, timeout)
+        finally:
+            running[0] -= 1
+    monkeypatch.setattr(controller, '_run_process', counting)
+
+    async def six_at_once():
+        return await asyncio.gather(*[controller.get_volume() for _ in range(6)])
+    assert asyncio.run(six_at_once()) == [42] * 6
+    assert peak[0] == 2
+
+
+class AsyncStubClient:
+    """bench_tts's stub Hume client behind the asyncio client's interface"""
+
+    def __init__(self, api_key, base_url=None):
+        self.base_url = base_url
+        self._client = StubHumeClient(api_key, base_url)
+        self.tts = self
+
+    async def synthesize_json(self, utterances):
+        return await asyncio.to_thread(self._client.synthesize_json, utterances)
+
+
+@pytest.fixture
+def tts_server(monkeypatch):
+    server = StubTTSServer('127.0.0.1', LatencyModel('fixed', 0), LatencyModel('fixed', 500))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(hume_tts, '_hume_config', HumeConfig(True, 'test-key', 'Test Voice', server.url))
+    monkeypatch.setattr(hume_tts, '_hume_async_sdk', (AsyncStubClient, Utterance, Voice))
+    announcement_cache.clear()
+    yield server
+    announcement_cache.clear()
+    server.shutdown()
+    server.server_close()
+
+
+def test_speak_times_every_stage_against_the_base_url(tts_server):
+    played = []
+    controller = AsyncMusicController()
+    result = asyncio.run(controller.speak("Patriots goal!", player=lambda path: played.append(os.path.getsize(path))))
+    assert result['ok'] and not result['cached'] and len(played) == 1, result
+    assert len(tts_server.payload_bytes) == 1, "synthesis didn't go to HUME_BASE_URL"
+    assert set(result['stages']) == {'dns_ms', 'client_ms', 'synthesize_ms', 'decode_ms', 'prepare_ms',
+                                     'write_ms', 'play_ms'}
+    assert result['lead_trimmed_ms'] > 0
+
+    # Cached: only writing and playing
+    result = asyncio.run(controller.speak("Patriots goal!", player=lambda path: played.append(path)))
+    assert result['cached'] and set(result['stages']) == {'write_ms', 'play_ms'}
+
+
+def test_speak_timeout(tts_server):
+    tts_server.latency = LatencyModel('fixed', 1500)
+    result = asyncio.run(AsyncMusicController().speak("Slow goal!", player=lambda path: pytest.fail("played"),
+                                                      synth_timeout=0.3))
+    assert result['error'] == 'timeout' and not result['ok']
+    assert set(result['stages']) == {'dns_ms', 'client_ms'}
+
+
+class FakeTk:
+    """after() queues the callback; run_pending() runs what is due on the calling (Tk) thread"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback()
+
+
+def test_blocking_facade_and_tk_bridge(osascript, tmp_path):
+    loop_thread = AsyncLoopThread('test-asyncio')
+    try:
+        backend = SyncMusicController(osascript(reply="Song | Band|||Other | Act"), loop_thread)
+        assert backend.get_playlist_tracks('Stoppage') == ['Song | Band', 'Other | Act']
+        assert [s for _, s in _scripts(tmp_path, 'done')] == [applescript.playlist_tracks('Stoppage')]
+
+        root = FakeTk()
+        bridge = TkAsyncBridge(root, loop_thread)
+        results = []
+        future = bridge.call(backend.async_controller.get_playlist_tracks('Stoppage'),
+                             on_result=lambda tracks: results.append((threading.current_thread(), tracks)))
+        future.result(10)
+        root.run_pending()
+        assert results == [(threading.current_thread(), ['Song | Band', 'Other | Act'])]
+    finally:
+        loop_thread.stop()
+
+
+def test_async_backend_is_opt_in():
+    backend = make_music_controller('async', {'async_max_concurrent': 2, 'async_timeout': 5})
+    try:
+        assert isinstance(backend, SyncMusicController)
+        assert backend.async_controller.max_concurrent == 2 and backend.async_controller.timeout == 5
+    finally:
+        backend.loop_thread.stop()
+    assert not isinstance(make_music_controller('applescript'), SyncMusicController)
@@ -0,0 +1,213 @@
+"""
+Test loudness analysis, normalization, silence trimming and mixing - gated loudness of known
+tones, gain limits, NumPy and pure Python agreeing, trimmed announcements, clips mixed onto
+their end and leveled soundboard clips
+
+    python3 -m pytest test_audio_dsp.py
+"""
+
+import math
+import os
+import struct
+
+import pytest
+
+import audio_dsp
+import soundboard
+from audio_dsp import (TARGET_LUFS, Segue, WavCache, analyze, apply_gain, convert, db_to_volume, mix,
+                       normalization_gain, normalize, normalize_wav, prepare_wav, read_wav, segue_wav, silence_bounds,
+                       trim_silence, wav_bytes)
+from soundboard import Soundboard
+
+RATE = 16000
+BACKENDS = ['numpy', 'python'] if audio_dsp.numpy_available() else ['python']
+
+
+def tone(dbfs, seconds=1.0, channels=1, rate=RATE, frequency=440):
+    """16-bit sine PCM with its peak at dbfs"""
+    amplitude = 10 ** (dbfs / 20) * 32767
+    samples = []
+    for i in range(int(seconds * rate)):
+        samples.extend([int(amplitude * math.sin(2 * math.pi * frequency * i / rate))] * channels)
+    return struct.pack(f'<{len(samples)}h', *samples)
+
+
+def test_tone_loudness_and_gating():
+    fmt = (1, 2, RATE)
+    expected = -0.691 + 10 * math.log10(10 ** (-6 / 10) / 2)  # mean square of a sine is peak² / 2
+    levels = analyze(fmt, tone(-6))
+    assert abs(levels.loudness - expected) < 0.05 and abs(levels.peak + 6) < 0.05, levels
+    # A pause half as long as the speech would cost 3 dB ungated - gated, only the blocks at its edges count
+    with_pause = analyze(fmt, tone(-6) + bytes(RATE * 2) + tone(-6))
+    assert abs(with_pause.loudness - levels.loudness) < 1, with_pause
+    # A second channel adds 3 dB (BS.1770 sums channel power)
+    stereo = analyze((2, 2, RATE), tone(-6, channels=2))
+    assert abs(stereo.loudness - levels.loudness - 3.01) < 0.05, stereo
+    assert analyze(fmt, bytes(RATE * 2)) == (None, None)
+    assert analyze(fmt, b'') == (None, None)
+    assert analyze(fmt, tone(-6, seconds=0.1)).loudness is not None  # shorter than one block
+
+
+def test_gain_limits():
+    fmt = (1, 2, RATE)
+    pcm, gain = normalize(fmt, tone(-24))
+    assert abs(analyze(fmt, pcm).loudness - TARGET_LUFS) < 0.1 and gain > 0, gain
+    pcm, gain = normalize(fmt, tone(-2))
+    assert gain < 0 and abs(analyze(fmt, pcm).loudness - TARGET_LUFS) < 0.1
+    assert normalization_gain(analyze(fmt, tone(-60))) == audio_dsp.MAX_GAIN_DB
+    # A spiky clip is only raised until its peak reaches the ceiling
+    spiky = tone(-40) + tone(-3, seconds=0.01)
+    assert normalization_gain(analyze(fmt, spiky)) == round(audio_dsp.PEAK_CEILING_DB + 3, 2)
+    assert normalization_gain(analyze(fmt, tone(-30)), target=None) == 0.0
+    assert apply_gain(fmt, tone(-6), 0) == tone(-6)
+    louder = apply_gain(fmt, tone(-6), 20)  # clipped, not wrapped around
+    assert max(struct.unpack(f'<{len(louder) // 2}h', louder)) == 32767
+    assert abs(db_to_volume(-6.0206) - 0.5) < 1e-4
+
+
+def test_numpy_and_pure_python_agree():
+    results = []
+    for backend in BACKENDS:
+        for fmt, pcm in [((1, 2, RATE), tone(-12) + bytes(RATE)), ((2, 2, RATE), tone(-20, channels=2)),
+                         ((1, 1, 8000), bytes(range(100, 156)) * 200),
+                         ((1, 4, 8000), struct.pack('<800i', *[(i % 40 - 20) << 24 for i in range(800)]))]:
+            results.append((backend, analyze(fmt, pcm, backend), apply_gain(fmt, pcm, 4.5, backend)))
+    per_path = len(results) // len(BACKENDS)
+    for (_, levels, pcm), (_, other_levels, other_pcm) in zip(results[:per_path], results[per_path:]):
+        assert abs(levels.loudness - other_levels.loudness) < 1e-6 and abs(levels.peak - other_levels.peak) < 1e-6
+        assert pcm == other_pcm
+
+
+def test_bench_levels_the_batch_it_measured():
+    numpy_before = audio_dsp._numpy
+    before, results = audio_dsp.bench(clips=4, seconds=0.2, seed=5)
+    assert audio_dsp._numpy is numpy_before, "bench switched the backend for everyone"
+    assert set(results) == set(BACKENDS) and len(before) == 4
+    assert max(before) - min(before) > 3  # the clips start at different levels
+    for timings, levels in results.values():
+        assert len(timings) == len(levels) == 4
+        # Each clip is raised to the target unless its peak stops it first - never pushed past it
+        assert all(after <= TARGET_LUFS + 0.1 and after >= level - 0.1 for level, after in zip(before, levels))
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match='Unknown DSP backend'):
+        analyze((1, 2, RATE), tone(-6), backend='fortran')
+
+
+def test_normalize_wav():
+    wav = wav_bytes((1, 2, RATE), tone(-24))
+    out, gain = normalize_wav(wav)
+    fmt, pcm = read_wav(out)
+    assert fmt == (1, 2, RATE) and gain > 0 and abs(analyze(fmt, pcm).loudness - TARGET_LUFS) < 0.1
+    assert normalize_wav(b'not a wav') == (b'not a wav', 0.0)
+    assert normalize_wav(wav_bytes((1, 2, RATE), bytes(100)))[1] == 0.0
+
+
+def test_trim_silence():
+    fmt = (1, 2, RATE)
+    speech = tone(-12, seconds=0.5)
+    noise_floor = apply_gain(fmt, tone(-12, seconds=0.4), -60)  # hiss well under the speech still counts as silence
+    pcm = noise_floor + speech + bytes(RATE * 2 // 2)
+    assert silence_bounds(fmt, pcm) == (int(0.4 * RATE), int(0.9 * RATE))
+    trimmed, lead_ms, trail_ms = trim_silence(fmt, pcm)
+    assert lead_ms == 400 - audio_dsp.LEAD_PAD_MS and trail_ms == 500 - audio_dsp.TRAIL_PAD_MS, (lead_ms, trail_ms)
+    assert len(trimmed) == len(speech) + 2 * RATE * (audio_dsp.LEAD_PAD_MS + audio_dsp.TRAIL_PAD_MS) // 1000
+    assert trim_silence(fmt, speech) == (speech, 0.0, 0.0)
+    # All silence is left alone, not cut to nothing
+    assert trim_silence(fmt, bytes(RATE)) == (bytes(RATE), 0.0, 0.0)
+    assert silence_bounds(fmt, b'') is None
+
+    stereo = (2, 2, RATE)
+    stereo_pcm = bytes(RATE) + tone(-20, seconds=0.3, channels=2) + bytes(4 * (RATE // 3))
+    results = [(silence_bounds(fmt, pcm, backend), silence_bounds(stereo, stereo_pcm, backend)) for backend in BACKENDS]
+    assert len(set(results)) == 1, results
+
+
+def test_prepare_wav_and_cache():
+    wav = wav_bytes((1, 2, RATE), bytes(RATE) + tone(-24) + bytes(RATE))
+    out, info = prepare_wav(wav)
+    fmt, pcm = read_wav(out)
+    assert info['gain_db'] > 0 and abs(analyze(fmt, pcm).loudness - TARGET_LUFS) < 0.5, info
+    assert info['lead_trimmed_ms'] == 500 - audio_dsp.LEAD_PAD_MS and info['trail_trimmed_ms'] == 500 - audio_dsp.TRAIL_PAD_MS
+    untrimmed, info = prepare_wav(wav, target=None, trim=False)
+    assert untrimmed == wav and info == {'gain_db': 0.0, 'lead_trimmed_ms': 0.0, 'trail_trimmed_ms': 0.0}
+    assert prepare_wav(b'not a wav') == (b'not a wav', {})
+
+    cache = WavCache(size=2)
+    for text in ('goal', 'final', 'goal', 'period'):
+        if cache.get(text) is None:
+            cache.put(text, text.encode(), {})
+    assert cache.get('final') is None and cache.get('goal') == (b'goal', {}) and cache.get('period')
+
+
+def test_mix_and_segue():
+    fmt = (1, 2, RATE)
+    speech, clip = tone(-12, seconds=0.5), tone(-12, seconds=0.25, frequency=660)
+    assert mix(fmt, speech, clip) == speech + clip
+    overlapped = mix(fmt, speech, clip, overlap_ms=100)
+    assert len(overlapped) == len(speech) + len(clip) - 2 * RATE // 10
+    assert overlapped[:len(speech) - 2 * RATE // 10] == speech[:len(speech) - 2 * RATE // 10]
+    # Crossfaded, the overlap starts as the speech and ends as the clip
+    faded = mix(fmt, speech, clip, overlap_ms=250, crossfade=True)
+    faded = struct.unpack(f'<{len(faded) // 2}h', faded)
+    start = RATE // 4
+    assert faded[start] == struct.unpack('<h', speech[2 * start:2 * start + 2])[0]
+    clip_samples = struct.unpack(f'<{len(clip) // 2}h', clip)
+    assert abs(faded[-1] - clip_samples[-1]) < 10
+    assert mix(fmt, speech, clip, overlap_ms=10_000) == mix(fmt, speech, clip, overlap_ms=250)
+
+    results = []
+    for backend in BACKENDS:
+        stereo = convert(fmt, speech, (2, 2, 44100), backend)
+        results.append((stereo, convert((2, 2, 44100), stereo, (1, 1, 8000), backend),
+                        convert(fmt, speech, (1, 3, RATE), backend), mix(fmt, speech, clip, 100, True, backend)))
+    assert all(result == results[0] for result in results)
+    stereo = results[0][0]
+    assert len(stereo) == 4 * round(len(speech) // 2 * 44100 / RATE) and stereo[:4] == stereo[:2] * 2
+    assert abs(analyze((1, 3, RATE), results[0][2]).loudness - analyze(fmt, speech).loudness) < 0.01
+
+    # A stereo clip at another rate comes out in the announcement's rate, as stereo
+    out, segued = segue_wav(wav_bytes(fmt, speech), Segue((2, 2, 2 * RATE), bytes(4 * RATE), 0, False))
+    out_format, pcm = read_wav(out)
+    assert segued and out_format == (2, 2, RATE) and len(pcm) == 2 * len(speech) + 4 * RATE // 2
+    assert segue_wav(b'not a wav', Segue(fmt, clip, 0, False)) == (b'not a wav', False)
+    assert segue_wav(b'anything', None) == (b'anything', False)
+
+
+class Finished:
+    def poll(self):
+        return 0
+
+
+def test_soundboard_clips_are_leveled_once(tmp_path):
+    folder = str(tmp_path)
+    for name, dbfs in (('quiet', -22), ('loud', -3)):
+        with open(os.path.join(folder, f'{name}.wav'), 'wb') as f:
+            f.write(wav_bytes((1, 2, RATE), tone(dbfs)))
+    played = []
+    board = Soundboard(folder, output=lambda fmt, pcm: played.append((fmt, pcm)) or Finished())
+    board.preload()
+    board.play('quiet')
+    board.play('loud')
+    assert len(played) == 2
+    for fmt, pcm in played:
+        assert abs(analyze(fmt, pcm).loudness - TARGET_LUFS) < 0.2
+    assert os.path.exists(os.path.join(folder, soundboard.LEVELS_FILE))
+
+    # The next start reads the levels instead of measuring again, and players get the gain as volume
+    measured = []
+    original = soundboard.analyze
+    soundboard.analyze = lambda *a: measured.append(1) or original(*a)
+    try:
+        volumes = {}
+        board = Soundboard(folder, spawn=lambda path, volume: volumes.update({os.path.basename(path): volume}) or Finished())
+        board.preload()
+        board.play('quiet')
+        board.play('loud')
+    finally:
+        soundboard.analyze = original
+    assert not measured
+    assert volumes['quiet.wav'] > 1 > volumes['loud.wav'], volumes
+    assert Soundboard(folder, loudness_target=None).preload() == 0
+
@@ -0,0 +1,141 @@
+"""
+Test the command dispatcher - which worker runs each action, request values checked and converted
+into 400s instead of bad state, coalescing over the API
+Runs against the simulator's in-memory Music backend
+
+    python3 -m pytest test_command_server.py
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from command_server import CommandDispatcher, CommandServer
+from hockey_music_controller import HockeyController
+
+READ_ONLY = {'status', 'snapshot', 'search', 'rosters'}
+
+
+@pytest.fixture
+def dispatcher(sim_backend, write_config, clip_folder):
+    config_file = write_config({'soundboard_dir': str(clip_folder('horn.wav')), 'soundboard_output': 'process'})
+    dispatcher = CommandDispatcher(lambda call_later: HockeyController(sim_backend, config_file, call_later))
+    assert dispatcher.dispatch('load_playlist', {'name': 'Stoppage'})[0] == 200
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def test_only_read_only_queries_run_inline(dispatcher):
+    inline = {action for action, (worker, _) in dispatcher.actions.items() if worker is None}
+    assert inline == READ_ONLY
+
+    threads = {}
+    core = dispatcher.core
+    for method in ('shuffle', 'reset_order', 'move_track', 'set_position', 'apply_settings', 'switch_playlist',
+                   'set_away_team', 'play_clip'):
+        original = getattr(core, method)
+        setattr(core, method, lambda *a, original=original, method=method: (
+            threads.__setitem__(method, threading.current_thread().name), original(*a))[1])
+    core.preload_playlists()
+    for action, params in [('shuffle', {}), ('reset_order', {}), ('move_track', {'from': 0, 'to': 1}),
+                           ('set_position', {'index': 3}), ('settings', {'fade_seconds': 2}),
+                           ('switch_playlist', {'name': 'Stoppage'}), ('set_away_team', {'team': 'Hawks'}),
+                           ('clip', {'name': 'horn'})]:
+        status, response = dispatcher.dispatch(action, params)
+        assert status == 200, (action, response)
+    assert threads.pop('play_clip') == 'clips'
+    assert set(threads.values()) == {'playback'}, threads
+
+
+def test_settings_are_converted_and_checked(dispatcher):
+    core = dispatcher.core
+    status, _ = dispatcher.dispatch('settings', {'fade_seconds': '3', 'max_durations': {'stoppage': '45.5'},
+                                                 'start_times': {'Song 1 | Artist 1': 12}, 'away_team': None})
+    assert status == 200
+    assert core.fade_seconds == 3 and core.max_durations == {'stoppage': 45.5} and core.away_team == ''
+    with open(core.config_file) as f:
+        assert json.load(f)['fade_seconds'] == 3
+
+    for bad in ({'fade_seconds': 'soon'}, {'fade_seconds': -1}, {'fade_seconds': 'nan'},
+                {'max_durations': {'stoppage': 'x'}}, {'start_times': [12]}, {'cues': 'Goal Horn'}):
+        status, response = dispatcher.dispatch('settings', dict(bad, away_team='Changed'))
+        assert status == 400, (bad, response)
+    assert core.fade_seconds == 3 and core.away_team == '', "a rejected request changed settings"
+
+    # The scheduler gets numbers it can compare
+    assert dispatcher.dispatch('settings', {'max_durations': {'goal_song': '1'}, 'fade_seconds': '0.5'})[0] == 200
+    core.config['goal_song'] = 'Song 2'
+    assert dispatcher.dispatch('goal', {})[0] == 200
+    assert core.scheduler.is_pending()
+
+
+def test_positions_are_bounds_checked(dispatcher):
+    core = dispatcher.core
+    count = len(core.shuffled_order)
+    for action, params in [('set_position', {'index': count}), ('set_position', {'index': -1}),
+                           ('play_track', {'index': 999}), ('move_track', {'from': 0, 'to': count}),
+                           ('move_track', {'from': 'x', 'to': 1}), ('set_position', {})]:
+        status, response = dispatcher.dispatch(action, params)
+        assert status == 400, (action, params, response)
+    assert core.current_track_index == 0 and len(core.shuffled_order) == count
+
+    assert dispatcher.dispatch('set_position', {'index': '5'})[0] == 200 and core.current_track_index == 5
+    assert dispatcher.dispatch('play_track', {'index': count - 1})[0] == 200
+
+
+def test_goal_numbers_may_be_json_numbers(dispatcher):
+    status, response = dispatcher.dispatch('announce_goal', {'team': 'away', 'scorer': 9, 'assist1': 10,
+                                                             'assist2': ''})
+    assert status == 200, response
+    assert response['result'] == "Goal scored by number 9, assisted by 10."
+    assert dispatcher.dispatch('prepare_goal', {'scorer': 9})[1]['result'] is False  # no pack to prepare from
+    assert dispatcher.dispatch('announce_goal', {'scorer': ' '})[0] == 400
+    assert dispatcher.dispatch('announce_goal', {})[0] == 400
+
+
+def test_bad_parameter_types_answer_400(dispatcher):
+    for action, params in [('next', {'count': 'abc'}), ('next', {'count': 1.5}), ('play_track', {'index': [1]}),
+                           ('search', {'q': 'song', 'limit': 'ten'}), ('announce_goal', {'team': 5, 'scorer': 9}),
+                           ('announce_goal', {'scorer': [9]}), ('load_playlist', {'name': {'x': 1}}),
+                           ('status', ['not', 'an', 'object'])]:
+        status, response = dispatcher.dispatch(action, params)
+        assert status == 400, (action, params, response)
+    assert dispatcher.core.current_track_index == 0
+
+    # Numbers sent as text (query strings) are still converted
+    assert dispatcher.dispatch('next', {'count': '2'})[0] == 200 and dispatcher.core.current_track_index == 2
+    assert len(dispatcher.dispatch('search', {'q': 'song', 'limit': '3'})[1]['result']) == 3
+
+
+def test_http_body_must_be_a_json_object(dispatcher):
+    server = CommandServer(port=0, dispatcher=dispatcher)
+    server.start()
+    host, port = server.address
+
+    def post(path, body):
+        request = urllib.request.Request(f"http://{host}:{port}{path}", data=body, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+    try:
+        for body in (b'[1, 2]', b'"next"', b'7', b'{not json'):
+            status, response = post('/next', body)
+            assert status == 400 and not response['ok'], (body, response)
+        assert post('/next', b'{"count": "x"}')[0] == 400
+        assert post('/next', b'{"count": 2}')[0] == 200
+    finally:
+        server.httpd.shutdown()
+        server.httpd.server_close()
+
+
+def test_unknown_action_and_coalesced_presses(dispatcher):
+    assert dispatcher.dispatch('nope', {})[0] == 404
+    futures = [dispatcher.submit('next', {}) for _ in range(4)]
+    assert len({id(f) for f in futures}) == 1, "presses in a burst were not merged"
+    futures[0].result(timeout=5)
+    assert dispatcher.core.current_track_index == 4
@@ -0,0 +1,194 @@
+"""
+Test the engine process protocol - JSON lines over the Unix socket, state published before the
+reply, RemoteCore driving the engine, reconnecting to a running engine, and a client outliving an
+engine that died (connect_or_spawn starts a new one on the stale socket)
+
+    python3 -m pytest test_engine_process.py
+"""
+
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+import engine_process
+from command_server import CommandDispatcher
+from engine_process import EngineClient, EngineServer, RemoteCore, connect_or_spawn
+from hockey_music_controller import HockeyController
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+POPEN = subprocess.Popen  # the tests patch engine_process's
+
+# An engine in its own process: simulated Music, announcements that take a minute to synthesize
+ENGINE = """
+import sys
+import hume_tts
+from command_server import CommandDispatcher
+from engine_process import EngineServer
+from game_simulator import LatencyModel, SimClock, SimulatedMusicBackend
+from hockey_music_controller import HockeyController
+hume_tts._hume_config = hume_tts.HumeConfig(False, None, None)
+backend = SimulatedMusicBackend(LatencyModel('fixed', 0), SimClock(1), tts_latency=LatencyModel('fixed', 60000))
+dispatcher = CommandDispatcher(lambda call_later: HockeyController(backend, sys.argv[2], call_later))
+engine = EngineServer(dispatcher, sys.argv[1], poll_seconds=0.1)
+engine.start()
+engine.wait()
+"""
+
+
+@pytest.fixture
+def socket_path():
+    """A socket path short enough for AF_UNIX"""
+    folder = tempfile.mkdtemp(prefix='hk')
+    yield os.path.join(folder, 'engine.sock')
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+@pytest.fixture
+def engine(sim_backend, write_config, socket_path):
+    config_file = write_config({'goal_song': 'Goal Horn'})
+    dispatcher = CommandDispatcher(lambda call_later: HockeyController(sim_backend, config_file, call_later))
+    engine = EngineServer(dispatcher, socket_path, poll_seconds=0.05)
+    engine.start()
+    yield engine
+    engine.stop()
+    dispatcher.shutdown()
+
+
+@pytest.fixture
+def client(engine):
+    client = EngineClient(engine.path)
+    yield client
+    client.close()
+
+
+def _spawn_engine(socket_path, config_file, **kwargs):
+    return POPEN([sys.executable, '-c', ENGINE, socket_path, config_file], cwd=HERE, **kwargs)
+
+
+def test_round_trip(client, engine):
+    assert client.state['core']['playlist'] == engine.core.playlist_name
+    assert client.call('load_playlist', name='Stoppage') == 60
+
+    # The state is published before the reply, so it already has the command's changes
+    client.call('next', count=3)
+    assert client.state['core']['current_index'] == 3
+
+    core = RemoteCore(client)
+    assert core.playlist_name == 'Stoppage' and core.current_track_index == 3
+    core.shuffle()
+    core.sync()  # what the GUI's state listener does on the Tk thread
+    assert core.shuffled_order == engine.core.shuffled_order
+    assert core.play_cue('goal_song') is True
+    assert engine.core.controller.current == 'Goal Horn'
+
+    # Errors come back raised the way the local controller raises them
+    with pytest.raises(ValueError, match='out of range'):
+        client.call('play_track', index=999)
+    with pytest.raises(ValueError, match='Unknown action'):
+        client.call('nope')
+    status, response = client.request('status').result(5)
+    assert status == 200 and response['ok']
+
+    # A bad request answers 400 and the connection keeps serving
+    status, response = client.request('next', count='abc').result(5)
+    assert status == 400 and 'whole number' in response['error']
+    status, response = client.request('announce_goal', team=5, scorer=9).result(5)
+    assert status == 400 and engine.announcement['state'] == 'failed'
+    assert client.call('set_position', index=2) is None and engine.core.current_track_index == 2
+
+
+def test_snapshots_are_taken_on_the_playback_worker(client, engine, monkeypatch):
+    threads = set()
+    snapshot = engine.core.snapshot
+    monkeypatch.setattr(engine.core, 'snapshot', lambda: threads.add(threading.current_thread().name) or snapshot())
+    client.call('load_playlist', name='Stoppage')
+    client.call('set_position', index=4)
+    client.call('announce_goal', team='home', scorer='9')
+    client.call('status')
+    time.sleep(0.2)  # a few now-playing polls
+    assert client.state['core']['current_index'] == 4
+    assert threads == {'playback'}, threads
+
+
+def test_superseded_command_raises_cancelled(client, engine):
+    client.call('load_playlist', name='Stoppage')
+    release = threading.Event()
+    engine.dispatcher.playback.submit(release.wait, 5)  # hold the playback lane
+    outcome = []
+
+    def goal():
+        try:
+            outcome.append(client.call('goal'))
+        except CancelledError:
+            outcome.append('cancelled')
+    thread = threading.Thread(target=goal)
+    thread.start()
+    time.sleep(0.1)
+    stop = client.request('stop')  # a newer command drops the queued goal
+    release.set()
+    thread.join(5)
+    assert stop.result(5)[0] == 200 and outcome == ['cancelled']
+
+
+def test_reconnect_picks_up_the_engine_state(engine):
+    first = EngineClient(engine.path)
+    first.call('load_playlist', name='Stoppage')
+    first.call('set_position', index=7)
+    first.close()
+
+    # The GUI went away - the engine kept its state for the next one
+    second = EngineClient(engine.path)
+    assert second.state['core']['playlist'] == 'Stoppage' and second.state['core']['current_index'] == 7
+    second.close()
+
+    with pytest.raises(RuntimeError, match='already running'):
+        EngineServer(engine.dispatcher, engine.path)
+
+
+def test_client_survives_engine_death(socket_path, write_config, tmp_path, monkeypatch):
+    config_file = write_config({'goal_song': 'Goal Horn'})
+    # connect_or_spawn starts our engine (never the real one) whenever there is none to connect to
+    spawned = []
+    monkeypatch.setattr(engine_process.subprocess, 'Popen', lambda args, **kwargs: spawned.append(
+        _spawn_engine(socket_path, config_file, stdout=kwargs['stdout'], stderr=kwargs['stderr'])))
+    log_file = tmp_path / 'engine.log'
+    try:
+        client = connect_or_spawn(socket_path, wait_seconds=30, log_file=str(log_file))
+        assert len(spawned) == 1 and log_file.exists()
+        lost = threading.Event()
+        speaking = threading.Event()
+        client.add_listener(lambda state: state is None and lost.set())
+        client.add_listener(lambda state: state and state['announcement']['state'] == 'speaking' and speaking.set())
+        assert client.call('load_playlist', name='Stoppage') == 60
+
+        # Kill it mid-announcement: the waiting request fails instead of hanging, listeners hear None
+        announcement = client.request('announce_goal', team='home', scorer='9')
+        assert speaking.wait(10)
+        spawned[0].send_signal(signal.SIGKILL)
+        spawned[0].wait()
+        with pytest.raises(ConnectionError):
+            announcement.result(5)
+        assert lost.wait(5)
+        with pytest.raises(ConnectionError):
+            client.request('status').result(5)
+        client.close()
+        assert os.path.exists(socket_path), "expected the dead engine's socket to be left behind"
+
+        # The next connect starts a new engine, which takes over the stale socket
+        client = connect_or_spawn(socket_path, wait_seconds=30, log_file=str(log_file))
+        assert len(spawned) == 2
+        assert client.state['core']['playlist'] == 'Stoppage'  # remembered in the config file
+        assert client.call('load_playlist', name='Stoppage') == 60
+        client.close()
+    finally:
+        for process in spawned:
+            process.kill()
+            process.wait()
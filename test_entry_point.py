@@ -0,0 +1,28 @@
+"""
+Test that running the controller as a script leaves one copy of the shared state - the script
+hands over to the imported module, and Hume settings live in hume_tts for every module to see
+
+    python3 -m pytest test_entry_point.py
+"""
+
+import runpy
+
+import announcement_pack
+import hockey_music_controller
+import hume_tts
+import phrase_cache
+from hume_tts import HumeConfig
+
+
+def test_script_runs_the_imported_module(monkeypatch):
+    ran = []
+    monkeypatch.setattr(hockey_music_controller, 'main', lambda: ran.append('main'))
+    runpy.run_path(hockey_music_controller.__file__, run_name='__main__')
+    assert ran == ['main']
+
+
+def test_hume_settings_are_shared(monkeypatch):
+    monkeypatch.setattr(hume_tts, '_hume_config', HumeConfig(True, 'key', 'Voice', 'http://127.0.0.1:9'))
+    for module in (hockey_music_controller, phrase_cache, announcement_pack):
+        assert module.hume_config() is hume_tts._hume_config
+    assert hockey_music_controller.hume_enabled()
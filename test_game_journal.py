@@ -0,0 +1,136 @@
+"""
+Test the game journal - records stay buffered until the writer flushes and fsyncs them, a full
+batch wakes the writer, new_game() rotates to a new file (suffixed within the same second), a torn
+last line is skipped on read and kept off the next event, and write failures are logged instead of
+killing the writer
+
+    python3 -m pytest test_game_journal.py
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+import game_journal
+from game_journal import GameJournal, list_games, read_events
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """File descriptors the journal fsyncs, in order"""
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(game_journal.os, 'fsync', lambda fd: (synced.append(fd), real_fsync(fd))[1])
+    return synced
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = GameJournal(str(tmp_path), flush_interval=60, batch_size=4)
+    yield journal
+    journal.close()
+
+
+def _lines(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_records_are_buffered_then_written_and_synced(journal, fsyncs):
+    journal.record('cue', cue='goal_song', ok=True)
+    assert _lines(journal.path) == [], "record() wrote on the calling thread"
+    journal.flush()
+    events = read_events(journal.path)
+    assert [e['event'] for e in events] == ['game_started', 'cue']
+    assert events[1]['cue'] == 'goal_song' and isinstance(events[1]['ts'], float)
+    assert fsyncs == [journal._file.fileno()]
+
+    journal.flush()  # nothing buffered - no write, no fsync
+    assert len(fsyncs) == 1
+
+
+def test_full_batch_wakes_the_writer(journal, fsyncs):
+    for i in range(3):
+        journal.record('next', index=i)  # with game_started, a full batch of 4
+    deadline = time.monotonic() + 5
+    while len(_lines(journal.path)) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(_lines(journal.path)) == 4 and fsyncs
+
+
+def test_new_game_rotates_the_file(journal, tmp_path):
+    first = journal.path
+    journal.record('cue', cue='goal_song')
+    second = journal.new_game('Hawks vs. Rivals')
+    assert second != first and second.endswith('_Hawks_vs__Rivals.jsonl')
+    assert [e['event'] for e in read_events(first)] == ['game_started', 'cue'], "the old game wasn't flushed"
+    journal.record('cue', cue='zamboni')
+    journal.close()
+    assert [(e['event'], e.get('label')) for e in read_events(second)] == [('game_started', 'Hawks vs. Rivals'),
+                                                                           ('cue', None)]
+    assert list_games(str(tmp_path)) == sorted([first, second])
+
+
+class _GameNight(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 3, 1, 19, 0, 0)
+
+
+def test_torn_last_line(tmp_path, monkeypatch):
+    path = tmp_path / 'game_20250301_190000.jsonl'
+    path.write_text('{"ts": 1.0, "event": "cue"}\n{"ts": 2.0, "event": "ne')
+    assert read_events(str(path)) == [{'ts': 1.0, 'event': 'cue'}]
+
+    # Reopening the same game (same second, same label) starts on a fresh line
+    monkeypatch.setattr(game_journal, 'datetime', _GameNight)
+    journal = GameJournal(str(tmp_path), flush_interval=60)
+    assert journal.path == str(path)
+    journal.record('next', index=1)
+    journal.close()
+    assert [e['event'] for e in read_events(str(path))] == ['cue', 'game_started', 'next']
+
+
+def test_new_games_in_the_same_second_get_their_own_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(game_journal, 'datetime', _GameNight)
+    journal = GameJournal(str(tmp_path), flush_interval=60)
+    first = journal.path
+    journal.record('cue', cue='goal_song')
+    second = journal.new_game('Hawks')
+    third = journal.new_game('Hawks')
+    journal.record('next', index=1)
+    journal.close()
+    assert [os.path.basename(path) for path in (first, second, third)] == [
+        'game_20250301_190000.jsonl', 'game_20250301_190000_Hawks.jsonl', 'game_20250301_190000_Hawks_2.jsonl']
+    assert [e['event'] for e in read_events(second)] == ['game_started']
+    assert [e['event'] for e in read_events(third)] == ['game_started', 'next']
+    assert list_games(str(tmp_path))[-1] == third
+
+
+class _BrokenFile:
+    def write(self, text):
+        raise OSError("disk full")
+
+    def close(self):
+        pass
+
+
+def test_write_failure_is_logged(tmp_path, log_records):
+    journal = GameJournal(str(tmp_path), flush_interval=0.01)
+    journal.flush()
+    real_file, journal._file = journal._file, _BrokenFile()
+    journal.record('cue', cue='goal_song')
+    deadline = time.monotonic() + 5
+    while not log_records and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert log_records[0].getMessage() == "⚠️  Journal write failed: disk full"
+    assert log_records[0].name == 'hockey.journal' and log_records[0].threadName == 'journal'
+
+    # The writer carries on once the disk is back
+    journal._file = real_file
+    journal.record('cue', cue='zamboni')
+    journal.close()
+    assert json.loads(_lines(journal.path)[-1])['cue'] == 'zamboni'
@@ -0,0 +1,37 @@
+"""
+Test the game simulator - a short generated game replays end to end through the dispatcher,
+announcements go through the simulated TTS only (never Hume or the phrase cache, whatever .env says)
+
+    python3 -m pytest test_game_simulator.py
+"""
+
+import json
+
+import hume_tts
+from game_simulator import main, synthetic_game
+from hockey_music_controller import HockeyController
+from hume_tts import HumeConfig
+
+
+def test_short_synthetic_game(monkeypatch, tmp_path, capsys):
+    # As if .env had a Hume key - the simulator must turn it off itself
+    monkeypatch.setattr(hume_tts, '_hume_config', HumeConfig(True, 'real-key', 'voice'))
+
+    def no_phrase_cache(self):
+        raise AssertionError("the simulator reached the phrase cache")
+    monkeypatch.setattr(HockeyController, 'phrase_cache', no_phrase_cache)
+
+    report_file = tmp_path / 'report.json'
+    main(['--synthetic', '--seed', '4', '--periods', '1', '--period-minutes', '5', '--speed', '200',
+          '--music-latency', '20', '--tts-latency', '200', '--json', str(report_file)])
+    assert "GAME SIMULATION REPORT" in capsys.readouterr().out
+    report = json.loads(report_file.read_text())
+
+    expected = {action for _, action, _ in synthetic_game(4, 1, 300)}
+    assert set(report['actions']) == expected
+    for action, stats in report['actions'].items():
+        assert stats['errors'] == 0, (action, stats)
+    assert report['actions']['announce_goal']['count'] == 2
+    # Two goals and the final score, each spoken once by the simulated voice
+    assert report['backend_calls']['speak'] == 3
+    assert hume_tts._hume_config.api_key == 'real-key', "the run left Hume switched off"
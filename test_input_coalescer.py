@@ -0,0 +1,127 @@
+"""
+Test the input coalescer - Next bursts merged, Play/Pause pairs cancelled, queued commands a newer
+one made obsolete dropped, submit() as a barrier, key bounce debounced, listeners run on the worker
+
+    python3 -m pytest test_input_coalescer.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from input_coalescer import CoalescingWorker
+
+
+class Recorder:
+    """Handlers that record what ran, in order"""
+
+    def __init__(self):
+        self.ran = []
+
+    def __call__(self, name):
+        return lambda *args: self.ran.append((name, *args)) or name
+
+
+@pytest.fixture
+def worker():
+    worker = CoalescingWorker('test', settle_ms=50, debounce_ms=80, toggle_ms=80)
+    yield worker
+    worker.stop()
+
+
+@pytest.fixture
+def busy(worker):
+    """Hold the worker on a long command until the test sets the event"""
+    release = threading.Event()
+    started = threading.Event()
+    worker.submit(lambda: (started.set(), release.wait(5)))
+    started.wait(5)
+    yield release
+    release.set()
+
+
+def _drain(worker):
+    worker.submit(lambda: None).result(timeout=5)
+
+
+def test_next_presses_merge_into_one_call(worker):
+    ran = Recorder()
+    futures = [worker.press('next', ran('next')) for _ in range(5)]
+    assert len({id(f) for f in futures}) == 1
+    assert futures[0].result(timeout=5) == 'next'
+    assert ran.ran == [('next', 5)] and worker.stats['merged'] == 4
+
+    # A pause longer than settle_ms starts a new burst
+    time.sleep(0.2)
+    worker.press('next', ran('next'), count=2).result(timeout=5)
+    assert ran.ran[-1] == ('next', 2)
+
+
+def test_play_pause_twice_is_nothing(worker):
+    ran = Recorder()
+    first = worker.press('play_pause', ran('toggle'))
+    second = worker.press('play_pause', ran('toggle'))  # within debounce_ms - still a pair, not a bounce
+    assert first.cancelled() and second.cancelled()
+    _drain(worker)
+    assert ran.ran == [] and worker.stats['debounced'] == 0
+
+    # Far enough apart, both run - even with the worker idle in between
+    worker.press('play_pause', ran('toggle')).result(timeout=5)
+    time.sleep(0.2)
+    worker.press('play_pause', ran('toggle')).result(timeout=5)
+    assert ran.ran == [('toggle',), ('toggle',)]
+
+
+def test_newer_command_drops_queued_ones(worker, busy):
+    ran = Recorder()
+    goal = worker.press('goal', ran('goal'))
+    toggle = worker.press('play_pause', ran('toggle'))
+    nexts = worker.press('next', ran('next'), count=3)
+    stop = worker.press('stop', ran('stop'))
+    busy.set()
+    assert stop.result(timeout=5) == 'stop'
+    assert goal.cancelled() and toggle.cancelled()
+    # Queued Next presses still advance the playlist, just without waiting to settle
+    assert nexts.result(timeout=5) == 'next'
+    assert ran.ran == [('next', 3), ('stop',)]
+
+
+def test_submit_is_a_barrier(worker, busy):
+    ran = Recorder()
+    goal = worker.press('goal', ran('goal'))
+    load = worker.submit(ran('load'), 'Stoppage')
+    stop = worker.press('stop', ran('stop'))
+    busy.set()
+    stop.result(timeout=5)
+    assert not goal.cancelled() and load.result(timeout=5) == 'load'
+    assert ran.ran == [('goal',), ('load', 'Stoppage'), ('stop',)]
+
+
+def test_key_bounce_is_debounced(worker):
+    ran = Recorder()
+    first = worker.press('goal', ran('goal'))
+    assert worker.press('goal', ran('goal')) is first
+    first.result(timeout=5)
+    assert ran.ran == [('goal',)] and worker.stats['debounced'] == 1
+
+    time.sleep(0.2)
+    worker.press('goal', ran('goal')).result(timeout=5)
+    assert ran.ran == [('goal',), ('goal',)]
+    # A different command right away isn't a bounce
+    worker.press('stop', ran('stop')).result(timeout=5)
+    assert ran.ran[-1] == ('stop',)
+
+
+def test_listeners_run_on_the_worker_before_the_result(worker):
+    ran = Recorder()
+    seen = []
+    worker.add_listener(lambda: seen.append((threading.current_thread().name, list(ran.ran))))
+    worker.add_listener(lambda: 1 / 0)  # a failing listener doesn't stop the lane
+    future = worker.press('goal', ran('goal'))
+    future.add_done_callback(lambda future: seen.append('resolved'))
+    assert future.result(timeout=5) == 'goal'
+    failed = worker.submit(lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        failed.result(timeout=5)
+    assert seen == [('test', [('goal',)]), 'resolved', ('test', [('goal',)])]
@@ -0,0 +1,91 @@
+"""
+Test JXA backend parsing against recorded Music output
+Runs anywhere (no macOS needed) - osascript is replaced by fixtures/music_queries.json
+
+    python3 -m pytest test_jxa_parsing.py
+"""
+
+import json
+import os
+
+from hockey_music_controller import AppleMusicController
+from jxa_backend import JXAMusicController, PLAYLISTS_JS, PLAYLIST_TRACKS_JS, PLAYLIST_IDS_JS
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'music_queries.json')
+
+with open(FIXTURES, 'r', encoding='utf-8') as f:
+    FX = json.load(f)
+
+
+class ReplayJXA(JXAMusicController):
+    """JXA backend answering from recorded stdout"""
+
+    def __init__(self, outputs, success=True):
+        self.outputs = outputs      # script -> stdout
+        self.success = success
+        self.calls = []
+
+    def run_jxa(self, script, *args, max_retries=2, retry_delay=0.5, silent_on_error=False):
+        self.calls.append((script, args))
+        return (self.outputs.get(script, ''), True) if self.success else ('', False)
+
+
+class ReplayAppleScript(AppleMusicController):
+    """AppleScript backend answering every query with one recorded stdout"""
+
+    def __init__(self, output):
+        self.output = output
+
+    def run_applescript(self, script, max_retries=3, retry_delay=0.5, silent_on_error=False):
+        return self.output, True
+
+
+def test_playlist_names_with_commas_and_pipes():
+    fx = FX['playlists']
+    assert ReplayJXA({PLAYLISTS_JS: fx['jxa']}).get_playlists() == fx['expected']
+    # The AppleScript path splits "Goals, Celebrations" in two
+    assert ReplayAppleScript(fx['applescript']).get_playlists() != fx['expected']
+
+
+def test_tracks_with_pipes_quotes_and_unicode():
+    fx = FX['playlist_tracks']
+    backend = ReplayJXA({PLAYLIST_TRACKS_JS: fx['jxa']})
+    assert backend.get_playlist_tracks(fx['playlist']) == fx['expected']
+    # The playlist name is passed as an argument, not spliced into the script
+    assert backend.calls == [(PLAYLIST_TRACKS_JS, (fx['playlist'],))]
+    assert ReplayAppleScript(fx['applescript']).get_playlist_tracks(fx['playlist']) != fx['expected']
+
+
+def test_plain_tracks_match_applescript_format():
+    fx = FX['plain_tracks']
+    jxa = ReplayJXA({PLAYLIST_TRACKS_JS: fx['jxa']}).get_playlist_tracks(fx['playlist'])
+    applescript = ReplayAppleScript(fx['applescript']).get_playlist_tracks(fx['playlist'])
+    assert jxa == applescript == fx['expected']
+
+
+def test_missing_artist():
+    fx = FX['missing_artist']
+    assert JXAMusicController.parse_playlist_tracks(fx['jxa']) == fx['expected']
+
+
+def test_empty_playlist():
+    fx = FX['empty_playlist']
+    assert ReplayJXA({PLAYLIST_TRACKS_JS: fx['jxa']}).get_playlist_tracks('Empty') == fx['expected']
+    assert ReplayAppleScript(fx['applescript']).get_playlist_tracks('Empty') == fx['expected']
+
+
+def test_fingerprint_matches_applescript():
+    # Same fingerprint from both backends, so cached playlists stay valid when switching
+    fx = FX['track_ids']
+    jxa = ReplayJXA({PLAYLIST_IDS_JS: fx['jxa']}).get_playlist_fingerprint('Stoppage')
+    applescript = ReplayAppleScript(fx['applescript']).get_playlist_fingerprint('Stoppage')
+    assert jxa == applescript
+    assert jxa.startswith('7:')
+
+
+def test_failures_and_garbage():
+    assert ReplayJXA({}, success=False).get_playlists() == []
+    assert ReplayJXA({}, success=False).get_playlist_tracks('Stoppage') == []
+    assert ReplayJXA({}, success=False).get_playlist_fingerprint('Stoppage') is None
+    assert ReplayJXA({PLAYLIST_TRACKS_JS: 'execution error: not JSON'}).get_playlist_tracks('Stoppage') == []
+
@@ -0,0 +1,219 @@
+"""
+Test the mpv backend - library parsing anywhere, the whole controller end to end where mpv is installed
+mpv runs with a null audio output, so this works headless on Linux CI
+
+    python3 -m pytest test_mpv_backend.py
+    MPV=/usr/local/bin/mpv python3 -m pytest test_mpv_backend.py
+"""
+
+import json
+import os
+import shutil
+import socket
+import struct
+import threading
+import time
+import wave
+
+import pytest
+
+from hockey_music_controller import HockeyController
+import mpv_backend
+from mpv_backend import MpvError, MpvMusicController, MusicLibrary, track_label
+
+MPV = os.environ.get('MPV') or shutil.which('mpv')
+needs_mpv = pytest.mark.skipif(not MPV, reason="mpv not installed")
+
+
+def write_tone(path, seconds, rate=8000):
+    """Small silent-ish WAV file"""
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(struct.pack('<h', 0) * int(seconds * rate))
+
+
+@pytest.fixture
+def library_root(tmp_path):
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, 'Stoppage Music'))
+    os.makedirs(os.path.join(root, 'Goal Songs'))
+    for i, name in enumerate(['Band A - First Song', 'Band B - Second Song', 'Third Song'], 1):
+        write_tone(os.path.join(root, 'Stoppage Music', f"{i:02d} {name}.wav"), 6)
+    write_tone(os.path.join(root, 'Goal Songs', 'Horn Section - Goal Horn.wav'), 6)
+    with open(os.path.join(root, 'Warmup.m3u'), 'w') as f:
+        f.write("#EXTM3U\nStoppage Music/03 Third Song.wav\nGoal Songs/Horn Section - Goal Horn.wav\n")
+    return root
+
+
+def test_track_labels():
+    assert track_label('/x/01 Band A - First Song.mp3') == 'First Song | Band A'
+    assert track_label('/x/Third Song.m4a') == 'Third Song | '
+    assert track_label('/x/2. Dash - In - Title.flac') == 'In - Title | Dash'
+
+
+def test_library_playlists(library_root):
+    library = MusicLibrary(library_root)
+    assert library.playlists() == ['Goal Songs', 'Stoppage Music', 'Warmup']
+    assert [track_label(p) for p in library.playlist_files('Stoppage Music')] == [
+        'First Song | Band A', 'Second Song | Band B', 'Third Song | ']
+    assert [os.path.basename(p) for p in library.playlist_files('Warmup')] == [
+        '03 Third Song.wav', 'Horn Section - Goal Horn.wav']
+    assert library.playlist_files('Nope') == []
+    assert library.find_track('goal horn').endswith('Horn Section - Goal Horn.wav')
+
+
+def test_library_fingerprint(library_root):
+    root = library_root
+    library = MusicLibrary(root)
+    before = library.fingerprint('Stoppage Music')
+    assert before.startswith('3:')
+    assert library.fingerprint('Stoppage Music') == before
+    write_tone(os.path.join(root, 'Stoppage Music', '04 New Song.wav'), 1)
+    assert library.fingerprint('Stoppage Music').startswith('4:')
+    assert library.fingerprint('Nope') is None
+
+
+def test_find_track_uses_the_scan_index(library_root, monkeypatch):
+    walks = []
+    walk = os.walk
+    monkeypatch.setattr(mpv_backend.os, 'walk', lambda root: (walks.append(root), walk(root))[1])
+    library = MusicLibrary(library_root)
+    assert library.find_track('Goal Horn').endswith('Horn Section - Goal Horn.wav')
+    assert library.find_track(' second song ').endswith('02 Band B - Second Song.wav')
+    assert library.find_track('03 third song').endswith('03 Third Song.wav')  # by file name
+    assert library.find_track('Nope') is None
+    assert len(walks) == 1, "every lookup walked the library"
+
+    # A file added, renamed or removed changes its folder - the next lookup rescans
+    goal_songs = os.path.join(library_root, 'Goal Songs')
+    time.sleep(0.01)
+    write_tone(os.path.join(goal_songs, 'Organ - Charge.wav'), 1)
+    assert library.find_track('charge').endswith('Organ - Charge.wav') and len(walks) == 2
+    os.rename(os.path.join(goal_songs, 'Organ - Charge.wav'), os.path.join(goal_songs, 'Organ - Let Us Go.wav'))
+    assert library.find_track('charge') is None and library.find_track('Let Us Go') and len(walks) == 3
+    shutil.rmtree(goal_songs)
+    assert library.find_track('Goal Horn') is None and len(walks) == 4
+
+
+class FakeMpvIPC:
+    """mpv's IPC socket - answers each request with the next scripted reply
+
+    A reply is a function of the request id returning the bytes to send; one that doesn't
+    end in a newline is cut off - the connection closes after it. Keeps accepting, like mpv.
+    """
+
+    def __init__(self, path, replies):
+        self.replies = list(replies)
+        self.connections = 0
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(4)
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            with conn, conn.makefile('rb') as requests:
+                for line in requests:
+                    reply = self.replies.pop(0)(json.loads(line)['request_id'])
+                    conn.sendall(reply)
+                    if not reply.endswith(b'\n'):
+                        break
+
+    def close(self):
+        self.sock.close()
+
+
+def _answer(data):
+    return lambda request_id: (json.dumps({'request_id': request_id, 'error': 'success', 'data': data}) + '\n').encode()
+
+
+def test_unreadable_ipc_replies(tmp_path):
+    path = str(tmp_path / 'mpv.sock')
+    event = (json.dumps({'event': 'idle'}) + '\n').encode()
+    ipc = FakeMpvIPC(path, [
+        lambda request_id: event + b'<html>not json</html>\n',   # garbage: MpvError, not ValueError
+        _answer(42),                                             # ...and the next command reconnects
+        lambda request_id: b'{"request_id": %d, "err' % request_id,  # cut off: retried on a new connection
+        _answer(0.5),
+    ])
+    backend = MpvMusicController(str(tmp_path), path, mpv='/nonexistent/mpv')
+    try:
+        with pytest.raises(MpvError, match='unreadable reply'):
+            backend.command('get_property', 'volume')
+        assert backend.command('get_property', 'volume') == 42
+        assert backend.get_property('time-pos') == 0.5
+        assert ipc.connections == 3
+        ipc.replies.append(lambda request_id: b'\xff\xfe\n')
+        assert backend.get_property('volume', default='unknown') == 'unknown'
+    finally:
+        backend._disconnect()
+        ipc.close()
+
+
+@pytest.fixture
+def mpv_controller(library_root, write_config):
+    backend = MpvMusicController(library_root, os.path.join(library_root, 'mpv.sock'), audio_output='null', mpv=MPV)
+    core = HockeyController(backend, write_config({'goal_song': 'Goal Horn', 'power_play': 'Missing Song'}))
+    yield backend, core
+    core.scheduler.cancel()
+    backend.quit()
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@needs_mpv
+def test_end_to_end_playback(mpv_controller):
+    backend, core = mpv_controller
+    readiness = core.warm_up()
+    assert readiness['state'] == 'degraded' and 'Missing Song' in readiness['detail'], readiness
+    assert core.load_playlist('Stoppage Music') == 3
+    assert core.play_track_at(1)
+    assert _wait_for(backend.is_playing)
+    assert backend.get_current_track() == 'Second Song - Band B'
+
+    core.play_pause()  # pause
+    assert _wait_for(lambda: not backend.is_playing())
+    core.play_pause()  # resume
+    assert _wait_for(backend.is_playing)
+
+    track = core.next_track()  # stop and queue the next one without playing
+    assert track == 'Third Song | '
+    assert _wait_for(lambda: not backend.is_playing())
+
+    assert core.play_cue('goal_song')
+    assert _wait_for(lambda: backend.get_current_track_name_only() == 'Goal Horn')
+    assert core.play_cue('power_play') is False  # configured song isn't in the library
+
+    assert core.stop()
+    assert backend.get_current_track() == 'No track playing'
+
+
+@needs_mpv
+def test_end_to_end_start_time_and_fade(mpv_controller):
+    backend, core = mpv_controller
+    core.load_playlist('Stoppage Music')
+    track = core.track_at(0)
+    core.start_times[track] = 2
+    core.max_durations['stoppage'] = 1
+    core.fade_seconds = 0.5
+    backend.set_volume(80)
+    assert core.play_track_at(0)
+    assert _wait_for(lambda: (backend.get_property('time-pos') or 0) >= 2)
+    # Auto-stop after 1s with a 0.5s fade, then the volume is back for the next song
+    assert _wait_for(lambda: backend.get_current_track() == 'No track playing', timeout=4)
+    assert _wait_for(lambda: backend.get_volume() == 80)
+
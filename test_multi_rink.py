@@ -0,0 +1,95 @@
+"""
+Test the multi-rink manager - rinks driven at the same time keep their own playlist state, settings
+and journals, a slow rink never holds up the others, and failures and latency are reported per rink
+Each rink runs on its own simulated Music backend
+
+    python3 -m pytest test_multi_rink.py
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from game_simulator import LatencyModel, SimClock, SimulatedMusicBackend
+from multi_rink import RinkManager
+
+SLOW_MS = 300  # every Music call on rink1
+
+
+@pytest.fixture
+def manager(write_config, tmp_path):
+    """Three rinks - rink1's Music answers slowly, rink3 has no goal song configured"""
+    rinks = [{'id': f"rink{i}", 'name': f"Rink {i}",
+              'config_file': write_config({'goal_song': f"Rink {i} Horn"} if i < 3 else {})} for i in (1, 2, 3)]
+    backends = {}
+
+    def backend_factory(rink):
+        latency = LatencyModel('fixed', SLOW_MS if rink['id'] == 'rink1' else 0)
+        backends[rink['id']] = SimulatedMusicBackend(latency, SimClock(1))
+        return backends[rink['id']]
+
+    manager = RinkManager(rinks, backend_factory, journal_dir=str(tmp_path / 'journal'))
+    manager.backends = backends
+    with ThreadPoolExecutor(3) as pool:
+        loaded = list(pool.map(lambda rink_id: manager.dispatch(rink_id, 'load_playlist', {'name': 'Stoppage'}),
+                               manager.rinks))
+    assert all(status == 200 for status, _ in loaded), loaded
+    yield manager
+    manager.shutdown()
+
+
+def _all_at_once(manager, requests):
+    """Dispatch (rink id, action, params) requests from one thread each, returns their (status, response)"""
+    with ThreadPoolExecutor(len(requests)) as pool:
+        return list(pool.map(lambda request: manager.dispatch(*request), requests))
+
+
+def test_rinks_keep_their_own_state(manager, tmp_path):
+    results = _all_at_once(manager, [('rink1', 'goal', {}), ('rink2', 'next', {'count': 3}),
+                                     ('rink3', 'set_position', {'index': 7}),
+                                     ('rink2', 'settings', {'fade_seconds': 9}),
+                                     *[(rink_id, 'new_game', {'label': rink_id}) for rink_id in manager.rinks]])
+    assert all(status == 200 for status, _ in results), results
+
+    cores = {rink_id: manager.core(rink_id) for rink_id in manager.rinks}
+    assert [cores[rink_id].current_track_index for rink_id in ('rink1', 'rink2', 'rink3')] == [0, 3, 7]
+    assert manager.backends['rink1'].current == 'Rink 1 Horn'
+    assert manager.backends['rink2'].current == cores['rink2'].track_at(3)
+    assert manager.backends['rink3'].current is None
+
+    assert cores['rink2'].fade_seconds == 9 and cores['rink1'].fade_seconds != 9
+    for rink_id, core in cores.items():
+        with open(core.config_file) as f:
+            assert (json.load(f).get('fade_seconds') == 9) == (rink_id == 'rink2')
+
+    # Each rink journals into its own folder
+    for rink_id, (_, response) in zip(manager.rinks, results[4:]):
+        assert os.path.dirname(response['result']) == str(tmp_path / 'journal' / rink_id)
+
+
+def test_a_slow_rink_never_holds_up_the_others(manager):
+    busy = [manager.submit('rink1', 'goal', {}), manager.submit('rink1', 'shuffle', {})]
+    fast = [manager.submit('rink2', 'goal', {}), manager.submit('rink3', 'next', {})]
+    for future in fast:
+        future.result(timeout=10)
+    assert not any(future.done() for future in busy), "a fast rink waited for rink1's Music"
+    for future in busy:
+        future.result(timeout=10)
+
+
+def test_failures_and_latency_are_reported_per_rink(manager):
+    results = _all_at_once(manager, [('rink1', 'goal', {}), ('rink2', 'goal', {}), ('rink3', 'goal', {}),
+                                     ('rink2', 'next', {'count': 'x'}), ('rink4', 'goal', {})])
+    assert [status for status, _ in results] == [200, 200, 400, 400, 404]
+    assert [response['rink'] for _, response in results] == ['rink1', 'rink2', 'rink3', 'rink2', 'rink4']
+
+    report = manager.latency_report()
+    assert set(report) == {'rink1', 'rink2', 'rink3'}, "an unknown rink got a report"
+    assert {rink_id: stats['errors'] for rink_id, stats in report.items()} == {'rink1': 0, 'rink2': 1, 'rink3': 1}
+    # load_playlist from the fixture, then this test's requests
+    assert {rink_id: stats['count'] for rink_id, stats in report.items()} == {'rink1': 2, 'rink2': 3, 'rink3': 2}
+    assert report['rink1']['actions']['goal']['max_ms'] >= SLOW_MS
+    assert report['rink2']['actions']['goal']['max_ms'] < SLOW_MS
+    assert report['rink3']['actions']['goal']['max_ms'] < SLOW_MS
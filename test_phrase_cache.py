@@ -0,0 +1,113 @@
+"""
+Test phrase-by-phrase live announcements - only missing phrases synthesized, in parallel,
+kept across restarts, stitched with the baked pack
+Synthesis is a fake that returns tones padded with silence; nothing goes to Hume
+
+    python3 -m pytest test_phrase_cache.py
+"""
+
+import os
+import time
+
+import pytest
+
+import hockey_music_controller
+import phrase_cache
+from announcement_pack import AnnouncementPack, bake, spoken_text
+from audio_dsp import LEAD_PAD_MS, TRAIL_PAD_MS
+from hockey_music_controller import AppleMusicController
+from phrase_cache import CROSSFADE_MS, PhraseCache
+
+HOME = {'9': 'Brant Friedholm', '10': 'Cale Kulig', '11': 'Kyler Harris'}
+
+
+@pytest.fixture
+def make_cache(tmp_path_factory):
+    """make_cache(synth, directory=None, **PhraseCache kwargs) - a cache in a fresh folder unless given one"""
+    def make(synth, directory=None, **kwargs):
+        directory = directory or str(tmp_path_factory.mktemp('phrases'))
+        return PhraseCache(directory, voice='test', synthesize=synth, loudness_target=None, **kwargs)
+    return make
+
+
+def _speak(cache, team, scorer, assist1=None, assist2=None, pack=None):
+    played = []
+    fragments = AppleMusicController.goal_announcement_fragments(team, scorer, assist1, assist2, HOME)
+    result = cache.speak(fragments, lambda path: played.append(os.path.getsize(path)), pack)
+    assert result['ok'] and len(played) == 1, result
+    return result
+
+
+def test_only_missing_phrases_are_synthesized(make_synth, make_cache):
+    synth = make_synth()
+    cache = make_cache(synth)
+    assert _speak(cache, 'home', '9', '10', '11')['synthesized'] == 4  # lead-in, scorer, both assist clauses
+    assert _speak(cache, 'home', '9', '10')['synthesized'] == 1        # just "Assisted by number 10, Cale Kulig!"
+    assert _speak(cache, 'home', '11', '10', '11')['synthesized'] == 1  # just the new scorer
+    assert _speak(cache, 'home', '9', '10', '11')['synthesized'] == 0
+    assert len(synth.calls) == len(set(synth.calls)) == 6
+
+    # Phrases are kept on disk for the next start
+    synth = make_synth()
+    cache = make_cache(synth, cache.directory)
+    assert _speak(cache, 'home', '11', '10', '11')['synthesized'] == 0 and not synth.calls
+    assert make_cache(make_synth(), cache.directory).audio('Patriots GOAL!!') is not None
+    other_voice = PhraseCache(cache.directory, voice='other', synthesize=synth, loudness_target=None)
+    assert other_voice.audio('Patriots GOAL!!') is None
+
+
+def test_missing_phrases_synthesize_in_parallel(make_synth, make_cache):
+    synth = make_synth(delay=0.3)
+    cache = make_cache(synth)
+    started = time.perf_counter()
+    assert cache.fill(['Patriots GOAL!!', 'Scored by number 9!', 'Unassisted!', 'Patriots GOAL!!']) == (3, [])
+    assert time.perf_counter() - started < 0.6, "phrases were synthesized one after another"
+
+    # Too slow: the announcement gives up, the phrase is still stored when it arrives
+    cache = make_cache(make_synth(delay=0.4), timeout=0.1)
+    played = []
+    result = cache.speak(AppleMusicController.goal_announcement_fragments('home', '42', None, None, HOME), played.append)
+    assert not result['ok'] and result['error'] and not played
+    time.sleep(0.5)
+    assert cache.audio('Unassisted!') is not None
+
+
+def test_phrases_stitch_with_the_pack(make_synth, make_cache, tmp_path, monkeypatch):
+    path = str(tmp_path / 'announcements.pack')
+    bake(['Patriots GOAL!!', 'Unassisted!'], path, voice='test', synthesize=make_synth())
+    pack = AnnouncementPack(path)
+    synth = make_synth()
+    cache = make_cache(synth)
+    fragments = AppleMusicController.goal_announcement_fragments('home', '9', None, None, HOME)
+    assert _speak(cache, 'home', '9', pack=pack)['synthesized'] == 1
+    assert synth.calls == ['Scored by number 9, Brant Friedholm!']
+
+    # Every phrase trimmed to its pads, joined with a short crossfade - cached phrases were trimmed
+    # when they were stored, so only the pack's are trimmed here
+    trimmed = []
+    trim_silence = phrase_cache.trim_silence
+    monkeypatch.setattr(phrase_cache, 'trim_silence', lambda *args: trimmed.append(args) or trim_silence(*args))
+    audio_format, pcm = cache.assemble(fragments, pack)
+    assert len(trimmed) == 2
+    phrase_ms = LEAD_PAD_MS + synth.speech_ms + TRAIL_PAD_MS
+    expected_ms = 3 * phrase_ms - 2 * CROSSFADE_MS
+    assert audio_format == (1, 2, synth.rate) and abs(len(pcm) / 2 / synth.rate * 1000 - expected_ms) <= 10, len(pcm)
+    assert cache.assemble(fragments + [' Scored by number 42!']) is None
+    pack.close()
+
+
+def test_controller_speaks_phrase_by_phrase(make_synth, make_cache, make_core, sim_backend, clip_folder, monkeypatch):
+    backend = sim_backend
+    core = make_core({'celebration_premix': False, 'soundboard_dir': str(clip_folder())})
+    synth = make_synth()
+    core._phrase_cache = make_cache(synth)
+    monkeypatch.setattr(hockey_music_controller, 'hume_enabled', lambda: True)
+    core.announce_goal('home', '9')
+    core.announce_goal('home', '9', '10')
+    assert backend.calls['speak'] == 0 and backend.calls['play_sound_file'] == 2
+    spoken = {spoken_text(f) for f in core.goal_announcement_fragments('home', '9', '10')}
+    assert set(synth.calls) == spoken | {spoken_text(f) for f in core.goal_announcement_fragments('home', '9')}
+
+    core.config['announcement_phrases'] = False  # whole sentences again
+    core.announce_goal('home', '9')
+    assert backend.calls['speak'] == 1
@@ -0,0 +1,215 @@
+"""
+Test the playback scheduler on a fake monotonic clock - stops fire at the deadline, pause freezes
+the countdown, fades hand off to the fade process, rescheduling or cancelling replaces the pending
+stop, and next_track's delayed calls are dropped once a newer command ran
+
+    python3 -m pytest test_playback_scheduler.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from hockey_music_controller import PlaybackScheduler
+
+
+class FakeClock:
+    """time.monotonic stand-in that only moves when advanced, waking the scheduler's timer"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.scheduler = None
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+        with self.scheduler._cond:
+            self.scheduler._cond.notify()
+        time.sleep(0.05)  # let the timer thread look at the new time
+
+
+class FadeProcess:
+    """Fade ramp that runs until finish() or kill()"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.killed = False
+
+    def poll(self):
+        return 0 if self.done.is_set() else None
+
+    def kill(self):
+        self.killed = True
+        self.done.set()
+
+    def wait(self):
+        self.done.wait(5)
+        return 0
+
+    def finish(self):
+        self.done.set()
+        time.sleep(0.05)
+
+
+class Music:
+    """Records the scheduler's backend calls"""
+
+    def __init__(self):
+        self.calls = []
+        self.fades = []
+
+    def stop(self):
+        self.calls.append(('stop',))
+
+    def get_volume(self):
+        return 80
+
+    def set_volume(self, volume):
+        self.calls.append(('set_volume', volume))
+
+    def start_fade_out(self, duration, start_volume, steps=20):
+        self.calls.append(('fade', duration, start_volume))
+        self.fades.append(FadeProcess())
+        return self.fades[-1]
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def music():
+    return Music()
+
+
+@pytest.fixture
+def stops():
+    return []
+
+
+@pytest.fixture
+def scheduler(clock, music, stops):
+    scheduler = PlaybackScheduler(music, on_stop=lambda label, fade: stops.append((label, fade)), clock=clock)
+    clock.scheduler = scheduler
+    yield scheduler
+    scheduler.cancel()
+
+
+def test_stop_fires_at_the_deadline(scheduler, clock, music, stops):
+    scheduler.schedule(30, 0, 'Song 1')
+    assert scheduler.is_pending()
+    clock.advance(29.9)
+    assert music.calls == [] and stops == []
+    clock.advance(0.1)
+    assert music.calls == [('stop',)] and stops == [('Song 1', 0)]
+    assert not scheduler.is_pending()
+    clock.advance(60)
+    assert music.calls == [('stop',)], "a stop fired twice"
+
+
+def test_pause_freezes_the_countdown(scheduler, clock, music):
+    scheduler.schedule(10, 0, 'Song 1')
+    clock.advance(4)
+    scheduler.pause()
+    clock.advance(100)
+    assert music.calls == [] and scheduler.is_pending()
+    scheduler.resume()
+    clock.advance(5.9)
+    assert music.calls == []
+    clock.advance(0.1)
+    assert music.calls == [('stop',)]
+
+
+def test_fade_hands_off_to_the_fade_process(scheduler, clock, music, stops):
+    scheduler.schedule(10, 3, 'Song 1')
+    clock.advance(6.9)
+    assert music.calls == []
+    clock.advance(0.1)  # the fade starts fade_seconds before the end point
+    assert music.calls == [('fade', 3, 80)]
+    assert stops == [], "reported stopped before the fade finished"
+    music.fades[-1].finish()
+    assert stops == [('Song 1', 3)]
+    assert ('stop',) not in music.calls and not scheduler.is_pending()
+
+    # A fade longer than the play time is cut to it
+    scheduler.schedule(2, 5, 'Song 2')
+    clock.advance(0)
+    assert music.calls[-1] == ('fade', 2, 80)
+
+
+def test_reschedule_replaces_the_pending_stop(scheduler, clock, music, stops):
+    scheduler.schedule(10, 0, 'Song 1')
+    clock.advance(5)
+    scheduler.schedule(10, 0, 'Song 2')
+    clock.advance(5)
+    assert music.calls == []
+    clock.advance(5)
+    assert stops == [('Song 2', 0)] and music.calls == [('stop',)]
+
+    scheduler.schedule(10, 0, 'Song 3')
+    scheduler.cancel()
+    assert not scheduler.is_pending()
+    clock.advance(60)
+    assert stops == [('Song 2', 0)]
+
+
+def test_cancel_mid_fade_restores_the_volume(scheduler, clock, music, stops):
+    scheduler.schedule(5, 5, 'Song 1')
+    clock.advance(0)
+    fade = music.fades[-1]
+    scheduler.cancel()
+    assert fade.killed and music.calls[-1] == ('set_volume', 80)
+    time.sleep(0.05)
+    assert stops == [], "a cancelled fade reported an auto-stop"
+
+    # Rescheduling kills the running fade the same way
+    scheduler.schedule(5, 5, 'Song 2')
+    clock.advance(0)
+    scheduler.schedule(30, 0, 'Song 3')
+    assert music.fades[-1].killed and music.calls[-1] == ('set_volume', 80)
+
+
+@pytest.fixture
+def queued_core(make_core, sim_backend):
+    """Controller whose call_later only queues - run_due(count=all) runs queued calls in order"""
+    pending = []
+
+    def run_due(count=None):
+        while pending and count != 0:
+            pending.pop(0)()
+            count = None if count is None else count - 1
+
+    core = make_core({'goal_song': 'Goal Horn'}, call_later=lambda delay_ms, callback: pending.append(callback))
+    core.load_playlist('Stoppage')
+    core.run_due = run_due
+    sim_backend.calls.clear()
+    return core
+
+
+def test_next_track_queues_the_song_stopped(queued_core, sim_backend):
+    queued_core.next_track()
+    queued_core.run_due()
+    assert sim_backend.calls['play_track_from_playlist'] == 1 and sim_backend.calls['stop'] == 4
+    assert sim_backend.state == 'stopped'
+
+
+def test_next_track_calls_are_dropped_after_a_newer_command(queued_core, sim_backend):
+    queued_core.next_track()
+    assert queued_core.play_cue('goal_song')
+    queued_core.run_due()
+    assert sim_backend.calls['play_track_from_playlist'] == 0, "Next queued its song over the goal song"
+    assert sim_backend.state == 'playing' and sim_backend.current == 'Goal Horn'
+
+    # Once the song is queued, its pending stops don't silence a newer command's song either
+    queued_core.next_track()
+    queued_core.run_due(1)
+    assert sim_backend.calls['play_track_from_playlist'] == 1
+    assert queued_core.play_cue('goal_song')
+    stops = sim_backend.calls['stop']
+    queued_core.run_due()
+    assert sim_backend.calls['stop'] == stops and sim_backend.current == 'Goal Horn'
+    assert sim_backend.state == 'playing'
@@ -0,0 +1,123 @@
+"""
+Test segment playlist preloading - bounded parallel fetches, instant switching that keeps each position
+Runs against the simulator's in-memory Music backend
+
+    python3 -m pytest test_playlist_preload.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from command_server import CommandDispatcher
+from game_simulator import LatencyModel, SimClock, SimulatedMusicBackend
+from playlist_cache import PlaylistCache
+
+SEGMENTS = ['Warmup', 'Period Stoppage', 'Intermission', 'Third Period Push', 'Overtime']
+FETCH_MS = 100
+
+
+class ProbedBackend(SimulatedMusicBackend):
+    """Simulated Music that records how many playlist fetches overlap"""
+
+    def __init__(self):
+        playlists = {name: [f"{name} Song {i} | Artist {i}" for i in range(1, 21)] for name in SEGMENTS}
+        super().__init__(LatencyModel('fixed', FETCH_MS), SimClock(1), playlists)
+        self.active = 0
+        self.max_active = 0
+        self._probe_lock = threading.Lock()
+
+    def get_playlist_tracks(self, playlist_name):
+        with self._probe_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            return super().get_playlist_tracks(playlist_name)
+        finally:
+            with self._probe_lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def segment_core(make_core):
+    """segment_core(backend, playlist_cache=None, **config) - a controller with the segment playlists configured"""
+    def make(backend, playlist_cache=None, **config):
+        return make_core(dict({'segment_playlists': SEGMENTS}, **config), backend, playlist_cache=playlist_cache)
+    return make
+
+
+def test_preload_is_parallel_and_bounded(segment_core):
+    backend = ProbedBackend()
+    core = segment_core(backend)
+    started = time.perf_counter()
+    counts = core.preload_playlists(workers=2)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert counts == {name: 20 for name in SEGMENTS}
+    assert backend.max_active == 2, backend.max_active
+    # 5 playlists, 2 at a time: 3 rounds instead of 5
+    per_fetch_ms = FETCH_MS + 2 * 20
+    assert elapsed_ms < 4 * per_fetch_ms, f"{elapsed_ms:.0f} ms"
+    assert core.loaded_playlist_names() == SEGMENTS
+    assert core.search("third period song 7")[0] == "Third Period Push Song 7 | Artist 7"
+
+
+def test_switch_keeps_order_and_position(segment_core):
+    backend = ProbedBackend()
+    core = segment_core(backend, playlist='Period Stoppage')
+    assert core.load_playlist('Period Stoppage') == 20
+    core.preload_playlists()
+    assert 'Period Stoppage' not in core.loaded_playlists  # the active one isn't fetched twice
+    assert backend.calls['get_playlist_tracks'] == 5
+
+    core.shuffle()
+    period_order = list(core.shuffled_order)
+    core.current_track_index = 6
+    calls = sum(backend.calls.values())
+
+    assert core.switch_playlist('Intermission') == 20
+    assert core.playlist_name == 'Intermission' and core.current_track_index == 0
+    core.current_track_index = 3
+    assert core.switch_playlist('Period Stoppage') == 20
+    assert core.shuffled_order == period_order and core.current_track_index == 6
+    assert core.track_at(6).startswith('Period Stoppage')
+    assert core.switch_playlist('Intermission') == 20 and core.current_track_index == 3
+    assert sum(backend.calls.values()) == calls, "switching called the backend"
+
+    with pytest.raises(ValueError):
+        core.switch_playlist('Nope')
+
+    # Loading another playlist by hand keeps the one it replaces switchable
+    backend.playlists['Shootout'] = ['Shootout Song | Band']
+    core.load_playlist('Shootout')
+    assert 'Intermission' in core.loaded_playlist_names() and core.switch_playlist('Intermission') == 20
+    assert core.current_track_index == 3
+
+
+def test_cached_playlists_only_check_fingerprints(segment_core, tmp_path):
+    cache = PlaylistCache(str(tmp_path / 'cache.json'))
+    backend = ProbedBackend()
+    segment_core(backend, playlist_cache=cache).preload_playlists()
+    assert backend.calls['get_playlist_tracks'] == 5
+
+    backend = ProbedBackend()
+    backend.playlists['Overtime'] = backend.playlists['Overtime'][:10]  # changed since it was cached
+    core = segment_core(backend, playlist_cache=cache)
+    core.preload_playlists()
+    assert backend.calls['get_playlist_tracks'] == 1
+    assert len(core.loaded_playlists['Overtime']['tracks']) == 10
+
+
+def test_switch_over_the_command_api(segment_core):
+    backend = ProbedBackend()
+    dispatcher = CommandDispatcher(lambda call_later: segment_core(backend))
+    try:
+        dispatcher.core.preload_playlists()
+        status, response = dispatcher.dispatch('switch_playlist', {'name': 'Overtime'})
+        assert status == 200 and response['result'] == 20, response
+        assert dispatcher.core.snapshot()['loaded_playlists'] == SEGMENTS
+        status, response = dispatcher.dispatch('switch_playlist', {'name': 'Nope'})
+        assert status == 400, response
+    finally:
+        dispatcher.shutdown()
+
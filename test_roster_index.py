@@ -0,0 +1,73 @@
+"""
+Test the roster index - team names from file names, a league CSV split into one roster per team
+(reported through the log), and goal announcements that read the roster files once, not per goal
+
+    python3 -m pytest test_roster_index.py
+"""
+
+import pytest
+
+import roster_index
+from hockey_music_controller import AppleMusicController
+from roster_index import RosterIndex, team_name_for_file
+
+
+@pytest.fixture
+def rosters(tmp_path):
+    folder = tmp_path / 'rosters'
+    folder.mkdir()
+    (folder / 'patriots_roster_2025.csv').write_text("9,Brant Friedholm\n10,Cale Kulig\n")
+    (folder / 'opponents_blue_devils.csv').write_text("#12,Sam Ode\n")
+    return folder
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Roster files read, in order"""
+    paths = []
+    read = roster_index.read_roster_csv
+    monkeypatch.setattr(roster_index, 'read_roster_csv', lambda path: (paths.append(path), read(path))[1])
+    monkeypatch.setattr(roster_index, '_shared', {})
+    return paths
+
+
+def test_team_names_and_lookup(rosters):
+    assert team_name_for_file('patriots_roster_2025.csv') == 'Patriots'
+    assert team_name_for_file('opponents_blue_devils.csv') == 'Blue Devils'
+    index = RosterIndex(str(rosters))
+    assert index.teams() == ['Blue Devils', 'Patriots']
+    assert index.lookup('blue devils', '#12') == 'Sam Ode' and index.lookup('Patriots', 99) is None
+
+
+def test_import_league_logs_instead_of_printing(rosters, log_records, capsys):
+    league = rosters.parent / 'league.csv'
+    league.write_text("Team,Number,Name\nBlue Devils,12,Sam Ode\nBlue Devils,4,Ray Lin\nRed Wings,7,Al Best\n")
+    index = RosterIndex(str(rosters))
+    assert index.import_league(str(league)) == {'Blue Devils': 2, 'Red Wings': 1}
+    assert capsys.readouterr().out == ""
+    imported = [r for r in log_records if r.getMessage().startswith("✅ Imported")]
+    assert imported[0].getMessage() == f"✅ Imported 2 team rosters into {rosters}"
+    assert imported[0].fields == {'path': str(league), 'teams': 2}
+    # The existing Blue Devils file is replaced, the new team gets its own
+    assert (rosters / 'opponents_blue_devils.csv').read_text().splitlines() == ["12,Sam Ode", "4,Ray Lin"]
+    assert index.players('Red Wings') == {'7': 'Al Best'}
+
+    league.write_text("team,name\nRed Wings,Al Best\n")
+    with pytest.raises(ValueError, match='missing: number'):
+        index.import_league(str(league))
+
+
+def test_goal_announcements_read_the_roster_once(rosters, reads, monkeypatch):
+    roster_file = str(rosters / 'patriots_roster_2025.csv')
+    for _ in range(3):
+        text = AppleMusicController.build_goal_announcement('home', '9', '10', roster_file=roster_file)
+        assert 'Brant Friedholm' in text and 'Cale Kulig' in text
+    assert AppleMusicController.build_goal_announcement('away', '12', roster_file=roster_file).count('12') == 1
+    assert sorted(reads) == sorted(str(path) for path in rosters.glob('*.csv'))
+
+    # Without a roster file, the default one (relative to the working folder) - still read once
+    monkeypatch.chdir(rosters.parent)
+    reads.clear()
+    for _ in range(3):
+        assert 'Brant Friedholm' in AppleMusicController.generate_goal_announcement('home', '9')
+    assert len(reads) == 2
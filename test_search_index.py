@@ -0,0 +1,94 @@
+"""
+Test the search index - fuzzy matching, incremental updates, type-ahead speed on a big library
+The controller test indexes a folder library through the mpv backend (mpv itself isn't needed)
+
+    python3 -m pytest test_search_index.py
+"""
+
+import os
+import statistics
+import time
+
+import pytest
+
+from mpv_backend import MpvMusicController
+from search_index import SearchIndex, normalize, synthetic_library
+
+TRACKS = [
+    "Sweet Caroline | Neil Diamond",
+    "Sweet Child O' Mine | Guns N' Roses",
+    "Caroline | Status Quo",
+    "We Will Rock You | Queen",
+    "Halo | Beyoncé",
+    "Zamboni Song | The Rink Band",
+]
+
+
+def test_normalize():
+    assert normalize("Beyoncé - Halo!") == ['beyonce', 'halo']
+    assert normalize("Sweet Child O' Mine | Guns N' Roses") == ['sweet', 'child', 'o', 'mine', 'guns', 'n', 'roses']
+
+
+def test_type_ahead_and_typos():
+    index = SearchIndex(TRACKS)
+    assert index.search("sweet ca")[0] == "Sweet Caroline | Neil Diamond"
+    assert index.search("sweet chi")[0] == "Sweet Child O' Mine | Guns N' Roses"
+    assert index.search("zamb")[0] == "Zamboni Song | The Rink Band"
+    assert index.search("carolnie")[:2] == ["Caroline | Status Quo", "Sweet Caroline | Neil Diamond"]
+    assert index.search("beyonce") == ["Halo | Beyoncé"]  # accents don't matter
+    assert index.search("queen")[0] == "We Will Rock You | Queen"  # artists are searchable
+    assert index.search("xylophone") == []
+    assert index.search("  ") == []
+    assert len(index.search("s", limit=2)) == 2
+
+
+def test_incremental_updates():
+    index = SearchIndex(TRACKS)
+    assert not index.add(TRACKS[0])
+    assert index.add("Sweet Georgia Brown | Brother Bones")
+    assert "Sweet Georgia Brown | Brother Bones" in index.search("sweet geo")
+    assert index.remove("Sweet Caroline | Neil Diamond")
+    assert "Sweet Caroline | Neil Diamond" not in index.search("sweet caroline")
+    assert not index.remove("Sweet Caroline | Neil Diamond")
+
+    added, removed = index.sync(["Halo | Beyoncé", "Thunderstruck | AC/DC"])
+    assert (added, removed) == (1, 5) and len(index) == 2
+    assert index.search("thunder") == ["Thunderstruck | AC/DC"]
+    assert index.search("zamboni") == []
+
+
+def test_type_ahead_speed_on_big_library():
+    tracks = synthetic_library(50000)
+    index = SearchIndex(tracks)
+    timings = []
+    for track in tracks[::2500]:
+        title = track.split(' | ')[0]
+        for end in range(1, len(title) + 1):
+            started = time.perf_counter()
+            results = index.search(title[:end])
+            timings.append((time.perf_counter() - started) * 1000)
+        assert track in results, (track, results[:3])
+    assert statistics.median(timings) < 10, f"median {statistics.median(timings):.1f} ms"
+
+
+def test_controller_indexes_library(tmp_path, make_core):
+    root = str(tmp_path)
+    for folder, names in {'Stoppage Music': ['01 Neil Diamond - Sweet Caroline.mp3', 'Queen - We Will Rock You.mp3'],
+                          'Goal Songs': ['Gary Glitter - Rock and Roll Part 2.mp3']}.items():
+        os.makedirs(os.path.join(root, folder))
+        for name in names:
+            open(os.path.join(root, folder, name), 'wb').close()
+    core = make_core(backend=MpvMusicController(root, os.path.join(root, 'mpv.sock')))
+
+    assert core.index_library() == (3, 2)
+    assert core.search("swet carol") == ["Sweet Caroline | Neil Diamond"]
+    assert core.search("rock")[0] == "Rock and Roll Part 2 | Gary Glitter"  # starts with what was typed
+    assert "We Will Rock You | Queen" in core.search("rock")
+    assert core.search("goal", 'playlist') == ["Goal Songs"]
+
+    # A loaded playlist's tracks are searchable straight away
+    core.set_playlist_tracks('Warmup', ["Thunderstruck | AC/DC"])
+    assert core.search("thunder") == ["Thunderstruck | AC/DC"]
+    with pytest.raises(ValueError):
+        core.search("x", 'album')
+
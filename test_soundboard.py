@@ -0,0 +1,143 @@
+"""
+Test the soundboard - hotkeys, overlapping non-blocking playback, the decoded-clip budget, the folder watcher
+Clips are short WAV files written on the fly; playback goes to fake outputs, not the sound card
+
+    python3 -m pytest test_soundboard.py
+"""
+
+import os
+import threading
+import time
+
+from command_server import CommandDispatcher
+from hockey_music_controller import HockeyController
+from soundboard import Soundboard, clip_name
+
+
+class FakePlayback:
+    """What simpleaudio.play_buffer returns: plays until stopped"""
+
+    def __init__(self):
+        self.playing = True
+
+    def is_playing(self):
+        return self.playing
+
+    def stop(self):
+        self.playing = False
+
+
+class FakeOutput:
+    """output(format, pcm) that records what it was given"""
+
+    def __init__(self):
+        self.played = []
+
+    def __call__(self, audio_format, pcm):
+        self.played.append((audio_format, len(pcm)))
+        return FakePlayback()
+
+
+def test_clip_names_and_hotkeys(clip_folder):
+    assert clip_name('/x/Lets_Go-Patriots.m4a') == 'lets go patriots'
+    folder = clip_folder('Horn.wav', 'Lets_Go_Patriots.wav', 'woo.wav')
+    open(os.path.join(folder, 'notes.txt'), 'w').close()
+    board = Soundboard(folder)
+    assert sorted(board.clips) == ['horn', 'lets go patriots', 'woo']
+    assert board.hotkeys() == {'1': 'horn', '2': 'lets go patriots', '3': 'woo'}
+    board = Soundboard(folder, keys={'h': 'horn', 'c': 'lets go patriots', 'x': 'missing'})
+    assert board.hotkeys() == {'h': 'horn', 'c': 'lets go patriots'}
+
+
+def test_clips_overlap_without_blocking(clip_folder):
+    folder = clip_folder('horn.wav', 'chant.wav', 'woo.wav', seconds=2)
+    output = FakeOutput()
+    board = Soundboard(folder, output=output)
+    assert board.preload() == 3
+    started = time.perf_counter()
+    assert board.play('horn') and board.play('chant') and board.play('woo') and board.play('horn')
+    assert time.perf_counter() - started < 0.1, "play() waited for a clip"
+    assert board.playing_count() == 4  # the same clip twice overlaps too
+    assert output.played[0] == ((1, 2, 8000), 32000)
+    assert not board.play('nope')
+    stats = board.latency_stats()
+    assert stats['count'] == 4 and stats['max_ms'] < 50, stats
+    board.stop_all()
+    assert board.playing_count() == 0
+
+    # Without an in-memory output each trigger starts its own player on the file
+    spawned = []
+    board = Soundboard(folder, spawn=lambda path, volume: spawned.append(path) or FakeProcess())
+    assert board.play('horn') and board.play('woo')
+    assert [os.path.basename(path) for path in spawned] == ['horn.wav', 'woo.wav']
+    assert board.playing_count() == 2 and board.latency_stats()['count'] == 2
+
+
+class FakeProcess:
+    def __init__(self):
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.returncode = -9
+
+
+def test_cache_stays_within_budget(clip_folder):
+    folder = clip_folder('a.wav', 'b.wav', 'c.wav', seconds=60)  # 960,000 bytes of PCM each
+    board = Soundboard(folder, cache_mb=2.5, output=FakeOutput())
+    assert board.preload() == 2
+    assert board.cached_clips() == ['a', 'b']
+    board.play('a')
+    board.play('c')  # decoded on demand, pushing out the least recently played
+    assert board.cached_clips() == ['a', 'c']
+    assert board._cached_bytes <= board.cache_budget
+
+    # A clip bigger than the whole budget still plays, straight from a fresh decode
+    board = Soundboard(folder, cache_mb=0.5, output=FakeOutput())
+    assert board.preload() == 0 and board.play('a') and board.cached_clips() == []
+
+
+def test_watcher_picks_up_new_clips(clip_folder, write_clip):
+    folder = clip_folder('horn.wav')
+    board = Soundboard(folder, output=FakeOutput())
+    changed = threading.Event()
+    board.add_listener(changed.set)
+    board.watch(0.05)
+    try:
+        write_clip(folder, 'Goal_Horn_2.wav')
+        assert changed.wait(2), "new clip not noticed"
+        assert 'goal horn 2' in board.clips and 'goal horn 2' in board.cached_clips()
+
+        changed.clear()
+        os.unlink(os.path.join(folder, 'horn.wav'))
+        assert changed.wait(2), "deleted clip not noticed"
+        assert 'horn' not in board.clips and 'horn' not in board.cached_clips()
+    finally:
+        board.close()
+
+
+def test_controller_celebration_and_clip_action(clip_folder, sim_backend, write_config):
+    folder = str(clip_folder('woo.wav', 'horn.wav'))
+    config_file = write_config({'soundboard_dir': folder, 'soundboard_output': 'process', 'soundboard_keys': {'h': 'horn'}})
+    backend = sim_backend
+
+    dispatcher = CommandDispatcher(lambda call_later: HockeyController(backend, config_file, call_later))
+    try:
+        core = dispatcher.core
+        started = time.perf_counter()
+        core.play_celebration_sound()
+        assert time.perf_counter() - started < 0.5, "celebration waited for the clip"
+        assert backend.calls['spawn_sound_file'] == 1 and backend.calls['play_sound_file'] == 0
+
+        status, response = dispatcher.dispatch('clip', {'name': 'horn'})
+        assert status == 200 and response['result'] is True, response
+        assert backend.calls['spawn_sound_file'] == 2
+        status, response = dispatcher.dispatch('clip', {'name': 'nope'})
+        assert status == 502, response
+        assert core.snapshot()['clips'] == [{'name': 'horn', 'key': 'h'}, {'name': 'woo', 'key': None}]
+        assert core.status()['clip_latency']['count'] == 2
+    finally:
+        dispatcher.shutdown()
+
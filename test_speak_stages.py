@@ -0,0 +1,124 @@
+"""
+Test the stage timings speak() returns - every pipeline step on a synthesized announcement, the
+steps that ran before a failure, only writing and playing on a cached one - and the same for
+announcements spoken phrase by phrase and from the baked pack
+Synthesis goes to bench_tts.py's stub TTS server on 127.0.0.1; nothing plays
+
+    python3 -m pytest test_speak_stages.py
+"""
+
+import os
+import socket
+import threading
+
+import pytest
+
+import hume_tts
+from announcement_pack import AnnouncementPack, bake, spoken_text
+from audio_dsp import announcement_cache
+from bench_tts import StubHumeClient, StubTTSServer, Utterance, Voice
+from game_simulator import LatencyModel
+from hockey_music_controller import AppleMusicController
+from hume_tts import HumeConfig
+from phrase_cache import PhraseCache
+
+SYNTHESIZED = {'dns_ms', 'client_ms', 'synthesize_ms', 'decode_ms', 'prepare_ms', 'write_ms', 'play_ms'}
+
+
+@pytest.fixture
+def hume(monkeypatch):
+    """hume(url) - Hume configured against url, through the stub client"""
+    def configure(url):
+        monkeypatch.setattr(hume_tts, '_hume_config', HumeConfig(True, 'test-key', 'Test Voice', url))
+    monkeypatch.setattr(hume_tts, '_hume_sdk', (StubHumeClient, Utterance, Voice))
+    timeout = socket.getdefaulttimeout()  # the worker sets its own for the DNS check
+    announcement_cache.clear()
+    yield configure
+    announcement_cache.clear()
+    socket.setdefaulttimeout(timeout)
+
+
+@pytest.fixture
+def tts_server():
+    server = StubTTSServer('127.0.0.1', LatencyModel('fixed', 0), LatencyModel('fixed', 500))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _player(played):
+    return lambda path: played.append(os.path.getsize(path))
+
+
+def test_synthesized_announcement_has_every_stage(hume, tts_server):
+    hume(tts_server.url)
+    played = []
+    result = AppleMusicController.speak("Patriots goal!", player=_player(played))
+    assert result['ok'] and not result['cached'] and len(played) == 1, result
+    assert set(result['stages']) == SYNTHESIZED
+    assert all(ms >= 0 for ms in result['stages'].values())
+
+    # The same announcement again skips synthesis - only writing and playing are timed
+    result = AppleMusicController.speak("Patriots goal!", player=_player(played))
+    assert result['ok'] and result['cached'] and len(played) == 2
+    assert set(result['stages']) == {'write_ms', 'play_ms'}
+
+
+def test_failed_synthesis_has_the_stages_before_it(hume):
+    hume(_unused_url())  # nothing listening
+    played = []
+    result = AppleMusicController.speak("Patriots goal!", player=_player(played))
+    assert not result['ok'] and result['error'] and played == []
+    assert set(result['stages']) == {'dns_ms', 'client_ms'}
+
+
+def test_no_hume_has_no_stages():
+    result = AppleMusicController.speak("Patriots goal!", player=lambda path: pytest.fail("played"))
+    assert result['engine'] == 'none' and not result['ok'] and result['stages'] == {}
+
+
+def _unused_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_phrase_cache_stages_and_base_url(hume, tts_server, tmp_path):
+    hume(tts_server.url)
+    fragments = AppleMusicController.goal_announcement_fragments('home', '9', None, None, {'9': 'Brant Friedholm'})
+    cache = PhraseCache(str(tmp_path / 'phrases'), loudness_target=None)
+    played = []
+    result = cache.speak(fragments, _player(played))
+    assert result['ok'] and result['synthesized'] == len(fragments) and len(played) == 1, result
+    assert len(tts_server.payload_bytes) == len(fragments), "phrases weren't synthesized at HUME_BASE_URL"
+    assert set(result['stages']) == {'synthesize_ms', 'assemble_ms', 'write_ms', 'play_ms'}
+
+    # Every phrase cached: nothing to synthesize
+    result = cache.speak(fragments, _player(played))
+    assert result['ok'] and set(result['stages']) == {'assemble_ms', 'write_ms', 'play_ms'}
+
+    # Synthesis failed: only its stage
+    hume(_unused_url())
+    cache = PhraseCache(str(tmp_path / 'failed'), loudness_target=None)
+    result = cache.speak(fragments, lambda path: pytest.fail("played"))
+    assert not result['ok'] and set(result['stages']) == {'synthesize_ms'}
+    cache.close()
+
+
+def test_pack_stages_and_base_url(hume, tts_server, tmp_path):
+    hume(tts_server.url)
+    fragments = AppleMusicController.goal_announcement_fragments('home', '9', None, None, {'9': 'Brant Friedholm'})
+    path = str(tmp_path / 'test.pack')
+    assert bake([spoken_text(f) for f in fragments], path)['failed'] == []
+    assert len(tts_server.payload_bytes) == len(fragments), "the pack wasn't baked at HUME_BASE_URL"
+
+    pack = AnnouncementPack(path)
+    played = []
+    result = pack.speak(fragments, _player(played))
+    assert result['ok'] and set(result['stages']) == {'assemble_ms', 'write_ms', 'play_ms'}, result
+
+    # Assembled ahead: only writing and playing
+    result = pack.speak(fragments, _player(played), audio=pack.wav_bytes(fragments))
+    assert result['ok'] and set(result['stages']) == {'write_ms', 'play_ms'} and len(played) == 2
+    pack.close()
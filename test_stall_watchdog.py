@@ -0,0 +1,164 @@
+"""
+Test the stall watchdog on a stand-in Tk loop - a call that blocks the loop is recorded with its
+duration, app call site and the call it was stuck in; short waits and an idle loop are not stalls;
+stall log write failures are logged from the writer thread; the log read back game by game
+
+    python3 -m pytest test_stall_watchdog.py
+"""
+
+import json
+import sys
+import threading
+import time
+import traceback
+
+import pytest
+
+import stall_watchdog
+from stall_watchdog import StallWatchdog, _is_idle, read_stall_log
+
+
+class FakeTk:
+    """A Tk event loop on its own thread - just after() and a way to run code on it"""
+
+    def __init__(self):
+        self._calls = []
+        self._lock = threading.Lock()
+        self._quit = False
+        self.thread = threading.Thread(target=self._loop, name='fake-tk', daemon=True)
+        self.thread.start()
+
+    def after(self, ms, callback):
+        with self._lock:
+            self._calls.append((time.monotonic() + ms / 1000, callback))
+
+    def run(self, function):
+        """Run function on the loop, returns its result"""
+        result = []
+        done = threading.Event()
+        self.after(0, lambda: (result.append(function()), done.set()))
+        assert done.wait(5)
+        return result[0]
+
+    def quit(self):
+        self._quit = True
+        self.thread.join(5)
+
+    def _loop(self):
+        while not self._quit:
+            now = time.monotonic()
+            with self._lock:
+                due = [call for call in self._calls if call[0] <= now]
+                self._calls = [call for call in self._calls if call[0] > now]
+            for _, callback in sorted(due, key=lambda call: call[0]):
+                callback()
+            time.sleep(0.002)
+
+
+class Journal:
+    def __init__(self):
+        self.events = []
+
+    def record(self, event, **fields):
+        self.events.append((event, fields))
+
+
+@pytest.fixture
+def root():
+    root = FakeTk()
+    yield root
+    root.quit()
+
+
+@pytest.fixture
+def watchdog(root, tmp_path):
+    journal = Journal()
+    # Created on the loop's thread, like the GUI does, so it knows which thread to watch
+    watchdog = root.run(lambda: StallWatchdog(root, threshold_ms=100, interval_ms=20,
+                                              log_path=str(tmp_path / 'stalls.log'), journal=journal))
+    root.run(watchdog.start)
+    yield watchdog
+    watchdog.stop()
+
+
+def slow_backend_call(seconds):
+    """Stands in for a blocking AppleScript call made on the Tk thread"""
+    threading.Event().wait(seconds)
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_blocking_call_is_recorded_with_its_stack(root, watchdog, tmp_path):
+    time.sleep(0.1)  # a few heartbeats on time
+    root.run(lambda: slow_backend_call(0.4))
+    assert _wait_for(lambda: watchdog.stalls)
+    stall = watchdog.stalls[0]
+    assert 250 <= stall['duration_ms'] < 2000
+    assert stall['site'].startswith('test_stall_watchdog.py:') and stall['site'].endswith('in slow_backend_call')
+    assert stall['blocking_in'].startswith('threading.py:')
+    assert watchdog.journal.events == [('ui_stall', stall)]
+
+    # A wait shorter than the threshold is not a stall
+    root.run(lambda: slow_backend_call(0.03))
+    time.sleep(0.1)
+    assert len(watchdog.stalls) == 1
+
+    summary = root.run(lambda: watchdog.new_game('Second game'))
+    assert summary['count'] == 1 and summary['sites'][0]['site'] == stall['site']
+    assert watchdog.stalls == []
+    watchdog.stop()
+    watchdog._writer.join(5)  # everything queued is written before it exits
+
+    # The stall belongs to the first game; the latest one has none yet
+    games = read_stall_log(str(tmp_path / 'stalls.log'))
+    assert [(label, len(stalls)) for label, stalls in games] == [('', 1), ('Second game', 0)]
+    with open(tmp_path / 'stalls.log', encoding='utf-8') as f:
+        logged = [json.loads(line) for line in f]
+    assert [entry['event'] for entry in logged] == ['start', 'stall', 'game']
+    assert any('in slow_backend_call' in frame for frame in logged[1]['stack'])
+
+
+def test_idle_loop_is_not_a_stall():
+    def mainloop():
+        return traceback.extract_stack()
+    stack = mainloop()
+    assert not _is_idle(stack)
+    stack[-1] = traceback.FrameSummary('/usr/lib/python3/tkinter/__init__.py', 1504, 'mainloop')
+    assert _is_idle(stack)
+
+
+def test_log_write_failure_is_logged(root, tmp_path, log_records):
+    # A folder where the log file should be - every write fails
+    (tmp_path / 'stalls.log').mkdir()
+    watchdog = root.run(lambda: StallWatchdog(root, log_path=str(tmp_path / 'stalls.log')))
+    root.run(watchdog.start)
+    try:
+        assert _wait_for(lambda: log_records)
+    finally:
+        watchdog.stop()
+    assert log_records[0].getMessage().startswith("⚠️  Stall log write failed:")
+    assert log_records[0].name == 'hockey.stalls' and log_records[0].threadName == 'stall-log'
+
+
+def test_latest_game_is_read_even_without_stalls(tmp_path, monkeypatch, capsys):
+    stall = {'event': 'stall', 'duration_ms': 250.0, 'site': 'app.py:1 in load', 'blocking_in': 'x.py:2 in wait'}
+    path = tmp_path / 'stalls.log'
+    path.write_text('\n'.join(json.dumps(entry) for entry in [
+        {'event': 'start'}, {'event': 'game', 'label': 'Hawks'}, stall, {'event': 'game', 'label': 'Bears'}]))
+    assert [(label, len(stalls)) for label, stalls in read_stall_log(str(path))] == [('Hawks', 1), ('Bears', 0)]
+
+    monkeypatch.setattr(sys, 'argv', ['stall_watchdog.py', '--log', str(path)])
+    assert stall_watchdog.main() == 0
+    assert capsys.readouterr().out.strip() == "✅ UI stalls - Bears: none"
+    monkeypatch.setattr(sys, 'argv', ['stall_watchdog.py', '--log', str(path), '--all'])
+    stall_watchdog.main()
+    out = capsys.readouterr().out
+    assert "UI stalls - Hawks: 1 stalls" in out and "UI stalls - Bears: none" in out
+
+    path.write_text(json.dumps({'event': 'start'}))
+    assert read_stall_log(str(path)) == [('', [])]
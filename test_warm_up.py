@@ -0,0 +1,78 @@
+"""
+Test the startup warm-up - an unreachable or failing backend leaves the controller 'offline' (never
+stuck 'warming') without starting the library load, a missing playlist or cue song is 'degraded',
+and a later warm-up recovers once Music answers
+Runs against the simulator's in-memory Music backend
+
+    python3 -m pytest test_warm_up.py
+"""
+
+import pytest
+
+from command_server import CommandDispatcher
+from hockey_music_controller import HockeyController
+
+
+class Journal:
+    def __init__(self):
+        self.events = []
+
+    def record(self, event, **fields):
+        self.events.append((event, fields))
+
+
+@pytest.fixture
+def journal():
+    return Journal()
+
+
+def test_no_answer_is_offline(make_core, sim_backend, journal, log_records):
+    core = make_core({'playlist': 'Stoppage'}, journal=journal)
+    sim_backend.warm_up = lambda: False
+    readiness = core.warm_up()
+    assert readiness['state'] == 'offline' and readiness['detail'] == 'Music is not responding'
+    assert core.snapshot()['readiness'] == readiness
+    assert journal.events == [('warm_up', readiness)]
+    assert [r.getMessage() for r in log_records if r.levelname == 'ERROR'] == ["❌ Music did not answer during warm-up"]
+    # Nothing else is asked of a backend that isn't there
+    assert not core.library_loaded.wait(0.2)
+    assert sim_backend.calls['get_library_tracks'] == 0 and sim_backend.calls['run_applescript'] == 0
+
+    # Music came up later - the next warm-up finds it
+    del sim_backend.warm_up
+    assert core.warm_up()['state'] == 'ready'
+    assert core.library_loaded.wait(5)
+
+
+def test_failing_backend_is_offline_not_warming(make_core, sim_backend, journal):
+    def broken():
+        raise FileNotFoundError("osascript not found")
+    sim_backend.warm_up = broken
+    core = make_core(journal=journal)
+    readiness = core.warm_up()
+    assert readiness['state'] == 'offline'
+    assert readiness['detail'] == "Music is not responding (osascript not found)"
+    assert journal.events[-1] == ('warm_up', readiness)
+
+
+def test_missing_playlist_and_song_are_degraded(make_core, sim_backend):
+    sim_backend.missing_tracks = lambda names: [name for name in names if name == 'Lost Song']
+    core = make_core({'playlist': 'Gone', 'goal_song': 'Lost Song', 'zamboni': 'Song 3 | Artist 3'})
+    readiness = core.warm_up()
+    assert readiness['state'] == 'degraded'
+    assert readiness['detail'] == "playlist 'Gone' not found; Goal song 'Lost Song' not found"
+    assert core.library_loaded.wait(5), "Music answered - the library should still load"
+
+
+def test_failing_warm_up_over_the_command_api(sim_backend, write_config):
+    sim_backend.warm_up = lambda: False
+    config_file = write_config({})
+    dispatcher = CommandDispatcher(lambda call_later: HockeyController(sim_backend, config_file, call_later))
+    try:
+        assert dispatcher.warm_up().result(5)['state'] == 'offline'
+        # Presses queued behind it still run, and fail like they would without warm-up
+        status, response = dispatcher.dispatch('next', {})
+        assert status == 400 and 'load a playlist' in response['error']
+        assert dispatcher.dispatch('status', {})[0] == 200
+    finally:
+        dispatcher.shutdown()